@@ -1,15 +1,18 @@
 import getpass
 import json
 import os
+import socket
 import sys
+import tempfile
+import time
 from binascii import hexlify, unhexlify
-from typing import Dict
+from typing import Dict, Optional
 
-from eth_keyfile import decode_keyfile_json
+from eth_keyfile import create_keyfile_json, decode_keyfile_json
 import structlog
 from eth_utils import to_checksum_address
 
-from raiden.utils import privtopub, privatekey_to_address
+from raiden.utils import privtopub, privatekey_to_address, sha3
 
 log = structlog.get_logger(__name__)
 
@@ -76,9 +79,179 @@ def check_keystore_json(jsondata: Dict) -> bool:
     return True
 
 
+def write_private_file(path: str, content: str):
+    """ Atomically replace the file at `path`, which is only readable by the user. """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    # mkstemp creates the file with the mode 0600
+    fd, temporary_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as handler:
+            handler.write(content)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def read_system_id(paths) -> Optional[bytes]:
+    """ Return the content of the first of `paths` which is readable and not
+    empty, or `None`.
+    """
+    for path in paths:
+        try:
+            with open(path, 'rb') as handler:
+                system_id = handler.read().strip()
+        except OSError:
+            continue
+
+        if system_id:
+            return system_id
+
+    return None
+
+
+def local_secret() -> Optional[bytes]:
+    """ Secret of this machine, user and boot, or `None` if it can't be told.
+
+    Derived from the host name, the user, the machine id and the boot id, which
+    changes on every boot. Without both ids, e.g. outside of Linux, there is
+    no secret.
+    """
+    machine_id = read_system_id(('/etc/machine-id', '/var/lib/dbus/machine-id'))
+    boot_id = read_system_id(('/proc/sys/kernel/random/boot_id',))
+    if machine_id is None or boot_id is None:
+        return None
+
+    secret = [socket.gethostname().encode()]
+
+    if hasattr(os, 'getuid'):
+        secret.append(str(os.getuid()).encode())
+
+    secret.extend((machine_id, boot_id))
+    return sha3(b'\0'.join(secret))
+
+
+class UnlockCache:
+    """ Keeps the unlocked private keys for `lifetime` seconds, so a restarted
+    node skips the password and the key derivation of the keystore file.
+
+    Every key is stored as a keystore file of its own, encrypted with a single
+    round of pbkdf2 and a password derived from `local_secret`, the content of
+    the account's keystore file and the expiration time. A cached key can't be
+    used after it expired, after the keystore file changed or once the cache
+    is copied to another machine, or after a reboot. The cache is disabled
+    where the machine and boot ids are unavailable. On this machine the cache
+    is as sensitive as a password file and is only readable by the user.
+    """
+
+    def __init__(self, path: str, lifetime: int):
+        self.path = path
+        self.lifetime = lifetime
+
+    def _read(self) -> Dict:
+        """ Return the entries which did not expire, the expired ones are
+        removed from the file.
+        """
+        try:
+            with open(self.path) as handler:
+                entries = json.load(handler)
+        except (OSError, ValueError):
+            return dict()
+
+        if not isinstance(entries, dict):
+            return dict()
+
+        now = time.time()
+        valid_entries = {
+            cached_address: entry
+            for cached_address, entry in entries.items()
+            if isinstance(entry, dict) and entry.get('expires_at', 0) > now
+        }
+        if valid_entries != entries:
+            self._write(valid_entries)
+
+        return valid_entries
+
+    def _write(self, entries: Dict):
+        if not entries:
+            self.clear()
+            return
+
+        try:
+            write_private_file(self.path, json.dumps(entries))
+        except OSError as ex:
+            log.warning('Unable to write the unlock cache', path=self.path, ex=ex)
+
+    @staticmethod
+    def _password(secret: bytes, keystore_file: str, expires_at: int) -> bytes:
+        with open(keystore_file, 'rb') as handler:
+            keystore = handler.read()
+
+        return hexlify(sha3(secret + sha3(keystore) + str(expires_at).encode()))
+
+    def get(self, address: str, keystore_file: str) -> Optional[bytes]:
+        """ Return the private key of `address` or `None` if it isn't cached. """
+        entry = self._read().get(address)
+        secret = local_secret()
+        if entry is None or secret is None:
+            return None
+
+        try:
+            password = self._password(secret, keystore_file, entry['expires_at'])
+            return decode_keyfile_json(entry['keystore'], password)
+        except (KeyError, OSError, ValueError):
+            # The keystore file changed or the cache was created elsewhere
+            return None
+
+    def put(self, address: str, keystore_file: str, privkey: bytes):
+        secret = local_secret()
+        if secret is None:
+            log.warning(
+                'The unlock cache is disabled, the machine id or the boot id is unavailable',
+            )
+            return
+
+        expires_at = int(time.time() + self.lifetime)
+
+        entries = self._read()
+        entries[address] = {
+            'expires_at': expires_at,
+            'keystore': create_keyfile_json(
+                privkey,
+                self._password(secret, keystore_file, expires_at),
+                iterations=1,
+            ),
+        }
+        self._write(entries)
+
+    def clear(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
 class AccountManager:
-    def __init__(self, keystore_path=None):
+    """ The accounts of the keystore directory.
+
+    Finding the address of an account requires to parse its keystore file. If
+    `index_path` is given, the addresses are stored in this file, with the
+    modification time and the size of the keystore files, and only the new or
+    changed files are parsed the next time. If `unlock_cache` is given, the
+    unlocked private keys are stored in it.
+    """
+
+    def __init__(
+            self,
+            keystore_path: str = None,
+            index_path: str = None,
+            unlock_cache: UnlockCache = None,
+    ):
         self.keystore_path = keystore_path
+        self.index_path = index_path
+        self.unlock_cache = unlock_cache
         self.accounts = {}
         if self.keystore_path is None:
             self.keystore_path = find_keystoredir()
@@ -91,13 +264,26 @@ class AccountManager:
                 log.error('OsError', msg=msg, path=self.keystore_path, ex=ex)
                 return
 
+            index = self._read_index()
+            updated_index = dict()
+
             for f in files:
                 fullpath = os.path.join(self.keystore_path, f)
                 if os.path.isfile(fullpath):
                     try:
+                        stat = os.stat(fullpath)
+                        signature = [stat.st_mtime_ns, stat.st_size]
+                        indexed = index.get(f)
+                        if isinstance(indexed, dict) and indexed.get('signature') == signature:
+                            self.accounts[indexed['address']] = str(fullpath)
+                            updated_index[f] = indexed
+                            continue
+
                         with open(fullpath) as data_file:
                             data = json.load(data_file)
-                            self.accounts[str(data['address']).lower()] = str(fullpath)
+                            address = str(data['address']).lower()
+                            self.accounts[address] = str(fullpath)
+                            updated_index[f] = {'signature': signature, 'address': address}
                     except (
                         IOError,
                         json.JSONDecodeError,
@@ -115,6 +301,40 @@ class AccountManager:
                                 msg = 'The account file is not valid JSON format'
                             log.warning(msg, path=fullpath, ex=ex)
 
+            if updated_index != index:
+                self._write_index(updated_index)
+
+    def _read_index(self) -> Dict:
+        if self.index_path is None:
+            return dict()
+
+        try:
+            with open(self.index_path) as handler:
+                index = json.load(handler)
+        except (OSError, ValueError):
+            return dict()
+
+        if not isinstance(index, dict):
+            return dict()
+
+        if index.get('keystore_path') != os.path.abspath(self.keystore_path):
+            return dict()
+
+        files = index.get('files')
+        if not isinstance(files, dict):
+            return dict()
+        return files
+
+    def _write_index(self, files: Dict):
+        if self.index_path is None:
+            return
+
+        index = {'keystore_path': os.path.abspath(self.keystore_path), 'files': files}
+        try:
+            write_private_file(self.index_path, json.dumps(index))
+        except OSError as ex:
+            log.warning('Unable to write the keystore index', path=self.index_path, ex=ex)
+
     def address_in_keystore(self, address):
         if address is None:
             return False
@@ -130,8 +350,10 @@ class AccountManager:
         Args:
             address(str): The Ethereum address for which to find the keyfile in the system
             password(str): Mostly for testing purposes. A password can be provided
-                           as the function argument here. If it's not then the
-                           user is interactively queried for one.
+                           as the function argument here, the unlock cache is
+                           then not used to read the key. If it's not then the
+                           user is interactively queried for one, unless the key
+                           is in the unlock cache.
         Returns
             str: The private key associated with the address
         """
@@ -144,6 +366,11 @@ class AccountManager:
         if not self.address_in_keystore(address):
             raise ValueError('Keystore file not found for %s' % address)
 
+        if self.unlock_cache is not None and password is None:
+            privkey = self.unlock_cache.get(address, self.accounts[address])
+            if privkey is not None:
+                return privkey
+
         with open(self.accounts[address]) as data_file:
             data = json.load(data_file)
 
@@ -153,6 +380,10 @@ class AccountManager:
                 f'Enter the password to unlock {to_checksum_address(address)}: ',
             )
         acc = Account(data, password, self.accounts[address])
+
+        if self.unlock_cache is not None:
+            self.unlock_cache.put(address, self.accounts[address], acc.privkey)
+
         return acc.privkey
 
 
@@ -0,0 +1,45 @@
+import json
+from typing import Any, Callable, Dict, Hashable, NamedTuple
+
+from eth_utils import encode_hex
+
+from raiden.utils import sha3
+
+
+class CachedResult(NamedTuple):
+    data: str
+    etag: str
+
+
+class StateViewCache:
+    """ JSON encoded results of the read only endpoints, computed at most once
+    per version of the node state.
+
+    `state_version` returns the identifier of the last state change applied
+    to the node state, all the results are discarded once it changes. The
+    ETag of a result is the hash of its content, so a result computed again
+    after an unrelated state change keeps its ETag.
+    """
+
+    def __init__(self, state_version: Callable[[], Any]):
+        self.state_version = state_version
+        self.version = None
+        self.results: Dict[Hashable, CachedResult] = dict()
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> CachedResult:
+        """ Return the result for `key`, `compute` is called if there is no
+        result for the current state.
+        """
+        version = self.state_version()
+        if version != self.version:
+            self.results.clear()
+            self.version = version
+
+        cached = self.results.get(key)
+        if cached is None:
+            data = json.dumps(compute())
+            etag = encode_hex(sha3(data.encode()))[2:34]
+            cached = CachedResult(data, etag)
+            self.results[key] = cached
+
+        return cached
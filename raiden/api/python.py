@@ -1,8 +1,9 @@
-from contextlib import ExitStack
-
 import  json
+from collections import deque
+
 import gevent
 import structlog
+from gevent.queue import Queue
 from eth_utils import is_binary_address, to_checksum_address
 
 from raiden import waiting
@@ -12,13 +13,18 @@ from raiden.blockchain.events import (
     get_token_network_events,
     get_token_network_registry_events,
 )
-from raiden.transfer import views
+from raiden.transfer import channel, views
 from raiden.transfer.events import (
+    ContractSendChannelBatchUnlock,
+    ContractSendChannelClose,
+    ContractSendChannelSettle,
+    ContractSendChannelUpdateTransfer,
+    EventCrossSwapUpdated,
     EventTransferSentSuccess,
     EventTransferSentFailed,
     EventTransferReceivedSuccess,
 )
-from raiden.transfer.state_change import ActionChannelClose
+from raiden.transfer.state_change import ActionChannelClose, ReceiveCrossInvoicePaid
 from raiden.exceptions import (
     AlreadyRegisteredTokenAddress,
     ChannelNotFound,
@@ -30,24 +36,27 @@ from raiden.exceptions import (
     UnknownTokenAddress,
     DepositOverLimit,
     DuplicatedChannelError,
+    DuplicatedCrossIdentifier,
+    DuplicatedPaymentIdentifier,
     TokenNotRegistered,
+    UnknownCrossTransaction,
+    UnknownEventType,
 )
 from raiden.settings import (
+    DEFAULT_API_PAGE_SIZE,
+    DEFAULT_EVENT_FEED_KEEPALIVE,
     DEFAULT_POLL_TIMEOUT,
     DEFAULT_RETRY_TIMEOUT,
 )
 from raiden.utils import (
+    create_default_crossid,
+    create_default_identifier,
     pex,
     typing,
 )
 from raiden.api.rest import hexbytes_to_str, encode_byte_values
-from raiden.messages import (
-    AcceptCross,
-)
-import random
 from raiden.constants import (
     UINT256_MAX,
-    UINT64_MAX,
 )
 
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
@@ -57,6 +66,29 @@ EVENTS_EXTERNALLY_VISIBLE = (
     EventTransferSentFailed,
     EventTransferReceivedSuccess,
 )
+EVENTS_EXTERNALLY_VISIBLE_NAMES = [event.__name__ for event in EVENTS_EXTERNALLY_VISIBLE]
+
+EVENTS_FEED = EVENTS_EXTERNALLY_VISIBLE + (
+    EventCrossSwapUpdated,
+    ContractSendChannelClose,
+    ContractSendChannelUpdateTransfer,
+    ContractSendChannelSettle,
+    ContractSendChannelBatchUnlock,
+)
+EVENTS_FEED_NAMES = [event.__name__ for event in EVENTS_FEED]
+
+
+def event_to_dict(block_number, event):
+    event_dict = {
+        'block_number': block_number,
+        'event': type(event).__name__,
+    }
+    # The events have __slots__, the base classes' attributes come first
+    for klass in reversed(type(event).__mro__):
+        for name in getattr(klass, '__slots__', ()):
+            # the events stored before a slot was added don't have it
+            event_dict[name] = getattr(event, name, None)
+    return event_dict
 
 
 class RaidenAPI:
@@ -342,7 +374,7 @@ class RaidenAPI:
 
         balance = token.balance_of(self.raiden.address)
 
-        deposit_limit = token_network_proxy.proxy.contract.functions.deposit_limit().call()
+        deposit_limit = token_network_proxy.deposit_limit()
         if total_deposit > deposit_limit:
             raise DepositOverLimit(
                 'The deposit of {} is bigger than the current limit of {}'.format(
@@ -452,40 +484,35 @@ class RaidenAPI:
             token_address,
         )
 
-        # If concurrent operations are happening on one of the channels, fail entire
-        # request.
-        with ExitStack() as stack:
-            # Put all the locks in this outer context so that the netting channel functions
-            # don't release the locks when their context goes out of scope
-            for channel_state in channels_to_close:
-                channel = self.raiden.chain.payment_channel(
-                    token_network_identifier,
-                    channel_state.identifier,
-                )
-                stack.enter_context(channel.lock_or_raise())
+        # Each close is handled by its own greenlet, so the transactions are
+        # sent back to back and mined together. Concurrent operations on the
+        # same channel are serialized by the channel proxy lock, the locks
+        # can not be held here because they are reentrant per greenlet.
+        greenlets = list()
+        for channel_state in channels_to_close:
+            channel_close = ActionChannelClose(
+                token_network_identifier,
+                channel_state.identifier,
+            )
 
-            for channel_state in channels_to_close:
-                channel_close = ActionChannelClose(
-                    token_network_identifier,
-                    channel_state.identifier,
-                )
+            greenlets.append(gevent.spawn(self.raiden.handle_state_change, channel_close))
 
-                self.raiden.handle_state_change(channel_close)
+        msg = 'After {} seconds the closing transactions were not properly processed.'.format(
+            poll_timeout,
+        )
 
-            msg = 'After {} seconds the closing transactions were not properly processed.'.format(
-                poll_timeout,
-            )
+        channel_ids = [channel_state.identifier for channel_state in channels_to_close]
 
-            channel_ids = [channel_state.identifier for channel_state in channels_to_close]
+        with gevent.Timeout(poll_timeout, EthNodeCommunicationError(msg)):
+            gevent.joinall(greenlets, raise_error=True)
 
-            with gevent.Timeout(poll_timeout, EthNodeCommunicationError(msg)):
-                waiting.wait_for_close(
-                    self.raiden,
-                    registry_address,
-                    token_address,
-                    channel_ids,
-                    retry_timeout,
-                )
+            waiting.wait_for_close(
+                self.raiden,
+                registry_address,
+                token_address,
+                channel_ids,
+                retry_timeout,
+            )
 
     def get_channel_list(self, registry_address, token_address=None, partner_address=None):
         """Returns a list of channels associated with the optionally given
@@ -635,6 +662,192 @@ class RaidenAPI:
         )
         return async_result
 
+    def transfer_batch_async(self, registry_address, token_address, payments):
+        """ Pay every target in `payments` with mediated transfers, returns a
+        queue which yields `(payment, result)` in the order the payments
+        complete.
+
+        Every payment is a dictionary with a `target_address`, an `amount` and
+        an optional `identifier`. All the payments are validated before any is
+        started, then the batch is sent by a greenlet of its own, whether the
+        results are read from the queue or not.
+
+        The payments are started in order while one of the open channels can
+        carry the next amount, and are pipelined instead of waiting for each
+        other, the following payments are started once the locks of the
+        completed ones are released. A payment that is larger than the
+        capacity of every channel while nothing else is pending fails, as does
+        one which can't be started, e.g. because its identifier was used by
+        another request in the meantime.
+        """
+        if not is_binary_address(token_address):
+            raise InvalidAddress('token address is not valid.')
+
+        valid_tokens = views.get_token_network_addresses_for(
+            views.state_from_raiden(self.raiden),
+            registry_address,
+        )
+        if token_address not in valid_tokens:
+            raise UnknownTokenAddress('Token address is not known.')
+
+        identifiers = set()
+        for payment in payments:
+            amount = payment['amount']
+            if not isinstance(amount, int) or amount <= 0:
+                raise InvalidAmount('Amount must be a positive integer')
+
+            if not is_binary_address(payment['target_address']):
+                raise InvalidAddress('target address is not valid.')
+
+            identifier = payment['identifier']
+            if identifier is not None:
+                if identifier in identifiers or identifier in self.raiden.identifier_to_results:
+                    raise DuplicatedPaymentIdentifier(
+                        'Payment identifier {} is not unique'.format(identifier),
+                    )
+                identifiers.add(identifier)
+
+        payment_network_identifier = self.raiden.default_registry.address
+        token_network_identifier = views.get_token_network_identifier_by_token_address(
+            views.state_from_raiden(self.raiden),
+            payment_network_identifier,
+            token_address,
+        )
+
+        pending_payments = deque()
+        for payment in payments:
+            identifier = payment['identifier']
+            if identifier is None:
+                identifier = create_default_identifier()
+            pending_payments.append(dict(payment, identifier=identifier))
+
+        log.debug(
+            'initiating transfer batch',
+            initiator=pex(self.raiden.address),
+            token=pex(token_address),
+            payments=len(pending_payments),
+        )
+
+        results = Queue()
+        gevent.spawn(
+            self._transfer_batch,
+            registry_address,
+            token_address,
+            token_network_identifier,
+            pending_payments,
+            results,
+        )
+        return results
+
+    def _transfer_batch(
+            self,
+            registry_address,
+            token_address,
+            token_network_identifier,
+            pending_payments,
+            results,
+    ):
+        try:
+            self._send_transfer_batch(
+                registry_address,
+                token_address,
+                token_network_identifier,
+                pending_payments,
+                results,
+            )
+        finally:
+            # ends the iteration of the queue
+            results.put(StopIteration)
+
+    def _send_transfer_batch(
+            self,
+            registry_address,
+            token_address,
+            token_network_identifier,
+            pending_payments,
+            results,
+    ):
+        inflight = dict()
+
+        while pending_payments or inflight:
+            while pending_payments:
+                payment = pending_payments[0]
+                capacity = self._get_distributable_per_channel(registry_address, token_address)
+                if payment['amount'] > capacity:
+                    break
+
+                pending_payments.popleft()
+                async_result = self._start_batch_payment(token_network_identifier, payment)
+                if async_result is None:
+                    results.put((payment, False))
+                else:
+                    inflight[async_result] = payment
+
+            if not inflight:
+                if pending_payments:
+                    # no channel can carry the payment, and no pending lock
+                    # will be released to make room for it
+                    results.put((pending_payments.popleft(), False))
+                continue
+
+            for async_result in gevent.wait(list(inflight), count=1):
+                payment = inflight.pop(async_result)
+
+                if async_result.successful():
+                    results.put((payment, async_result.value))
+                else:
+                    log.error(
+                        'batch payment failed',
+                        identifier=payment['identifier'],
+                        error=str(async_result.exception),
+                    )
+                    results.put((payment, False))
+
+    def _start_batch_payment(self, token_network_identifier, payment):
+        """ Start a payment of a batch, returns None if it could not be
+        started, the other payments of the batch go on.
+        """
+        # another request may have used the identifier since the batch was
+        # validated
+        if payment['identifier'] in self.raiden.identifier_to_results:
+            log.error(
+                'batch payment identifier is not unique',
+                identifier=payment['identifier'],
+            )
+            return None
+
+        try:
+            return self.raiden.mediated_transfer_async(
+                token_network_identifier,
+                payment['amount'],
+                payment['target_address'],
+                payment['identifier'],
+            )
+        except Exception as e:
+            log.error(
+                'batch payment could not be started',
+                identifier=payment['identifier'],
+                error=str(e),
+            )
+            return None
+
+    def _get_distributable_per_channel(self, registry_address, token_address):
+        """ Return the largest amount that can be sent through a single open
+        channel, the amount of the pending locks is not distributable.
+        """
+        open_channels = views.get_channelstate_open(
+            views.state_from_raiden(self.raiden),
+            registry_address,
+            token_address,
+        )
+        return max(
+            (
+                channel.get_distributable(channel_state.our_state, channel_state.partner_state)
+                for channel_state in open_channels
+            ),
+            default=0,
+        )
+
     def get_network_events(self, registry_address, from_block, to_block):
         return sorted(get_token_network_registry_events(
             self.raiden.chain,
@@ -660,30 +873,38 @@ class RaidenAPI:
             partner_address=partner_address,
         )
         returned_events = []
-        for channel in channel_list:
+        for channel_state in channel_list:
             returned_events.extend(get_all_netting_channel_events(
                 self.raiden.chain,
                 token_network_address,
-                channel.identifier,
+                channel_state.identifier,
                 from_block=from_block,
                 to_block=to_block,
             ))
 
-        raiden_events = self.raiden.wal.storage.get_events_by_block(
-            from_block=from_block,
-            to_block=to_block,
+        if partner_address is None:
+            raiden_events = self.raiden.wal.storage.get_events_page(
+                event_types=EVENTS_EXTERNALLY_VISIBLE_NAMES,
+                from_block=from_block,
+                to_block=to_block,
+                token_network_identifier=token_network_address,
+            )
+        else:
+            raiden_events = list()
+            for channel_state in channel_list:
+                raiden_events.extend(self.raiden.wal.storage.get_events_page(
+                    event_types=EVENTS_EXTERNALLY_VISIBLE_NAMES,
+                    from_block=from_block,
+                    to_block=to_block,
+                    token_network_identifier=token_network_address,
+                    channel_identifier=channel_state.identifier,
+                ))
+
+        returned_events.extend(
+            event_to_dict(block_number, event)
+            for _, block_number, event in raiden_events
         )
 
-        # Here choose which raiden internal events we want to expose to the end user
-        for block_number, event in raiden_events:
-            if isinstance(event, EVENTS_EXTERNALLY_VISIBLE):
-                new_event = {
-                    'block_number': block_number,
-                    'event': type(event).__name__,
-                }
-                new_event.update(event.__dict__)
-                returned_events.append(new_event)
-
         returned_events.sort(key=lambda evt: evt.get('block_number'), reverse=True)
         return returned_events
 
@@ -716,24 +937,154 @@ class RaidenAPI:
 
             hexbytes_to_str(event)
 
-        raiden_events = self.raiden.wal.storage.get_events_by_block(
+        raiden_events = self.raiden.wal.storage.get_events_page(
+            event_types=EVENTS_EXTERNALLY_VISIBLE_NAMES,
             from_block=from_block,
             to_block=to_block,
+            token_network_identifier=token_network_address,
+        )
+        returned_events.extend(
+            event_to_dict(block_number, event)
+            for _, block_number, event in raiden_events
         )
-
-        # Here choose which raiden internal events we want to expose to the end user
-        for block_number, event in raiden_events:
-            if isinstance(event, EVENTS_EXTERNALLY_VISIBLE):
-                new_event = {
-                    'block_number': block_number,
-                    'event': type(event).__name__,
-                }
-                new_event.update(event.__dict__)
-                returned_events.append(new_event)
 
         returned_events.sort(key=lambda evt: evt.get('block_number'), reverse=True)
         return returned_events
 
+    def get_raiden_events(self, limit, cursor=None, from_block=None, to_block=None):
+        """ Return a page of the internal events visible to the user, the most
+        recent first, and the cursor of the next page.
+
+        The cursor is None once there are no more events.
+        """
+        raiden_events = self.raiden.wal.storage.get_events_page(
+            limit=limit,
+            before_identifier=cursor,
+            event_types=EVENTS_EXTERNALLY_VISIBLE_NAMES,
+            from_block=from_block,
+            to_block=to_block,
+        )
+
+        returned_events = [
+            event_to_dict(block_number, event)
+            for _, block_number, event in raiden_events
+        ]
+
+        next_cursor = None
+        if len(raiden_events) == limit:
+            next_cursor = raiden_events[-1][0]
+
+        return returned_events, next_cursor
+
+    def follow_raiden_events(
+            self,
+            registry_address,
+            after_identifier=None,
+            event_types=None,
+            token_address=None,
+            partner_address=None,
+            keepalive=DEFAULT_EVENT_FEED_KEEPALIVE,
+    ):
+        """ Return an endless iterator of `(identifier, event)` with the events
+        of the node as they are produced, the oldest first.
+
+        The iterator is woken up by `RaidenService.handle_state_change` and
+        reads the new events from the storage, so a client can resume the feed
+        with the identifier of the last event it received.
+
+        Args:
+            after_identifier: Only events after this one are returned, if None
+                only the events produced from now on.
+            event_types: Names of the events, one of EVENTS_FEED_NAMES.
+            token_address: Only the events of this token network.
+            partner_address: Only the events of the channel with this partner,
+                requires `token_address`.
+            keepalive: `(None, None)` is returned when no event was produced
+                for these many seconds, so the caller can check the connection.
+        """
+        if event_types is None:
+            event_types = EVENTS_FEED_NAMES
+
+        unknown_event_types = set(event_types) - set(EVENTS_FEED_NAMES)
+        if unknown_event_types:
+            raise UnknownEventType('Unknown event types {}'.format(
+                ', '.join(sorted(unknown_event_types)),
+            ))
+
+        chain_state = views.state_from_raiden(self.raiden)
+        token_network_identifier = None
+        channel_identifier = None
+
+        if token_address is not None:
+            token_network_identifier = views.get_token_network_identifier_by_token_address(
+                chain_state,
+                registry_address,
+                token_address,
+            )
+            if token_network_identifier is None:
+                raise UnknownTokenAddress('Token address is not known.')
+
+        if partner_address is not None:
+            if token_address is None:
+                raise InvalidAddress('The partner address requires a token address')
+
+            channel_state = views.get_channelstate_for(
+                chain_state,
+                registry_address,
+                token_address,
+                partner_address,
+            )
+            if channel_state is None:
+                raise ChannelNotFound('No channel with partner {} for token {}'.format(
+                    to_checksum_address(partner_address),
+                    to_checksum_address(token_address),
+                ))
+            channel_identifier = channel_state.identifier
+
+        storage = self.raiden.wal.storage
+        if after_identifier is None:
+            latest_event = storage.get_events_page(limit=1)
+            after_identifier = latest_event[0][0] if latest_event else 0
+
+        return self._follow_raiden_events(
+            after_identifier,
+            event_types,
+            token_network_identifier,
+            channel_identifier,
+            keepalive,
+        )
+
+    def _follow_raiden_events(
+            self,
+            after_identifier,
+            event_types,
+            token_network_identifier,
+            channel_identifier,
+            keepalive,
+    ):
+        storage = self.raiden.wal.storage
+        subscriptions = self.raiden.state_change_subscriptions
+
+        # subscribe before reading the storage, otherwise the events written
+        # in between would only be read after the next state change
+        with subscriptions.subscribe() as subscription:
+            while True:
+                raiden_events = storage.get_events_page(
+                    limit=DEFAULT_API_PAGE_SIZE,
+                    after_identifier=after_identifier,
+                    event_types=event_types,
+                    token_network_identifier=token_network_identifier,
+                    channel_identifier=channel_identifier,
+                )
+
+                for identifier, block_number, event in raiden_events:
+                    after_identifier = identifier
+                    yield identifier, event_to_dict(block_number, event)
+
+                if len(raiden_events) < DEFAULT_API_PAGE_SIZE:
+                    if not subscription.wait(keepalive):
+                        yield None, None
+
     #demo
     def crosstransaction_async(self,registry_address,token_address,target_address, initiator_address, sendETH_amount, sendBTC_amount, receiveBTC_address,cross_type,identifier):
         payment_network_identifier = self.raiden.default_registry.address
@@ -758,42 +1109,115 @@ class RaidenAPI:
     def get_crosstransaction_by_id(self,cross_id):
         return self.raiden.get_crosstransaction_by_crossid(cross_id)
 
-    def get_crosstransaction_all(self):
-        return self.raiden.get_crosstransaction_all()
+    def crosstransaction_batch_async(self, registry_address, crosstransactions):
+        """ Start all the swaps in `crosstransactions` without waiting for
+        them, returns the swap identifiers.
+
+        All the swaps are validated before any is started, so an invalid swap
+        doesn't leave the batch partially started. The given identifiers must
+        be unique within the batch and not be used by another swap.
+        """
+        chain_state = views.state_from_raiden(self.raiden)
+        valid_tokens = views.get_token_network_addresses_for(chain_state, registry_address)
+
+        cross_ids = set()
+        for crosstransaction in crosstransactions:
+            sendETH_amount = crosstransaction['sendETH_amount']
+            if not isinstance(sendETH_amount, int) or sendETH_amount <= 0:
+                raise InvalidAmount('sendETH_amount must be a positive integer')
+
+            if crosstransaction['sendBTC_amount'] <= 0:
+                raise InvalidAmount('sendBTC_amount must be positive')
+
+            if not is_binary_address(crosstransaction['target_address']):
+                raise InvalidAddress('target address is not valid.')
+
+            if crosstransaction['token_address'] not in valid_tokens:
+                raise UnknownTokenAddress('Token address is not known.')
+
+            cross_id = crosstransaction['identifier']
+            if cross_id is not None:
+                if cross_id in cross_ids or self._cross_id_in_use(cross_id):
+                    raise DuplicatedCrossIdentifier(
+                        'Cross transaction identifier {} is not unique'.format(cross_id),
+                    )
+                cross_ids.add(cross_id)
+
+        started_ids = list()
+        for crosstransaction in crosstransactions:
+            token_network_identifier = views.get_token_network_identifier_by_token_address(
+                chain_state,
+                registry_address,
+                crosstransaction['token_address'],
+            )
+            cross_id = crosstransaction['identifier']
+            if cross_id is None:
+                cross_id = create_default_crossid()
+                while cross_id in cross_ids or self._cross_id_in_use(cross_id):
+                    cross_id = create_default_crossid()
+                cross_ids.add(cross_id)
+            initiator_address = crosstransaction['initiator_address'] or self.raiden.address
+            cross_type = crosstransaction['cross_type']
+
+            self.raiden.start_crosstransaction(
+                token_network_identifier,
+                crosstransaction['target_address'],
+                initiator_address,
+                crosstransaction['sendETH_amount'],
+                crosstransaction['sendBTC_amount'],
+                crosstransaction['receiveBTC_address'],
+                1 if cross_type is None else cross_type,
+                cross_id,
+            )
+            started_ids.append(cross_id)
+
+        return started_ids
+
+    def _cross_id_in_use(self, cross_id):
+        if cross_id in self.raiden.identifier_to_results:
+            return True
+
+        if views.get_cross_swap(views.state_from_raiden(self.raiden), cross_id) is not None:
+            return True
+
+        try:
+            self.raiden.wal.storage.get_crosstransaction_by_identifier(cross_id)
+        except UnknownCrossTransaction:
+            return False
+
+        return True
+
+    def get_crosstransactions(self, limit, cursor=None, status=None, counterparty=None):
+        """ Return a page of the swaps, see
+        `SQLiteStorage.get_crosstransactions_page`.
+        """
+        return self.raiden.wal.storage.get_crosstransactions_page(
+            limit,
+            after_identifier=cursor,
+            status=status,
+            counterparty=counterparty,
+        )
 
     transfer = transfer_and_wait
 
 
     def get_state_change_by_r(self, r):
-        try:
-            print('recieve hash_R from lnd:', r)
-            row = self.raiden.wal.storage.get_crosstransaction_by_r(r)
-            state_change_id = row[8]
-            cross_id = row[0]
-            if state_change_id == 0:
-                self.raiden.wal.storage.change_crosstransaction_status(cross_id, 6)
-            else:
-                state_change = self.raiden.wal.storage.get_cross_state_change_by_identifier(state_change_id)
-                self.raiden.handle_state_change(state_change)
-                self.raiden.wal.change_crosstransaction_status(cross_id, 8)
-                #sync
-                acceptcross = AcceptCross(random.randint(0, UINT64_MAX), row[1], row[2], cross_id, 7)
-                self.raiden.sign(acceptcross)
-                self.raiden.transport.send_async(
-                    row[2],
-                    bytes("123", 'utf-8'),
-                    acceptcross,
-                )
-                log.info('##sync sended')
-            return  {"success":True,"reason":"null"}
-        except :
-            return  {"sucess":False,"reason":"hash_r is error"}
+        """ Called by the LND node when the invoice with the payment hash `r`
+        is paid.
+        """
+        chain_state = views.state_from_raiden(self.raiden)
+        if views.get_cross_swap_by_lnd_r_hash(chain_state, r) is None:
+            return {"success": False, "reason": "hash_r is error"}
+
+        self.raiden.handle_state_change(ReceiveCrossInvoicePaid(r))
+        return {"success": True, "reason": "null"}
 
     def post_lnd(self, port, identity, address, macaroon):
         try:
             row = self.raiden.wal.storage.get_lnd(1)
         except:
             self.raiden.wal.storage.create_lnd(port, identity, address, macaroon)
+            self.raiden.lnd.invalidate_credentials()
             return {"status":0}
         else:
             return {"status":1, "error":"already exists"}
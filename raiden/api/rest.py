@@ -7,14 +7,14 @@ import structlog
 import sys
 from typing import Dict
 
-from flask import Flask, make_response, url_for, send_from_directory, request
+from flask import Flask, Response, make_response, url_for, send_from_directory, request
 from flask.json import jsonify
 from flask_restful import Api, abort
 from flask_cors import CORS
 from webargs.flaskparser import parser
 from werkzeug.exceptions import NotFound
 from gevent.pywsgi import WSGIServer
-from eth_utils import to_checksum_address
+from eth_utils import to_checksum_address, to_normalized_address
 from hexbytes import HexBytes
 from eth_utils import encode_hex
 
@@ -30,12 +30,16 @@ from raiden.exceptions import (
     InvalidBlockNumberInput,
     InvalidAmount,
     InvalidSettleTimeout,
+    ProfilerAlreadyRunning,
     SamePeerAddress,
     TransactionThrew,
     UnknownTokenAddress,
     DepositOverLimit,
     DepositMismatch,
+    DuplicatedCrossIdentifier,
+    DuplicatedPaymentIdentifier,
     TokenNotRegistered,
+    UnknownEventType,
 )
 from raiden.api.v1.encoding import (
     AddressListSchema,
@@ -55,13 +59,19 @@ from raiden.api.v1.resources import (
     TokensResource,
     PartnersResourceByTokenAddress,
     NetworkEventsResource,
+    RaidenEventsResource,
+    RaidenEventsFeedResource,
+    MetricsResource,
+    ProfilerResource,
     RegisterTokenResource,
     TokenEventsResource,
     ChannelEventsResource,
     TransferToTargetResource,
+    TransferBatchResource,
     ConnectionsResource,
     ConnectionsInfoResource,
     CrossTransactionTry,
+    CrossTransactionBatch,
     CrossTransactionLnd,
     GetCrossTransaction, GetCrossTransactionById, ReciveHashResource, CrossTransactionHash)
 from raiden.transfer import channel, views
@@ -69,7 +79,9 @@ from raiden.transfer.state import (
     CHANNEL_STATE_OPENED,
     CHANNEL_STATE_CLOSED,
 )
-from raiden.utils import create_default_identifier
+from raiden.utils import create_default_crossid, create_default_identifier
+from raiden.api.cache import StateViewCache
+from raiden.utils import metrics, profiler
 from raiden.api.objects import PartnersPerTokenList, AddressList
 from raiden.utils import (
     split_endpoint,
@@ -96,6 +108,10 @@ URLS_V1 = [
     ('/tokens/<hexaddress:token_address>/partners', PartnersResourceByTokenAddress),
     ('/tokens/<hexaddress:token_address>', RegisterTokenResource),
     ('/events/network', NetworkEventsResource),
+    ('/events/raiden', RaidenEventsResource),
+    ('/events/raiden/feed', RaidenEventsFeedResource),
+    ('/metrics', MetricsResource),
+    ('/admin/profiler', ProfilerResource),
     ('/events/tokens/<hexaddress:token_address>', TokenEventsResource),
     (
         '/events/channels/<hexaddress:token_address>',
@@ -110,12 +126,14 @@ URLS_V1 = [
         '/transfers/<hexaddress:token_address>/<hexaddress:target_address>',
         TransferToTargetResource,
     ),
+    ('/transfers/<hexaddress:token_address>/batch', TransferBatchResource),
     ('/connections/<hexaddress:token_address>', ConnectionsResource),
     ('/connections', ConnectionsInfoResource),
 
 ###sqlite_demo
     ('/crosstransactiontry/<hexaddress:token_address>/<hexaddress:target_address>',CrossTransactionTry),
     ('/crosstransactiontry',GetCrossTransaction),
+    ('/crosstransactiontry/batch', CrossTransactionBatch),
     ('/crosstransactiontry/<string:cross_id>', GetCrossTransactionById),
     ('/crosstransactiontry_hash/<string:hash_r>', ReciveHashResource),
     ('/crosstransactionr', CrossTransactionHash),
@@ -138,6 +156,23 @@ def api_response(result, status_code=HTTPStatus.OK):
     return response
 
 
+def api_cached_response(cached_result):
+    """ Response for a result of the `StateViewCache`, the body is left out if
+    the client already has it.
+    """
+    if cached_result.etag in request.if_none_match:
+        response = make_response(('', HTTPStatus.NOT_MODIFIED))
+    else:
+        response = make_response((
+            cached_result.data,
+            HTTPStatus.OK,
+            {'mimetype': 'application/json', 'Content-Type': 'application/json'},
+        ))
+
+    response.set_etag(cached_result.etag)
+    return response
+
+
 def api_error(errors, status_code):
     assert status_code in ERROR_STATUS_CODES, 'Programming error, unexpected error status code'
     response = make_response((
@@ -194,10 +229,31 @@ def normalize_events_list(old_list):
             new_event['initiator'] = to_checksum_address(new_event['initiator'])
         if new_event['event'] == 'EventTransferSentSuccess':
             new_event['target'] = to_checksum_address(new_event['target'])
+        if new_event.get('token_network_identifier') is not None:
+            new_event['token_network_identifier'] = to_checksum_address(
+                new_event['token_network_identifier'],
+            )
+        # the channel_identifier is a hash
+        if isinstance(new_event.get('channel_identifier'), bytes):
+            new_event['channel_identifier'] = encode_hex(new_event['channel_identifier'])
         new_list.append(new_event)
     return new_list
 
 
+def encode_feed_event(event: Dict) -> Dict:
+    """ Encode an event of the feed, the values which are not a JSON scalar,
+    like balance proofs, are left out.
+    """
+    encoded_event = normalize_events_list([event])[0]
+    encode_byte_values(encoded_event)
+
+    return {
+        key: value
+        for key, value in encoded_event.items()
+        if value is None or isinstance(value, (str, int, float, bool))
+    }
+
+
 def restapi_setup_urls(flask_api_context, rest_api, urls):
     for url_tuple in urls:
         if len(url_tuple) == 2:
@@ -352,6 +408,9 @@ class RestAPI:
         self.address_list_schema = AddressListSchema()
         self.partner_per_token_list_schema = PartnersPerTokenListSchema()
         self.transfer_schema = TransferSchema()
+        self.state_view_cache = StateViewCache(
+            lambda: self.raiden_api.raiden.wal.state_change_id,
+        )
         #####sqlite_demo
         self.crosstransaction_schema = CrossTransactionSchema()
         self.crosstransaction_sql_schema = Crosstransaction_sql_schema()
@@ -519,59 +578,83 @@ class RestAPI:
     def get_connection_managers_info(self, registry_address):
         """Get a dict whose keys are token addresses and whose values are
         open channels, funds of last request, sum of deposits and number of channels"""
-        connection_managers = dict()
+        raiden = self.raiden_api.raiden
 
-        for token in self.raiden_api.get_tokens_list(registry_address):
-            token_network_identifier = views.get_token_network_identifier_by_token_address(
-                views.state_from_raiden(self.raiden_api.raiden),
-                payment_network_id=registry_address,
-                token_address=token,
-            )
+        def compute():
+            connection_managers = dict()
 
-            try:
-                connection_manager = self.raiden_api.raiden.connection_manager_for_token_network(
-                    token_network_identifier,
+            for token in self.raiden_api.get_tokens_list(registry_address):
+                token_network_identifier = views.get_token_network_identifier_by_token_address(
+                    views.state_from_raiden(self.raiden_api.raiden),
+                    payment_network_id=registry_address,
+                    token_address=token,
                 )
-            except InvalidAddress:
-                connection_manager = None
-
-            open_channels = views.get_channelstate_open(
-                chain_state=views.state_from_raiden(self.raiden_api.raiden),
-                payment_network_id=registry_address,
-                token_address=token,
-            )
-            if connection_manager is not None and open_channels:
-                connection_managers[to_checksum_address(connection_manager.token_address)] = {
-                    'funds': connection_manager.funds,
-                    'sum_deposits': views.get_our_capacity_for_token_network(
-                        views.state_from_raiden(self.raiden_api.raiden),
-                        registry_address,
-                        token,
-                    ),
-                    'channels': len(open_channels),
-                }
 
-        return connection_managers
+                try:
+                    connection_manager = raiden.connection_manager_for_token_network(
+                        token_network_identifier,
+                    )
+                except InvalidAddress:
+                    connection_manager = None
+
+                open_channels = views.get_channelstate_open(
+                    chain_state=views.state_from_raiden(self.raiden_api.raiden),
+                    payment_network_id=registry_address,
+                    token_address=token,
+                )
+                if connection_manager is not None and open_channels:
+                    connection_managers[to_checksum_address(connection_manager.token_address)] = {
+                        'funds': connection_manager.funds,
+                        'sum_deposits': views.get_our_capacity_for_token_network(
+                            views.state_from_raiden(self.raiden_api.raiden),
+                            registry_address,
+                            token,
+                        ),
+                        'channels': len(open_channels),
+                    }
+
+            return connection_managers
+
+        # the funds of the connection managers are not part of the node state
+        connection_funds = tuple(sorted(
+            (token_network_identifier, connection_manager.funds)
+            for token_network_identifier, connection_manager
+            in raiden.tokennetworkids_to_connectionmanagers.items()
+        ))
+        cached_result = self.state_view_cache.get(
+            ('connections', registry_address, connection_funds),
+            compute,
+        )
+        return api_cached_response(cached_result)
 
     def get_channel_list(self, registry_address, token_address=None, partner_address=None):
-        raiden_service_result = self.raiden_api.get_channel_list(
-            registry_address,
-            token_address,
-            partner_address,
+        def compute():
+            raiden_service_result = self.raiden_api.get_channel_list(
+                registry_address,
+                token_address,
+                partner_address,
+            )
+            assert isinstance(raiden_service_result, list)
+            return [
+                self.channel_schema.dump(channel_schema).data
+                for channel_schema in raiden_service_result
+            ]
+
+        cached_result = self.state_view_cache.get(
+            ('channels', registry_address, token_address, partner_address),
+            compute,
         )
-        assert isinstance(raiden_service_result, list)
-        result = [
-            self.channel_schema.dump(channel_schema).data
-            for channel_schema in raiden_service_result
-        ]
-        return api_response(result=result)
+        return api_cached_response(cached_result)
 
     def get_tokens_list(self, registry_address):
-        raiden_service_result = self.raiden_api.get_tokens_list(registry_address)
-        assert isinstance(raiden_service_result, list)
-        tokens_list = AddressList(raiden_service_result)
-        result = self.address_list_schema.dump(tokens_list)
-        return api_response(result=result.data)
+        def compute():
+            raiden_service_result = self.raiden_api.get_tokens_list(registry_address)
+            assert isinstance(raiden_service_result, list)
+            tokens_list = AddressList(raiden_service_result)
+            return self.address_list_schema.dump(tokens_list).data
+
+        cached_result = self.state_view_cache.get(('tokens', registry_address), compute)
+        return api_cached_response(cached_result)
 
     def get_network_events(self, registry_address, from_block, to_block):
         try:
@@ -617,15 +700,142 @@ class RestAPI:
 
         return api_response(result=normalize_events_list(raiden_service_result))
 
-    def get_channel(self, registry_address, token_address, partner_address):
+    def get_metrics(self):
+        """ Return the metrics in the Prometheus text format, the gauges are
+        computed from the node state on every request.
+        """
+        chain_state = views.state_from_raiden(self.raiden_api.raiden)
+
+        metrics.OPEN_CHANNELS.clear()
+        metrics.PENDING_LOCKS.clear()
+        for payment_network in chain_state.identifiers_to_paymentnetworks.values():
+            for token_network in payment_network.tokenidentifiers_to_tokennetworks.values():
+                token_network_address = to_checksum_address(token_network.address)
+                channel_states = token_network.channelidentifiers_to_channels.values()
+
+                open_channels = 0
+                pending_locks = 0
+                for channel_state in channel_states:
+                    if channel.get_status(channel_state) == CHANNEL_STATE_OPENED:
+                        open_channels += 1
+                    pending_locks += len(channel_state.our_state.secrethashes_to_lockedlocks)
+                    pending_locks += len(channel_state.our_state.secrethashes_to_unlockedlocks)
+
+                metrics.OPEN_CHANNELS.set(open_channels, token_network_address)
+                metrics.PENDING_LOCKS.set(pending_locks, token_network_address)
+
+        metrics.TRANSPORT_QUEUE_SIZE.set(sum(
+            len(queue)
+            for queue in views.get_all_messagequeues(chain_state).values()
+        ))
+
+        return Response(
+            metrics.REGISTRY.render(),
+            status=HTTPStatus.OK,
+            mimetype='text/plain; version=0.0.4',
+        )
+
+    def profile(self, duration, interval, output_format):
+        """ Sample the greenlets of the node for `duration` seconds, the
+        request is answered once the profile is done.
+        """
+        try:
+            result = profiler.profile(duration, interval)
+        except ProfilerAlreadyRunning as e:
+            return api_error(str(e), status_code=HTTPStatus.CONFLICT)
+
+        if output_format == 'json':
+            return api_response(result={
+                'interval': interval,
+                'samples': sum(result.stacks.values()),
+                'greenlets': result.greenlets(),
+                'stacks': dict(result.stacks),
+            })
+
+        return Response(result.collapsed(), status=HTTPStatus.OK, mimetype='text/plain')
+
+    def get_raiden_events(self, limit, cursor=None, from_block=None, to_block=None):
+        """ Return a page of the node events, the body is streamed as the
+        events are encoded.
+        """
+        raiden_service_result, next_cursor = self.raiden_api.get_raiden_events(
+            limit,
+            cursor,
+            from_block,
+            to_block,
+        )
+
+        def stream_events():
+            yield '{"events": ['
+            for position, event in enumerate(normalize_events_list(raiden_service_result)):
+                if position:
+                    yield ', '
+                yield json.dumps(event)
+            yield '], "cursor": {}}}'.format(json.dumps(next_cursor))
+
+        return Response(
+            stream_events(),
+            status=HTTPStatus.OK,
+            mimetype='application/json',
+        )
+
+    def get_raiden_events_feed(
+            self,
+            registry_address,
+            last_event_id=None,
+            event_types=None,
+            token_address=None,
+            partner_address=None,
+    ):
+        """ Stream the node events as server-sent events, the event id is the
+        cursor to resume the feed.
+        """
         try:
+            raiden_events = self.raiden_api.follow_raiden_events(
+                registry_address,
+                after_identifier=last_event_id,
+                event_types=event_types,
+                token_address=token_address,
+                partner_address=partner_address,
+            )
+        except (UnknownTokenAddress, ChannelNotFound) as e:
+            return api_error(str(e), status_code=HTTPStatus.NOT_FOUND)
+        except (UnknownEventType, InvalidAddress) as e:
+            return api_error(str(e), status_code=HTTPStatus.BAD_REQUEST)
+
+        def stream_events():
+            for identifier, event in raiden_events:
+                if identifier is None:
+                    yield ': keepalive\n\n'
+                else:
+                    yield 'id: {}\nevent: {}\ndata: {}\n\n'.format(
+                        identifier,
+                        event['event'],
+                        json.dumps(encode_feed_event(event)),
+                    )
+
+        return Response(
+            stream_events(),
+            status=HTTPStatus.OK,
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache'},
+        )
+
+    def get_channel(self, registry_address, token_address, partner_address):
+        def compute():
             channel_state = self.raiden_api.get_channel(
                 registry_address=registry_address,
                 token_address=token_address,
                 partner_address=partner_address,
             )
-            result = self.channel_schema.dump(channel_state)
-            return api_response(result=result.data)
+            return self.channel_schema.dump(channel_state).data
+
+        try:
+            cached_result = self.state_view_cache.get(
+                ('channel', registry_address, token_address, partner_address),
+                compute,
+            )
+            return api_cached_response(cached_result)
         except ChannelNotFound as e:
             return api_error(
                 errors=str(e),
@@ -633,25 +843,31 @@ class RestAPI:
             )
 
     def get_partners_by_token(self, registry_address, token_address):
-        return_list = []
-        raiden_service_result = self.raiden_api.get_channel_list(
-            registry_address,
-            token_address,
-        )
-        for result in raiden_service_result:
-            return_list.append({
-                'partner_address': result.partner_state.address,
-                'channel': url_for(
-                    # TODO: Somehow nicely parameterize this for future versions
-                    'v1_resources.channelsresourcebytokenandpartneraddress',
-                    token_address=token_address,
-                    partner_address=result.partner_state.address,
-                ),
-            })
+        def compute():
+            return_list = []
+            raiden_service_result = self.raiden_api.get_channel_list(
+                registry_address,
+                token_address,
+            )
+            for result in raiden_service_result:
+                return_list.append({
+                    'partner_address': result.partner_state.address,
+                    'channel': url_for(
+                        # TODO: Somehow nicely parameterize this for future versions
+                        'v1_resources.channelsresourcebytokenandpartneraddress',
+                        token_address=token_address,
+                        partner_address=result.partner_state.address,
+                    ),
+                })
 
-        schema_list = PartnersPerTokenList(return_list)
-        result = self.partner_per_token_list_schema.dump(schema_list)
-        return api_response(result=result.data)
+            schema_list = PartnersPerTokenList(return_list)
+            return self.partner_per_token_list_schema.dump(schema_list).data
+
+        cached_result = self.state_view_cache.get(
+            ('partners', registry_address, token_address),
+            compute,
+        )
+        return api_cached_response(cached_result)
 
     def initiate_transfer(
             self,
@@ -702,6 +918,48 @@ class RestAPI:
         result = self.transfer_schema.dump(transfer)
         return api_response(result=result.data)
 
+    def initiate_transfer_batch(self, registry_address, token_address, payments):
+        """ Start all the `payments` and stream their results as newline
+        delimited JSON, in the order the payments complete. The stream only
+        reads the results, the payments are sent even if it is not consumed.
+        """
+        try:
+            payment_results = self.raiden_api.transfer_batch_async(
+                registry_address=registry_address,
+                token_address=token_address,
+                payments=payments,
+            )
+        except (
+            InvalidAmount,
+            InvalidAddress,
+            UnknownTokenAddress,
+            DuplicatedPaymentIdentifier,
+        ) as e:
+            return api_error(
+                errors=str(e),
+                status_code=HTTPStatus.CONFLICT,
+            )
+
+        def stream_results():
+            for payment, payment_result in payment_results:
+                transfer = {
+                    'initiator_address': self.raiden_api.address,
+                    'registry_address': registry_address,
+                    'token_address': token_address,
+                    'target_address': payment['target_address'],
+                    'amount': payment['amount'],
+                    'identifier': payment['identifier'],
+                }
+                result = self.transfer_schema.dump(transfer).data
+                result['success'] = bool(payment_result)
+                yield json.dumps(result) + '\n'
+
+        return Response(
+            stream_results(),
+            status=HTTPStatus.OK,
+            mimetype='application/x-ndjson',
+        )
+
 
 
     def _deposit(self, registry_address, channel_state, total_deposit):
@@ -834,7 +1092,7 @@ class RestAPI:
     #demo
     def start_cross(self,registry_address,token_address, target_address, initiator_address, sendETH_amount,sendBTC_amount,receiveBTC_address,cross_type,identifier=None):
         if identifier is None:
-            identifier = create_default_identifier()
+            identifier = create_default_crossid()
 
         try:
             self.raiden_api.crosstransaction_async(registry_address,token_address, target_address, initiator_address, sendETH_amount,sendBTC_amount,receiveBTC_address,cross_type,identifier)
@@ -874,24 +1132,52 @@ class RestAPI:
         result = self.crosstransaction_sql_schema.dump(crosstransaction)
         return api_response(result=result.data)
 
-    def get_crosstransaction_all(self):
-
-        res = self.raiden_api.get_crosstransaction_all()
-        print(res)
-        crosstransaction_all = list(dict())
-        for result in res:
-            crosstransaction = {
-                "crossid": result[0],
-                "initiator_address": result[1],
-                "target_address": result[2],
-                "token_network_identifier": result[3],
-                'sendETH_amount': result[4],
-                'sendBTC_amount': result[5],
-                'status': result[7],
+    def get_crosstransactions(self, limit, cursor, status, counterparty):
+        rows = self.raiden_api.get_crosstransactions(limit, cursor, status, counterparty)
+
+        # To get the next page pass the crossid of the last swap as the cursor
+        crosstransactions = [
+            {
+                'crossid': row[0],
+                'initiator_address': to_normalized_address(row[1]),
+                'target_address': to_normalized_address(row[2]),
+                'token_network_identifier': to_normalized_address(row[3]),
+                'sendETH_amount': row[4],
+                'sendBTC_amount': row[5],
+                'status': row[7],
+            }
+            for row in rows
+        ]
+        return api_response(result=crosstransactions)
+
+    def start_cross_batch(self, registry_address, crosstransactions):
+        try:
+            cross_ids = self.raiden_api.crosstransaction_batch_async(
+                registry_address,
+                crosstransactions,
+            )
+        except (
+            InvalidAmount,
+            InvalidAddress,
+            UnknownTokenAddress,
+            DuplicatedCrossIdentifier,
+        ) as e:
+            return api_error(
+                errors=str(e),
+                status_code=HTTPStatus.CONFLICT,
+            )
+
+        result = [
+            {
+                'crossid': cross_id,
+                'target_address': to_checksum_address(crosstransaction['target_address']),
+                'token_address': to_checksum_address(crosstransaction['token_address']),
+                'sendETH_amount': crosstransaction['sendETH_amount'],
+                'sendBTC_amount': crosstransaction['sendBTC_amount'],
             }
-            crosstransaction_all.append(crosstransaction)
-        print(crosstransaction_all)
-        return api_response(result=crosstransaction_all)
+            for cross_id, crosstransaction in zip(cross_ids, crosstransactions)
+        ]
+        return api_response(result=result, status_code=HTTPStatus.ACCEPTED)
 
     def state_change_by_r(self,hashr):
         return self.raiden_api.get_state_change_by_r(hashr)
@@ -28,11 +28,17 @@ from raiden.api.objects import (
     PartnersPerToken,
     PartnersPerTokenList,
 )
+from raiden.constants import INT64_MAX
 from raiden.settings import (
+    DEFAULT_API_PAGE_SIZE,
     DEFAULT_SETTLE_TIMEOUT,
     DEFAULT_REVEAL_TIMEOUT,
     DEFAULT_JOINABLE_FUNDS_TARGET,
     DEFAULT_INITIAL_CHANNEL_TARGET,
+    DEFAULT_PROFILER_SAMPLING_INTERVAL,
+    MAX_API_BATCH_SIZE,
+    MAX_API_PAGE_SIZE,
+    MAX_PROFILE_DURATION,
 )
 from raiden.transfer import channel
 from raiden.transfer.state import (
@@ -208,6 +214,49 @@ class EventRequestSchema(BaseSchema):
         decoding_class = dict
 
 
+class EventPageRequestSchema(EventRequestSchema):
+    limit = fields.Integer(
+        missing=DEFAULT_API_PAGE_SIZE,
+        validate=validate.Range(min=1, max=MAX_API_PAGE_SIZE),
+    )
+    cursor = fields.Integer(missing=None)
+
+    class Meta:
+        strict = True
+        decoding_class = dict
+
+
+class EventFeedRequestSchema(BaseSchema):
+    event_types = fields.List(fields.String(), missing=None)
+    token_address = AddressField(missing=None)
+    partner_address = AddressField(missing=None)
+    last_event_id = fields.Integer(missing=None)
+
+    class Meta:
+        strict = True
+        decoding_class = dict
+
+
+class ProfileSchema(BaseSchema):
+    duration = fields.Float(
+        required=True,
+        validate=validate.Range(min=0, max=MAX_PROFILE_DURATION),
+    )
+    interval = fields.Float(
+        missing=DEFAULT_PROFILER_SAMPLING_INTERVAL,
+        validate=validate.Range(min=0.001, max=1),
+    )
+    output_format = fields.String(
+        load_from='format',
+        missing='collapsed',
+        validate=validate.OneOf(['collapsed', 'json']),
+    )
+
+    class Meta:
+        strict = True
+        decoding_class = dict
+
+
 class AddressSchema(BaseSchema):
     address = AddressField()
 
@@ -311,6 +360,20 @@ class TransferSchema(BaseSchema):
         decoding_class = dict
 
 
+class TransferBatchSchema(BaseSchema):
+    payments = fields.Nested(
+        TransferSchema,
+        only=('target_address', 'amount', 'identifier'),
+        many=True,
+        required=True,
+        validate=validate.Length(min=1, max=MAX_API_BATCH_SIZE),
+    )
+
+    class Meta:
+        strict = True
+        decoding_class = dict
+
+
 class ConnectionsConnectSchema(BaseSchema):
     funds = fields.Integer(required=True)
     initial_channel_target = fields.Integer(
@@ -339,7 +402,8 @@ class CrossTransactionSchema(BaseSchema):
     sendETH_amount = fields.Integer(required=True)
     sendBTC_amount = fields.Float(required=True)
     receiveBTC_address = fields.String(required=True)
-    identifier = fields.Integer(missing=None)
+    # the swaps are stored with their identifier in a SQLite INTEGER
+    identifier = fields.Integer(missing=None, validate=validate.Range(min=0, max=INT64_MAX))
     cross_type = fields.Integer(missing=None)
 
     class Meta:
@@ -361,6 +425,33 @@ class Crosstransaction_sql_schema(BaseSchema):
         strict = True
         decoding_class = dict
 
+class CrossTransactionBatchSchema(BaseSchema):
+    crosstransactions = fields.Nested(
+        CrossTransactionSchema,
+        many=True,
+        required=True,
+        validate=validate.Length(min=1, max=MAX_API_BATCH_SIZE),
+    )
+
+    class Meta:
+        strict = True
+        decoding_class = dict
+
+
+class CrossTransactionListSchema(BaseSchema):
+    limit = fields.Integer(
+        missing=DEFAULT_API_PAGE_SIZE,
+        validate=validate.Range(min=1, max=MAX_API_PAGE_SIZE),
+    )
+    cursor = fields.Integer(missing=None)
+    status = fields.Integer(missing=None)
+    counterparty = AddressField(missing=None)
+
+    class Meta:
+        strict = True
+        decoding_class = dict
+
+
 class CrossTransactionHashSchema(BaseSchema):
     hashr = fields.String(required=True)
 
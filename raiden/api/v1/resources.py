@@ -1,14 +1,20 @@
 from webargs.flaskparser import use_kwargs
 from flask_restful import Resource
-from flask import Blueprint
+from flask import Blueprint, request
 from raiden.api.v1.encoding import (
     ChannelPutSchema,
     ChannelPatchSchema,
+    EventFeedRequestSchema,
+    EventPageRequestSchema,
     EventRequestSchema,
+    ProfileSchema,
     TransferSchema,
+    TransferBatchSchema,
     ConnectionsConnectSchema,
     ConnectionsLeaveSchema,
+    CrossTransactionBatchSchema,
     CrossTransactionHashSchema,
+    CrossTransactionListSchema,
     CrossTransactionLndSchema,
 )
 
@@ -140,6 +146,59 @@ class ChannelEventsResource(BaseResource):
         )
 
 
+class RaidenEventsResource(BaseResource):
+
+    get_schema = EventPageRequestSchema()
+
+    @use_kwargs(get_schema, locations=('query',))
+    def get(self, from_block, to_block, limit, cursor):
+        return self.rest_api.get_raiden_events(
+            limit=limit,
+            cursor=cursor,
+            from_block=from_block,
+            to_block=to_block,
+        )
+
+
+class RaidenEventsFeedResource(BaseResource):
+
+    get_schema = EventFeedRequestSchema()
+
+    @use_kwargs(get_schema, locations=('query',))
+    def get(self, event_types, token_address, partner_address, last_event_id):
+        # reconnecting EventSource clients send the id of the last event
+        last_event_id_header = request.headers.get('Last-Event-ID')
+        if last_event_id_header is not None and last_event_id_header.isdigit():
+            last_event_id = int(last_event_id_header)
+
+        return self.rest_api.get_raiden_events_feed(
+            registry_address=self.rest_api.raiden_api.raiden.default_registry.address,
+            last_event_id=last_event_id,
+            event_types=event_types,
+            token_address=token_address,
+            partner_address=partner_address,
+        )
+
+
+class MetricsResource(BaseResource):
+
+    def get(self):
+        return self.rest_api.get_metrics()
+
+
+class ProfilerResource(BaseResource):
+
+    post_schema = ProfileSchema()
+
+    @use_kwargs(post_schema, locations=('json',))
+    def post(self, duration, interval, output_format):
+        return self.rest_api.profile(
+            duration=duration,
+            interval=interval,
+            output_format=output_format,
+        )
+
+
 class RegisterTokenResource(BaseResource):
 
     def put(self, token_address):
@@ -166,6 +225,19 @@ class TransferToTargetResource(BaseResource):
         )
 
 
+class TransferBatchResource(BaseResource):
+
+    post_schema = TransferBatchSchema()
+
+    @use_kwargs(post_schema, locations=('json',))
+    def post(self, token_address, payments):
+        return self.rest_api.initiate_transfer_batch(
+            registry_address=self.rest_api.raiden_api.raiden.default_registry.address,
+            token_address=token_address,
+            payments=payments,
+        )
+
+
 class ConnectionsResource(BaseResource):
 
     put_schema = ConnectionsConnectSchema()
@@ -222,6 +294,17 @@ class CrossTransactionTry(BaseResource):
             cross_type= cross_type,
         )
 
+class CrossTransactionBatch(BaseResource):
+    post_schema = CrossTransactionBatchSchema()
+
+    @use_kwargs(post_schema, locations=('json',))
+    def post(self, crosstransactions):
+        return self.rest_api.start_cross_batch(
+            registry_address=self.rest_api.raiden_api.raiden.default_registry.address,
+            crosstransactions=crosstransactions,
+        )
+
+
 class CrossTransactionHash(BaseResource):
 
     post_schema = CrossTransactionHashSchema(
@@ -250,8 +333,16 @@ class CrossTransactionLnd(BaseResource):
 
 class GetCrossTransaction(BaseResource):
 
-    def get(self):
-        return self.rest_api.get_crosstransaction_all()
+    get_schema = CrossTransactionListSchema()
+
+    @use_kwargs(get_schema, locations=('query',))
+    def get(self, limit, cursor, status, counterparty):
+        return self.rest_api.get_crosstransactions(
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            counterparty=counterparty,
+        )
 
 class GetCrossTransactionById(BaseResource):
 
@@ -18,6 +18,7 @@ from raiden.settings import (
     DEFAULT_REVEAL_TIMEOUT,
     DEFAULT_SETTLE_TIMEOUT,
     DEFAULT_SHUTDOWN_TIMEOUT,
+    DEFAULT_STORAGE_BACKEND,
     INITIAL_PORT,
 )
 from raiden.utils import (
@@ -48,6 +49,7 @@ class App:  # pylint: disable=too-few-public-methods
         'reveal_timeout': DEFAULT_REVEAL_TIMEOUT,
         'settle_timeout': DEFAULT_SETTLE_TIMEOUT,
         'database_path': '',
+        'storage_backend': DEFAULT_STORAGE_BACKEND,
         'msg_timeout': 100.0,
         'transport': {
             'retry_interval': DEFAULT_TRANSPORT_RETRY_INTERVAL,
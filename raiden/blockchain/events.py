@@ -8,9 +8,11 @@ from eth_utils import (
     to_canonical_address,
 )
 from raiden_contracts.constants import (
+    CONTRACT_ENDPOINT_REGISTRY,
     CONTRACT_SECRET_REGISTRY,
     CONTRACT_TOKEN_NETWORK,
     CONTRACT_TOKEN_NETWORK_REGISTRY,
+    EVENT_ADDRESS_REGISTERED,
     EVENT_CHANNEL_BALANCE_PROOF_UPDATED,
     EVENT_CHANNEL_CLOSED,
     EVENT_CHANNEL_DEPOSIT,
@@ -26,7 +28,7 @@ from raiden_contracts.contract_manager import CONTRACT_MANAGER
 from raiden.constants import UINT64_MAX
 from raiden.exceptions import InvalidBlockNumberInput
 from raiden.network.blockchain_service import BlockChainService
-from raiden.network.proxies import PaymentChannel, SecretRegistry
+from raiden.network.proxies import Discovery, PaymentChannel, SecretRegistry
 from raiden.utils import pex, typing
 from raiden.utils.filters import (
     decode_event,
@@ -298,6 +300,10 @@ def decode_event_to_internal(event):
         data['secrethash'] = data['args']['secrethash']
         data['secret'] = data['args']['secret']
 
+    elif data['event'] == EVENT_ADDRESS_REGISTERED:
+        data['eth_address'] = to_canonical_address(data['args']['eth_address'])
+        data['endpoint'] = data['args']['socket']
+
     return event
 
 
@@ -439,3 +445,18 @@ class BlockchainEvents:
             secret_registry_filter,
             CONTRACT_MANAGER.get_contract_abi(CONTRACT_SECRET_REGISTRY),
         )
+
+    def add_discovery_listener(
+            self,
+            discovery_proxy: Discovery,
+            from_block: typing.BlockSpecification = 'latest',
+    ):
+        address_registered_filter = discovery_proxy.address_registered_filter(
+            from_block=from_block,
+        )
+        discovery_address = discovery_proxy.address
+        self.add_event_listener(
+            'Discovery {}'.format(pex(discovery_address)),
+            address_registered_filter,
+            CONTRACT_MANAGER.get_contract_abi(CONTRACT_ENDPOINT_REGISTRY),
+        )
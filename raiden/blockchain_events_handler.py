@@ -2,6 +2,7 @@ import gevent
 import structlog
 
 from raiden_contracts.constants import (
+    EVENT_ADDRESS_REGISTERED,
     EVENT_CHANNEL_BALANCE_PROOF_UPDATED,
     EVENT_CHANNEL_CLOSED,
     EVENT_CHANNEL_DEPOSIT,
@@ -230,6 +231,14 @@ def handle_secret_revealed(raiden, event, current_block_number):
     raiden.handle_state_change(registeredsecret_state_change, current_block_number)
 
 
+def handle_address_registered(raiden, event):
+    """ Handles an `AddressRegistered` event, this only updates the endpoint
+    mappings of the discovery, there is no state change.
+    """
+    data = event.event_data
+    raiden.discovery.endpoint_registered(data['eth_address'], data['endpoint'])
+
+
 def on_blockchain_event(raiden, event, current_block_number, chain_id):
     log.debug('BLOCKCHAIN EVENT', node=pex(raiden.address), chain_event=event)
 
@@ -266,5 +275,8 @@ def on_blockchain_event(raiden, event, current_block_number, chain_id):
     elif data['event'] == EVENT_CHANNEL_UNLOCKED:
         handle_channel_batch_unlock(raiden, event, current_block_number)
 
+    elif data['event'] == EVENT_ADDRESS_REGISTERED:
+        handle_address_registered(raiden, event)
+
     else:
         log.error('Unknown event type', event_name=data['event'], raiden_event=event)
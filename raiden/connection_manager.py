@@ -3,18 +3,26 @@ from binascii import unhexlify
 import gevent
 from gevent.lock import Semaphore
 from gevent.event import AsyncResult
+from gevent.pool import Pool
 
 import structlog
 
 from raiden import waiting
 from raiden.exceptions import DuplicatedChannelError
 from raiden.api.python import RaidenAPI
+from raiden.constants import (
+    CHANNEL_DEPOSIT_TX_GAS_LIMIT,
+    CHANNEL_OPEN_TX_GAS_LIMIT,
+    TOKEN_APPROVE_TX_GAS_LIMIT,
+)
 from raiden.utils import pex
 from raiden.exceptions import (
     AddressWithoutCode,
+    EthNodeCommunicationError,
     InvalidAmount,
     TransactionThrew,
 )
+from raiden.settings import DEFAULT_CONNECTION_MANAGER_RETRIES, DEFAULT_RETRY_TIMEOUT
 from raiden.transfer import views
 
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
@@ -262,6 +270,10 @@ class ConnectionManager:
         """ Open channels until there are `self.initial_channel_target`
         channels open. Do nothing if there are enough channels open already.
 
+        The channels are opened and funded concurrently, the number of
+        channels in flight is limited by the ETH balance and the funding by
+        the token balance.
+
         Note:
             - This method must be called with the lock held.
         """
@@ -275,29 +287,124 @@ class ConnectionManager:
         if qty_channels_to_open <= 0:
             return
 
-        for partner in self.find_new_partners(qty_channels_to_open):
-            try:
-                self.api.channel_open(
-                    self.registry_address,
-                    self.token_address,
+        partners = self.find_new_partners(qty_channels_to_open)
+        if not partners:
+            return
+
+        funding = self._initial_funding_per_partner
+        token_balance = self.raiden.chain.token(self.token_address).balance_of(
+            self.raiden.address,
+        )
+        available_funds = min(token_balance, self._funds_remaining)
+
+        # The deposits are checked one by one against the token balance,
+        # plan them here so the concurrent deposits don't exceed it together.
+        qty_funded = len(partners)
+        if funding > 0:
+            qty_funded = min(qty_funded, available_funds // funding)
+
+        if qty_funded < len(partners):
+            log.warning(
+                'connection manager: not enough tokens to fund all channels',
+                token_address=pex(self.token_address),
+                balance=token_balance,
+                funding=funding,
+                channels=len(partners),
+                funded=qty_funded,
+            )
+
+        pool = Pool(self._max_concurrent_channels(len(partners), funding > 0))
+        try:
+            greenlets = [
+                pool.spawn(
+                    self._open_and_fund_channel,
                     partner,
+                    funding if position < qty_funded else 0,
                 )
-            except DuplicatedChannelError:
-                # This can fail because of a race condition, where the channel
-                # partner opens first.
-                log.info('partner opened channel first')
+                for position, partner in enumerate(partners)
+            ]
+            gevent.joinall(greenlets, raise_error=True)
+        finally:
+            # the first failure is raised, don't leave the other channels
+            # being set up in the background
+            pool.kill()
+
+    def _max_concurrent_channels(self, qty_channels: int, funded: bool) -> int:
+        """ Number of channels which can be opened and funded at the same
+        time, the transactions of every in-flight channel (open, and approve
+        and deposit if it's `funded`) must be affordable together.
+        """
+        gas = CHANNEL_OPEN_TX_GAS_LIMIT
+        if funded:
+            gas += TOKEN_APPROVE_TX_GAS_LIMIT + CHANNEL_DEPOSIT_TX_GAS_LIMIT
+
+        client = self.raiden.chain.client
+        eth_balance = client.balance(self.raiden.address)
+
+        affordable = eth_balance // (gas * client.gasprice())
+        return max(1, min(qty_channels, affordable))
 
+    def _open_and_fund_channel(
+            self,
+            partner,
+            funding: int,
+            retries: int = DEFAULT_CONNECTION_MANAGER_RETRIES,
+    ):
+        """ Open a channel with `partner` and deposit `funding`, transient
+        failures are retried independently of the other channels.
+        """
+        for attempt in range(1, retries + 1):
             try:
-                self.api.set_total_channel_deposit(
-                    self.registry_address,
-                    self.token_address,
-                    partner,
-                    self._initial_funding_per_partner,
+                self._open_channel(partner)
+                if funding > 0:
+                    self._fund_channel(partner, funding)
+                return
+            except (EthNodeCommunicationError, TransactionThrew):
+                log.exception(
+                    'connection manager: channel setup failed',
+                    partner=pex(partner),
+                    attempt=attempt,
                 )
-            except AddressWithoutCode:
-                log.warn('connection manager: channel closed just after it was created')
-            except TransactionThrew:
-                log.exception('connection manager: deposit failed')
+                gevent.sleep(attempt * DEFAULT_RETRY_TIMEOUT)
+
+        log.error(
+            'connection manager: giving up on channel',
+            partner=pex(partner),
+            attempts=retries,
+        )
+
+    def _open_channel(self, partner):
+        channel_state = views.get_channelstate_for(
+            views.state_from_raiden(self.raiden),
+            self.registry_address,
+            self.token_address,
+            partner,
+        )
+        if channel_state is not None:
+            # opened by a previous attempt or by the partner
+            return
+
+        try:
+            self.api.channel_open(
+                self.registry_address,
+                self.token_address,
+                partner,
+            )
+        except DuplicatedChannelError:
+            # This can fail because of a race condition, where the channel
+            # partner opens first.
+            log.info('partner opened channel first')
+
+    def _fund_channel(self, partner, funding: int):
+        try:
+            self.api.set_total_channel_deposit(
+                self.registry_address,
+                self.token_address,
+                partner,
+                funding,
+            )
+        except AddressWithoutCode:
+            log.warn('connection manager: channel closed just after it was created')
 
     @property
     def _initial_funding_per_partner(self) -> int:
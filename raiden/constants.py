@@ -31,6 +31,9 @@ ROPSTEN_DISCOVERY_ADDRESS = '0x81F7cC4F76Bf16a21a5d1ABfDfD1FB503E430368'
 ROPSTEN_SECRET_REGISTRY_ADDRESS = '0xD1B506A716B50069Ac3C990e86253C645b61633D'
 
 DISCOVERY_TX_GAS_LIMIT = 76000
+CHANNEL_OPEN_TX_GAS_LIMIT = 110000
+TOKEN_APPROVE_TX_GAS_LIMIT = 60000
+CHANNEL_DEPOSIT_TX_GAS_LIMIT = 45000
 
 ETH_RPC_DEFAULT_PORT = 8545
 HTTP_PORT = 80
@@ -73,3 +76,47 @@ NULL_ADDRESS = '0x' + '0' * 40
 NULL_ADDRESS_BYTES = b'\x00' * 20
 
 TESTNET_GASPRICE_MULTIPLIER = 2.0
+
+# Status of a cross chain swap, see `raiden.transfer.cross_swap`
+CROSS_STATUS_CREATED = 1
+# target: the swap was received and accepted
+CROSS_STATUS_RECEIVED = 2
+# initiator: the swap was accepted, the locked transfer and invoice are sent
+CROSS_STATUS_ACCEPTED = 3
+# target: the locked transfer was received, the invoice is being paid
+CROSS_STATUS_LOCKED = 4
+# initiator: the secret request arrived before the invoice was paid
+CROSS_STATUS_SECRET_REQUESTED = 5
+# initiator: the invoice was paid before the secret request arrived
+CROSS_STATUS_INVOICE_PAID = 6
+# target: the invoice was paid, the initiator has to finish the swap
+CROSS_STATUS_PAYMENT_SENT = 7
+CROSS_STATUS_DONE = 8
+# target: paying the invoice failed, the locked transfer is left to expire
+CROSS_STATUS_PAYMENT_FAILED = 9
+
+# Allowed status changes, setting the current status again is always allowed
+CROSS_STATUS_TRANSITIONS = {
+    CROSS_STATUS_CREATED: (CROSS_STATUS_RECEIVED, CROSS_STATUS_ACCEPTED),
+    CROSS_STATUS_RECEIVED: (CROSS_STATUS_LOCKED,),
+    CROSS_STATUS_ACCEPTED: (CROSS_STATUS_SECRET_REQUESTED, CROSS_STATUS_INVOICE_PAID),
+    CROSS_STATUS_LOCKED: (
+        CROSS_STATUS_PAYMENT_SENT,
+        CROSS_STATUS_PAYMENT_FAILED,
+        CROSS_STATUS_DONE,
+    ),
+    CROSS_STATUS_SECRET_REQUESTED: (CROSS_STATUS_DONE,),
+    CROSS_STATUS_INVOICE_PAID: (CROSS_STATUS_DONE,),
+    CROSS_STATUS_PAYMENT_SENT: (CROSS_STATUS_DONE,),
+    CROSS_STATUS_DONE: (),
+    CROSS_STATUS_PAYMENT_FAILED: (),
+}
+
+# Swaps with these statuses are finished and only kept in the
+# crosstransaction_events table
+CROSS_STATUS_FINISHED = (CROSS_STATUS_DONE, CROSS_STATUS_PAYMENT_FAILED)
+
+# Values of `AcceptCross.accept`
+CROSS_ACCEPT = 1
+# initiator to target: the swap is done
+CROSS_ACCEPT_SYNC = 7
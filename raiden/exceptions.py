@@ -62,6 +62,20 @@ class InvalidAmount(RaidenError):
     pass
 
 
+class DuplicatedPaymentIdentifier(RaidenError):
+    """ Raised when the user provided payment identifier is already used by
+    another pending payment.
+    """
+    pass
+
+
+class DuplicatedCrossIdentifier(RaidenError):
+    """ Raised when the user provided cross chain swap identifier is already
+    used by another swap.
+    """
+    pass
+
+
 class InvalidSettleTimeout(RaidenError):
     """ Raised when the user provided timeout value is less than the minimum
     settle timeout"""
@@ -85,6 +99,11 @@ class UnknownTokenAddress(RaidenError):
     pass
 
 
+class UnknownEventType(RaidenError):
+    """ Raised when the user provided event type can not be queried. """
+    pass
+
+
 class TokenNotRegistered(RaidenError):
     """ Raised if there is no token network for token used when opening a channel  """
     pass
@@ -173,3 +192,21 @@ class TransportError(RaidenError):
 
 class ReplacementTransactionUnderpriced(RaidenError):
     """Raised when a replacement transaction is rejected by the blockchain"""
+
+
+class UnknownCrossTransaction(RaidenError):
+    """ Raised when a cross chain swap is not in the storage """
+
+
+class InvalidCrossTransactionStatus(RaidenError):
+    """ Raised when the status of a cross chain swap can not be changed to the
+    requested value, see CROSS_STATUS_TRANSITIONS.
+    """
+
+
+class LndError(RaidenError):
+    """ Raised when a request to the LND node fails """
+
+
+class ProfilerAlreadyRunning(RaidenError):
+    """ Raised when a profile is requested while another one is running """
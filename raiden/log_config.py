@@ -1,16 +1,24 @@
 import logging
 import logging.config
+import logging.handlers
 import re
 import sys
+from collections import deque
 from traceback import TracebackException
 from functools import wraps
 from typing import Dict, Callable, Pattern, Tuple, List
 
+import gevent
 import structlog
+from gevent.event import Event
 
 DEFAULT_LOG_LEVEL = 'INFO'
+DEFAULT_DEBUG_LOG_FILE_NAME = 'raiden-debug.log'
 MAX_LOG_FILE_SIZE = 5 * 1024 * 1024
 
+# Loggers which had their level set by `configure_logging`
+_configured_loggers = set()
+
 
 def _chain(first_func, *funcs) -> Callable:
     """Chains a give number of functions.
@@ -97,16 +105,70 @@ class RaidenFilter(logging.Filter):
         return self._log_filter.should_log(record.name, record.levelname)
 
 
-def _get_log_handler(formatter: str, log_file: str) -> Dict:
+class AsyncHandler(logging.Handler):
+    """ Queues the records and hands them to the `target_class` handler from
+    a greenlet, so the formatting and the writes are done when the hub is
+    idle instead of in the greenlet which logged.
+
+    The objects of a record are formatted when it is written, not when it
+    was logged.
+    """
+
+    def __init__(self, target_class, **kwargs):
+        super().__init__()
+        self.target = target_class(**kwargs)
+        self.records = deque()
+        self.pending = Event()
+        self.writer = gevent.spawn(self._write)
+        self.writer.name = 'Log writer'
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def emit(self, record):
+        self.records.append(record)
+        self.pending.set()
+
+    def _write(self):
+        while True:
+            self.pending.wait()
+            self.pending.clear()
+            self.drain()
+
+    def drain(self):
+        while self.records:
+            self.target.handle(self.records.popleft())
+
+    def flush(self):
+        self.drain()
+        self.target.flush()
+
+    def close(self):
+        self.writer.kill(block=False)
+        self.flush()
+        self.target.close()
+        super().close()
+
+
+def _file_handler(handler_class: type, log_async: bool, **kwargs) -> Dict:
+    if log_async:
+        return {'()': AsyncHandler, 'target_class': handler_class, **kwargs}
+
+    return {'()': handler_class, **kwargs}
+
+
+def _get_log_handler(formatter: str, log_file: str, log_async: bool = False) -> Dict:
     if log_file:
         return {
-            'file': {
-                'class': 'logging.handlers.WatchedFileHandler',
-                'filename': log_file,
-                'level': 'DEBUG',
-                'formatter': formatter,
-                'filters': ['log_level_filter'],
-            },
+            'file': _file_handler(
+                logging.handlers.WatchedFileHandler,
+                log_async,
+                filename=log_file,
+                level='DEBUG',
+                formatter=formatter,
+                filters=['log_level_filter'],
+            ),
         }
     else:
         return {
@@ -119,20 +181,48 @@ def _get_log_handler(formatter: str, log_file: str) -> Dict:
         }
 
 
-def _get_log_file_handler() -> Dict:
+def _get_log_file_handler(file_name: str, log_async: bool = False) -> Dict:
     return {
-        'debug-info': {
-            'class': 'logging.handlers.RotatingFileHandler',
-            'filename': f'raiden-debug.log',
-            'level': 'DEBUG',
-            'formatter': 'debug',
-            'maxBytes': MAX_LOG_FILE_SIZE,
-            'backupCount': 3,
-            'filters': ['log_level_debug_filter'],
-        },
+        'debug-info': _file_handler(
+            logging.handlers.RotatingFileHandler,
+            log_async,
+            filename=file_name,
+            level='DEBUG',
+            formatter='debug',
+            maxBytes=MAX_LOG_FILE_SIZE,
+            backupCount=3,
+            filters=['log_level_debug_filter'],
+        ),
     }
 
 
+def _set_logger_levels(level_configs: List[Dict[str, str]]):
+    """ Set the level of the loggers to the lowest level any of the handlers
+    accepts, so the records no handler would emit are dropped before they are
+    built.
+    """
+    log_filters = [
+        LogFilter(level_config, default_level=DEFAULT_LOG_LEVEL)
+        for level_config in level_configs
+    ]
+    logger_names = {''}
+    for level_config in level_configs:
+        logger_names.update(level_config)
+
+    for logger_name in _configured_loggers - logger_names:
+        logging.getLogger(logger_name).setLevel(logging.NOTSET)
+
+    for logger_name in logger_names:
+        level = min(
+            getattr(logging, log_filter._get_log_level(logger_name).upper(), logging.DEBUG)
+            for log_filter in log_filters
+        )
+        logging.getLogger(logger_name).setLevel(level)
+
+    _configured_loggers.clear()
+    _configured_loggers.update(logger_names)
+
+
 def redactor(blacklist: Dict[Pattern, str]) -> Callable:
     """Returns a function which transforms a str, replacing all matches for its replacement"""
     def processor_wrapper(msg: str) -> str:
@@ -163,7 +253,17 @@ def configure_logging(
     colorize: bool = True,
     log_json: bool = False,
     log_file: str = None,
+    disable_debug_logfile: bool = False,
+    debug_log_file_name: str = DEFAULT_DEBUG_LOG_FILE_NAME,
+    log_async: bool = False,
 ):
+    """ Configure the stdlib logging and structlog.
+
+    The records are written to stderr, or to `log_file`, filtered by
+    `logger_level_config`. Unless `disable_debug_logfile` is set, the debug
+    records of raiden are also written to `debug_log_file_name`. With
+    `log_async` the files are written from a greenlet.
+    """
     structlog.reset_defaults()
     if logger_level_config is None:
         logger_level_config = {'': DEFAULT_LOG_LEVEL}
@@ -185,13 +285,20 @@ def configure_logging(
     })
     _wrap_tracebackexception_format(redact)
 
+    debug_level_config = {'': DEFAULT_LOG_LEVEL, 'raiden': 'DEBUG'}
+
     log_handler = _get_log_handler(
         formatter,
         log_file,
+        log_async,
     )
-    debug_log_file_handler = _get_log_file_handler()
+    combined_log_handlers = dict(log_handler)
+    level_configs = [logger_level_config]
 
-    combined_log_handlers = {**log_handler, **debug_log_file_handler}
+    if not disable_debug_logfile:
+        debug_log_file_handler = _get_log_file_handler(debug_log_file_name, log_async)
+        combined_log_handlers.update(debug_log_file_handler)
+        level_configs.append(debug_level_config)
 
     logging.config.dictConfig(
         {
@@ -204,7 +311,7 @@ def configure_logging(
                 },
                 'log_level_debug_filter': {
                     '()': RaidenFilter,
-                    'log_level_config': {'': DEFAULT_LOG_LEVEL, 'raiden': 'DEBUG'},
+                    'log_level_config': debug_level_config,
                 },
             },
             'formatters': {
@@ -238,8 +345,10 @@ def configure_logging(
             },
         },
     )
+    # The level is checked before any other processor runs, the foreign
+    # records were already checked by the stdlib logger
     structlog.configure(
-        processors=processors + [
+        processors=[structlog.stdlib.filter_by_level] + processors + [
             structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
         wrapper_class=structlog.stdlib.BoundLogger,
@@ -247,7 +356,4 @@ def configure_logging(
         cache_logger_on_first_use=True,
     )
 
-    # set raiden logging level to DEBUG, to be able to intercept all messages,
-    # which should then be filtered by the specific filters
-    structlog.get_logger('').setLevel('DEBUG')
-    structlog.get_logger('raiden').setLevel('DEBUG')
+    _set_logger_levels(level_configs)
@@ -1,14 +1,18 @@
 import structlog
-import random
 
-from eth_utils import to_normalized_address, encode_hex
+from eth_utils import to_normalized_address
 
 from raiden.raiden_service import RaidenService
 from raiden.utils import random_secret
 from raiden.routing import get_best_routes
 from raiden.transfer import views
-from raiden.transfer.state import balanceproof_from_envelope
+from raiden.transfer.state import CrossSwapState, balanceproof_from_envelope
 from raiden.transfer.state_change import (
+    ActionCrossSwapLocked,
+    ReceiveCrossSecretRequest,
+    ReceiveCrossSwap,
+    ReceiveCrossSwapAccept,
+    ReceiveCrossSwapDone,
     ReceiveProcessed,
     ReceiveTransferDirect,
     ReceiveUnlock,
@@ -35,10 +39,10 @@ from raiden.transfer.mediated_transfer.state_change import (
     ReceiveTransferRefundCancelRoute,
 )
 from raiden.constants import (
+    CROSS_ACCEPT_SYNC,
+    CROSS_STATUS_RECEIVED,
     UINT256_MAX,
-    UINT64_MAX,
 )
-from eth_utils import encode_hex
 
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
@@ -136,16 +140,18 @@ def handle_message_processed(raiden: RaidenService, message: Processed):
 def handle_message_crosstransaction(raiden: RaidenService, message : Crosstransaction):
     cross_type = message.cross_type
     if cross_type==1:
-        raiden.wal.create_crosstransactiontry(message.initiator_address, message.target_address, message.token_network_identifier, message.sendETH_amount, message.sendBTC_amount, message.receiveBTC_address,message.identifier)
-        raiden.wal.change_crosstransaction_status(message.identifier, 2)
-        accept=1
-        acceptcross = AcceptCross(random.randint(0, UINT64_MAX),message.initiator_address,message.target_address,message.identifier,accept)
-        raiden.sign(acceptcross)
-        raiden.transport.send_async(
+        cross_swap = CrossSwapState(
+            message.identifier,
             message.initiator_address,
-            bytes("123", 'utf-8'),
-            acceptcross,
+            message.target_address,
+            message.token_network_identifier,
+            message.sendETH_amount,
+            message.sendBTC_amount,
+            message.receiveBTC_address,
+            CROSS_STATUS_RECEIVED,
         )
+        # The AcceptCross message is sent by the state machine
+        raiden.handle_state_change(ReceiveCrossSwap(cross_swap))
     else:
         message.cross_type = 1
         async_result = raiden.start_crosstransaction(message.token_network_identifier,message.initiator_address,message.target_address,message.sendETH_amount,message.sendBTC_amount,message.receiveBTC_address,message.cross_type,message.identifier)
@@ -170,15 +176,16 @@ def handle_message_crosstransaction(raiden: RaidenService, message : Crosstransa
 
 
 def handle_message_acceptcross(raiden:RaidenService,message:AcceptCross):
-    # for sync
-    if message.accept == 7:
-        raiden.wal.change_crosstransaction_status(message.identifier, 8)
-        log.info('##sync received')
+    if message.accept == CROSS_ACCEPT_SYNC:
+        raiden.handle_state_change(ReceiveCrossSwapDone(message.identifier))
         return
 
+    events = raiden.handle_state_change(ReceiveCrossSwapAccept(message.identifier))
 
-    raiden.wal.change_crosstransaction_status(message.identifier, 3)
-    raiden.start_send_crosstansfer(message.identifier)
+    # Only the first AcceptCross starts the transfer, the swap ignores repeated
+    # messages
+    if events:
+        raiden.start_send_crosstansfer(message.identifier)
 
 
 def handle_message_crosslockedtransfer(raiden:RaidenService,message:CrossLockedTransfer):
@@ -203,13 +210,15 @@ def handle_message_crosslockedtransfer(raiden:RaidenService,message:CrossLockedT
     locked_transfer_message.signature = message.locked_transfer_signature
     if message.target == raiden.address:
         raiden.cross_handle_recieved_locked_transfer(locked_transfer_message, message.cross_id)
-
-        raiden.wal.change_crosstransaction_status(message.cross_id, 4)
-        raiden.wal.storage.change_crosstransaction_r(message.cross_id, encode_hex(locked_transfer_message.lock.secrethash), "")
+        raiden.handle_state_change(ActionCrossSwapLocked(
+            message.cross_id,
+            locked_transfer_message.lock.secrethash,
+            None,
+        ))
 
         #to do send lnd string to lnd
         lnd_string = message.lnd_string.decode('utf-8')
-        raiden.send_payment_request(lnd_string)
+        raiden.send_payment_request(message.cross_id, lnd_string)
     else:
         handle_message_lockedtransfer(raiden, locked_transfer_message)
 
@@ -233,23 +242,8 @@ def handle_message_crosssecretrequest(raiden, message):
         secret_request_message.sender,
     )
 
-    row = raiden.wal.get_crosstransaction_by_identifier(message.cross_id)
-    if row[7] == 6:
-        raiden.handle_state_change(state_change)
-        raiden.wal.change_crosstransaction_status(message.cross_id, 8)
-        #sync
-        acceptcross = AcceptCross(random.randint(0, UINT64_MAX),row[1],row[2],message.cross_id,7)
-        raiden.sign(acceptcross)
-        raiden.transport.send_async(
-            row[2],
-            bytes("123", 'utf-8'),
-            acceptcross,
-        )
-        log.info('##sync sended')
-    else:
-        raiden.wal.change_crosstransaction_status(message.cross_id, 5)
-        state_change_id = raiden.wal.storage.write_state_change(state_change)
-        raiden.wal.storage.change_crosstransaction_statechangeid(message.cross_id, state_change_id)
+    # The secret request is held by the swap until the LND invoice is paid
+    raiden.handle_state_change(ReceiveCrossSecretRequest(message.cross_id, state_change))
 
 
 
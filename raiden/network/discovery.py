@@ -21,6 +21,23 @@ class Discovery:
 
     def __init__(self):
         self.nodeid_to_hostport = dict()
+        self.hostport_to_nodeid = dict()
+
+    def _index(self, node_address: bytes, host_port: Tuple[str, int]):
+        """ Update both mappings, a node has a single endpoint and an endpoint
+        a single node.
+        """
+        previous_host_port = self.nodeid_to_hostport.get(node_address)
+        if self.hostport_to_nodeid.get(previous_host_port) == node_address:
+            del self.hostport_to_nodeid[previous_host_port]
+
+        # the endpoint moved to `node_address`, its previous owner is unknown
+        previous_node_address = self.hostport_to_nodeid.get(host_port)
+        if self.nodeid_to_hostport.get(previous_node_address) == host_port:
+            del self.nodeid_to_hostport[previous_node_address]
+
+        self.nodeid_to_hostport[node_address] = host_port
+        self.hostport_to_nodeid[host_port] = node_address
 
     def register(self, node_address: bytes, host: str, port: int):
         if not is_binary_address(node_address):
@@ -34,7 +51,7 @@ class Discovery:
         if not isinstance(port, int):
             raise ValueError('port must be a valid number')
 
-        self.nodeid_to_hostport[node_address] = (host, port)
+        self._index(node_address, (host, port))
 
     def get(self, node_address: bytes):
         try:
@@ -43,16 +60,18 @@ class Discovery:
             raise InvalidAddress('Unknown address {}'.format(pex(node_address)))
 
     def nodeid_by_host_port(self, host_port):
-        for nodeid, value_hostport in self.nodeid_to_hostport.items():
-            if value_hostport == host_port:
-                return nodeid
-        return None
+        return self.hostport_to_nodeid.get(host_port)
 
 
 class ContractDiscovery(Discovery):
     """ Raiden node discovery.
 
     Allows registering and looking up by endpoint (host, port) for node_address.
+
+    Endpoints are read from the smart contract once and then served from the
+    local mappings. `endpoint_registered` must be called for every
+    `AddressRegistered` event of the discovery contract to keep the mappings
+    up-to-date, see `BlockchainEvents.add_discovery_listener`.
     """
 
     def __init__(
@@ -65,6 +84,10 @@ class ContractDiscovery(Discovery):
         self.node_address = node_address
         self.discovery_proxy = discovery_proxy
 
+        # Incremented on every update from an event, a lookup that raced with
+        # an update must not overwrite it with the value it read.
+        self.generation = 0
+
     def register(self, node_address: bytes, host: str, port: int):
         if node_address != self.node_address:
             raise ValueError('You can only register your own endpoint.')
@@ -95,6 +118,7 @@ class ContractDiscovery(Discovery):
         else:
             endpoint = host_port_to_endpoint(host, port)
             self.discovery_proxy.register_endpoint(node_address, endpoint)
+            self.endpoint_registered(node_address, endpoint)
             log.info(
                 'registered endpoint in discovery',
                 node_address=pex(node_address),
@@ -102,15 +126,37 @@ class ContractDiscovery(Discovery):
                 port=port,
             )
 
+    def endpoint_registered(self, node_address: bytes, endpoint: str):
+        """ Update the mappings with a new registration from the contract. """
+        self.generation += 1
+        self._index(node_address, split_endpoint(endpoint))
+
     def get(self, node_address: bytes):
-        endpoint = self.discovery_proxy.endpoint_by_address(node_address)
-        host_port = split_endpoint(endpoint)
+        host_port = self.nodeid_to_hostport.get(node_address)
+
+        if host_port is None:
+            generation = self.generation
+            endpoint = self.discovery_proxy.endpoint_by_address(node_address)
+            host_port = split_endpoint(endpoint)
+
+            if generation == self.generation:
+                self._index(node_address, host_port)
+
         return host_port
 
     def nodeid_by_host_port(self, host_port: Tuple[str, int]):
-        host, port = host_port
-        endpoint = host_port_to_endpoint(host, port)
-        return self.discovery_proxy.address_by_endpoint(endpoint)
+        node_address = self.hostport_to_nodeid.get(host_port)
+
+        if node_address is None:
+            generation = self.generation
+            host, port = host_port
+            endpoint = host_port_to_endpoint(host, port)
+            node_address = self.discovery_proxy.address_by_endpoint(endpoint)
+
+            if node_address is not None and generation == self.generation:
+                self._index(node_address, host_port)
+
+        return node_address
 
     def version(self):
         return self.discovery_proxy.version()
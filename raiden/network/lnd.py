@@ -0,0 +1,240 @@
+import base64
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, NamedTuple, Tuple
+
+import gevent
+import requests
+import structlog
+from gevent import Greenlet
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from raiden.exceptions import LndError
+from raiden.settings import (
+    DEFAULT_LND_INVOICE_EXPIRY,
+    DEFAULT_LND_INVOICE_POOL_SIZE,
+    DEFAULT_LND_POOL_SIZE,
+    DEFAULT_LND_RETRIES,
+    DEFAULT_LND_TIMEOUT,
+)
+from raiden.utils import random_secret
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+
+class LndClient:
+    """ Client for the REST API of the LND node used by the cross chain swaps.
+
+    The connections to the node are kept in a pool and reused. The macaroon is
+    read once with `load_macaroon` and cached, `invalidate_credentials` must
+    be called when it changes.
+
+    Only failures to connect are retried, a request which reached the node is
+    not repeated, since creating an invoice or paying one are not idempotent.
+
+    Args:
+        address: host:port of the LND REST API.
+        load_macaroon: Returns the hex encoded macaroon.
+        scheme: Either https or http, http is only used for testing.
+        verify: TLS verification, passed to `requests`. LND uses a self signed
+            certificate by default, so this can be the path to `tls.cert`.
+    """
+
+    def __init__(
+            self,
+            address: str,
+            load_macaroon: Callable[[], str],
+            scheme: str = 'https',
+            verify=False,
+            timeout: float = DEFAULT_LND_TIMEOUT,
+            retries: int = DEFAULT_LND_RETRIES,
+            pool_size: int = DEFAULT_LND_POOL_SIZE,
+    ):
+        self.base_url = '{}://{}'.format(scheme, address)
+        self.load_macaroon = load_macaroon
+        self.timeout = timeout
+        self._macaroon = None
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=0,
+            backoff_factor=0.1,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=retry,
+        )
+
+        self.session = requests.Session()
+        self.session.verify = verify
+        self.session.mount('{}://'.format(scheme), adapter)
+
+    def __repr__(self):
+        return '<LndClient {}>'.format(self.base_url)
+
+    @property
+    def macaroon(self) -> str:
+        if self._macaroon is None:
+            self._macaroon = self.load_macaroon()
+        return self._macaroon
+
+    def invalidate_credentials(self):
+        self._macaroon = None
+
+    def _post(self, path: str, data: Dict) -> Dict:
+        url = self.base_url + path
+        headers = {'Grpc-Metadata-macaroon': self.macaroon}
+
+        try:
+            response = self.session.post(url, headers=headers, json=data, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise LndError('Request to {} failed: {}'.format(url, e))
+
+        if response.status_code != 200:
+            raise LndError('Request to {} failed with status {}: {}'.format(
+                url,
+                response.status_code,
+                response.text,
+            ))
+
+        return response.json()
+
+    def add_invoice(
+            self,
+            value: int,
+            preimage: bytes,
+            expiry: int = DEFAULT_LND_INVOICE_EXPIRY,
+    ) -> Tuple[str, str]:
+        """ Create an invoice of `value` satoshis locked with `preimage`, which
+        expires after `expiry` seconds, returns the base64 payment hash and the
+        payment request.
+        """
+        data = {
+            'value': value,
+            'r_preimage': base64.b64encode(preimage).decode('utf-8'),
+            'expiry': expiry,
+            'type': 'CROSS_CHAIN_INVOICE',
+        }
+        result = self._post('/v1/invoices', data)
+
+        log.debug('lnd invoice added', r_hash=result['r_hash'])
+        return result['r_hash'], result['payment_request']
+
+    def send_payment(self, payment_request: str) -> Dict:
+        """ Pay the invoice `payment_request`. """
+        result = self._post('/v1/channels/transactions', {'payment_request': payment_request})
+
+        if result.get('payment_error'):
+            raise LndError('Payment failed: {}'.format(result['payment_error']))
+
+        log.debug('lnd payment sent', payment_request=payment_request)
+        return result
+
+
+class Invoice(NamedTuple):
+    secret: bytes
+    r_hash: str
+    payment_request: str
+    created_at: float
+
+
+class InvoicePool:
+    """ Keeps up to `size` unused invoices for every amount in `amounts`, so
+    a cross transfer of one of these amounts can be started without waiting
+    on the LND node.
+
+    An invoice is for an exact amount, so only the configured amounts are
+    pooled, the invoices for other amounts are created when they are
+    allocated. The pools are filled in the background by `provision` and
+    refilled after every allocation.
+
+    The pooled invoices expire on the LND node after `expiry` seconds, and
+    are only handed out during the first half of their lifetime so the
+    transfer has time to complete. Older invoices are dropped from the pool
+    and left to expire, as are the ones still pooled when the node stops,
+    the secrets are only kept in memory.
+    """
+
+    def __init__(
+            self,
+            lnd: LndClient,
+            amounts: Iterable[int] = (),
+            size: int = DEFAULT_LND_INVOICE_POOL_SIZE,
+            expiry: int = DEFAULT_LND_INVOICE_EXPIRY,
+    ):
+        self.lnd = lnd
+        self.size = size
+        self.expiry = expiry
+        self.invoices: Dict[int, Deque[Invoice]] = {amount: deque() for amount in amounts}
+        self.provisioners: Dict[int, Greenlet] = dict()
+
+    def create_invoice(self, value: int) -> Invoice:
+        secret = random_secret()
+        created_at = time.monotonic()
+        r_hash, payment_request = self.lnd.add_invoice(value, secret, self.expiry)
+        return Invoice(secret, r_hash, payment_request, created_at)
+
+    def is_fresh(self, invoice: Invoice) -> bool:
+        return time.monotonic() - invoice.created_at < self.expiry / 2
+
+    def _drop_stale(self, invoices: Deque[Invoice]):
+        # the invoices are appended in the order they were created
+        while invoices and not self.is_fresh(invoices[0]):
+            invoices.popleft()
+
+    def provision(self, value: int = None):
+        """ Fill the pool of invoices for `value` in the background, or the
+        pools of all the configured amounts if `value` is not given.
+        Amounts which are not configured are ignored.
+        """
+        if self.size <= 0:
+            return
+
+        if value is None:
+            for amount in self.invoices:
+                self.provision(amount)
+            return
+
+        if value not in self.invoices:
+            return
+
+        provisioner = self.provisioners.get(value)
+        if provisioner is None or provisioner.ready():
+            self.provisioners[value] = gevent.spawn(self._fill, value)
+
+    def _fill(self, value: int):
+        invoices = self.invoices[value]
+        self._drop_stale(invoices)
+
+        while len(invoices) < self.size:
+            try:
+                invoice = self.create_invoice(value)
+            except LndError as e:
+                log.warning('invoice provisioning failed', value=value, error=str(e))
+                return
+
+            invoices.append(invoice)
+
+    def allocate(self, value: int) -> Invoice:
+        """ Return an unused invoice for `value`, taken from the pool if one is
+        available, otherwise it is created synchronously.
+        """
+        invoices = self.invoices.get(value)
+        if invoices is not None:
+            self._drop_stale(invoices)
+
+        if invoices:
+            invoice = invoices.popleft()
+        else:
+            log.debug('invoice pool miss', value=value)
+            invoice = self.create_invoice(value)
+
+        self.provision(value)
+        return invoice
+
+    def stop(self):
+        gevent.killall(list(self.provisioners.values()))
@@ -1,11 +1,14 @@
 from eth_utils import (
+    encode_hex,
+    event_abi_to_log_topic,
     to_canonical_address,
     to_checksum_address,
     is_binary_address,
     to_normalized_address,
 )
 from raiden_contracts.contract_manager import CONTRACT_MANAGER
-from raiden_contracts.constants import CONTRACT_ENDPOINT_REGISTRY
+from raiden_contracts.constants import CONTRACT_ENDPOINT_REGISTRY, EVENT_ADDRESS_REGISTERED
+from web3.utils.filters import Filter
 
 from raiden.constants import NULL_ADDRESS
 from raiden.exceptions import (
@@ -17,7 +20,7 @@ from raiden.network.rpc.client import check_address_has_code
 from raiden.network.rpc.smartcontract_proxy import ContractProxy
 from raiden.network.rpc.transactions import check_transaction_threw
 from raiden.settings import EXPECTED_CONTRACTS_VERSION
-from raiden.utils import compare_versions, pex
+from raiden.utils import compare_versions, pex, typing
 
 
 class Discovery:
@@ -71,9 +74,10 @@ class Discovery:
 
     def endpoint_by_address(self, node_address_bin):
         node_address_hex = to_checksum_address(node_address_bin)
-        endpoint = self.proxy.contract.functions.findEndpointByAddress(
+        endpoint = self.proxy.call(
+            'findEndpointByAddress',
             node_address_hex,
-        ).call()
+        )
 
         if endpoint == '':
             raise UnknownAddress('Unknown address {}'.format(pex(node_address_bin)))
@@ -81,7 +85,7 @@ class Discovery:
         return endpoint
 
     def address_by_endpoint(self, endpoint):
-        address = self.proxy.contract.functions.findAddressByEndpoint(endpoint).call()
+        address = self.proxy.call('findAddressByEndpoint', endpoint)
 
         if address == self.not_found_address:  # the 0 address means nothing found
             return None
@@ -89,4 +93,22 @@ class Discovery:
         return to_canonical_address(address)
 
     def version(self):
-        return self.proxy.contract.functions.contract_version().call()
+        return self.proxy.call('contract_version', immutable=True)
+
+    def address_registered_filter(
+            self,
+            from_block: typing.BlockSpecification = 0,
+            to_block: typing.BlockSpecification = 'latest',
+    ) -> Filter:
+        event_abi = CONTRACT_MANAGER.get_event_abi(
+            CONTRACT_ENDPOINT_REGISTRY,
+            EVENT_ADDRESS_REGISTERED,
+        )
+        topics = [encode_hex(event_abi_to_log_topic(event_abi))]
+
+        return self.client.new_filter(
+            self.address,
+            topics=topics,
+            from_block=from_block,
+            to_block=to_block,
+        )
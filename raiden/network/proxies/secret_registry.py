@@ -129,7 +129,7 @@ class SecretRegistry:
         return transaction_hash
 
     def get_register_block_for_secrethash(self, secrethash: typing.Keccak256) -> int:
-        return self.proxy.contract.functions.getSecretRevealBlockHeight(secrethash).call()
+        return self.proxy.call('getSecretRevealBlockHeight', secrethash)
 
     def check_registered(self, secrethash: typing.Keccak256) -> bool:
         return self.get_register_block_for_secrethash(secrethash) > 0
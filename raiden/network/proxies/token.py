@@ -36,10 +36,11 @@ class Token:
         self.proxy = proxy
 
     def allowance(self, owner, spender):
-        return self.proxy.contract.functions.allowance(
+        return self.proxy.call(
+            'allowance',
             to_checksum_address(owner),
             to_checksum_address(spender),
-        ).call()
+        )
 
     def approve(self, contract_address, allowance):
         """ Aprove `contract_address` to transfer up to `deposit` amount of token. """
@@ -94,9 +95,10 @@ class Token:
 
     def balance_of(self, address):
         """ Return the balance of `address`. """
-        return self.proxy.contract.functions.balanceOf(
+        return self.proxy.call(
+            'balanceOf',
             to_checksum_address(address),
-        ).call()
+        )
 
     def transfer(self, to_address, amount):
         transaction_hash = self.proxy.transact(
@@ -89,8 +89,7 @@ class TokenNetwork:
         self.deposit_lock = Semaphore()
 
     def _call_and_check_result(self, function_name: str, *args):
-        fn = getattr(self.proxy.contract.functions, function_name)
-        call_result = fn(*args).call()
+        call_result = self.proxy.call(function_name, *args)
 
         if call_result == b'':
             raise RuntimeError(f"Call to '{function_name}' returned nothing")
@@ -99,7 +98,7 @@ class TokenNetwork:
 
     def token_address(self) -> typing.Address:
         """ Return the token of this manager. """
-        return to_canonical_address(self.proxy.contract.functions.token().call())
+        return to_canonical_address(self.proxy.call('token', immutable=True))
 
     def new_netting_channel(
             self,
@@ -284,7 +283,7 @@ class TokenNetwork:
 
         channel_data = self.detail_channel(participant1, participant2)
         participants_data = self.detail_participants(participant1, participant2)
-        chain_id = self.proxy.contract.functions.chain_id().call()
+        chain_id = self.proxy.call('chain_id', immutable=True)
 
         return {
             'chain_id': chain_id,
@@ -294,11 +293,15 @@ class TokenNetwork:
 
     def settlement_timeout_min(self) -> int:
         """ Returns the minimal settlement timeout for the token network. """
-        return self.proxy.contract.functions.settlement_timeout_min().call()
+        return self.proxy.call('settlement_timeout_min', immutable=True)
 
     def settlement_timeout_max(self) -> int:
         """ Returns the maximal settlement timeout for the token network. """
-        return self.proxy.contract.functions.settlement_timeout_max().call()
+        return self.proxy.call('settlement_timeout_max', immutable=True)
+
+    def deposit_limit(self) -> typing.TokenAmount:
+        """ Returns the maximum total deposit allowed per participant. """
+        return self.proxy.call('deposit_limit')
 
     def locked_amount_by_locksroot(
             self,
@@ -74,9 +74,10 @@ class TokenNetworkRegistry:
         if not isinstance(token_address, typing.T_TargetAddress):
             raise ValueError('token_address must be an address')
 
-        address = self.proxy.contract.functions.token_to_token_networks(
+        address = self.proxy.call(
+            'token_to_token_networks',
             to_checksum_address(token_address),
-        ).call()
+        )
         address = to_canonical_address(address)
 
         if is_same_address(address, NULL_ADDRESS):
@@ -161,8 +162,8 @@ class TokenNetworkRegistry:
 
     def settlement_timeout_min(self) -> int:
         """ Returns the minimal settlement timeout for the token network registry. """
-        return self.proxy.contract.functions.settlement_timeout_min().call()
+        return self.proxy.call('settlement_timeout_min', immutable=True)
 
     def settlement_timeout_max(self) -> int:
         """ Returns the maximal settlement timeout for the token network registry. """
-        return self.proxy.contract.functions.settlement_timeout_max().call()
+        return self.proxy.call('settlement_timeout_max', immutable=True)
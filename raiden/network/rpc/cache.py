@@ -0,0 +1,112 @@
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import structlog
+
+from raiden.utils import typing
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+CacheKey_T = Tuple[typing.Address, str, Tuple[Hashable, ...]]
+
+
+class BlockCallCache:
+    """ Read-through cache for the results of contract calls (`eth_call`).
+
+    Entries are keyed by (contract address, function name, arguments, block
+    number). Values which are set at deployment time and can never change,
+    e.g. the settlement timeout bounds or the chain id, may be cached with
+    `immutable=True`, these are kept for the lifetime of the cache. Every
+    other entry is only valid for the block in which it was fetched.
+
+    Notes:
+    - `on_new_block` must be registered with the `AlarmTask`, so that block
+      scoped entries are dropped as soon as a new block is known. Until the
+      first block is known, e.g. for a client without an alarm task, only
+      the immutable values are cached.
+    - Transactions sent by this node change the contract storage without the
+      alarm task noticing a new block in time, so the client must call
+      `invalidate` once one of its transactions is mined.
+    """
+
+    def __init__(self):
+        self.block_number = None
+        self.block_entries: Dict[CacheKey_T, Any] = dict()
+        self.immutable_entries: Dict[CacheKey_T, Any] = dict()
+
+        # Incremented on every invalidation, used to detect a fetch that
+        # raced with an invalidation, its result must not be cached.
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_fetch(
+            self,
+            contract_address: typing.Address,
+            function_name: str,
+            args: Tuple[Hashable, ...],
+            fetch: Callable[[], Any],
+            immutable: bool = False,
+    ) -> Any:
+        """ Return the cached result for the call or execute `fetch` and
+        cache its result.
+        """
+        if immutable:
+            key = (contract_address, function_name, args)
+            entries = self.immutable_entries
+        elif self.block_number is None:
+            # Nothing would ever invalidate the entries
+            return fetch()
+        else:
+            key = (contract_address, function_name, args, self.block_number)
+            entries = self.block_entries
+
+        try:
+            result = entries[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        generation = self.generation
+
+        # `fetch` does a request to the ethereum node and may context-switch
+        result = fetch()
+
+        if immutable or generation == self.generation:
+            entries[key] = result
+
+        return result
+
+    def invalidate(self):
+        """ Drop all the block scoped entries. """
+        self.generation += 1
+        self.block_entries = dict()
+
+    def on_new_block(self, block_number: typing.BlockNumber, chain_id: int):
+        """ AlarmTask callback, drops the entries of the previous block. """
+        if block_number != self.block_number:
+            log.debug('rpc call cache', block_number=block_number, **self.stats())
+
+            self.block_number = block_number
+            self.invalidate()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+
+        if total == 0:
+            return 0.0
+
+        return self.hits / total
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'block_entries': len(self.block_entries),
+            'immutable_entries': len(self.immutable_entries),
+        }
@@ -1,10 +1,10 @@
 import copy
 import os
 import sys
+import time
 import warnings
 from binascii import unhexlify
 from json.decoder import JSONDecodeError
-from itertools import count
 
 from pkg_resources import DistributionNotFound
 from web3 import Web3, HTTPProvider
@@ -32,9 +32,12 @@ from raiden.utils import (
     is_supported_client,
     privatekey_to_address,
 )
-from raiden.utils.typing import List, Dict, Iterable, Address, BlockSpecification
+from raiden.utils.metrics import RPC_REQUEST_SECONDS
+from raiden.utils.typing import List, Dict, Address, BlockSpecification
 from raiden.utils.filters import StatelessFilter
+from raiden.network.rpc.cache import BlockCallCache
 from raiden.network.rpc.smartcontract_proxy import ContractProxy
+from raiden.network.rpc.transaction_manager import TransactionManager
 from raiden.utils.solc import (
     solidity_unresolved_symbols,
     solidity_library_symbol,
@@ -79,6 +82,19 @@ def make_connection_test_middleware(client):
     return connection_test_middleware
 
 
+def rpc_latency_middleware(make_request, web3):  # pylint: disable=unused-argument
+    """ Creates middleware that measures the latency of every request. """
+
+    def middleware(method, params):
+        start = time.perf_counter()
+        try:
+            return make_request(method, params)
+        finally:
+            RPC_REQUEST_SECONDS.observe(time.perf_counter() - start, method)
+
+    return middleware
+
+
 def check_address_has_code(
         client: 'JSONRPCClient',
         address: Address,
@@ -161,9 +177,12 @@ class JSONRPCClient:
         host: Ethereum node host address.
         port: Ethereum node port number.
         privkey: Local user private key, used to sign transactions.
-        nonce_update_interval: Update the account nonce every
-            `nonce_update_interval` seconds.
         nonce_offset: Network's default base nonce number.
+
+    Note:
+        The account nonce is fetched from the node once and then assigned
+        locally, so transactions can be sent back to back. This assumes no
+        other client is sending transactions with the same account.
     """
 
     def __init__(
@@ -172,7 +191,6 @@ class JSONRPCClient:
             port: int,
             privkey: bytes,
             gasprice: int = None,
-            nonce_update_interval: float = 5.0,
             nonce_offset: int = 0,
             web3: Web3 = None,
     ):
@@ -191,11 +209,16 @@ class JSONRPCClient:
 
         self._nonce_offset = nonce_offset
         self._nonce_lock = Semaphore()
+        # The next nonce to use, None if it must be fetched from the node
+        self._available_nonce = None
         self.given_gas_price = gasprice
 
         self._gaslimit_cache = TTLCache(maxsize=16, ttl=RPC_CACHE_TTL)
         self._gasprice_cache = TTLCache(maxsize=16, ttl=RPC_CACHE_TTL)
-        self._nonce_cache = TTLCache(maxsize=16, ttl=nonce_update_interval)
+
+        # Shared by all the contract proxies created with this client
+        self.call_cache = BlockCallCache()
+        self.transactions = TransactionManager(self)
 
         # web3
         if web3 is None:
@@ -211,6 +234,12 @@ class JSONRPCClient:
             # scoped web3 instance is used for all clients
             pass
 
+        try:
+            # shared web3 instances already have the middleware, see above
+            self.web3.middleware_stack.inject(rpc_latency_middleware, layer=0)
+        except ValueError:
+            pass
+
         # create the connection test middleware (but only for non-tester chain)
         if not hasattr(web3, 'testing'):
             connection_test = make_connection_test_middleware(self)
@@ -229,25 +258,26 @@ class JSONRPCClient:
         """ Return the most recent block. """
         return self.web3.eth.blockNumber
 
-    @cachedmethod(attrgetter('_nonce_cache'))
-    def _node_nonce_it(self) -> Iterable[int]:
-        """Returns counter iterator from the account's nonce
-
-        As this method is backed by a TTLCache and _nonce_lock-protected,
-        it may be used as iterable-cache of the node's nonce, and refreshed every
-        nonce_update_inverval seconds, to ensure it's always in-sync.
+    def _node_nonce(self) -> int:
+        """ Returns the account's nonce as seen by the node, including the
+        transactions in the pool.
         """
         transaction_count = self.web3.eth.getTransactionCount(
             to_checksum_address(self.sender),
             'pending',
         )
-        nonce = transaction_count + self._nonce_offset
-
-        return count(nonce)
+        return transaction_count + self._nonce_offset
 
     def _nonce(self) -> int:
-        """Returns and increments the nonce on every call"""
-        return next(self._node_nonce_it())
+        """ Returns the next nonce, must be called with `_nonce_lock` held.
+
+        The nonce is only consumed once the transaction is accepted by the
+        node, see `send_transaction`.
+        """
+        if self._available_nonce is None:
+            self._available_nonce = self._node_nonce()
+
+        return self._available_nonce
 
     def inject_stop_event(self, event):
         self.stop_event = event
@@ -292,7 +322,11 @@ class JSONRPCClient:
         )
 
     def get_transaction_receipt(self, tx_hash: bytes):
-        return self.web3.eth.getTransactionReceipt(encode_hex(tx_hash))
+        """ Return the receipt of `tx_hash`, or of the replacement transaction
+        which was mined in its place.
+        """
+        mined_hash = self.transactions.mined_hash(tx_hash)
+        return self.web3.eth.getTransactionReceipt(encode_hex(mined_hash))
 
     def deploy_solidity_contract(
             self,  # pylint: disable=too-many-locals
@@ -437,31 +471,57 @@ class JSONRPCClient:
         if to == to_canonical_address(NULL_ADDRESS):
             warnings.warn('For contract creation the empty string must be used.')
 
+        # The values are computed outside of the lock, the lock only protects
+        # the nonce assignment, so concurrent senders don't wait on each other
+        # requests to the node.
+        transaction = dict(
+            gasPrice=gasprice or self.gasprice(),
+            gas=self.check_startgas(startgas),
+            value=value,
+            data=data,
+        )
+
+        # add the to address if not deploying a contract
+        if to != b'':
+            transaction['to'] = to_checksum_address(to)
+
         with self._nonce_lock:
-            transaction = dict(
-                nonce=self._nonce(),
-                gasPrice=gasprice or self.gasprice(),
-                gas=self.check_startgas(startgas),
-                value=value,
-                data=data,
-            )
+            transaction['nonce'] = self._nonce()
 
-            # add the to address if not deploying a contract
-            if to != b'':
-                transaction['to'] = to_checksum_address(to)
+            try:
+                tx_hash = self.send_signed_transaction(transaction)
+            except Exception:
+                # The transaction may or may not have reached the pool,
+                # resynchronize with the node on the next transaction.
+                self._available_nonce = None
+                raise
 
-            signed_txn = self.web3.eth.account.signTransaction(transaction, self.privkey)
+            self._available_nonce = transaction['nonce'] + 1
+            self.transactions.add(tx_hash, transaction)
 
-            tx_hash = self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
-            log.debug(
-                'send_raw_transaction',
-                account=to_checksum_address(self.sender),
-                nonce=transaction['nonce'],
-                gasLimit=transaction['gas'],
-                gasPrice=transaction['gasPrice'],
-                tx_hash=tx_hash,
-            )
-            return tx_hash
+        return tx_hash
+
+    def resync_nonce(self):
+        """ Fetch the nonce from the node for the next transaction, e.g.
+        after a transaction was dropped from the pool.
+        """
+        with self._nonce_lock:
+            self._available_nonce = None
+
+    def send_signed_transaction(self, transaction: Dict) -> bytes:
+        """ Sign `transaction` with the client's key and send it as is. """
+        signed_txn = self.web3.eth.account.signTransaction(transaction, self.privkey)
+
+        tx_hash = self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
+        log.debug(
+            'send_raw_transaction',
+            account=to_checksum_address(self.sender),
+            nonce=transaction['nonce'],
+            gasLimit=transaction['gas'],
+            gasPrice=transaction['gasPrice'],
+            tx_hash=tx_hash,
+        )
+        return tx_hash
 
     def poll(self, transaction_hash: bytes, confirmations: int = None):
         """ Wait until the `transaction_hash` is applied or rejected.
@@ -476,7 +536,28 @@ class JSONRPCClient:
                 'transaction_hash must be a 32 byte hash',
             )
 
-        transaction_hash = encode_hex(transaction_hash)
+        if self.transactions.is_pending(transaction_hash):
+            receipt = self.transactions.wait(transaction_hash)
+            transaction_block = receipt['blockNumber']
+        else:
+            transaction_block = self._poll_unmanaged(transaction_hash)
+
+        if confirmations:
+            # this will wait for both APPLIED and REVERTED transactions
+            confirmation_block = transaction_block + confirmations
+
+            block_number = self.block_number()
+
+            while block_number < confirmation_block:
+                gevent.sleep(.5)
+                block_number = self.block_number()
+
+    def _poll_unmanaged(self, transaction_hash: bytes) -> int:
+        """ Busy wait for a transaction which is not tracked by the
+        transaction manager, e.g. one that is already mined, returns the
+        transaction's block number.
+        """
+        transaction_hash = encode_hex(self.transactions.mined_hash(transaction_hash))
 
         # used to check if the transaction was removed, this could happen
         # if gas price is too low:
@@ -503,16 +584,11 @@ class JSONRPCClient:
             last_result = transaction
             gevent.sleep(.5)
 
-        if confirmations:
-            # this will wait for both APPLIED and REVERTED transactions
-            transaction_block = transaction['blockNumber']
-            confirmation_block = transaction_block + confirmations
-
-            block_number = self.block_number()
+        # The transaction changed the contract storage, cached calls done in
+        # the same block are now stale.
+        self.call_cache.invalidate()
 
-            while block_number < confirmation_block:
-                gevent.sleep(.5)
-                block_number = self.block_number()
+        return transaction['blockNumber']
 
     def new_filter(
             self,
@@ -94,6 +94,22 @@ class ContractProxy:
 
         return txhash
 
+    def call(self, function_name: str, *args, immutable: bool = False):
+        """ Execute `function_name` with `eth_call`.
+
+        The result is cached by the client's `BlockCallCache`, if `immutable`
+        is True the value is cached for the lifetime of the client, otherwise
+        only until the next block.
+        """
+        fn = getattr(self.contract.functions, function_name)
+        return self.jsonrpc_client.call_cache.get_or_fetch(
+            self.contract.address,
+            function_name,
+            args,
+            lambda: fn(*args).call(),
+            immutable=immutable,
+        )
+
     @staticmethod
     def sanitize_args(abi: Dict, args: List):
         """Prepare inputs to match the ABI"""
@@ -0,0 +1,267 @@
+import math
+
+import structlog
+from cachetools import LRUCache
+from eth_utils import encode_hex
+from gevent.event import AsyncResult
+
+from raiden.settings import DEFAULT_GAS_PRICE_BUMP_PERCENT, DEFAULT_TRANSACTION_RESEND_BLOCKS
+from raiden.utils import typing
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+# Geth and parity reject replacements that don't pay at least 10% more
+MINIMUM_GAS_PRICE_BUMP_PERCENT = 10
+
+
+class PendingTransaction:
+    """ A transaction that was sent but is not mined yet.
+
+    A stuck transaction is replaced by a copy with the same nonce and a higher
+    gas price, any of the sent versions may be mined, so all of their hashes
+    are kept.
+    """
+
+    def __init__(
+            self,
+            transaction: typing.Dict,
+            transaction_hash: bytes,
+            block_number: typing.BlockNumber,
+    ):
+        self.transaction = transaction
+        self.transaction_hashes = [transaction_hash]
+        self.sent_at_block = block_number
+        self.receipt = AsyncResult()
+        # Set once the node knows of one of the versions, a transaction that
+        # is unknown afterwards was dropped from the pool
+        self.seen_in_pool = False
+
+    @property
+    def original_hash(self) -> bytes:
+        return self.transaction_hashes[0]
+
+    @property
+    def nonce(self) -> int:
+        return self.transaction['nonce']
+
+    def __repr__(self):
+        return '<PendingTransaction nonce:{} hashes:{}>'.format(
+            self.nonce,
+            [encode_hex(transaction_hash) for transaction_hash in self.transaction_hashes],
+        )
+
+
+class TransactionManager:
+    """ Tracks the transactions sent by a `JSONRPCClient` until they are mined.
+
+    `on_new_block` must be registered with the `AlarmTask`, it checks the
+    receipts of all the pending transactions once per block, so any number of
+    transactions can be in flight without a polling loop per transaction.
+    Transactions that are not mined after `resend_after_blocks` are resent
+    with the same nonce and a gas price increased by `gas_price_bump_percent`.
+    Transactions dropped from the node's pool fail their waiters.
+
+    Transactions are identified by the hash returned from `send_transaction`,
+    the hash of the version which was mined is available through
+    `mined_hash`.
+    """
+
+    def __init__(
+            self,
+            client,
+            resend_after_blocks: int = DEFAULT_TRANSACTION_RESEND_BLOCKS,
+            gas_price_bump_percent: int = DEFAULT_GAS_PRICE_BUMP_PERCENT,
+    ):
+        if gas_price_bump_percent < MINIMUM_GAS_PRICE_BUMP_PERCENT:
+            raise ValueError(
+                'gas_price_bump_percent must be at least {}'.format(
+                    MINIMUM_GAS_PRICE_BUMP_PERCENT,
+                ),
+            )
+
+        self.client = client
+        self.resend_after_blocks = resend_after_blocks
+        self.gas_price_bump_percent = gas_price_bump_percent
+
+        self.block_number = None
+
+        # Keyed by the original transaction hash
+        self.pending: typing.Dict[bytes, PendingTransaction] = dict()
+        # Maps the hash of every sent version to the original hash
+        self.hash_to_original: typing.Dict[bytes, bytes] = dict()
+        # Maps the original hash to the hash of the mined version, only used
+        # to fetch the receipt after `wait` returns, so it is bounded
+        self.original_to_mined: typing.Dict[bytes, bytes] = LRUCache(maxsize=1024)
+
+    def add(self, transaction_hash: bytes, transaction: typing.Dict):
+        pending = PendingTransaction(transaction, transaction_hash, self.block_number)
+        self.pending[transaction_hash] = pending
+        self.hash_to_original[transaction_hash] = transaction_hash
+
+    def is_pending(self, transaction_hash: bytes) -> bool:
+        original_hash = self.hash_to_original.get(transaction_hash, transaction_hash)
+        return original_hash in self.pending
+
+    def mined_hash(self, transaction_hash: bytes) -> bytes:
+        """ Return the hash of the mined version of `transaction_hash`, or
+        the hash itself if it was not replaced or is unknown.
+        """
+        original_hash = self.hash_to_original.get(transaction_hash, transaction_hash)
+        return self.original_to_mined.get(original_hash, transaction_hash)
+
+    def check(self, pending: PendingTransaction) -> bool:
+        """ Query the receipts of all versions of `pending`, returns True and
+        resolves the waiters if one of them was mined.
+        """
+        for transaction_hash in pending.transaction_hashes:
+            receipt = self.client.web3.eth.getTransactionReceipt(encode_hex(transaction_hash))
+
+            if receipt and receipt['blockNumber'] is not None:
+                self._mined(pending, transaction_hash, receipt)
+                return True
+
+        return False
+
+    def check_dropped(self, pending: PendingTransaction) -> bool:
+        """ Returns True and fails the waiters if the node dropped every
+        version of `pending` from its pool, e.g. because the gas price is too
+        low.
+
+        A transaction may be unknown for a short period of time after it was
+        sent, so it is only considered dropped if it was seen before.
+        """
+        for transaction_hash in pending.transaction_hashes:
+            transaction = self.client.web3.eth.getTransaction(encode_hex(transaction_hash))
+
+            if transaction is not None:
+                pending.seen_in_pool = True
+                return False
+
+        if not pending.seen_in_pool or pending.receipt.ready():
+            return False
+
+        self._forget(pending)
+
+        # The nonce of the dropped transaction is free again
+        self.client.resync_nonce()
+
+        log.error(
+            'transaction dropped',
+            nonce=pending.nonce,
+            tx_hashes=[encode_hex(sent_hash) for sent_hash in pending.transaction_hashes],
+        )
+        pending.receipt.set_exception(Exception('invalid transaction, check gas price'))
+        return True
+
+    def _forget(self, pending: PendingTransaction):
+        self.pending.pop(pending.original_hash, None)
+        for sent_hash in pending.transaction_hashes:
+            self.hash_to_original.pop(sent_hash, None)
+
+    def _mined(self, pending: PendingTransaction, transaction_hash: bytes, receipt):
+        # check may be called concurrently by the watcher and a waiter
+        if pending.receipt.ready():
+            return
+
+        self._forget(pending)
+        self.original_to_mined[pending.original_hash] = transaction_hash
+
+        # The transaction changed the contract storage, cached calls done in
+        # the same block are now stale.
+        self.client.call_cache.invalidate()
+
+        log.debug(
+            'transaction mined',
+            nonce=pending.nonce,
+            tx_hash=encode_hex(transaction_hash),
+            replacements=len(pending.transaction_hashes) - 1,
+            block_number=receipt['blockNumber'],
+        )
+        pending.receipt.set(receipt)
+
+    def replace(self, pending: PendingTransaction):
+        """ Resend `pending` with the same nonce and a higher gas price. """
+        old_gas_price = pending.transaction['gasPrice']
+        bumped_gas_price = math.ceil(old_gas_price * (100 + self.gas_price_bump_percent) / 100)
+
+        replacement = dict(pending.transaction)
+
+        try:
+            replacement['gasPrice'] = max(bumped_gas_price, self.client.gasprice())
+            transaction_hash = self.client.send_signed_transaction(replacement)
+        except ValueError as e:
+            # Most likely the nonce was consumed by one of the previous
+            # versions, which will be found by the next `check`
+            log.warning(
+                'transaction replacement failed',
+                nonce=pending.nonce,
+                error=str(e),
+            )
+            return
+        except Exception as e:
+            # This runs in the alarm task, a connection error with the node
+            # must not stop it, the replacement is retried on the next block
+            log.error(
+                'transaction replacement failed',
+                nonce=pending.nonce,
+                error=str(e),
+            )
+            return
+
+        log.info(
+            'transaction replaced',
+            nonce=pending.nonce,
+            old_gas_price=old_gas_price,
+            new_gas_price=replacement['gasPrice'],
+            tx_hash=encode_hex(transaction_hash),
+        )
+
+        pending.transaction = replacement
+        pending.transaction_hashes.append(transaction_hash)
+        pending.sent_at_block = self.block_number
+        # The node may not know the replacement yet while the replaced
+        # version is already gone
+        pending.seen_in_pool = False
+        self.hash_to_original[transaction_hash] = pending.original_hash
+
+    def on_new_block(self, block_number: typing.BlockNumber, chain_id: int):
+        """ AlarmTask callback, checks the receipts of all pending transactions
+        and replaces the ones which are stuck.
+        """
+        self.block_number = block_number
+
+        for pending in list(self.pending.values()):
+            if pending.receipt.ready() or self.check(pending) or self.check_dropped(pending):
+                continue
+
+            if pending.sent_at_block is None:
+                pending.sent_at_block = block_number
+
+            elif block_number - pending.sent_at_block >= self.resend_after_blocks:
+                self.replace(pending)
+
+    def wait(self, transaction_hash: bytes, poll_interval: float = .5):
+        """ Wait until one of the versions of `transaction_hash` is mined and
+        return its receipt.
+
+        The receipt is normally provided by `on_new_block`, but the waiter
+        checks it as well every `poll_interval` seconds, because the alarm
+        task may be blocked, e.g. when the transaction is sent from one of its
+        callbacks, or there is no alarm task at all.
+
+        Raises:
+            Exception: if the transaction was dropped from the node's pool.
+        """
+        original_hash = self.hash_to_original.get(transaction_hash, transaction_hash)
+        pending = self.pending.get(original_hash)
+
+        if pending is None:
+            raise ValueError('Unknown transaction {}'.format(encode_hex(transaction_hash)))
+
+        while not pending.receipt.ready():
+            pending.receipt.wait(poll_interval)
+
+            if not pending.receipt.ready() and not self.check(pending):
+                self.check_dropped(pending)
+
+        return pending.receipt.get()
@@ -1,2 +1,2 @@
-from raiden.network.transport.matrix import MatrixTransport  # NOQA
-from raiden.network.transport.udp import UDPTransport        # NOQA
+# The transports are imported from their modules, e.g.
+# `raiden.network.transport.matrix`, so a node only loads the one it uses
@@ -529,7 +529,7 @@ class MatrixTransport:
             )
 
     def _receive_message(self, message):
-        self.log.info(
+        self.log.debug(
             'MESSAGE RECEIVED',
             node=pex(self._raiden_service.address),
             message=message,
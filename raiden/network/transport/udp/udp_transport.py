@@ -1,7 +1,6 @@
 import socket
 from binascii import hexlify
 
-import cachetools
 import gevent
 from gevent.event import (
     AsyncResult,
@@ -25,7 +24,6 @@ from raiden.messages import (
     Ping,
     Pong,
 )
-from raiden.settings import CACHE_TTL
 from raiden.utils import pex, typing
 from raiden.utils.notifying_queue import NotifyingQueue
 from raiden.message_handler import on_message
@@ -169,12 +167,9 @@ class UDPTransport:
         # because python integers are immutable)
         self.nodeaddresses_to_nonces = dict()
 
-        cache = cachetools.TTLCache(
-            maxsize=50,
-            ttl=CACHE_TTL,
-        )
-        cache_wrapper = cachetools.cached(cache=cache)
-        self.get_host_port = cache_wrapper(discovery.get)
+        # The discovery keeps the endpoints in memory, a time based cache here
+        # would only serve stale endpoints after a registration.
+        self.get_host_port = discovery.get
 
         self.throttle_policy = throttle_policy
         self.server = DatagramServer(udpsocket, handle=self._receive)
@@ -1,4 +1,5 @@
 import random
+import time
 
 import gevent
 from gevent.event import (
@@ -7,6 +8,7 @@ from gevent.event import (
 )
 
 from raiden.utils import typing
+from raiden.utils.metrics import TRANSPORT_ROUNDTRIP_SECONDS
 # type alias to avoid both circular dependencies and flake8 errors
 UDPTransport = 'UDPTransport'
 
@@ -89,6 +91,7 @@ def retry(
         bool: True if the message was acknowledged, False otherwise.
     """
 
+    start = time.perf_counter()
     async_result = transport.maybe_sendraw_with_result(
         recipient,
         messagedata,
@@ -111,7 +114,11 @@ def retry(
             message_id,
         )
 
-    return async_result.ready()
+    acknowledged = async_result.ready()
+    if acknowledged:
+        TRANSPORT_ROUNDTRIP_SECONDS.observe(time.perf_counter() - start)
+
+    return acknowledged
 
 
 def wait_recovery(event_stop: Event, event_healthy: Event):
@@ -1,7 +1,15 @@
+import random
+
 import structlog
+from eth_utils import encode_hex
 
-from raiden.exceptions import ChannelIncorrectStateError
-from raiden.messages import message_from_sendevent
+from raiden.constants import UINT64_MAX
+from raiden.exceptions import (
+    ChannelIncorrectStateError,
+    InvalidCrossTransactionStatus,
+    UnknownCrossTransaction,
+)
+from raiden.messages import AcceptCross, message_from_sendevent
 from raiden.transfer.architecture import Event
 from raiden.transfer.events import (
     ContractSendSecretReveal,
@@ -13,6 +21,8 @@ from raiden.transfer.events import (
     EventTransferReceivedSuccess,
     EventTransferSentFailed,
     EventTransferSentSuccess,
+    EventCrossSwapUpdated,
+    SendCrossSwapAccept,
     SendDirectTransfer,
     SendProcessed,
     SendCrosstransaction)
@@ -329,6 +339,67 @@ def handle_send_crosstransaction(raiden: RaidenService,
 
 
 
+def handle_send_crossswapaccept(raiden: RaidenService, event: SendCrossSwapAccept):
+    accept_message = AcceptCross(
+        random.randint(0, UINT64_MAX),
+        event.initiator_address,
+        event.target_address,
+        event.cross_id,
+        event.accept,
+    )
+    raiden.sign(accept_message)
+    raiden.transport.send_async(
+        event.recipient,
+        b'123',
+        accept_message,
+    )
+
+
+def handle_crossswapupdated(raiden: RaidenService, event: EventCrossSwapUpdated):
+    """ Keep the row of the swap in the `crosstransaction_events` table, which
+    is a view of the swaps for the REST API, up-to-date.
+
+    The status goes through `change_crosstransaction_status`, so the row can
+    only move forward. The events replayed after a restart may be older than
+    the row, these are ignored.
+    """
+    storage = raiden.wal.storage
+    identifier = event.identifier
+
+    try:
+        storage.get_crosstransaction_by_identifier(identifier)
+    except UnknownCrossTransaction:
+        storage.create_crosstransaction(
+            event.initiator_address,
+            event.target_address,
+            event.token_network_identifier,
+            event.sendETH_amount,
+            event.sendBTC_amount,
+            event.receiveBTC_address,
+            event.status,
+            identifier,
+        )
+    else:
+        try:
+            storage.change_crosstransaction_status(identifier, event.status)
+        except InvalidCrossTransactionStatus:
+            log.debug(
+                'ignoring outdated cross swap update',
+                cross_id=identifier,
+                status=event.status,
+            )
+            return
+
+    if event.secrethash is not None or event.lnd_r_hash is not None:
+        storage.change_crosstransaction_r(
+            identifier,
+            encode_hex(event.secrethash) if event.secrethash else '',
+            event.lnd_r_hash or '',
+        )
+
+    storage.change_crosstransaction_statechangeid(identifier, raiden.wal.state_change_id or 0)
+
+
 def on_raiden_event(raiden: RaidenService, event: Event):
     # pylint: disable=too-many-branches
 
@@ -348,6 +419,10 @@ def on_raiden_event(raiden: RaidenService, event: Event):
         handle_send_processed(raiden, event)
     elif type(event) == SendCrosstransaction:
         handle_send_crosstransaction(raiden,event)
+    elif type(event) == SendCrossSwapAccept:
+        handle_send_crossswapaccept(raiden, event)
+    elif type(event) == EventCrossSwapUpdated:
+        handle_crossswapupdated(raiden, event)
     elif type(event) == EventTransferSentSuccess:
         handle_transfersentsuccess(raiden, event)
     elif type(event) == EventTransferSentFailed:
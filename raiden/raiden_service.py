@@ -2,6 +2,7 @@
 import os
 import random
 import sys
+import time
 from collections import defaultdict
 
 import filelock
@@ -9,9 +10,11 @@ import gevent
 from gevent.event import AsyncResult, Event
 from coincurve import PrivateKey
 import structlog
-from eth_utils import is_binary_address, to_normalized_address, encode_hex
+from eth_utils import is_binary_address, to_normalized_address
 
 from raiden.network.blockchain_service import BlockChainService
+from raiden.network.discovery import ContractDiscovery
+from raiden.network.lnd import InvoicePool, LndClient
 from raiden.network.proxies import (
     SecretRegistry,
     TokenNetworkRegistry,
@@ -22,13 +25,14 @@ from raiden.blockchain.events import BlockchainEvents
 from raiden.raiden_event_handler import on_raiden_event
 from raiden.tasks import AlarmTask
 from raiden.transfer import views, node
-from raiden.transfer.state import RouteState, PaymentNetworkState
+from raiden.transfer.state import CrossSwapState, RouteState, PaymentNetworkState
 from raiden.transfer.mediated_transfer.state import (
     lockedtransfersigned_from_message,
     TransferDescriptionWithSecretState,
 )
 
 from raiden.constants import (
+    CROSS_STATUS_CREATED,
     UINT256_MAX,
     UINT64_MAX,
 )
@@ -40,13 +44,17 @@ from raiden.transfer.state_change import (
     Block,
     ContractReceiveNewPaymentNetwork,
     ActionCrosstransaction,
+    ActionCrossSwapLocked,
+    ActionCrossSwapPaymentFailed,
+    ActionCrossSwapPaymentSent,
+    ActionInitCrossSwap,
 )
 from raiden.transfer.mediated_transfer.state_change import (
     ActionInitInitiator,
     ActionInitMediator,
     ActionInitTarget,
 )
-from raiden.exceptions import InvalidAddress, RaidenShuttingDown
+from raiden.exceptions import InvalidAddress, LndError, RaidenShuttingDown
 from raiden.messages import (LockedTransfer, SignedMessage,Crosstransaction, CrossLockedTransfer, CrossSecretRequest)
 from raiden.connection_manager import ConnectionManager
 from raiden.utils import (
@@ -56,18 +64,19 @@ from raiden.utils import (
     create_default_identifier,
     typing,
     create_default_crossid)
-from raiden.storage import wal, serialize, sqlite
+from raiden.utils.metrics import EVENT_HANDLER_SECONDS
+from raiden.settings import DEFAULT_LND_INVOICE_POOL_SIZE, DEFAULT_STORAGE_BACKEND
+from raiden.storage import wal, serialize
+from raiden.storage.base import open_storage
 from raiden.transfer.mediated_transfer.events import (
     SendLockedTransfer,
 )
 #demo
-import base64, requests, json
 from raiden.messages import message_from_sendevent
 from raiden.transfer.mediated_transfer.events import (
     SendLockedTransfer,
     SendSecretRequest,
 )
-from eth_utils import encode_hex
 
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
@@ -129,7 +138,6 @@ def mediator_init(raiden, transfer: LockedTransfer):
 
 def target_init(transfer: LockedTransfer):
     from_transfer = lockedtransfersigned_from_message(transfer)
-    print(transfer.to_dict())
     from_route = RouteState(
         transfer.sender,
         from_transfer.balance_proof.channel_address,
@@ -141,6 +149,13 @@ def target_init(transfer: LockedTransfer):
     return init_target_statechange
 
 
+def lnd_exception_handler(greenlet):
+    try:
+        greenlet.get()
+    except Exception:  # pylint: disable=broad-except
+        log.exception('Request to the LND node failed.')
+
+
 def endpoint_registry_exception_handler(greenlet):
     try:
         greenlet.get()
@@ -176,6 +191,7 @@ class RaidenService:
 
         self.tokennetworkids_to_connectionmanagers = dict()
         self.identifier_to_results = defaultdict(list)
+        self.state_change_subscriptions = waiting.StateChangeSubscriptions()
 
         self.chain: BlockChainService = chain
         self.default_registry = default_registry
@@ -208,6 +224,15 @@ class RaidenService:
 
         self.wal = None
 
+        # The macaroon is stored in the database, which is only available
+        # after `start`
+        self.lnd = LndClient(config.get('lnd_address'), self._load_lnd_macaroon)
+        self.invoice_pool = InvoicePool(
+            self.lnd,
+            config.get('lnd_invoice_amounts', ()),
+            config.get('lnd_invoice_pool_size', DEFAULT_LND_INVOICE_POOL_SIZE),
+        )
+
         self.database_path = config['database_path']
         if self.database_path != ':memory:':
             database_dir = os.path.dirname(config['database_path'])
@@ -243,7 +268,11 @@ class RaidenService:
             assert self.db_lock.is_locked
 
         # The database may be :memory:
-        storage = sqlite.SQLiteStorage(self.database_path, serialize.PickleSerializer())
+        storage = open_storage(
+            self.database_path,
+            serialize.PickleSerializer(),
+            self.config.get('storage_backend', DEFAULT_STORAGE_BACKEND),
+        )
         self.wal, unapplied_events = wal.restore_from_latest_snapshot(
             node.state_transition,
             storage,
@@ -275,6 +304,12 @@ class RaidenService:
             # installed starting from this position without losing events.
             last_log_block_number = views.block_number(self.wal.state_manager.current_state)
 
+            # Databases written before the swaps were part of the node state
+            # only have them in the crosstransaction_events table
+            chain_state = views.state_from_raiden(self)
+            for state_change in wal.legacy_cross_swaps(self.wal.storage, chain_state):
+                self.handle_state_change(state_change)
+
         # Install the filters using the correct from_block value, otherwise
         # blockchain logs can be lost.
         self.install_all_blockchain_filters(
@@ -283,6 +318,16 @@ class RaidenService:
             last_log_block_number,
         )
 
+        # The endpoint mappings of the discovery start empty and are filled on
+        # demand, only the registrations from now on are needed to keep them
+        # up-to-date.
+        if isinstance(self.discovery, ContractDiscovery):
+            with self.event_poll_lock:
+                self.blockchain_events.add_discovery_listener(
+                    self.discovery.discovery_proxy,
+                    self.get_block_number(),
+                )
+
         # Complete the first_run of the alarm task and synchronize with the
         # blockchain since the last run.
         #
@@ -291,6 +336,13 @@ class RaidenService:
         # otherwise the state changes won't have effect.
         # - The alarm must complete its first run  before the transport is started,
         #  to avoid rejecting messages for unknown channels.
+        #
+        # The rpc call cache is registered first, the events polled by
+        # `_callback_new_block` must not observe values from the previous block.
+        # The transaction manager checks the receipts of all pending
+        # transactions once per block.
+        self.alarm.register_callback(self.chain.client.call_cache.on_new_block)
+        self.alarm.register_callback(self.chain.client.transactions.on_new_block)
         self.alarm.register_callback(self._callback_new_block)
         self.alarm.first_run()
 
@@ -305,6 +357,10 @@ class RaidenService:
         for event in unapplied_events:
             on_raiden_event(self, event)
 
+        # The macaroon is read from the database, so the invoices can only be
+        # provisioned after the WAL is restored
+        self.invoice_pool.provision()
+
         self.start_event.set()
 
     def start_neighbours_healthcheck(self):
@@ -318,6 +374,7 @@ class RaidenService:
         self.stop_event.set()
         self.transport.stop_and_wait()
         self.alarm.stop_async()
+        self.invoice_pool.stop()
 
         wait_for = [self.alarm]
         wait_for.extend(getattr(self.transport, 'greenlets', []))
@@ -356,17 +413,21 @@ class RaidenService:
             block_number = self.get_block_number()
 
         event_list = self.wal.log_and_dispatch(state_change, block_number)
+        self.state_change_subscriptions.notify(state_change, event_list)
 
         for event in event_list:
             log.debug('RAIDEN EVENT', node=pex(self.address), raiden_event=event)
 
+            start = time.perf_counter()
             on_raiden_event(self, event)
+            EVENT_HANDLER_SECONDS.observe(time.perf_counter() - start, type(event).__name__)
 
         return event_list
 
     def set_node_network_state(self, node_address, network_state):
         state_change = ActionChangeNodeNetworkState(node_address, network_state)
-        self.wal.log_and_dispatch(state_change, self.get_block_number())
+        event_list = self.wal.log_and_dispatch(state_change, self.get_block_number())
+        self.state_change_subscriptions.notify(state_change, event_list)
 
     def start_health_check_for(self, node_address):
         self.transport.start_health_check(node_address)
@@ -483,7 +544,16 @@ class RaidenService:
 
     def leave_all_token_networks(self):
         state_change = ActionLeaveAllNetworks()
-        self.wal.log_and_dispatch(state_change, self.get_block_number())
+        event_list = self.wal.log_and_dispatch(state_change, self.get_block_number())
+        self.state_change_subscriptions.notify(state_change, event_list)
+
+        # Every close is sent by its own greenlet, the transactions are
+        # pipelined and mined together instead of waiting for each other.
+        greenlets = [
+            gevent.spawn(on_raiden_event, self, event)
+            for event in event_list
+        ]
+        gevent.joinall(greenlets, raise_error=True)
 
     def close_and_settle(self):
         log.info('raiden will close and settle all channels now')
@@ -612,7 +682,8 @@ class RaidenService:
     def start_crosstransaction(self,token_network_identifier,
             target_address, initiator_address, sendETH_amount, sendBTC_amount, receiveBTC_address,cross_type, identifier):
 
-        identifier = create_default_crossid()
+        if identifier is None:
+            identifier = create_default_crossid()
         async_result = AsyncResult()
         self.identifier_to_results[identifier].append(async_result)
 
@@ -620,9 +691,17 @@ class RaidenService:
         self.transport.start_health_check(target_address)
         cross_id = identifier
         if(cross_type==1):
-            self.wal.create_crosstransactiontry(initiator_address, target_address, token_network_identifier, sendETH_amount, sendBTC_amount, receiveBTC_address,cross_id)
-            print("write data to sqlite")
-            print(self.wal.get_crosstransaction_by_identifier(cross_id))
+            cross_swap = CrossSwapState(
+                cross_id,
+                initiator_address,
+                target_address,
+                token_network_identifier,
+                sendETH_amount,
+                sendBTC_amount,
+                receiveBTC_address,
+                CROSS_STATUS_CREATED,
+            )
+            self.handle_state_change(ActionInitCrossSwap(cross_swap))
         crosstransaction_message = Crosstransaction(random.randint(0, UINT64_MAX),initiator_address,target_address, token_network_identifier, sendETH_amount,sendBTC_amount,receiveBTC_address, cross_type,cross_id,)
         self.sign(crosstransaction_message)
         self.transport.send_async(
@@ -634,62 +713,92 @@ class RaidenService:
 
     # demo
     def start_send_crosstansfer(self, cross_id, identifier=None):
-        cross_data = self.wal.get_crosstransaction_by_identifier(cross_id)
-        print(cross_data)
-        amount = cross_data[4]
-        target = cross_data[2]
-        btc_amount = cross_data[5]
-        token_network_identifier = cross_data[3]
+        cross_swap = views.get_cross_swap(views.state_from_raiden(self), cross_id)
+        amount = cross_swap.sendETH_amount
+        target = cross_swap.target_address
+        btc_amount = cross_swap.sendBTC_amount
+        token_network_identifier = cross_swap.token_network_identifier
 
         self.transport.start_health_check(target)
 
-        secret = random_secret()
+        # Pooled invoices are used without waiting on the LND node, creating
+        # a new one on a pool miss must not block the message handling
+        greenlet = gevent.spawn(
+            self.send_crosstransfer,
+            cross_id,
+            amount,
+            btc_amount,
+            token_network_identifier,
+            target,
+        )
+        greenlet.link_exception(lnd_exception_handler)
+
+    def send_crosstransfer(self, cross_id, amount, btc_amount, token_network_identifier, target):
+        # The lock of the transfer uses the preimage of the invoice, so the
+        # invoice is allocated before the transfer is initialized
+        invoice = self.invoice_pool.allocate(btc_amount)
 
         init_initiator_statechange = initiator_init(
             self,
             cross_id,
             amount,
-            secret,
+            invoice.secret,
             token_network_identifier,
             target,
         )
-        print("init_initiator_statechange: ", init_initiator_statechange)
-        self.handle_cross_state_change(init_initiator_statechange, cross_id, secret, btc_amount)
-
+        self.handle_cross_state_change(
+            init_initiator_statechange,
+            cross_id,
+            invoice.r_hash,
+            invoice.payment_request,
+        )
 
     def get_crosstransaction_by_crossid(self,cross_id):
-        res= self.wal.get_crosstransaction_by_identifier(cross_id)
-        res = list(res)
+        cross_id = int(cross_id)
+        cross_swap = views.get_cross_swap(views.state_from_raiden(self), cross_id)
+
+        # Finished swaps are only kept in the crosstransaction_events table
+        if cross_swap is not None:
+            res = [
+                cross_swap.identifier,
+                cross_swap.initiator_address,
+                cross_swap.target_address,
+                cross_swap.token_network_identifier,
+                cross_swap.sendETH_amount,
+                cross_swap.sendBTC_amount,
+                cross_swap.receiveBTC_address,
+                cross_swap.status,
+            ]
+        else:
+            res = list(self.wal.get_crosstransaction_by_identifier(cross_id))
+
         res[1] = to_normalized_address(res[1])
         res[2] = to_normalized_address(res[2])
         res[3] = to_normalized_address(res[3])
     
         return  res
-    def get_crosstransaction_all(self):
-        res = self.wal.get_all_crosstransaction()
 
-        return  res
+    def handle_cross_state_change(
+            self,
+            state_change,
+            cross_id,
+            lnd_r_hash,
+            lnd_payment_request,
+            block_number=None,
+    ):
+        # The secrethash must be known to the swap before the target can
+        # request the secret
+        self.handle_state_change(ActionCrossSwapLocked(
+            cross_id,
+            state_change.transfer.secrethash,
+            lnd_r_hash,
+        ))
 
-    def handle_cross_state_change(self, state_change, cross_id, secret, btc_amount, block_number=None):
         if block_number is None:
             block_number = self.get_block_number()
 
         event_list = self.wal.log_and_dispatch(state_change, block_number)
-
-        row = self.wal.storage.get_lnd(1)
-        macaroon = row[4]
-        lnd_url = "https://{}/v1/invoices".format(self.config['lnd_address'])
-        lnd_headers = {'Grpc-Metadata-macaroon':macaroon}
-        lnd_r = base64.b64encode(secret)
-        lnd_data = {'value':btc_amount, 'r_preimage':lnd_r.decode('utf-8'), 'type':"CROSS_CHAIN_INVOICE"}
-
-        res = requests.post(lnd_url, headers=lnd_headers, data=json.dumps(lnd_data), verify=False)
-
-        res_json = res.json()
-        lnd_r_hash = res_json['r_hash']
-        lnd_payment_request = res_json['payment_request']
-        print('send invoice succ, lnd_r_hash:', lnd_r_hash)
-
+        self.state_change_subscriptions.notify(state_change, event_list)
 
         for event in event_list:
             log.debug('RAIDEN EVENT', node=pex(self.address), raiden_event=event)
@@ -697,10 +806,6 @@ class RaidenService:
             if type(event) == SendLockedTransfer:
                 locked_transfer_message = message_from_sendevent(event, self.address)
                 self.sign(locked_transfer_message)
-                self.wal.storage.change_crosstransaction_r(cross_id, encode_hex(locked_transfer_message.lock.secrethash), lnd_r_hash)
-                tmp_r_hash = base64.b64decode(lnd_r_hash)
-                raiden_r_hash = locked_transfer_message.lock.secrethash
-                hex_r_hash = encode_hex(tmp_r_hash)
                 lnd_string = bytes(lnd_payment_request, "utf-8")
                 cross_transfer_message = CrossLockedTransfer(locked_transfer_message, cross_id, lnd_string)
                 self.sign(cross_transfer_message)
@@ -721,6 +826,7 @@ class RaidenService:
         block_number = self.get_block_number()
 
         event_list = self.wal.log_and_dispatch(state_change, block_number)
+        self.state_change_subscriptions.notify(state_change, event_list)
 
         for event in event_list:
             log.debug('RAIDEN EVENT', node=pex(self.address), raiden_event=event)
@@ -742,13 +848,32 @@ class RaidenService:
 
         return event_list
 
-    def send_payment_request(self, lnd_string):
-        row = self.wal.storage.get_lnd(1)
-        macaroon = row[4]
-        lnd_url = "https://{}/v1/channels/transactions".format(self.config['lnd_address'])
-        lnd_headers = {'Grpc-Metadata-macaroon':macaroon}
-        data = {'payment_request':lnd_string}
-        res = requests.post(lnd_url, headers=lnd_headers, data=json.dumps(data), verify=False)
-        if res.status_code == 200:
-            print("send payment request to lnd succ")
+    def _load_lnd_macaroon(self):
+        try:
+            return self.wal.storage.get_lnd(1)[4]
+        except IndexError:
+            raise LndError('The LND credentials are not configured')
+
+    def send_payment_request(self, cross_id, lnd_string):
+        """ Pay the LND invoice of a cross transfer in the background, the
+        result of the payment is dispatched to the swap `cross_id`.
+        """
+        greenlet = gevent.spawn(self.pay_cross_invoice, cross_id, lnd_string)
+        greenlet.link_exception(lnd_exception_handler)
+
+    def pay_cross_invoice(self, cross_id, lnd_string):
+        try:
+            self.lnd.send_payment(lnd_string)
+        except LndError as e:
+            log.error(
+                'Paying the LND invoice of the swap failed',
+                node=pex(self.address),
+                cross_id=cross_id,
+                error=str(e),
+            )
+            state_change = ActionCrossSwapPaymentFailed(cross_id, str(e))
+        else:
+            state_change = ActionCrossSwapPaymentSent(cross_id)
+
+        self.handle_state_change(state_change)
     
\ No newline at end of file
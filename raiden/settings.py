@@ -22,6 +22,29 @@ DEFAULT_INITIAL_CHANNEL_TARGET = 3
 DEFAULT_WAIT_FOR_SETTLE = True
 DEFAULT_NUMBER_OF_CONFIRMATIONS_BLOCK = 5
 DEFAULT_CHANNEL_SYNC_TIMEOUT = 5
+DEFAULT_TRANSACTION_RESEND_BLOCKS = 10
+DEFAULT_GAS_PRICE_BUMP_PERCENT = 20
+DEFAULT_CONNECTION_MANAGER_RETRIES = 3
+
+DEFAULT_LND_TIMEOUT = 10
+DEFAULT_LND_RETRIES = 3
+DEFAULT_LND_POOL_SIZE = 10
+DEFAULT_LND_INVOICE_POOL_SIZE = 5
+DEFAULT_LND_INVOICE_EXPIRY = 3600
+
+DEFAULT_API_PAGE_SIZE = 100
+MAX_API_PAGE_SIZE = 1000
+MAX_API_BATCH_SIZE = 500
+DEFAULT_EVENT_FEED_KEEPALIVE = 15
+
+DEFAULT_PROFILER_SAMPLING_INTERVAL = 0.005
+MAX_PROFILE_DURATION = 300
+
+DEFAULT_HUB_MONITOR_INTERVAL = 0.1
+DEFAULT_HUB_BLOCKING_THRESHOLD = 0.1
+
+STORAGE_BACKENDS = ('sqlite', 'appendlog')
+DEFAULT_STORAGE_BACKEND = 'sqlite'
 
 DEFAULT_NAT_KEEPALIVE_RETRIES = 5
 DEFAULT_NAT_KEEPALIVE_TIMEOUT = 5
@@ -0,0 +1,460 @@
+"""
+Storage backend optimized for sequential appends and range scans.
+
+The state changes and the events are appended to a single log file, each
+record is written once and never updated, like the write-ahead-log of LMDB or
+RocksDB. The offsets of the records and the columns used to filter the
+events are kept in memory and rebuilt by a sequential scan of the log when
+it's opened, so a range of state changes or events is read from the log with
+a single read. The snapshot is a file of its own which is atomically
+replaced. The tables which are updated in place, the cross chain swaps and
+the LND connection, are kept in a SQLite database in the same directory.
+
+A record is a header followed by its payload:
+
+    kind (1 byte) | payload length (4) | crc32 (4) | state change id (8) | block number (8)
+
+The state change id and the block number are those of the events, the
+payload of an event starts with the length of its type and identifiers. A
+record which was not completely written before a crash is removed when the
+log is opened.
+"""
+import os
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from array import array
+from typing import Any, Iterable, List, Optional, Tuple
+
+import structlog
+
+from raiden.exceptions import InvalidDBData
+from raiden.storage.base import Storage
+from raiden.storage.sqlite import SQLiteStorage, event_channel
+from raiden.utils import intern_identifier
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+LOG_MAGIC = b'RDNLOG\x00\x01'
+HEADER = struct.Struct('>BIIQQ')
+EVENT_META = struct.Struct('>HBB')
+SNAPSHOT_HEADER = struct.Struct('>QI')
+
+RECORD_STATE_CHANGE = 1
+RECORD_EVENT = 2
+
+
+def checksum(kind, state_change_id, block_number, payload):
+    header = struct.pack('>BIQQ', kind, len(payload), state_change_id, block_number)
+    return zlib.crc32(payload, zlib.crc32(header))
+
+
+def write_file_atomically(path, data):
+    directory = os.path.dirname(path)
+    fd, temporary_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as handler:
+            handler.write(data)
+            handler.flush()
+            os.fsync(handler.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+class AppendLogStorage(Storage):
+    def __init__(self, directory, serializer, fsync=True):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.serializer = serializer
+        self.fsync = fsync
+        self.log_path = os.path.join(directory, 'log')
+        self.snapshot_path = os.path.join(directory, 'snapshot')
+        self.auxiliary = SQLiteStorage(os.path.join(directory, 'auxiliary.db'), serializer)
+
+        # The offsets and lengths of the serialized objects in the log, the
+        # identifier of a state change or an event is its position plus one
+        self.state_change_offsets = array('Q')
+        self.state_change_lengths = array('L')
+        self.event_offsets = array('Q')
+        self.event_lengths = array('L')
+        self.event_block_numbers = array('Q')
+        self.event_types = list()
+        self.event_token_networks = list()
+        self.event_channels = list()
+
+        if not os.path.exists(self.log_path):
+            write_file_atomically(self.log_path, LOG_MAGIC)
+
+        self._load_index()
+
+        self.write_lock = threading.Lock()
+        self.read_lock = threading.Lock()
+        self.writer = open(self.log_path, 'ab')
+        self.reader = open(self.log_path, 'rb')
+
+    def _load_index(self):
+        with open(self.log_path, 'r+b') as handler:
+            if handler.read(len(LOG_MAGIC)) != LOG_MAGIC:
+                raise InvalidDBData('{} is not a raiden log'.format(self.log_path))
+
+            file_size = os.fstat(handler.fileno()).st_size
+            offset = len(LOG_MAGIC)
+
+            while offset < file_size:
+                header = handler.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+
+                kind, length, crc, state_change_id, block_number = HEADER.unpack(header)
+                payload_offset = offset + HEADER.size
+                if payload_offset + length > file_size:
+                    break
+
+                payload = handler.read(length)
+                if crc != checksum(kind, state_change_id, block_number, payload):
+                    if payload_offset + length == file_size:
+                        break
+
+                    raise InvalidDBData(
+                        'The log {} is corrupt at offset {}. '
+                        'Manual user intervention required. Bailing ...'.format(
+                            self.log_path,
+                            offset,
+                        ),
+                    )
+
+                self._index_record(kind, payload_offset, payload, block_number)
+                offset = payload_offset + length
+
+            if offset < file_size:
+                log.warning(
+                    'Removing the incomplete record at the end of the log',
+                    path=self.log_path,
+                    offset=offset,
+                    size=file_size,
+                )
+                handler.truncate(offset)
+
+    def _index_record(self, kind, payload_offset, payload, block_number):
+        if kind == RECORD_STATE_CHANGE:
+            self.state_change_offsets.append(payload_offset)
+            self.state_change_lengths.append(len(payload))
+            return
+
+        type_length, token_network_length, channel_length = EVENT_META.unpack_from(payload)
+        position = EVENT_META.size
+        event_type = payload[position:position + type_length].decode()
+        position += type_length
+        token_network_identifier = payload[position:position + token_network_length] or None
+        position += token_network_length
+        channel_identifier = payload[position:position + channel_length] or None
+        position += channel_length
+
+        self.event_offsets.append(payload_offset + position)
+        self.event_lengths.append(len(payload) - position)
+        self.event_block_numbers.append(block_number)
+        self.event_types.append(sys.intern(event_type))
+        self.event_token_networks.append(intern_identifier(token_network_identifier))
+        self.event_channels.append(intern_identifier(channel_identifier))
+
+    def _append(self, records):
+        """ Append the `(kind, state_change_id, block_number, payload)`
+        records and return the offsets of their payloads.
+        """
+        chunks = list()
+        offsets = list()
+        offset = self.writer.tell()
+
+        for kind, state_change_id, block_number, payload in records:
+            crc = checksum(kind, state_change_id, block_number, payload)
+            chunks.append(HEADER.pack(kind, len(payload), crc, state_change_id, block_number))
+            chunks.append(payload)
+            offsets.append(offset + HEADER.size)
+            offset += HEADER.size + len(payload)
+
+        self.writer.write(b''.join(chunks))
+        self.writer.flush()
+        if self.fsync:
+            os.fsync(self.writer.fileno())
+
+        return offsets
+
+    def sync(self):
+        """ Flush the log to the disk, used when `fsync` is disabled to write
+        in batches.
+        """
+        with self.write_lock:
+            self.writer.flush()
+            os.fsync(self.writer.fileno())
+
+    def _read(self, offsets, lengths, positions):
+        """ Deserialize the objects at `positions`, which are in ascending
+        order, with a single read of the log.
+        """
+        if not positions:
+            return list()
+
+        start = offsets[positions[0]]
+        end = offsets[positions[-1]] + lengths[positions[-1]]
+
+        with self.read_lock:
+            self.reader.seek(start)
+            data = self.reader.read(end - start)
+
+        return [
+            self.serializer.deserialize(
+                data[offsets[position] - start:offsets[position] - start + lengths[position]],
+            )
+            for position in positions
+        ]
+
+    def write_state_change(self, state_change):
+        serialized_data = self.serializer.serialize(state_change)
+
+        with self.write_lock:
+            offset, = self._append([(RECORD_STATE_CHANGE, 0, 0, serialized_data)])
+            self.state_change_offsets.append(offset)
+            self.state_change_lengths.append(len(serialized_data))
+            last_id = len(self.state_change_offsets)
+
+        return last_id
+
+    def write_events(self, state_change_id, block_number, events):
+        records = list()
+        for event in events:
+            event_type = type(event).__name__.encode()
+            token_network_identifier, channel_identifier = event_channel(event)
+            token_network_identifier = token_network_identifier or b''
+            channel_identifier = channel_identifier or b''
+
+            payload = b''.join((
+                EVENT_META.pack(
+                    len(event_type),
+                    len(token_network_identifier),
+                    len(channel_identifier),
+                ),
+                event_type,
+                token_network_identifier,
+                channel_identifier,
+                self.serializer.serialize(event),
+            ))
+            records.append((RECORD_EVENT, state_change_id, block_number, payload))
+
+        if not records:
+            return
+
+        with self.write_lock:
+            if not 0 < state_change_id <= len(self.state_change_offsets):
+                raise ValueError('Unknown state change {}'.format(state_change_id))
+
+            offsets = self._append(records)
+            for offset, (_, _, _, payload) in zip(offsets, records):
+                self._index_record(RECORD_EVENT, offset, payload, block_number)
+
+    def _identifier_range(self, from_identifier, to_identifier, count):
+        if not (from_identifier == 'latest' or isinstance(from_identifier, int)):
+            raise ValueError("from_identifier must be an integer or 'latest'")
+
+        if not (to_identifier == 'latest' or isinstance(to_identifier, int)):
+            raise ValueError("to_identifier must be an integer or 'latest'")
+
+        if from_identifier == 'latest':
+            assert to_identifier is None
+            from_identifier = to_identifier = count
+
+        if to_identifier == 'latest':
+            to_identifier = count
+
+        return range(max(from_identifier, 1) - 1, min(to_identifier, count))
+
+    def get_statechanges_by_identifier(self, from_identifier, to_identifier):
+        positions = self._identifier_range(
+            from_identifier,
+            to_identifier,
+            len(self.state_change_offsets),
+        )
+
+        try:
+            return self._read(self.state_change_offsets, self.state_change_lengths, positions)
+        except AttributeError:
+            raise InvalidDBData(
+                'Your local database is corrupt. Bailing ...',
+            )
+
+    def get_cross_state_change_by_identifier(self, identifier):
+        if not 0 < identifier <= len(self.state_change_offsets):
+            raise IndexError('Unknown state change {}'.format(identifier))
+
+        state_change, = self._read(
+            self.state_change_offsets,
+            self.state_change_lengths,
+            [identifier - 1],
+        )
+        return state_change
+
+    def _read_events(self, positions):
+        events = self._read(self.event_offsets, self.event_lengths, positions)
+        return [
+            (self.event_block_numbers[position], event)
+            for position, event in zip(positions, events)
+        ]
+
+    def get_events_by_identifier(self, from_identifier, to_identifier):
+        positions = self._identifier_range(
+            from_identifier,
+            to_identifier,
+            len(self.event_offsets),
+        )
+        return self._read_events(positions)
+
+    def get_events_by_block(self, from_block, to_block):
+        if not (from_block == 'latest' or isinstance(from_block, int)):
+            raise ValueError("from_block must be an integer or 'latest'")
+
+        if not (to_block == 'latest' or isinstance(to_block, int)):
+            raise ValueError("to_block must be an integer or 'latest'")
+
+        if from_block == 'latest':
+            assert to_block is None
+            from_block = to_block = max(self.event_block_numbers, default=0)
+
+        positions = [
+            position
+            for position, block_number in enumerate(self.event_block_numbers)
+            if block_number >= from_block and (to_block == 'latest' or block_number <= to_block)
+        ]
+        return self._read_events(positions)
+
+    def get_events_page(
+            self,
+            limit: Optional[int] = None,
+            before_identifier: Optional[int] = None,
+            after_identifier: Optional[int] = None,
+            event_types: Optional[Iterable[str]] = None,
+            from_block: Optional[int] = None,
+            to_block=None,
+            token_network_identifier: Optional[bytes] = None,
+            channel_identifier: Optional[bytes] = None,
+    ) -> List[Tuple[int, int, Any]]:
+        first = after_identifier or 0
+        last = len(self.event_offsets)
+        if before_identifier is not None:
+            last = min(last, before_identifier - 1)
+
+        identifiers = range(first + 1, last + 1)
+        if after_identifier is None:
+            identifiers = reversed(identifiers)
+
+        if event_types is not None:
+            event_types = set(event_types)
+        if to_block == 'latest':
+            to_block = None
+
+        positions = list()
+        for identifier in identifiers:
+            position = identifier - 1
+            block_number = self.event_block_numbers[position]
+            matches = (
+                (event_types is None or self.event_types[position] in event_types) and
+                (from_block is None or block_number >= from_block) and
+                (to_block is None or block_number <= to_block) and
+                (
+                    token_network_identifier is None or
+                    self.event_token_networks[position] == token_network_identifier
+                ) and
+                (channel_identifier is None or self.event_channels[position] == channel_identifier)
+            )
+            if matches:
+                positions.append(position)
+                if limit is not None and len(positions) == limit:
+                    break
+
+        # The log is read in ascending order
+        events = self._read_events(sorted(positions))
+        result = [
+            (position + 1, block_number, event)
+            for position, (block_number, event) in zip(sorted(positions), events)
+        ]
+        if after_identifier is None:
+            result.reverse()
+
+        return result
+
+    def write_state_snapshot(self, statechange_id, snapshot):
+        serialized_data = self.serializer.serialize(snapshot)
+        header = SNAPSHOT_HEADER.pack(statechange_id, zlib.crc32(serialized_data))
+
+        with self.write_lock:
+            write_file_atomically(self.snapshot_path, header + serialized_data)
+
+    def get_state_snapshot(self) -> Optional[Tuple[int, Any]]:
+        """ Return the tuple of (last_applied_state_change_id, snapshot) or None"""
+        try:
+            with open(self.snapshot_path, 'rb') as handler:
+                data = handler.read()
+        except FileNotFoundError:
+            return None
+
+        statechange_id, crc = SNAPSHOT_HEADER.unpack_from(data)
+        serialized_data = data[SNAPSHOT_HEADER.size:]
+        if crc != zlib.crc32(serialized_data):
+            raise InvalidDBData('The snapshot {} is corrupt. Bailing ...'.format(
+                self.snapshot_path,
+            ))
+
+        return statechange_id, self.serializer.deserialize(serialized_data)
+
+    def close(self):
+        self.writer.close()
+        self.reader.close()
+        self.auxiliary.conn.close()
+
+    def __del__(self):
+        if hasattr(self, 'writer'):
+            self.writer.close()
+            self.reader.close()
+
+    # The auxiliary tables
+
+    def get_version(self):
+        return self.auxiliary.get_version()
+
+    def create_crosstransaction(self, *args):
+        return self.auxiliary.create_crosstransaction(*args)
+
+    def get_all_crosstransaction(self):
+        return self.auxiliary.get_all_crosstransaction()
+
+    def get_crosstransaction_by_identifier(self, identifier):
+        return self.auxiliary.get_crosstransaction_by_identifier(identifier)
+
+    def get_crosstransactions_by_status(self, status):
+        return self.auxiliary.get_crosstransactions_by_status(status)
+
+    def get_crosstransactions_page(self, *args, **kwargs):
+        return self.auxiliary.get_crosstransactions_page(*args, **kwargs)
+
+    def get_crosstransaction_by_r(self, r):
+        return self.auxiliary.get_crosstransaction_by_r(r)
+
+    def get_crosstransaction_by_hash_r(self, hash_r):
+        return self.auxiliary.get_crosstransaction_by_hash_r(hash_r)
+
+    def change_crosstransaction_status(self, identifier, status):
+        return self.auxiliary.change_crosstransaction_status(identifier, status)
+
+    def change_crosstransaction_statechangeid(self, identifier, state_change_id):
+        return self.auxiliary.change_crosstransaction_statechangeid(identifier, state_change_id)
+
+    def change_crosstransaction_r(self, identifier, hash_r, r):
+        return self.auxiliary.change_crosstransaction_r(identifier, hash_r, r)
+
+    def create_lnd(self, port, identity, address, macaroon):
+        return self.auxiliary.create_lnd(port, identity, address, macaroon)
+
+    def get_lnd(self, identifier):
+        return self.auxiliary.get_lnd(identifier)
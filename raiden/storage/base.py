@@ -0,0 +1,178 @@
+import os
+from typing import Any, Iterable, List, Optional, Tuple
+
+from raiden.exceptions import InvalidDBData
+from raiden.settings import DEFAULT_STORAGE_BACKEND
+
+
+class StateChangeLog:
+    """ The append only log of the state changes and of the events they
+    produced.
+
+    The state changes are identified by consecutive integers, starting at 1,
+    in the order they were written, the events too. The write-ahead-log
+    replays the state changes on top of the latest snapshot.
+    """
+
+    def write_state_change(self, state_change) -> int:
+        """ Append `state_change` and return its identifier. """
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def write_events(self, state_change_id: int, block_number: int, events: List):
+        """ Append the `events` produced by the state change `state_change_id`. """
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def get_statechanges_by_identifier(self, from_identifier, to_identifier) -> List:
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def get_cross_state_change_by_identifier(self, identifier):
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def get_events_by_identifier(self, from_identifier, to_identifier) -> List[Tuple[int, Any]]:
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def get_events_by_block(self, from_block, to_block) -> List[Tuple[int, Any]]:
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def get_events_page(
+            self,
+            limit: Optional[int] = None,
+            before_identifier: Optional[int] = None,
+            after_identifier: Optional[int] = None,
+            event_types: Optional[Iterable[str]] = None,
+            from_block: Optional[int] = None,
+            to_block=None,
+            token_network_identifier: Optional[bytes] = None,
+            channel_identifier: Optional[bytes] = None,
+    ) -> List[Tuple[int, int, Any]]:
+        """ Return up to `limit` events as `(identifier, block_number, event)`,
+        the most recent first and paged with `before_identifier`, or the oldest
+        first and paged with `after_identifier` when it is given.
+
+        See `SQLiteStorage.get_events_page` for the filters.
+        """
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+
+class SnapshotStorage:
+    """ The latest snapshot of the node state. """
+
+    def write_state_snapshot(self, statechange_id: int, snapshot):
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def get_state_snapshot(self) -> Optional[Tuple[int, Any]]:
+        """ Return the tuple of (last_applied_state_change_id, snapshot) or None"""
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+
+class AuxiliaryStorage:
+    """ The tables which are updated in place: the version of the database,
+    the cross chain swaps and the LND connection.
+    """
+
+    def get_version(self) -> int:
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def create_crosstransaction(
+            self,
+            initiator_address,
+            target_address,
+            token_address,
+            sendETH_amount,
+            sendBTC_amount,
+            receiveBTC_address,
+            status,
+            identifier,
+    ):
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def get_all_crosstransaction(self):
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def get_crosstransaction_by_identifier(self, identifier):
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def get_crosstransactions_by_status(self, status):
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def get_crosstransactions_page(
+            self,
+            limit,
+            after_identifier=None,
+            status=None,
+            counterparty=None,
+    ):
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def get_crosstransaction_by_r(self, r):
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def get_crosstransaction_by_hash_r(self, hash_r):
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def change_crosstransaction_status(self, identifier, status):
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def change_crosstransaction_statechangeid(self, identifier, state_change_id):
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def change_crosstransaction_r(self, identifier, hash_r, r):
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def create_lnd(self, port, identity, address, macaroon):
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+    def get_lnd(self, identifier):
+        raise NotImplementedError('Method needs to be implemented in a subclass.')
+
+
+class Storage(StateChangeLog, SnapshotStorage, AuxiliaryStorage):
+    """ The storage of a node, used by the `WriteAheadLog`. """
+
+
+def open_storage(
+        database_path: str,
+        serializer,
+        backend: str = DEFAULT_STORAGE_BACKEND,
+) -> Storage:
+    """ Open the storage `backend` of the node database `database_path`.
+
+    The `sqlite` backend stores everything in the SQLite database
+    `database_path`. The `appendlog` backend stores the log and the snapshot
+    in the directory `database_path` with the `.appendlog` extension instead
+    of its own, see `AppendLogStorage`. A `:memory:` database is always a
+    SQLite database.
+
+    The backends don't read each other's data, so the node refuses to start
+    with one backend while the database of the other one has data.
+    """
+    from raiden.storage.appendlog import LOG_MAGIC, AppendLogStorage
+    from raiden.storage.sqlite import SQLiteStorage
+
+    if database_path == ':memory:':
+        return SQLiteStorage(database_path, serializer)
+
+    directory = '{}.appendlog'.format(os.path.splitext(database_path)[0])
+    has_sqlite_data = os.path.isfile(database_path) and os.path.getsize(database_path) > 0
+    log_path = os.path.join(directory, 'log')
+    has_appendlog_data = os.path.isfile(log_path) and os.path.getsize(log_path) > len(LOG_MAGIC)
+
+    if backend == 'sqlite':
+        if has_appendlog_data:
+            raise InvalidDBData(
+                'The node database {} was written by the appendlog storage backend. '
+                'Start the node with --storage-backend appendlog, or remove it to '
+                'start from an empty sqlite database.'.format(directory),
+            )
+        return SQLiteStorage(database_path, serializer)
+
+    if backend == 'appendlog':
+        if has_sqlite_data:
+            raise InvalidDBData(
+                'The node database {} was written by the sqlite storage backend. '
+                'Start the node with --storage-backend sqlite, or remove it to '
+                'start from an empty appendlog database.'.format(database_path),
+            )
+        return AppendLogStorage(directory, serializer)
+
+    raise ValueError('Unknown storage backend {}'.format(backend))
@@ -1,6 +1,48 @@
+import io
 import pickle
 
 
+def slot_names(cls):
+    return {
+        name
+        for klass in cls.__mro__
+        for name in getattr(klass, '__slots__', ())
+    }
+
+
+class LegacyUnpickler(pickle._Unpickler):  # pylint: disable=protected-access
+    """ Loads the objects pickled before their class changed attributes.
+
+    The objects of a class without `__slots__` are pickled with their
+    `__dict__`, which can't be restored on a class with `__slots__`, and the
+    attributes which were removed from a class can't be set. The attributes
+    the class still has are set one by one, the others are dropped.
+    """
+
+    dispatch = dict(pickle._Unpickler.dispatch)  # pylint: disable=protected-access
+
+    def load_build(self):
+        state = self.stack.pop()
+        inst = self.stack[-1]
+
+        if hasattr(inst, '__setstate__') or hasattr(inst, '__dict__'):
+            self.stack.append(state)
+            super().load_build()
+            return
+
+        slotstate = None
+        if isinstance(state, tuple) and len(state) == 2:
+            state, slotstate = state
+
+        names = slot_names(type(inst))
+        for attributes in (state, slotstate):
+            for name, value in (attributes or dict()).items():
+                if name in names:
+                    setattr(inst, name, value)
+
+    dispatch[pickle.BUILD[0]] = load_build
+
+
 class PickleSerializer:
     @staticmethod
     def serialize(transaction):
@@ -8,4 +50,8 @@ class PickleSerializer:
 
     @staticmethod
     def deserialize(data):
-        return pickle.loads(data)
+        try:
+            return pickle.loads(data)
+        except AttributeError:
+            # Data written by an older version, see LegacyUnpickler
+            return LegacyUnpickler(io.BytesIO(data)).load()
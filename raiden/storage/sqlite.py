@@ -1,22 +1,52 @@
 import sqlite3
 import threading
+from itertools import groupby
+from operator import itemgetter
 
 from eth_utils import to_normalized_address
 
+from raiden.constants import CROSS_STATUS_TRANSITIONS
 from raiden.utils import sha3
-from raiden.exceptions import InvalidDBData
-from raiden.storage.utils import DB_SCRIPT_CREATE_TABLES
+from raiden.exceptions import (
+    InvalidCrossTransactionStatus,
+    InvalidDBData,
+    UnknownCrossTransaction,
+)
+from raiden.storage.base import Storage
+from raiden.storage.utils import DB_CREATE_STATE_EVENTS_INDEXES, DB_SCRIPT_CREATE_TABLES
 from typing import (
     Any,
+    Iterable,
+    List,
     Optional,
     Tuple,
 )
 
 # The latest DB version
-RAIDEN_DB_VERSION = 0
+RAIDEN_DB_VERSION = 1
+
+
+def event_channel(event) -> Tuple[Optional[bytes], Optional[bytes]]:
+    """ Return the token network and channel identifiers of `event`, these
+    are None for events which are not bound to a channel.
+
+    This also works for the state changes which carry a balance proof, a
+    transfer or a token network.
+    """
+    balance_proof = getattr(event, 'balance_proof', None)
+    if balance_proof is None:
+        balance_proof = getattr(getattr(event, 'transfer', None), 'balance_proof', None)
+
+    if balance_proof is not None:
+        return balance_proof.token_network_identifier, balance_proof.channel_address
 
+    return (
+        getattr(event, 'token_network_identifier', None),
+        getattr(event, 'channel_identifier', None),
+    )
 
-class SQLiteStorage:
+
+class SQLiteStorage(Storage):
     def __init__(self, database_path, serializer):
         conn = sqlite3.connect(database_path)
         conn.text_factory = str
@@ -32,8 +62,6 @@ class SQLiteStorage:
                     'Manual user intervention required. Bailing ...'.format(database_path),
                 )
 
-        self._run_updates()
-
         # When writting to a table where the primary key is the identifier and we want
         # to return said identifier we use cursor.lastrowid, which uses sqlite's last_insert_rowid
         # https://github.com/python/cpython/blob/2.7/Modules/_sqlite/cursor.c#L727-L732
@@ -49,10 +77,21 @@ class SQLiteStorage:
         self.write_lock = threading.Lock()
         self.serializer = serializer
 
+        self._run_updates()
+
     def _run_updates(self):
         # TODO: Here add upgrade mechanism depending on the version
         # current_version = self.get_version()
 
+        # Databases of version 0 don't have the indexed columns of the events
+        cursor = self.conn.execute('PRAGMA table_info(state_events)')
+        state_events_columns = {row[1] for row in cursor.fetchall()}
+        if 'event_type' not in state_events_columns:
+            self._upgrade_state_events()
+
+        with self.conn:
+            self.conn.executescript(DB_CREATE_STATE_EVENTS_INDEXES)
+
         # And finally at the end write the latest version in the DB
         cursor = self.conn.cursor()
         cursor.execute(
@@ -61,6 +100,60 @@ class SQLiteStorage:
         )
         self.conn.commit()
 
+    def _upgrade_state_events(self):
+        """ Add the indexed columns to the `state_events` of a version 0
+        database, the existing events are deserialized once to fill them.
+        """
+        with self.write_lock, self.conn:
+            self.conn.execute('ALTER TABLE state_events ADD COLUMN event_type VARCHAR')
+            self.conn.execute(
+                'ALTER TABLE state_events ADD COLUMN token_network_identifier BINARY',
+            )
+            self.conn.execute('ALTER TABLE state_events ADD COLUMN channel_identifier BINARY')
+
+            cursor = self.conn.execute(
+                'SELECT identifier, source_statechange_id, data FROM state_events '
+                'ORDER BY source_statechange_id',
+            )
+            columns = list()
+            for state_change_id, rows in groupby(cursor, key=itemgetter(1)):
+                events = [
+                    (identifier, self.serializer.deserialize(data))
+                    for identifier, _, data in rows
+                ]
+                channels = [event_channel(event) for _, event in events]
+
+                # The payment events of old databases are not bound to a
+                # channel, they are bound to the channel of the other events
+                # of the same state change or else of the state change itself
+                bound_channels = {
+                    channel_ids for channel_ids in channels if channel_ids != (None, None)
+                }
+                if len(bound_channels) == 1:
+                    fallback_channel = bound_channels.pop()
+                elif bound_channels:
+                    fallback_channel = (None, None)
+                else:
+                    state_change_data = self.conn.execute(
+                        'SELECT data FROM state_changes WHERE identifier = ?',
+                        (state_change_id,),
+                    ).fetchone()[0]
+                    state_change = self.serializer.deserialize(state_change_data)
+                    fallback_channel = event_channel(state_change)
+
+                for (identifier, event), channel_ids in zip(events, channels):
+                    if channel_ids == (None, None):
+                        channel_ids = fallback_channel
+
+                    columns.append((type(event).__name__, *channel_ids, identifier))
+
+            self.conn.executemany(
+                'UPDATE state_events SET '
+                '   event_type = ?, token_network_identifier = ?, channel_identifier = ? '
+                'WHERE identifier = ?',
+                columns,
+            )
+
     def get_version(self) -> int:
         cursor = self.conn.cursor()
         query = cursor.execute(
@@ -113,15 +206,23 @@ class SQLiteStorage:
             events: List of Event objects.
         """
         events_data = [
-            (None, state_change_id, block_number, self.serializer.serialize(event))
+            (
+                None,
+                state_change_id,
+                block_number,
+                self.serializer.serialize(event),
+                type(event).__name__,
+                *event_channel(event),
+            )
             for event in events
         ]
 
         with self.write_lock, self.conn:
             self.conn.executemany(
                 'INSERT INTO state_events('
-                '   identifier, source_statechange_id, block_number, data'
-                ') VALUES(?, ?, ?, ?)',
+                '   identifier, source_statechange_id, block_number, data, '
+                '   event_type, token_network_identifier, channel_identifier'
+                ') VALUES(?, ?, ?, ?, ?, ?, ?)',
                 events_data,
             )
 
@@ -250,6 +351,90 @@ class SQLiteStorage:
         ]
         return result
 
+    def get_events_page(
+            self,
+            limit: Optional[int] = None,
+            before_identifier: Optional[int] = None,
+            after_identifier: Optional[int] = None,
+            event_types: Optional[Iterable[str]] = None,
+            from_block: Optional[int] = None,
+            to_block=None,
+            token_network_identifier: Optional[bytes] = None,
+            channel_identifier: Optional[bytes] = None,
+    ) -> List[Tuple[int, int, Any]]:
+        """ Return up to `limit` events as `(identifier, block_number, event)`.
+
+        Without `after_identifier` the most recent events are returned first,
+        the next page is requested with `before_identifier` set to the
+        identifier of the last event of the previous page. With
+        `after_identifier` the oldest events are returned first, the next page
+        is requested with `after_identifier` set to the identifier of the last
+        event of the previous page, this is used to follow the new events.
+
+        The filters are applied by the indexes of `state_events`, only the
+        returned events are deserialized.
+
+        Args:
+            limit: Maximum number of events, all the matching events if None.
+            before_identifier: Only events with a smaller identifier are returned.
+            after_identifier: Only events with a greater identifier are
+                returned, the oldest first.
+            event_types: Names of the event classes to return.
+            from_block: Only events at this block or after.
+            to_block: Only events at this block or before, 'latest' or None
+                for no limit.
+        """
+        conditions = list()
+        params: List[Any] = list()
+
+        if before_identifier is not None:
+            conditions.append('identifier < ?')
+            params.append(before_identifier)
+
+        if after_identifier is not None:
+            conditions.append('identifier > ?')
+            params.append(after_identifier)
+
+        if event_types is not None:
+            event_types = list(event_types)
+            conditions.append('event_type IN ({})'.format(', '.join('?' * len(event_types))))
+            params.extend(event_types)
+
+        if from_block is not None:
+            conditions.append('block_number >= ?')
+            params.append(from_block)
+
+        if to_block is not None and to_block != 'latest':
+            conditions.append('block_number <= ?')
+            params.append(to_block)
+
+        if token_network_identifier is not None:
+            conditions.append('token_network_identifier = ?')
+            params.append(token_network_identifier)
+
+        if channel_identifier is not None:
+            conditions.append('channel_identifier = ?')
+            params.append(channel_identifier)
+
+        query = 'SELECT identifier, block_number, data FROM state_events'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        if after_identifier is not None:
+            query += ' ORDER BY identifier ASC'
+        else:
+            query += ' ORDER BY identifier DESC'
+
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+
+        cursor = self.conn.execute(query, params)
+        result = [
+            (identifier, block_number, self.serializer.deserialize(data))
+            for identifier, block_number, data in cursor
+        ]
+        return result
+
     def __del__(self):
         self.conn.close()
 
@@ -304,64 +489,152 @@ class SQLiteStorage:
         return  res_all
 
 
-    def get_crosstransaction_by_identifier(self,identifier):
+    def get_crosstransaction_by_identifier(self, identifier):
         cursor = self.conn.cursor()
-
         cursor.execute(
             'SELECT * FROM crosstransaction_events WHERE identifier = ?', (identifier,),
         )
 
-        res = cursor.fetchall()[0]
+        row = cursor.fetchone()
+        if row is None:
+            raise UnknownCrossTransaction('Unknown cross transaction {}'.format(identifier))
 
+        return row
 
+    def get_crosstransactions_by_status(self, status):
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'SELECT * FROM crosstransaction_events WHERE status = ?', (status,),
+        )
+        return cursor.fetchall()
 
-        return res
+    def get_crosstransactions_page(
+            self,
+            limit,
+            after_identifier=None,
+            status=None,
+            counterparty=None,
+    ):
+        """ Return up to `limit` swaps ordered by identifier.
 
+        This is a keyset pagination, the next page starts after the identifier
+        of the last swap of the previous page, so every page is an indexed
+        range scan, regardless of how deep it is.
 
-    def change_crosstransaction_status(self,identifier,status):
+        Args:
+            after_identifier: Only swaps with a greater identifier are returned.
+            status: Only swaps with this status are returned.
+            counterparty: Only swaps with this initiator or target address are
+                returned.
+        """
+        conditions = list()
+        params = list()
 
-        entry = self.get_crosstransaction_by_identifier(identifier)
+        if after_identifier is not None:
+            conditions.append('identifier > ?')
+            params.append(after_identifier)
 
-        with self.write_lock, self.conn:
-            self.conn.execute(
-                'INSERT OR REPLACE INTO crosstransaction_events('
-                '    identifier,initiator_address, target_address, token_address, sendETH_amount, sendBTC_amount, receiveBTC_address, status, state_change_id, hash_r,r'
-                ') VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
-                (identifier, entry[1], entry[2], entry[3], entry[4], entry[5], entry[6], status, entry[8], entry[9], entry[10]),
-            )
+        if status is not None:
+            conditions.append('status = ?')
+            params.append(status)
+
+        if counterparty is not None:
+            conditions.append('(initiator_address = ? OR target_address = ?)')
+            params.extend((counterparty, counterparty))
 
+        query = 'SELECT * FROM crosstransaction_events'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY identifier LIMIT ?'
+        params.append(limit)
 
-    def get_crosstransaction_by_r(self, hash_r):
         cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        return cursor.fetchall()
 
+    def get_crosstransaction_by_r(self, r):
+        """ Return the swap with the LND payment hash `r`, this is used by the
+        LND invoice callback.
+        """
+        cursor = self.conn.cursor()
         cursor.execute(
-            'SELECT * FROM crosstransaction_events WHERE r = ?', (hash_r,),
+            'SELECT * FROM crosstransaction_events WHERE r = ?', (r,),
         )
 
-        res = cursor.fetchall()[0]
-        return res
+        row = cursor.fetchone()
+        if row is None:
+            raise UnknownCrossTransaction('Unknown cross transaction with r {}'.format(r))
 
+        return row
+
+    def get_crosstransaction_by_hash_r(self, hash_r):
+        """ Return the swap with the raiden secrethash `hash_r`. """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'SELECT * FROM crosstransaction_events WHERE hash_r = ?', (hash_r,),
+        )
 
-    def change_crosstransaction_statechangeid(self,identifier,id):
+        row = cursor.fetchone()
+        if row is None:
+            raise UnknownCrossTransaction(
+                'Unknown cross transaction with hash_r {}'.format(hash_r),
+            )
 
-        entry = self.get_crosstransaction_by_identifier(identifier)
+        return row
 
+    def _update_crosstransaction(self, identifier, query, params):
+        """ Execute the single row UPDATE `query`, raises if `identifier` is
+        unknown.
+        """
         with self.write_lock, self.conn:
-            self.conn.execute(
-                'INSERT OR REPLACE INTO crosstransaction_events('
-                '    identifier,initiator_address, target_address, token_address, sendETH_amount, sendBTC_amount, receiveBTC_address, status, state_change_id, hash_r,r'
-                ') VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
-                (identifier, entry[1], entry[2], entry[3], entry[4], entry[5], entry[6], entry[7], id, entry[9], entry[10]),
-            )
+            cursor = self.conn.execute(query, params)
+
+        if cursor.rowcount == 0:
+            raise UnknownCrossTransaction('Unknown cross transaction {}'.format(identifier))
 
-    def change_crosstransaction_r(self,identifier,r_hash, r):
+    def change_crosstransaction_status(self, identifier, status):
+        """ Change the status of the swap, the transition is checked against
+        `CROSS_STATUS_TRANSITIONS` in the same statement.
 
-        entry = self.get_crosstransaction_by_identifier(identifier)
+        Raises:
+            UnknownCrossTransaction: If there is no swap with `identifier`.
+            InvalidCrossTransactionStatus: If the swap can not change from its
+                current status to `status`.
+        """
+        allowed_from = [status] + [
+            from_status
+            for from_status, to_statuses in CROSS_STATUS_TRANSITIONS.items()
+            if status in to_statuses
+        ]
+        placeholders = ', '.join('?' * len(allowed_from))
 
         with self.write_lock, self.conn:
-            self.conn.execute(
-                'INSERT OR REPLACE INTO crosstransaction_events('
-                '    identifier,initiator_address, target_address, token_address, sendETH_amount, sendBTC_amount, receiveBTC_address, status, state_change_id, hash_r,r'
-                ') VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
-                (identifier, entry[1], entry[2], entry[3], entry[4], entry[5], entry[6], entry[7], entry[8], r_hash, r),
+            cursor = self.conn.execute(
+                'UPDATE crosstransaction_events SET status = ? '
+                'WHERE identifier = ? AND status IN ({})'.format(placeholders),
+                (status, identifier, *allowed_from),
+            )
+
+        if cursor.rowcount == 0:
+            current_status = self.get_crosstransaction_by_identifier(identifier)[7]
+            raise InvalidCrossTransactionStatus(
+                'Cross transaction {} can not change from status {} to {}'.format(
+                    identifier,
+                    current_status,
+                    status,
+                ),
             )
+
+    def change_crosstransaction_statechangeid(self, identifier, state_change_id):
+        self._update_crosstransaction(
+            identifier,
+            'UPDATE crosstransaction_events SET state_change_id = ? WHERE identifier = ?',
+            (state_change_id, identifier),
+        )
+
+    def change_crosstransaction_r(self, identifier, hash_r, r):
+        self._update_crosstransaction(
+            identifier,
+            'UPDATE crosstransaction_events SET hash_r = ?, r = ? WHERE identifier = ?',
+            (hash_r, r, identifier),
+        )
@@ -27,10 +27,22 @@ CREATE TABLE IF NOT EXISTS state_events (
     source_statechange_id INTEGER NOT NULL,
     block_number INTEGER NOT NULL,
     data BINARY,
+    event_type VARCHAR,
+    token_network_identifier BINARY,
+    channel_identifier BINARY,
     FOREIGN KEY(source_statechange_id) REFERENCES state_changes(identifier)
 );
 '''
 
+# The indexes are not part of DB_SCRIPT_CREATE_TABLES because the columns are
+# added to existing databases by the upgrade in SQLiteStorage._run_updates
+DB_CREATE_STATE_EVENTS_INDEXES = '''
+CREATE INDEX IF NOT EXISTS state_events_block_number ON state_events(block_number);
+CREATE INDEX IF NOT EXISTS state_events_event_type ON state_events(event_type, identifier);
+CREATE INDEX IF NOT EXISTS state_events_channel
+    ON state_events(token_network_identifier, channel_identifier, identifier);
+'''
+
 DB_CREATE_CROSSTRANSACTION_EVENTS = '''
 CREATE TABLE IF NOT EXISTS crosstransaction_events (
     identifier INTEGER PRIMARY KEY, 
@@ -47,6 +59,16 @@ CREATE TABLE IF NOT EXISTS crosstransaction_events (
 );
 '''
 
+DB_CREATE_CROSSTRANSACTION_INDEXES = '''
+CREATE INDEX IF NOT EXISTS crosstransaction_events_r ON crosstransaction_events(r);
+CREATE INDEX IF NOT EXISTS crosstransaction_events_hash_r ON crosstransaction_events(hash_r);
+CREATE INDEX IF NOT EXISTS crosstransaction_events_status ON crosstransaction_events(status);
+CREATE INDEX IF NOT EXISTS crosstransaction_events_initiator
+    ON crosstransaction_events(initiator_address);
+CREATE INDEX IF NOT EXISTS crosstransaction_events_target
+    ON crosstransaction_events(target_address);
+'''
+
 DB_CREATE_LND = '''
 CREATE TABLE IF NOT EXISTS lnd (
     identifier INTEGER PRIMARY KEY,
@@ -60,7 +82,7 @@ CREATE TABLE IF NOT EXISTS lnd (
 DB_SCRIPT_CREATE_TABLES = """
 PRAGMA foreign_keys=off;
 BEGIN TRANSACTION;
-{}{}{}{}{}{}
+{}{}{}{}{}{}{}
 COMMIT;
 PRAGMA foreign_keys=on;
 """.format(
@@ -69,5 +91,6 @@ PRAGMA foreign_keys=on;
     DB_CREATE_SNAPSHOT,
     DB_CREATE_STATE_EVENTS,
     DB_CREATE_CROSSTRANSACTION_EVENTS,
+    DB_CREATE_CROSSTRANSACTION_INDEXES,
     DB_CREATE_LND,
 )
@@ -1,4 +1,18 @@
+import time
+
+from eth_utils import decode_hex
+
+from raiden.constants import (
+    CROSS_STATUS_CREATED,
+    CROSS_STATUS_FINISHED,
+    CROSS_STATUS_SECRET_REQUESTED,
+    CROSS_STATUS_TRANSITIONS,
+)
+from raiden.transfer import views
 from raiden.transfer.architecture import StateManager
+from raiden.transfer.state import CrossSwapState
+from raiden.transfer.state_change import ActionRestoreCrossSwap
+from raiden.utils.metrics import STATE_CHANGE_DISPATCH_SECONDS, STORAGE_WRITE_SECONDS
 
 
 def restore_from_latest_snapshot(transition_function, storage):
@@ -7,16 +21,13 @@ def restore_from_latest_snapshot(transition_function, storage):
 
     if snapshot:
         last_applied_state_change_id, state = snapshot
-        unapplied_state_changes = storage.get_statechanges_by_identifier(
-            from_identifier=last_applied_state_change_id,
-            to_identifier='latest',
-        )
     else:
-        state = None
-        unapplied_state_changes = storage.get_statechanges_by_identifier(
-            from_identifier=0,
-            to_identifier='latest',
-        )
+        last_applied_state_change_id, state = 0, None
+
+    unapplied_state_changes = storage.get_statechanges_by_identifier(
+        from_identifier=last_applied_state_change_id,
+        to_identifier='latest',
+    )
 
     state_manager = StateManager(transition_function, state)
     wal = WriteAheadLog(state_manager, storage)
@@ -24,9 +35,51 @@ def restore_from_latest_snapshot(transition_function, storage):
     for state_change in unapplied_state_changes:
         events.extend(state_manager.dispatch(state_change))
 
+    # The state changes are replayed from `last_applied_state_change_id` on,
+    # inclusive, and their identifiers are consecutive
+    if unapplied_state_changes:
+        first_identifier = max(last_applied_state_change_id, 1)
+        wal.state_change_id = first_identifier + len(unapplied_state_changes) - 1
+    elif snapshot:
+        wal.state_change_id = last_applied_state_change_id
+
     return wal, events
 
 
+def legacy_cross_swaps(storage, chain_state):
+    """ Return the `ActionRestoreCrossSwap` state changes of the swaps in
+    flight in the `crosstransaction_events` table which are not in
+    `chain_state`.
+
+    Databases written before the swaps were part of the node state only have
+    them in the table. The pending secret request of the initiator was
+    written to the `state_changes` table, its identifier is in the
+    `state_change_id` column.
+    """
+    state_changes = list()
+
+    for status in CROSS_STATUS_TRANSITIONS:
+        if status in CROSS_STATUS_FINISHED:
+            continue
+
+        for row in storage.get_crosstransactions_by_status(status):
+            identifier, state_change_id, hash_r, r = row[0], row[8], row[9], row[10]
+            if views.get_cross_swap(chain_state, identifier) is not None:
+                continue
+
+            cross_swap = CrossSwapState(*row[:8])
+            cross_swap.secrethash = decode_hex(hash_r) if hash_r else None
+            cross_swap.lnd_r_hash = r or None
+            if status == CROSS_STATUS_SECRET_REQUESTED and state_change_id:
+                cross_swap.secret_request = storage.get_cross_state_change_by_identifier(
+                    state_change_id,
+                )
+
+            state_changes.append(ActionRestoreCrossSwap(cross_swap))
+
+    return state_changes
+
+
 class WriteAheadLog:
     @property
     def version(self):
@@ -46,12 +99,23 @@ class WriteAheadLog:
 
         Events produced by applying state change are also saved.
         """
+        start = time.perf_counter()
         state_change_id = self.storage.write_state_change(state_change)
+        dispatch_start = time.perf_counter()
 
         events = self.state_manager.dispatch(state_change)
 
+        events_start = time.perf_counter()
         self.state_change_id = state_change_id
         self.storage.write_events(state_change_id, block_number, events)
+        end = time.perf_counter()
+
+        STORAGE_WRITE_SECONDS.observe(dispatch_start - start, 'state_change')
+        STATE_CHANGE_DISPATCH_SECONDS.observe(
+            events_start - dispatch_start,
+            type(state_change).__name__,
+        )
+        STORAGE_WRITE_SECONDS.observe(end - events_start, 'events')
 
         return events
 
@@ -66,40 +130,46 @@ class WriteAheadLog:
 
         # otherwise no state change was dispatched
         if state_change_id:
+            start = time.perf_counter()
             self.storage.write_state_snapshot(state_change_id, current_state)
-
-    def create_crosstransactiontry(self,initiator_address, target_address, token_address, sendETH_amount, sendBTC_amount, receiveBTC_address,identifier):
-        res = self.storage.create_crosstransaction(initiator_address, target_address, token_address, sendETH_amount, sendBTC_amount, receiveBTC_address, 1,identifier)
+            STORAGE_WRITE_SECONDS.observe(time.perf_counter() - start, 'snapshot')
+
+    def create_crosstransactiontry(
+            self,
+            initiator_address,
+            target_address,
+            token_address,
+            sendETH_amount,
+            sendBTC_amount,
+            receiveBTC_address,
+            identifier,
+    ):
+        res = self.storage.create_crosstransaction(
+            initiator_address,
+            target_address,
+            token_address,
+            sendETH_amount,
+            sendBTC_amount,
+            receiveBTC_address,
+            CROSS_STATUS_CREATED,
+            identifier,
+        )
 
         return res
 
     def get_all_crosstransaction(self):
-        """ Snapshot the application state.
-
-        Snapshots are used to restore the application state, either after a
-        restart or a crash.
-        """
+        """ Return all the cross chain swaps. """
         transactions = self.storage.get_all_crosstransaction()
         return transactions
 
-    def get_crosstransaction_by_identifier(self,identifier):
-        """ Snapshot the application state.
-
-        Snapshots are used to restore the application state, either after a
-        restart or a crash.
-        """
+    def get_crosstransaction_by_identifier(self, identifier):
+        """ Return the cross chain swap with the given identifier. """
         transactions = self.storage.get_crosstransaction_by_identifier(identifier)
         return transactions
 
-    def change_crosstransaction_status(self,identifier,status):
-        """ Snapshot the application state.
-
-        Snapshots are used to restore the application state, either after a
-        restart or a crash.
+    def change_crosstransaction_status(self, identifier, status):
+        """ Change the status of a cross chain swap, see
+        `SQLiteStorage.change_crosstransaction_status`.
         """
-        transactions = self.storage.change_crosstransaction_status(identifier,status)
+        transactions = self.storage.change_crosstransaction_status(identifier, status)
         return transactions
-
-    @property
-    def version(self):
-        return self.storage.get_version()
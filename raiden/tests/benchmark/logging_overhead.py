@@ -0,0 +1,146 @@
+"""
+Benchmark of the logging overhead per transfer.
+
+The transfers benchmark is run once for every logging mode, with the same
+seed, and the time per transfer is compared with the `disabled` mode, where
+no record is emitted. The log files are written to a temporary directory, use
+`--directory` to benchmark a specific disk. The results are written as JSON:
+
+    python -m raiden.tests.benchmark.logging_overhead --nodes 5 --transfers 200
+"""
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from raiden.log_config import configure_logging
+from raiden.tests.benchmark.state_machine import git_commit
+from raiden.tests.benchmark.transfers import run_benchmark
+
+# Arguments of `configure_logging` for every mode, the log files are added
+# by `run_mode`
+LOGGING_MODES = {
+    'disabled': dict(logger_level_config={'': 'CRITICAL'}, disable_debug_logfile=True),
+    'info': dict(logger_level_config={'': 'INFO'}, disable_debug_logfile=True),
+    'info-debug-logfile': dict(logger_level_config={'': 'INFO'}),
+    'info-debug-logfile-async': dict(logger_level_config={'': 'INFO'}, log_async=True),
+    'debug': dict(logger_level_config={'': 'DEBUG'}, disable_debug_logfile=True),
+    'debug-async': dict(
+        logger_level_config={'': 'DEBUG'},
+        disable_debug_logfile=True,
+        log_async=True,
+    ),
+}
+
+
+def run_mode(mode, directory, benchmark_arguments):
+    log_file = os.path.join(directory, '{}.log'.format(mode))
+    debug_log_file = os.path.join(directory, '{}-debug.log'.format(mode))
+
+    configure_logging(
+        colorize=False,
+        log_file=log_file,
+        debug_log_file_name=debug_log_file,
+        **LOGGING_MODES[mode],
+    )
+
+    result = run_benchmark(**benchmark_arguments)
+
+    # The records still queued by the asynchronous handlers
+    start = time.perf_counter()
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+    flush_seconds = time.perf_counter() - start
+
+    log_bytes = sum(
+        os.path.getsize(path)
+        for path in (log_file, debug_log_file)
+        if os.path.exists(path)
+    )
+    completed = result['completed_transfers']
+
+    return {
+        'completed_transfers': completed,
+        'failed_transfers': result['failed_transfers'],
+        'transfers_per_second': result['transfers_per_second'],
+        'transfer_mean_us': result['transfers']['mean_us'] if completed else None,
+        'flush_seconds': flush_seconds,
+        'log_bytes_per_transfer': log_bytes / completed if completed else None,
+    }
+
+
+def run_logging_benchmark(modes=tuple(LOGGING_MODES), directory=None, **benchmark_arguments):
+    if 'disabled' not in modes:
+        modes = ('disabled',) + tuple(modes)
+
+    results = dict()
+    with tempfile.TemporaryDirectory(dir=directory) as log_directory:
+        try:
+            for mode in modes:
+                results[mode] = run_mode(mode, log_directory, benchmark_arguments)
+        finally:
+            # Closes the log files before the directory is removed
+            configure_logging(
+                {'': 'CRITICAL'},
+                colorize=False,
+                log_file=os.devnull,
+                disable_debug_logfile=True,
+            )
+
+    baseline = results['disabled']['transfers_per_second']
+    for result in results.values():
+        transfers_per_second = result['transfers_per_second']
+        if baseline and transfers_per_second:
+            overhead = 1 / transfers_per_second - 1 / baseline
+            result['overhead_per_transfer_us'] = overhead * 10 ** 6
+        else:
+            result['overhead_per_transfer_us'] = None
+
+    return {
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'parameters': benchmark_arguments,
+        'modes': results,
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', default=0, type=int)
+    parser.add_argument('--nodes', default=5, type=int)
+    parser.add_argument('--topology', default='line')
+    parser.add_argument('--transfers', default=100, type=int)
+    parser.add_argument('--concurrency', default=10, type=int)
+    parser.add_argument(
+        '--mode',
+        action='append',
+        choices=sorted(LOGGING_MODES),
+        help='Logging mode to benchmark, can be given multiple times. Defaults to all.',
+    )
+    parser.add_argument('--directory', help='Where the log files are written.')
+    parser.add_argument('--output', help='Write the results to this file instead of stdout.')
+    args = parser.parse_args()
+
+    result = run_logging_benchmark(
+        modes=args.mode or tuple(LOGGING_MODES),
+        directory=args.directory,
+        seed=args.seed,
+        nodes=args.nodes,
+        topology=args.topology,
+        transfers=args.transfers,
+        concurrency=args.concurrency,
+    )
+
+    if args.output:
+        with open(args.output, 'w') as handler:
+            json.dump(result, handler, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(result, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
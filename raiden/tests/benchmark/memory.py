@@ -0,0 +1,157 @@
+"""
+Benchmark of the memory used by the node state.
+
+A synthetic ChainState is built like in the state machine benchmark and a
+number of payments are replayed through it, so the channels hold balance
+proofs decoded from the messages of the partners. The state is then pickled,
+as in a snapshot, and the memory allocated to unpickle it is measured with
+tracemalloc. This is the memory of the state once the node restarted, the
+objects shared in the state stay shared after the unpickle.
+
+The bytes per channel are the difference between a state with twice the
+channels and the base state, the bytes per pending lock and queued message
+are measured the same way. The results are written as JSON, e.g.:
+
+    python -m raiden.tests.benchmark.memory --channels 200 --pending-locks 5
+"""
+import gc
+import json
+import pickle
+import sys
+import tracemalloc
+
+from raiden.tests.benchmark.state_machine import ROLES, build_chain_state, git_commit, replay
+
+
+def state_size(chain_state):
+    """ Return the bytes allocated to unpickle `chain_state` and the size of
+    the pickle.
+    """
+    data = pickle.dumps(chain_state, 4)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        restored = pickle.loads(data)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del restored
+    return after - before, len(data)
+
+
+def measure(seed, channels, pending_locks, queued_messages, payments):
+    chain_state, network = build_chain_state(
+        seed,
+        tokens=1,
+        channels=channels,
+        pending_locks=pending_locks,
+        queued_messages=queued_messages,
+    )
+
+    if payments:
+        chain_state, _, _ = replay(
+            chain_state,
+            network,
+            seed,
+            payments,
+            mix={role: 1 for role in ROLES},
+            concurrency=10,
+            block_interval=50,
+            use_state_manager=False,
+        )
+
+    return state_size(chain_state)
+
+
+def run_benchmark(seed=0, channels=100, pending_locks=5, queued_messages=100, payments=200):
+    if channels < 2:
+        raise ValueError('mediated payments need at least two channels')
+
+    base_memory, base_snapshot = measure(seed, channels, 0, 0, payments)
+    channels_memory, channels_snapshot = measure(seed, 2 * channels, 0, 0, payments)
+    locks_memory, locks_snapshot = measure(seed, channels, pending_locks, 0, payments)
+    queue_memory, queue_snapshot = measure(seed, channels, 0, queued_messages, payments)
+
+    def per_item(total, base, items):
+        return (total - base) / items if items else None
+
+    return {
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'parameters': {
+            'seed': seed,
+            'channels': channels,
+            'pending_locks': pending_locks,
+            'queued_messages': queued_messages,
+            'payments': payments,
+        },
+        'state_bytes': base_memory,
+        'bytes_per_channel': per_item(channels_memory, base_memory, channels),
+        'bytes_per_pending_lock': per_item(
+            locks_memory,
+            base_memory,
+            channels * pending_locks,
+        ),
+        'bytes_per_queued_message': per_item(queue_memory, base_memory, queued_messages),
+        'snapshot_bytes': base_snapshot,
+        'snapshot_bytes_per_channel': per_item(channels_snapshot, base_snapshot, channels),
+        'snapshot_bytes_per_pending_lock': per_item(
+            locks_snapshot,
+            base_snapshot,
+            channels * pending_locks,
+        ),
+        'snapshot_bytes_per_queued_message': per_item(
+            queue_snapshot,
+            base_snapshot,
+            queued_messages,
+        ),
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', default=0, type=int)
+    parser.add_argument('--channels', default=100, type=int)
+    parser.add_argument(
+        '--pending-locks',
+        default=5,
+        type=int,
+        help='Locks sent by this node and pending on every channel.',
+    )
+    parser.add_argument(
+        '--queued-messages',
+        default=100,
+        type=int,
+        help='Messages waiting to be acknowledged by the partners.',
+    )
+    parser.add_argument(
+        '--payments',
+        default=200,
+        type=int,
+        help='Payments replayed before the state is measured.',
+    )
+    parser.add_argument('--output', help='Write the results to this file instead of stdout.')
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        seed=args.seed,
+        channels=args.channels,
+        pending_locks=args.pending_locks,
+        queued_messages=args.queued_messages,
+        payments=args.payments,
+    )
+
+    if args.output:
+        with open(args.output, 'w') as handler:
+            json.dump(result, handler, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(result, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark of the startup time of the `raiden` command.
+
+Every command is run a number of times in a new interpreter and the wall
+time is measured, `import` only imports the CLI module. The modules which are
+only needed by a running node must not be imported by the CLI module, the
+ones which were imported are listed under `deferred_modules_loaded`. The
+benchmark fails if one of them was imported or if the import of the CLI took
+longer than the budget, e.g.:
+
+    python -m raiden.tests.benchmark.startup --repeat 10 --budget 0.5
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import raiden
+from raiden.tests.benchmark.state_machine import git_commit
+
+# Seconds the import of the CLI module may take
+IMPORT_TIME_BUDGET = 1.0
+
+STARTUP_COMMANDS = {
+    'import': ['-c', 'import gevent.monkey; gevent.monkey.patch_all(); import raiden.ui.cli'],
+    'help': ['-m', 'raiden', '--help'],
+    'version': ['-m', 'raiden', 'version', '--short'],
+}
+
+# Imported on demand by the commands which start a node
+DEFERRED_MODULES = (
+    'flask',
+    'matrix_client',
+    'networkx',
+    'requests',
+    'web3',
+    'raiden.api.rest',
+    'raiden.app',
+    'raiden.network.sockfactory',
+    'raiden.network.transport.matrix',
+    'raiden.network.transport.udp',
+    'raiden.raiden_service',
+    'raiden.ui.console',
+    'raiden.ui.web',
+    'raiden_contracts.contract_manager',
+)
+
+LIST_LOADED_MODULES = '''
+import json, sys
+import gevent.monkey
+gevent.monkey.patch_all()
+import raiden.ui.cli
+print(json.dumps([module for module in {modules!r} if module in sys.modules]))
+'''
+
+
+def run_python(arguments):
+    # The package is imported from the tree being benchmarked, click refuses
+    # to run with an ASCII locale
+    environment = dict(os.environ, LC_ALL='C.UTF-8', LANG='C.UTF-8')
+    return subprocess.run(
+        [sys.executable] + arguments,
+        cwd=os.path.dirname(os.path.dirname(raiden.__file__)),
+        env=environment,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+
+
+def command_time(arguments, repeat):
+    durations = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_python(arguments)
+        durations.append(time.perf_counter() - start)
+
+    return {
+        'min_seconds': min(durations),
+        'median_seconds': statistics.median(durations),
+    }
+
+
+def deferred_modules_loaded(modules=DEFERRED_MODULES):
+    process = run_python(['-c', LIST_LOADED_MODULES.format(modules=tuple(modules))])
+    return json.loads(process.stdout.decode())
+
+
+def run_benchmark(commands=tuple(STARTUP_COMMANDS), repeat=5, budget=IMPORT_TIME_BUDGET):
+    results = {
+        command: command_time(STARTUP_COMMANDS[command], repeat)
+        for command in commands
+    }
+    loaded = deferred_modules_loaded()
+
+    within_budget = None
+    if 'import' in results:
+        within_budget = results['import']['min_seconds'] <= budget
+
+    return {
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'parameters': {
+            'repeat': repeat,
+            'budget': budget,
+        },
+        'commands': results,
+        'deferred_modules_loaded': loaded,
+        'within_budget': within_budget,
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', default=5, type=int)
+    parser.add_argument(
+        '--budget',
+        default=IMPORT_TIME_BUDGET,
+        type=float,
+        help='Seconds the import of the CLI module may take.',
+    )
+    parser.add_argument(
+        '--command',
+        action='append',
+        choices=sorted(STARTUP_COMMANDS),
+        help='Command to benchmark, can be given multiple times. Defaults to all.',
+    )
+    parser.add_argument('--output', help='Write the results to this file instead of stdout.')
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        commands=args.command or tuple(STARTUP_COMMANDS),
+        repeat=args.repeat,
+        budget=args.budget,
+    )
+
+    if args.output:
+        with open(args.output, 'w') as handler:
+            json.dump(result, handler, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(result, indent=2, sort_keys=True))
+
+    if result['deferred_modules_loaded'] or result['within_budget'] is False:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
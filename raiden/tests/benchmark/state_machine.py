@@ -0,0 +1,741 @@
+"""
+Offline benchmark of the state machine.
+
+A synthetic ChainState is built with a configurable number of token networks,
+channels, pending locks and queued messages. The benchmark then replays a mix
+of mediated transfers where this node is the initiator, a mediator or the
+target. The partners are simulated: they sign their locked transfers and
+unlocks with their own keys and acknowledge every message sent by the node.
+No chain, transport or database is involved, so the results only depend on
+the state machine.
+
+The results are written as JSON, e.g.:
+
+    python -m raiden.tests.benchmark.state_machine --channels 200 --output new.json
+    python -m raiden.tests.benchmark.state_machine --channels 200 --compare new.json
+"""
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+from coincurve import PrivateKey
+
+from raiden.messages import Lock, LockedTransfer, Secret
+from raiden.transfer import channel, node, views
+from raiden.transfer.architecture import SendMessageEvent, StateManager
+from raiden.transfer.events import (
+    EventTransferReceivedSuccess,
+    EventTransferSentSuccess,
+    SendProcessed,
+)
+from raiden.transfer.mediated_transfer.events import (
+    EventUnlockClaimSuccess,
+    SendBalanceProof,
+    SendLockedTransfer,
+    SendRefundTransfer,
+    SendRevealSecret,
+    SendSecretRequest,
+)
+from raiden.transfer.mediated_transfer.state import (
+    TransferDescriptionWithSecretState,
+    lockedtransfersigned_from_message,
+)
+from raiden.transfer.mediated_transfer.state_change import (
+    ActionInitInitiator,
+    ActionInitMediator,
+    ActionInitTarget,
+    ReceiveSecretRequest,
+    ReceiveSecretReveal,
+)
+from raiden.transfer.merkle_tree import compute_layers, merkleroot
+from raiden.transfer.state import (
+    BalanceProofUnsignedState,
+    ChainState,
+    HashTimeLockState,
+    MerkleTreeState,
+    NettingChannelEndState,
+    NettingChannelState,
+    PaymentNetworkState,
+    RouteState,
+    TokenNetworkState,
+    TransactionExecutionStatus,
+    balanceproof_from_envelope,
+    message_identifier_from_prng,
+)
+from raiden.transfer.state_change import (
+    Block,
+    ReceiveDelivered,
+    ReceiveProcessed,
+    ReceiveUnlock,
+)
+from raiden.utils import privatekey_to_address, sha3
+
+CHAIN_ID = 337
+SETTLE_TIMEOUT = 50
+REVEAL_TIMEOUT = 10
+DEPOSIT = 10 ** 18
+TRANSFER_AMOUNT = 1
+START_BLOCK = 1000
+
+ROLES = ('initiator', 'mediator', 'target')
+
+# Messages which are answered with a Processed by the partner, the others are
+# answered with a Delivered
+PROCESSED_MESSAGES = (SendLockedTransfer, SendBalanceProof, SendRefundTransfer)
+
+
+class SyntheticNetwork:
+    """ The addresses and keys used to build the synthetic ChainState. """
+
+    def __init__(self, prng):
+        self.prng = prng
+        self.our_address = self.make_address()
+        self.payment_network_identifier = self.make_address()
+        self.partners_to_keys = dict()
+        self.token_networks_to_channels = dict()
+
+    def make_address(self):
+        return bytes(self.prng.getrandbits(8) for _ in range(20))
+
+    def make_secret(self):
+        return bytes(self.prng.getrandbits(8) for _ in range(32))
+
+    def make_partner(self):
+        private_key = PrivateKey(sha3(self.make_secret()))
+        address = privatekey_to_address(private_key.secret)
+        self.partners_to_keys[address] = private_key
+        return address
+
+
+def make_channel(network, token_network_identifier, token_address, pending_locks):
+    partner_address = network.make_partner()
+
+    our_state = NettingChannelEndState(network.our_address, DEPOSIT)
+    partner_state = NettingChannelEndState(partner_address, DEPOSIT)
+
+    if pending_locks:
+        locks = [
+            HashTimeLockState(TRANSFER_AMOUNT, START_BLOCK + 10 ** 6, sha3(network.make_secret()))
+            for _ in range(pending_locks)
+        ]
+        for lock in locks:
+            our_state.secrethashes_to_lockedlocks[lock.secrethash] = lock
+
+        our_state.merkletree = MerkleTreeState(compute_layers([lock.lockhash for lock in locks]))
+
+    channel_identifier = network.make_secret()
+    our_state.balance_proof = BalanceProofUnsignedState(
+        nonce=1,
+        transferred_amount=0,
+        locked_amount=pending_locks * TRANSFER_AMOUNT,
+        locksroot=merkleroot(our_state.merkletree),
+        token_network_identifier=token_network_identifier,
+        channel_address=channel_identifier,
+        chain_id=CHAIN_ID,
+    )
+
+    open_transaction = TransactionExecutionStatus(
+        None,
+        START_BLOCK,
+        TransactionExecutionStatus.SUCCESS,
+    )
+
+    return NettingChannelState(
+        identifier=channel_identifier,
+        chain_id=CHAIN_ID,
+        token_address=token_address,
+        token_network_identifier=token_network_identifier,
+        reveal_timeout=REVEAL_TIMEOUT,
+        settle_timeout=SETTLE_TIMEOUT,
+        our_state=our_state,
+        partner_state=partner_state,
+        open_transaction=open_transaction,
+        close_transaction=None,
+        settle_transaction=None,
+    )
+
+
+def build_chain_state(seed, tokens, channels, pending_locks, queued_messages):
+    """ Return a ChainState with `tokens` token networks of `channels`
+    channels each, every channel with `pending_locks` locks sent by this node,
+    and `queued_messages` unacknowledged messages spread among the partners.
+    """
+    prng = random.Random(seed)
+    network = SyntheticNetwork(prng)
+
+    token_networks = list()
+    for _ in range(tokens):
+        token_network = TokenNetworkState(network.make_address(), network.make_address())
+
+        channel_identifiers = list()
+        for _ in range(channels):
+            channel_state = make_channel(
+                network,
+                token_network.address,
+                token_network.token_address,
+                pending_locks,
+            )
+            partner_address = channel_state.partner_state.address
+
+            token_network.channelidentifiers_to_channels[channel_state.identifier] = channel_state
+            token_network.partneraddresses_to_channels[partner_address] = channel_state
+            token_network.network_graph.network.add_edge(network.our_address, partner_address)
+            channel_identifiers.append(channel_state.identifier)
+
+        network.token_networks_to_channels[token_network.address] = channel_identifiers
+        token_networks.append(token_network)
+
+    chain_state = ChainState(random.Random(seed), START_BLOCK, CHAIN_ID)
+    chain_state.identifiers_to_paymentnetworks[network.payment_network_identifier] = (
+        PaymentNetworkState(network.payment_network_identifier, token_networks)
+    )
+
+    partners = list(network.partners_to_keys)
+    for _ in range(queued_messages):
+        recipient = prng.choice(partners)
+        queue = chain_state.queueids_to_queues.setdefault((recipient, b'global'), list())
+        queue.append(SendProcessed(recipient, b'global', message_identifier_from_prng(prng)))
+
+    return chain_state, network
+
+
+def locked_transfer_from_partner(
+        channel_state,
+        private_key,
+        prng,
+        payment_identifier,
+        secrethash,
+        expiration,
+        initiator,
+        target,
+):
+    """ The LockedTransfer the partner of `channel_state` would send to this
+    node, the balance proof is computed from the node's view of the channel.
+    """
+    partner_state = channel_state.partner_state
+    _, _, transferred_amount, locked_amount = channel.get_current_balanceproof(partner_state)
+
+    lock = Lock(TRANSFER_AMOUNT, expiration, secrethash)
+    lockhash = sha3(lock.as_bytes)
+    merkletree = channel.compute_merkletree_with(partner_state.merkletree, lockhash)
+
+    message = LockedTransfer(
+        chain_id=channel_state.chain_id,
+        message_identifier=message_identifier_from_prng(prng),
+        payment_identifier=payment_identifier,
+        nonce=channel.get_next_nonce(partner_state),
+        token_network_address=channel_state.token_network_identifier,
+        token=channel_state.token_address,
+        channel_identifier=channel_state.identifier,
+        transferred_amount=transferred_amount,
+        locked_amount=locked_amount + TRANSFER_AMOUNT,
+        recipient=channel_state.our_state.address,
+        locksroot=merkleroot(merkletree),
+        lock=lock,
+        target=target,
+        initiator=initiator,
+    )
+    message.sign(private_key)
+
+    return lockedtransfersigned_from_message(message)
+
+
+def unlock_from_partner(channel_state, private_key, prng, payment_identifier, secret):
+    """ The Unlock the partner of `channel_state` would send once the secret
+    is known.
+    """
+    partner_state = channel_state.partner_state
+    _, _, transferred_amount, locked_amount = channel.get_current_balanceproof(partner_state)
+
+    lock = channel.get_lock(partner_state, sha3(secret))
+    merkletree = channel.compute_merkletree_without(partner_state.merkletree, lock.lockhash)
+
+    message = Secret(
+        chain_id=channel_state.chain_id,
+        message_identifier=message_identifier_from_prng(prng),
+        payment_identifier=payment_identifier,
+        nonce=channel.get_next_nonce(partner_state),
+        token_network_address=channel_state.token_network_identifier,
+        channel_identifier=channel_state.identifier,
+        transferred_amount=transferred_amount + lock.amount,
+        locked_amount=locked_amount - lock.amount,
+        locksroot=merkleroot(merkletree),
+        secret=secret,
+    )
+    message.sign(private_key)
+
+    return ReceiveUnlock(
+        message.message_identifier,
+        secret,
+        balanceproof_from_envelope(message),
+    )
+
+
+def expect(events, event_type, role):
+    if not any(isinstance(event, event_type) for event in events):
+        raise AssertionError('{} payment did not produce {}, got {}'.format(
+            role,
+            event_type.__name__,
+            events,
+        ))
+
+
+def initiator_payment(get_state, network, prng, payment_identifier):
+    """ This node pays a node behind one of its partners. """
+    token_network_identifier = prng.choice(list(network.token_networks_to_channels))
+    channel_identifier = prng.choice(network.token_networks_to_channels[token_network_identifier])
+    channel_state = views.get_channelstate_by_token_network_identifier(
+        get_state(),
+        token_network_identifier,
+        channel_identifier,
+    )
+    partner_address = channel_state.partner_state.address
+    target = network.make_address()
+    secret = network.make_secret()
+
+    transfer_description = TransferDescriptionWithSecretState(
+        payment_identifier,
+        TRANSFER_AMOUNT,
+        token_network_identifier,
+        network.our_address,
+        target,
+        secret,
+    )
+    routes = [RouteState(partner_address, channel_identifier)]
+    events = yield ActionInitInitiator(transfer_description, routes)
+    expect(events, SendLockedTransfer, 'initiator')
+
+    events = yield ReceiveSecretRequest(payment_identifier, TRANSFER_AMOUNT, sha3(secret), target)
+    expect(events, SendRevealSecret, 'initiator')
+
+    events = yield ReceiveSecretReveal(secret, partner_address)
+    expect(events, EventTransferSentSuccess, 'initiator')
+
+
+def target_payment(get_state, network, prng, payment_identifier):
+    """ One of the partners pays this node on behalf of another node. """
+    token_network_identifier = prng.choice(list(network.token_networks_to_channels))
+    channel_identifier = prng.choice(network.token_networks_to_channels[token_network_identifier])
+    initiator = network.make_address()
+    secret = network.make_secret()
+
+    def payer_channel():
+        return views.get_channelstate_by_token_network_identifier(
+            get_state(),
+            token_network_identifier,
+            channel_identifier,
+        )
+
+    payer_address = payer_channel().partner_state.address
+    private_key = network.partners_to_keys[payer_address]
+
+    transfer = locked_transfer_from_partner(
+        payer_channel(),
+        private_key,
+        prng,
+        payment_identifier,
+        sha3(secret),
+        get_state().block_number + SETTLE_TIMEOUT,
+        initiator,
+        network.our_address,
+    )
+    events = yield ActionInitTarget(RouteState(payer_address, channel_identifier), transfer)
+    expect(events, SendSecretRequest, 'target')
+
+    events = yield ReceiveSecretReveal(secret, initiator)
+    expect(events, SendRevealSecret, 'target')
+
+    unlock = unlock_from_partner(payer_channel(), private_key, prng, payment_identifier, secret)
+    events = yield unlock
+    expect(events, EventTransferReceivedSuccess, 'target')
+
+
+def mediator_payment(get_state, network, prng, payment_identifier):
+    """ One of the partners pays another partner through this node. """
+    token_network_identifier = prng.choice(list(network.token_networks_to_channels))
+    payer_identifier, payee_identifier = prng.sample(
+        network.token_networks_to_channels[token_network_identifier],
+        2,
+    )
+    initiator = network.make_address()
+    secret = network.make_secret()
+
+    def channel_state(channel_identifier):
+        return views.get_channelstate_by_token_network_identifier(
+            get_state(),
+            token_network_identifier,
+            channel_identifier,
+        )
+
+    payer_address = channel_state(payer_identifier).partner_state.address
+    payee_address = channel_state(payee_identifier).partner_state.address
+    private_key = network.partners_to_keys[payer_address]
+
+    transfer = locked_transfer_from_partner(
+        channel_state(payer_identifier),
+        private_key,
+        prng,
+        payment_identifier,
+        sha3(secret),
+        get_state().block_number + SETTLE_TIMEOUT,
+        initiator,
+        payee_address,
+    )
+    events = yield ActionInitMediator(
+        [RouteState(payee_address, payee_identifier)],
+        RouteState(payer_address, payer_identifier),
+        transfer,
+    )
+    expect(events, SendLockedTransfer, 'mediator')
+
+    events = yield ReceiveSecretReveal(secret, payee_address)
+    expect(events, SendBalanceProof, 'mediator')
+
+    unlock = unlock_from_partner(
+        channel_state(payer_identifier),
+        private_key,
+        prng,
+        payment_identifier,
+        secret,
+    )
+    events = yield unlock
+    expect(events, EventUnlockClaimSuccess, 'mediator')
+
+
+PAYMENTS = {
+    'initiator': initiator_payment,
+    'mediator': mediator_payment,
+    'target': target_payment,
+}
+
+
+def acknowledgements(events):
+    """ The Processed and Delivered messages the partners send back. """
+    for event in events:
+        if isinstance(event, PROCESSED_MESSAGES):
+            yield ReceiveProcessed(event.message_identifier)
+        elif isinstance(event, SendMessageEvent):
+            yield ReceiveDelivered(event.message_identifier)
+
+
+def replay(
+        chain_state,
+        network,
+        seed,
+        payments,
+        mix,
+        concurrency,
+        block_interval,
+        use_state_manager,
+        record=None,
+):
+    """ Dispatch the state changes of `payments` mediated transfers, with at
+    most `concurrency` of them in flight, and a new block every
+    `block_interval` state changes.
+
+    Returns the final state, the dispatch time of every state change grouped
+    by the state change type and the number of completed payments per role.
+    Only the dispatch itself is timed, the simulated partners are not. If
+    `record` is a list the (state_change, events) pairs are appended to it.
+    """
+    prng = random.Random(seed)
+    roles = [role for role in ROLES if mix.get(role)]
+    weights = [mix[role] for role in roles]
+
+    if use_state_manager:
+        state_manager = StateManager(node.state_transition, chain_state)
+
+        def get_state():
+            return state_manager.current_state
+
+        def dispatch(state_change):
+            return state_manager.dispatch(state_change)
+    else:
+        def get_state():
+            return chain_state
+
+        def dispatch(state_change):
+            return node.state_transition(chain_state, state_change).events
+
+    samples = defaultdict(list)
+    completed = defaultdict(int)
+    started = 0
+    dispatched = 0
+    in_flight = list()
+
+    def timed_dispatch(state_change):
+        nonlocal dispatched
+
+        start = time.perf_counter()
+        events = dispatch(state_change)
+        samples[type(state_change).__name__].append(time.perf_counter() - start)
+
+        if record is not None:
+            record.append((state_change, events))
+
+        dispatched += 1
+        if dispatched % block_interval == 0:
+            timed_dispatch(Block(get_state().block_number + 1))
+
+        return events
+
+    while in_flight or started < payments:
+        while started < payments and len(in_flight) < concurrency:
+            role = prng.choices(roles, weights)[0]
+            payment = PAYMENTS[role](get_state, network, prng, started + 1)
+            in_flight.append([role, payment, None])
+            started += 1
+
+        position = prng.randrange(len(in_flight))
+        role, payment, events = in_flight[position]
+
+        try:
+            state_change = payment.send(events)
+        except StopIteration:
+            completed[role] += 1
+            in_flight.pop(position)
+            continue
+
+        events = timed_dispatch(state_change)
+        for acknowledgement in list(acknowledgements(events)):
+            timed_dispatch(acknowledgement)
+
+        in_flight[position][2] = events
+
+    return get_state(), samples, completed
+
+
+def percentile(sorted_values, fraction):
+    position = int(round(fraction * (len(sorted_values) - 1)))
+    return sorted_values[position]
+
+
+def summarize(durations):
+    durations = sorted(durations)
+    total = sum(durations)
+
+    return {
+        'count': len(durations),
+        'ops_per_second': len(durations) / total if total else None,
+        'mean_us': total / len(durations) * 10 ** 6,
+        'p50_us': percentile(durations, 0.5) * 10 ** 6,
+        'p99_us': percentile(durations, 0.99) * 10 ** 6,
+        'max_us': durations[-1] * 10 ** 6,
+    }
+
+
+def git_commit():
+    try:
+        output = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return output.decode().strip()
+
+
+def run_benchmark(
+        seed=0,
+        tokens=1,
+        channels=20,
+        pending_locks=0,
+        queued_messages=0,
+        payments=500,
+        mix=None,
+        concurrency=10,
+        block_interval=50,
+        use_state_manager=True,
+        measure_memory=True,
+):
+    mix = mix or {role: 1 for role in ROLES}
+
+    if mix.get('mediator') and channels < 2:
+        raise ValueError('mediated payments need at least two channels per token network')
+
+    parameters = {
+        'seed': seed,
+        'tokens': tokens,
+        'channels': channels,
+        'pending_locks': pending_locks,
+        'queued_messages': queued_messages,
+        'payments': payments,
+        'mix': mix,
+        'concurrency': concurrency,
+        'block_interval': block_interval,
+        'state_manager': use_state_manager,
+    }
+    replay_arguments = (seed, payments, mix, concurrency, block_interval, use_state_manager)
+
+    chain_state, network = build_chain_state(
+        seed,
+        tokens,
+        channels,
+        pending_locks,
+        queued_messages,
+    )
+    _, samples, completed = replay(chain_state, network, *replay_arguments)
+
+    all_samples = [duration for durations in samples.values() for duration in durations]
+    result = {
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'parameters': parameters,
+        'completed_payments': dict(completed),
+        'total': summarize(all_samples),
+        'state_changes': {
+            name: summarize(durations)
+            for name, durations in sorted(samples.items())
+        },
+    }
+
+    if measure_memory:
+        # tracemalloc slows down the allocations, so the peak memory is
+        # measured on a second replay which is not timed
+        chain_state, network = build_chain_state(
+            seed,
+            tokens,
+            channels,
+            pending_locks,
+            queued_messages,
+        )
+        tracemalloc.start()
+        replay(chain_state, network, *replay_arguments)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        result['peak_memory_bytes'] = peak
+
+    # ru_maxrss is in kilobytes on Linux
+    result['max_rss_bytes'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    return result
+
+
+def compare_results(baseline, current):
+    """ Return the lines of a table with the relative change of the
+    throughput and latencies from `baseline` to `current`.
+    """
+    def change(key, old, new):
+        if not old or new is None:
+            return '{:>10}'.format('-')
+        return '{:>+9.1f}%'.format((new[key] - old[key]) / old[key] * 100)
+
+    lines = ['{:<40} {:>10} {:>10} {:>10}'.format('state change', 'ops/s', 'p50', 'p99')]
+    names = ['total'] + sorted(set(baseline['state_changes']) | set(current['state_changes']))
+    for name in names:
+        if name == 'total':
+            old, new = baseline['total'], current['total']
+        else:
+            old = baseline['state_changes'].get(name)
+            new = current['state_changes'].get(name)
+
+        lines.append('{:<40} {} {} {}'.format(
+            name,
+            change('ops_per_second', old, new),
+            change('p50_us', old, new),
+            change('p99_us', old, new),
+        ))
+
+    if 'peak_memory_bytes' in baseline and 'peak_memory_bytes' in current:
+        lines.append('{:<40} {}'.format(
+            'peak memory',
+            change('peak_memory_bytes', baseline, current),
+        ))
+
+    return lines
+
+
+def parse_mix(value):
+    mix = dict()
+    for item in value.split(','):
+        role, _, weight = item.partition('=')
+        if role not in ROLES:
+            raise ValueError('unknown role {}, must be one of {}'.format(role, ', '.join(ROLES)))
+        mix[role] = float(weight or 1)
+    return mix
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', default=0, type=int)
+    parser.add_argument('--tokens', default=1, type=int, help='Number of token networks.')
+    parser.add_argument('--channels', default=20, type=int, help='Channels per token network.')
+    parser.add_argument(
+        '--pending-locks',
+        default=0,
+        type=int,
+        help='Locks sent by this node and pending on every channel.',
+    )
+    parser.add_argument(
+        '--queued-messages',
+        default=0,
+        type=int,
+        help='Messages waiting to be acknowledged by the partners.',
+    )
+    parser.add_argument('--payments', default=500, type=int)
+    parser.add_argument(
+        '--mix',
+        default='initiator=1,mediator=1,target=1',
+        type=parse_mix,
+        help='Relative weight of the role of this node in the payments.',
+    )
+    parser.add_argument(
+        '--concurrency',
+        default=10,
+        type=int,
+        help='Number of payments in flight.',
+    )
+    parser.add_argument(
+        '--block-interval',
+        default=50,
+        type=int,
+        help='Number of state changes between two blocks.',
+    )
+    parser.add_argument(
+        '--no-state-manager',
+        action='store_true',
+        help='Call node.state_transition directly, without copying the state.',
+    )
+    parser.add_argument('--no-memory', action='store_true', help='Skip the memory measurement.')
+    parser.add_argument('--output', help='Write the results to this file instead of stdout.')
+    parser.add_argument('--compare', help='Results of a previous run to compare with.')
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        seed=args.seed,
+        tokens=args.tokens,
+        channels=args.channels,
+        pending_locks=args.pending_locks,
+        queued_messages=args.queued_messages,
+        payments=args.payments,
+        mix=args.mix,
+        concurrency=args.concurrency,
+        block_interval=args.block_interval,
+        use_state_manager=not args.no_state_manager,
+        measure_memory=not args.no_memory,
+    )
+
+    if args.output:
+        with open(args.output, 'w') as handler:
+            json.dump(result, handler, indent=2, sort_keys=True)
+    elif not args.compare:
+        print(json.dumps(result, indent=2, sort_keys=True))
+
+    if args.compare:
+        with open(args.compare) as handler:
+            baseline = json.load(handler)
+
+        print('\n'.join(compare_results(baseline, result)))
+
+
+if __name__ == '__main__':
+    main()
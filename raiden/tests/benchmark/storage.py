@@ -0,0 +1,481 @@
+"""
+Benchmarks of the node storage.
+
+The `replay` mode opens an existing node database read only and replays its
+state changes through the state machine. It measures the deserialization and
+dispatch time of every state change. It also measures the size and the
+serialization time of a snapshot of the state at evenly spaced points, and
+the time `restore_from_latest_snapshot` takes to restore the node state:
+
+    python -m raiden.tests.benchmark.storage replay ~/.raiden/.../log.db
+
+The `synthetic` mode records the state changes and events of the state
+machine benchmark. It then writes them to a new storage for every combination
+of the given backends, pragmas, batch sizes and serializers, and reads all of
+them back with a range scan. A batch is the number of state changes, with
+their events, written per commit. The pragmas only apply to the `sqlite`
+backend, the `appendlog` backend syncs the log once per batch:
+
+    python -m raiden.tests.benchmark.storage synthetic \\
+        --backend sqlite --backend appendlog \\
+        --pragmas '' --pragmas 'journal_mode=WAL,synchronous=NORMAL' \\
+        --batch-size 1 --batch-size 100 --serializer pickle --serializer pickle-zlib
+
+The databases are created in a temporary directory, use `--directory` to
+benchmark a specific disk. The results are written as JSON.
+"""
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import defaultdict
+from urllib.request import pathname2url
+
+from raiden.settings import STORAGE_BACKENDS
+from raiden.storage.appendlog import AppendLogStorage
+from raiden.storage.serialize import PickleSerializer
+from raiden.storage.sqlite import SQLiteStorage
+from raiden.storage.wal import restore_from_latest_snapshot
+from raiden.tests.benchmark.state_machine import (
+    ROLES,
+    build_chain_state,
+    git_commit,
+    replay,
+    summarize,
+)
+from raiden.transfer import node
+from raiden.transfer.architecture import StateManager
+from raiden.transfer.state_change import Block
+
+
+class ZlibPickleSerializer:
+    @staticmethod
+    def serialize(transaction):
+        return zlib.compress(PickleSerializer.serialize(transaction))
+
+    @staticmethod
+    def deserialize(data):
+        return PickleSerializer.deserialize(zlib.decompress(data))
+
+
+SERIALIZERS = {
+    'pickle': PickleSerializer,
+    'pickle-zlib': ZlibPickleSerializer,
+}
+
+
+class ReadOnlyStorage(SQLiteStorage):
+    """ A SQLiteStorage over a read only connection, the schema upgrades are
+    not run so the database is left untouched.
+    """
+
+    def __init__(self, database_path, serializer):  # pylint: disable=super-init-not-called
+        uri = 'file:{}?mode=ro'.format(pathname2url(os.path.abspath(database_path)))
+        self.conn = sqlite3.connect(uri, uri=True)
+        self.conn.text_factory = str
+        self.write_lock = threading.Lock()
+        self.serializer = serializer
+
+
+class BatchConnection:
+    """ Wraps the connection of a SQLiteStorage so its `with conn:` blocks
+    don't commit, the caller commits once per batch.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.conn.rollback()
+        return False
+
+
+def table_size(conn, table):
+    count, size = conn.execute(
+        'SELECT count(*), coalesce(sum(length(data)), 0) FROM {}'.format(table),
+    ).fetchone()
+    return {'count': count, 'bytes': size}
+
+
+def files_size(database_path):
+    """ Size of the database and of its write-ahead log, if any. """
+    return sum(
+        os.path.getsize(path)
+        for path in (database_path, database_path + '-wal')
+        if os.path.exists(path)
+    )
+
+
+def summarize_by_type(samples):
+    all_samples = [duration for durations in samples.values() for duration in durations]
+    return {
+        'total': summarize(all_samples),
+        'state_changes': {
+            name: summarize(durations)
+            for name, durations in sorted(samples.items())
+        },
+    }
+
+
+def replay_database(database_path, checkpoints=10, serializer=PickleSerializer):
+    storage = ReadOnlyStorage(database_path, serializer)
+    rows = storage.conn.execute(
+        'SELECT identifier, data FROM state_changes ORDER BY identifier',
+    ).fetchall()
+
+    if not rows:
+        raise ValueError('{} has no state changes'.format(database_path))
+
+    checkpoint_positions = {
+        max(round(len(rows) * (index + 1) / checkpoints) - 1, 0)
+        for index in range(checkpoints)
+    }
+
+    state_manager = StateManager(node.state_transition, None)
+    deserialize_samples = defaultdict(list)
+    dispatch_samples = defaultdict(list)
+    snapshots = list()
+
+    for position, (identifier, data) in enumerate(rows):
+        start = time.perf_counter()
+        state_change = serializer.deserialize(data)
+        deserialized = time.perf_counter()
+        state_manager.dispatch(state_change)
+        dispatched = time.perf_counter()
+
+        name = type(state_change).__name__
+        deserialize_samples[name].append(deserialized - start)
+        dispatch_samples[name].append(dispatched - deserialized)
+
+        if position in checkpoint_positions:
+            start = time.perf_counter()
+            snapshot = serializer.serialize(state_manager.current_state)
+            serialized = time.perf_counter()
+            serializer.deserialize(snapshot)
+            deserialized = time.perf_counter()
+
+            snapshots.append({
+                'state_change_id': identifier,
+                'bytes': len(snapshot),
+                'serialize_us': (serialized - start) * 10 ** 6,
+                'deserialize_us': (deserialized - serialized) * 10 ** 6,
+            })
+
+    # This is the restore done by the node on start, it uses the stored
+    # snapshot if the database has one
+    start = time.perf_counter()
+    restore_from_latest_snapshot(node.state_transition, storage)
+    restore_seconds = time.perf_counter() - start
+
+    stored_snapshot = storage.conn.execute(
+        'SELECT statechange_id, length(data) FROM state_snapshot',
+    ).fetchone()
+
+    return {
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'database': os.path.abspath(database_path),
+        'file_bytes': files_size(database_path),
+        'state_changes': table_size(storage.conn, 'state_changes'),
+        'events': table_size(storage.conn, 'state_events'),
+        'stored_snapshot': {
+            'state_change_id': stored_snapshot[0],
+            'bytes': stored_snapshot[1],
+        } if stored_snapshot else None,
+        'restore_seconds': restore_seconds,
+        'deserialize': summarize_by_type(deserialize_samples),
+        'dispatch': summarize_by_type(dispatch_samples),
+        'snapshots': snapshots,
+    }
+
+
+def record_workload(seed, channels, payments):
+    """ Return the (state_change, events) pairs of the state machine benchmark
+    and its final state.
+    """
+    chain_state, network = build_chain_state(
+        seed,
+        tokens=1,
+        channels=channels,
+        pending_locks=0,
+        queued_messages=0,
+    )
+    records = list()
+    final_state, _, _ = replay(
+        chain_state,
+        network,
+        seed,
+        payments,
+        mix={role: 1 for role in ROLES},
+        concurrency=10,
+        block_interval=50,
+        use_state_manager=True,
+        record=records,
+    )
+
+    return records, final_state
+
+
+def range_scan(storage):
+    """ Time to read all the state changes and events back. """
+    start = time.perf_counter()
+    storage.get_statechanges_by_identifier(0, 'latest')
+    storage.get_events_by_identifier(0, 'latest')
+    return time.perf_counter() - start
+
+
+def write_records(storage, records, snapshot_state, batch_size, snapshot_interval, commit):
+    """ Write the records to `storage`, `commit` is called once per batch. """
+    block_number = 0
+    commits = list()
+
+    start = batch_start = time.perf_counter()
+    for position, (state_change, events) in enumerate(records, start=1):
+        if isinstance(state_change, Block):
+            block_number = state_change.block_number
+
+        state_change_id = storage.write_state_change(state_change)
+        storage.write_events(state_change_id, block_number, events)
+
+        if snapshot_interval and position % snapshot_interval == 0:
+            storage.write_state_snapshot(state_change_id, snapshot_state)
+
+        if position % batch_size == 0 or position == len(records):
+            commit()
+            now = time.perf_counter()
+            commits.append(now - batch_start)
+            batch_start = now
+    elapsed = time.perf_counter() - start
+
+    return {
+        'state_changes_per_second': len(records) / elapsed,
+        'batches': summarize(commits),
+        'range_scan_seconds': range_scan(storage),
+    }
+
+
+def write_workload(
+        records,
+        snapshot_state,
+        database_path,
+        pragmas,
+        batch_size,
+        serializer,
+        snapshot_interval,
+):
+    storage = SQLiteStorage(database_path, serializer)
+    for pragma in pragmas:
+        storage.conn.execute('PRAGMA {}'.format(pragma))
+    storage.conn = BatchConnection(storage.conn)
+
+    result = write_records(
+        storage,
+        records,
+        snapshot_state,
+        batch_size,
+        snapshot_interval,
+        storage.conn.commit,
+    )
+    result.update({
+        'file_bytes': files_size(database_path),
+        'state_changes': table_size(storage.conn, 'state_changes'),
+        'events': table_size(storage.conn, 'state_events'),
+    })
+    storage.conn.close()
+
+    return result
+
+
+def write_appendlog_workload(
+        records,
+        snapshot_state,
+        directory,
+        batch_size,
+        serializer,
+        snapshot_interval,
+):
+    # Every write is synced when the batches have a single state change
+    storage = AppendLogStorage(directory, serializer, fsync=batch_size == 1)
+    commit = storage.sync if batch_size > 1 else lambda: None
+
+    result = write_records(
+        storage,
+        records,
+        snapshot_state,
+        batch_size,
+        snapshot_interval,
+        commit,
+    )
+    result.update({
+        'file_bytes': sum(
+            os.path.getsize(os.path.join(directory, name))
+            for name in ('log', 'snapshot')
+            if os.path.exists(os.path.join(directory, name))
+        ),
+        'state_changes': {
+            'count': len(storage.state_change_offsets),
+            'bytes': sum(storage.state_change_lengths),
+        },
+        'events': {
+            'count': len(storage.event_offsets),
+            'bytes': sum(storage.event_lengths),
+        },
+    })
+    storage.close()
+
+    return result
+
+
+def run_synthetic(
+        seed=0,
+        channels=20,
+        payments=200,
+        pragmas=([],),
+        batch_sizes=(1,),
+        serializers=('pickle',),
+        snapshot_interval=0,
+        directory=None,
+        backends=('sqlite',),
+):
+    records, final_state = record_workload(seed, channels, payments)
+
+    configurations = list()
+    for backend in backends:
+        backend_pragmas = pragmas if backend == 'sqlite' else ([],)
+        configurations.extend(
+            itertools.product([backend], backend_pragmas, batch_sizes, serializers),
+        )
+
+    runs = list()
+    with tempfile.TemporaryDirectory(dir=directory) as database_dir:
+        for number, configuration in enumerate(configurations):
+            backend, pragma_list, batch_size, serializer_name = configuration
+            if backend == 'sqlite':
+                database_path = os.path.join(database_dir, 'synthetic{}.db'.format(number))
+                result = write_workload(
+                    records,
+                    final_state,
+                    database_path,
+                    pragma_list,
+                    batch_size,
+                    SERIALIZERS[serializer_name],
+                    snapshot_interval,
+                )
+            else:
+                result = write_appendlog_workload(
+                    records,
+                    final_state,
+                    os.path.join(database_dir, 'synthetic{}.appendlog'.format(number)),
+                    batch_size,
+                    SERIALIZERS[serializer_name],
+                    snapshot_interval,
+                )
+            result.update({
+                'backend': backend,
+                'pragmas': list(pragma_list),
+                'batch_size': batch_size,
+                'serializer': serializer_name,
+            })
+            runs.append(result)
+
+    return {
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'parameters': {
+            'seed': seed,
+            'channels': channels,
+            'payments': payments,
+            'snapshot_interval': snapshot_interval,
+        },
+        'records': len(records),
+        'runs': runs,
+    }
+
+
+def parse_pragmas(value):
+    return [pragma.strip() for pragma in value.split(',') if pragma.strip()]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', help='Write the results to this file instead of stdout.')
+    subparsers = parser.add_subparsers(dest='mode')
+    subparsers.required = True
+
+    replay_parser = subparsers.add_parser('replay', help='Replay an existing node database.')
+    replay_parser.add_argument('database')
+    replay_parser.add_argument(
+        '--checkpoints',
+        default=10,
+        type=int,
+        help='Number of points at which the snapshot size is measured.',
+    )
+
+    synthetic_parser = subparsers.add_parser(
+        'synthetic',
+        help='Write a synthetic workload with different storage settings.',
+    )
+    synthetic_parser.add_argument('--seed', default=0, type=int)
+    synthetic_parser.add_argument('--backend', action='append', choices=STORAGE_BACKENDS)
+    synthetic_parser.add_argument('--channels', default=20, type=int)
+    synthetic_parser.add_argument('--payments', default=200, type=int)
+    synthetic_parser.add_argument(
+        '--pragmas',
+        action='append',
+        type=parse_pragmas,
+        help='Comma separated pragmas of one configuration, e.g. journal_mode=WAL.',
+    )
+    synthetic_parser.add_argument('--batch-size', action='append', type=int)
+    synthetic_parser.add_argument(
+        '--serializer',
+        action='append',
+        choices=sorted(SERIALIZERS),
+    )
+    synthetic_parser.add_argument(
+        '--snapshot-interval',
+        default=0,
+        type=int,
+        help='Write a snapshot every this many state changes.',
+    )
+    synthetic_parser.add_argument('--directory', help='Where the databases are created.')
+
+    args = parser.parse_args()
+
+    if args.mode == 'replay':
+        result = replay_database(args.database, args.checkpoints)
+    else:
+        result = run_synthetic(
+            seed=args.seed,
+            channels=args.channels,
+            payments=args.payments,
+            pragmas=args.pragmas or [[]],
+            batch_sizes=args.batch_size or [1],
+            serializers=args.serializer or ['pickle'],
+            snapshot_interval=args.snapshot_interval,
+            directory=args.directory,
+            backends=args.backend or ['sqlite'],
+        )
+
+    if args.output:
+        with open(args.output, 'w') as handler:
+            json.dump(result, handler, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(result, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
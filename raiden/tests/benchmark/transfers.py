@@ -0,0 +1,380 @@
+"""
+In-process benchmark of mediated transfers among many nodes.
+
+Every node is a full RaidenService, with its own in-memory database and the
+UDP transport, but the nodes run in a single process: the blockchain is
+replaced by a `LoopbackChain` and the UDP sockets by a `LoopbackNetwork`, see
+`raiden.tests.utils.loopback`. The channels are opened by dispatching the
+state changes of the blockchain events directly to the nodes.
+
+The nodes are connected in a line, a star or a random connected graph and the
+payments are made between random pairs of nodes. The results are written as
+JSON, e.g.:
+
+    python -m raiden.tests.benchmark.transfers --nodes 10 --topology line
+"""
+import json
+import random
+import sys
+import time
+
+import gevent
+import networkx
+from gevent.pool import Pool
+
+from raiden import waiting
+from raiden.network.discovery import Discovery
+from raiden.network.throttle import DummyPolicy
+from raiden.raiden_service import RaidenService
+from raiden.settings import (
+    DEFAULT_NAT_INVITATION_TIMEOUT,
+    DEFAULT_NAT_KEEPALIVE_RETRIES,
+    DEFAULT_NAT_KEEPALIVE_TIMEOUT,
+    DEFAULT_REVEAL_TIMEOUT,
+    DEFAULT_SETTLE_TIMEOUT,
+    DEFAULT_SHUTDOWN_TIMEOUT,
+    DEFAULT_TRANSPORT_RETRIES_BEFORE_BACKOFF,
+    DEFAULT_TRANSPORT_RETRY_INTERVAL,
+)
+from raiden.tests.benchmark.state_machine import git_commit, summarize
+from raiden.tests.utils.loopback import (
+    LoopbackChain,
+    LoopbackNetwork,
+    LoopbackSecretRegistry,
+    LoopbackTokenNetworkRegistry,
+    LoopbackTransport,
+)
+from raiden.transfer import views
+from raiden.transfer.state import (
+    NettingChannelEndState,
+    NettingChannelState,
+    TokenNetworkState,
+    TransactionExecutionStatus,
+)
+from raiden.transfer.state_change import (
+    ContractReceiveChannelNew,
+    ContractReceiveNewTokenNetwork,
+    ContractReceiveRouteNew,
+)
+from raiden.utils import sha3
+
+CHAIN_ID = 337
+DEPOSIT = 10 ** 18
+TRANSFER_AMOUNT = 1
+FIRST_PORT = 40001
+RETRY_TIMEOUT = 0.1
+
+TOPOLOGIES = ('line', 'star', 'random')
+
+
+def make_bytes(prng, length):
+    return bytes(prng.getrandbits(8) for _ in range(length))
+
+
+def topology_edges(topology, number_of_nodes, prng):
+    """ Return the channels among the nodes `0 .. number_of_nodes - 1` as
+    pairs of indexes.
+    """
+    if topology == 'line':
+        return [(index, index + 1) for index in range(number_of_nodes - 1)]
+
+    if topology == 'star':
+        return [(0, index) for index in range(1, number_of_nodes)]
+
+    if topology == 'random':
+        # A random tree keeps the graph connected, the additional channels
+        # give alternative routes
+        edges = {
+            (prng.randrange(index), index)
+            for index in range(1, number_of_nodes)
+        }
+        possible_edges = number_of_nodes * (number_of_nodes - 1) // 2
+        extra_channels = min(number_of_nodes // 2, possible_edges - len(edges))
+
+        while extra_channels:
+            first, second = sorted(prng.sample(range(number_of_nodes), 2))
+            if (first, second) not in edges:
+                edges.add((first, second))
+                extra_channels -= 1
+
+        return sorted(edges)
+
+    raise ValueError('unknown topology {}, must be one of {}'.format(
+        topology,
+        ', '.join(TOPOLOGIES),
+    ))
+
+
+def create_nodes(chain, network, number_of_nodes, prng):
+    discovery = Discovery()
+    registry = LoopbackTokenNetworkRegistry(make_bytes(prng, 20))
+    secret_registry = LoopbackSecretRegistry(make_bytes(prng, 20))
+
+    transport_config = {
+        'retry_interval': DEFAULT_TRANSPORT_RETRY_INTERVAL,
+        'retries_before_backoff': DEFAULT_TRANSPORT_RETRIES_BEFORE_BACKOFF,
+        'nat_invitation_timeout': DEFAULT_NAT_INVITATION_TIMEOUT,
+        'nat_keepalive_retries': DEFAULT_NAT_KEEPALIVE_RETRIES,
+        'nat_keepalive_timeout': DEFAULT_NAT_KEEPALIVE_TIMEOUT,
+    }
+
+    nodes = list()
+    for index in range(number_of_nodes):
+        host_port = ('127.0.0.1', FIRST_PORT + index)
+        config = {
+            'external_ip': host_port[0],
+            'external_port': host_port[1],
+            'reveal_timeout': DEFAULT_REVEAL_TIMEOUT,
+            'settle_timeout': DEFAULT_SETTLE_TIMEOUT,
+            'database_path': ':memory:',
+            'shutdown_timeout': DEFAULT_SHUTDOWN_TIMEOUT,
+            'transport_type': 'udp',
+        }
+
+        # The throttling would measure the token bucket, not the node
+        transport = LoopbackTransport(
+            network,
+            discovery,
+            host_port,
+            DummyPolicy(),
+            transport_config,
+        )
+        node = RaidenService(
+            chain=chain,
+            query_start_block=0,
+            default_registry=registry,
+            default_secret_registry=secret_registry,
+            private_key_bin=sha3(make_bytes(prng, 32)),
+            transport=transport,
+            config=config,
+            discovery=discovery,
+        )
+        nodes.append(node)
+
+    return nodes
+
+
+def make_channel_state(channel_identifier, token_address, token_network_identifier, node, partner):
+    open_transaction = TransactionExecutionStatus(
+        None,
+        node.get_block_number(),
+        TransactionExecutionStatus.SUCCESS,
+    )
+
+    return NettingChannelState(
+        identifier=channel_identifier,
+        chain_id=CHAIN_ID,
+        token_address=token_address,
+        token_network_identifier=token_network_identifier,
+        reveal_timeout=node.config['reveal_timeout'],
+        settle_timeout=node.config['settle_timeout'],
+        our_state=NettingChannelEndState(node.address, DEPOSIT),
+        partner_state=NettingChannelEndState(partner.address, DEPOSIT),
+        open_transaction=open_transaction,
+        close_transaction=None,
+        settle_transaction=None,
+    )
+
+
+def open_channels(nodes, edges, prng):
+    """ Register a token network with all the nodes and open a channel with
+    `DEPOSIT` on both sides for every edge. Returns the token network
+    identifier.
+    """
+    token_address = make_bytes(prng, 20)
+    token_network_identifier = make_bytes(prng, 20)
+
+    for node in nodes:
+        new_token_network = ContractReceiveNewTokenNetwork(
+            node.default_registry.address,
+            TokenNetworkState(token_network_identifier, token_address),
+        )
+        node.handle_state_change(new_token_network)
+
+    for first, second in edges:
+        participants = (nodes[first], nodes[second])
+        channel_identifier = make_bytes(prng, 32)
+
+        for node in nodes:
+            if node in participants:
+                partner = participants[1] if node is participants[0] else participants[0]
+                channel_state = make_channel_state(
+                    channel_identifier,
+                    token_address,
+                    token_network_identifier,
+                    node,
+                    partner,
+                )
+                node.handle_state_change(
+                    ContractReceiveChannelNew(token_network_identifier, channel_state),
+                )
+                node.start_health_check_for(partner.address)
+            else:
+                node.handle_state_change(ContractReceiveRouteNew(
+                    token_network_identifier,
+                    participants[0].address,
+                    participants[1].address,
+                ))
+
+    return token_network_identifier
+
+
+def wait_for_neighbours(nodes, timeout):
+    with gevent.Timeout(timeout):
+        for node in nodes:
+            for neighbour in views.all_neighbour_nodes(views.state_from_raiden(node)):
+                waiting.wait_for_healthy(node, neighbour, RETRY_TIMEOUT)
+
+
+def run_transfers(nodes, token_network_identifier, pairs, concurrency, timeout):
+    """ Make a mediated transfer for every (initiator, target) pair, with at
+    most `concurrency` transfers in flight. Returns the duration of the
+    successful transfers, the number of failed transfers and the total time.
+    """
+    durations = list()
+    failed = 0
+
+    def transfer(payment_identifier, initiator, target):
+        nonlocal failed
+
+        start = time.perf_counter()
+        async_result = initiator.mediated_transfer_async(
+            token_network_identifier,
+            TRANSFER_AMOUNT,
+            target.address,
+            payment_identifier,
+        )
+
+        if async_result.wait(timeout) and async_result.get():
+            durations.append(time.perf_counter() - start)
+        else:
+            failed += 1
+
+    pool = Pool(concurrency)
+    start = time.perf_counter()
+    for payment_identifier, (initiator, target) in enumerate(pairs, start=1):
+        pool.spawn(transfer, payment_identifier, nodes[initiator], nodes[target])
+    pool.join()
+
+    return durations, failed, time.perf_counter() - start
+
+
+def run_benchmark(
+        seed=0,
+        nodes=5,
+        topology='line',
+        transfers=100,
+        concurrency=10,
+        network_delay=0,
+        transfer_timeout=30,
+):
+    if nodes < 2:
+        raise ValueError('at least two nodes are needed')
+
+    prng = random.Random(seed)
+    parameters = {
+        'seed': seed,
+        'nodes': nodes,
+        'topology': topology,
+        'transfers': transfers,
+        'concurrency': concurrency,
+        'network_delay': network_delay,
+    }
+
+    edges = topology_edges(topology, nodes, prng)
+    pairs = [tuple(prng.sample(range(nodes), 2)) for _ in range(transfers)]
+
+    graph = networkx.Graph(edges)
+    hops = [networkx.shortest_path_length(graph, *pair) for pair in pairs]
+
+    chain = LoopbackChain(CHAIN_ID)
+    network = LoopbackNetwork(network_delay)
+    raiden_nodes = create_nodes(chain, network, nodes, prng)
+
+    try:
+        token_network_identifier = open_channels(raiden_nodes, edges, prng)
+        wait_for_neighbours(raiden_nodes, transfer_timeout)
+
+        # Only the messages of the transfers are measured
+        network.latencies.clear()
+        durations, failed, elapsed = run_transfers(
+            raiden_nodes,
+            token_network_identifier,
+            pairs,
+            concurrency,
+            transfer_timeout,
+        )
+    finally:
+        for node in raiden_nodes:
+            node.stop()
+
+    return {
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'parameters': parameters,
+        'channels': len(edges),
+        'mean_hops': sum(hops) / len(hops) if hops else None,
+        'completed_transfers': len(durations),
+        'failed_transfers': failed,
+        'transfers_per_second': len(durations) / elapsed if elapsed else None,
+        'transfers': summarize(durations) if durations else None,
+        'messages': {
+            name: summarize(latencies)
+            for name, latencies in sorted(network.latencies.items())
+        },
+    }
+
+
+def main():
+    import argparse
+
+    from raiden.log_config import configure_logging
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', default=0, type=int)
+    parser.add_argument('--nodes', default=5, type=int)
+    parser.add_argument('--topology', default='line', choices=TOPOLOGIES)
+    parser.add_argument('--transfers', default=100, type=int)
+    parser.add_argument(
+        '--concurrency',
+        default=10,
+        type=int,
+        help='Number of transfers in flight.',
+    )
+    parser.add_argument(
+        '--network-delay',
+        default=0,
+        type=float,
+        help='Seconds added to the delivery of every message.',
+    )
+    parser.add_argument(
+        '--transfer-timeout',
+        default=30,
+        type=float,
+        help='Seconds to wait for a transfer before counting it as failed.',
+    )
+    parser.add_argument('--log-level', default='ERROR')
+    parser.add_argument('--output', help='Write the results to this file instead of stdout.')
+    args = parser.parse_args()
+
+    configure_logging({'': args.log_level}, colorize=False)
+
+    result = run_benchmark(
+        seed=args.seed,
+        nodes=args.nodes,
+        topology=args.topology,
+        transfers=args.transfers,
+        concurrency=args.concurrency,
+        network_delay=args.network_delay,
+        transfer_timeout=args.transfer_timeout,
+    )
+
+    if args.output:
+        with open(args.output, 'w') as handler:
+            json.dump(result, handler, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(result, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,9 @@
 from http import HTTPStatus
 
+import json
 import time
 import logging
+import gevent
 import pytest
 import grequests
 from flask import url_for
@@ -743,6 +745,7 @@ def test_api_tokens(api_backend, blockchain_services, token_addresses):
     )
     response = request.send().response
     assert_proper_response(response)
+    etag = response.headers['ETag']
     response = response.json()
     expected_response = [
         to_checksum_address(token_address1),
@@ -750,6 +753,18 @@ def test_api_tokens(api_backend, blockchain_services, token_addresses):
     ]
     assert set(response) == set(expected_response)
 
+    # an unchanged list is not sent again
+    request = grequests.get(
+        api_url_for(
+            api_backend,
+            'tokensresource',
+        ),
+        headers={'If-None-Match': etag},
+    )
+    response = request.send().response
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+
 
 @pytest.mark.parametrize('number_of_nodes', [1])
 @pytest.mark.parametrize('channels_per_node', [0])
@@ -860,6 +875,169 @@ def test_api_transfers(api_backend, raiden_network, token_addresses):
     assert_proper_response(response)
     response = response.json()
     assert response == transfer
+
+
+@pytest.mark.parametrize('number_of_nodes', [2])
+def test_api_transfer_batch(api_backend, raiden_network, token_addresses):
+    _, app1 = raiden_network
+    token_address = token_addresses[0]
+    target_address = to_checksum_address(app1.raiden.address)
+
+    payments = [
+        {'target_address': target_address, 'amount': 10, 'identifier': 1},
+        {'target_address': target_address, 'amount': 20, 'identifier': 2},
+        {'target_address': target_address, 'amount': 30},
+        # larger than the channel capacity
+        {'target_address': target_address, 'amount': 10 ** 9, 'identifier': 4},
+    ]
+
+    request = grequests.post(
+        api_url_for(
+            api_backend,
+            'transferbatchresource',
+            token_address=to_checksum_address(token_address),
+        ),
+        json={'payments': payments},
+    )
+    response = request.send().response
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['Content-Type'] == 'application/x-ndjson'
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert len(results) == len(payments)
+
+    success = {result['identifier']: result['success'] for result in results}
+    assert success[1] and success[2]
+    assert success[4] is False
+    assert sum(result['amount'] for result in results if result['success']) == 60
+
+    request = grequests.post(
+        api_url_for(
+            api_backend,
+            'transferbatchresource',
+            token_address=to_checksum_address(token_address),
+        ),
+        json={'payments': [payments[0], payments[0]]},
+    )
+    response = request.send().response
+    assert_response_with_error(response, HTTPStatus.CONFLICT)
+
+
+@pytest.mark.parametrize('number_of_nodes', [2])
+def test_api_crosstransaction_batch(api_backend, raiden_network, token_addresses):
+    _, app1 = raiden_network
+    token_address = to_checksum_address(token_addresses[0])
+    target_address = to_checksum_address(app1.raiden.address)
+
+    def crosstransaction(identifier, sendETH_amount=10):
+        return {
+            'target_address': target_address,
+            'token_address': token_address,
+            'sendETH_amount': sendETH_amount,
+            'sendBTC_amount': 2,
+            'receiveBTC_address': '1JnC15WwDVcC3QbQRUY6ChqRLucLpTGaJN',
+            'identifier': identifier,
+        }
+
+    def post_batch(crosstransactions):
+        request = grequests.post(
+            api_url_for(api_backend, 'crosstransactionbatch'),
+            json={'crosstransactions': crosstransactions},
+        )
+        return request.send().response
+
+    response = post_batch([crosstransaction(101), crosstransaction(102)])
+    assert_proper_response(response, HTTPStatus.ACCEPTED)
+    assert [result['crossid'] for result in response.json()] == [101, 102]
+
+    # the identifiers must be unique within the batch and unused
+    response = post_batch([crosstransaction(103), crosstransaction(103)])
+    assert_response_with_error(response, HTTPStatus.CONFLICT)
+    response = post_batch([crosstransaction(101)])
+    assert_response_with_error(response, HTTPStatus.CONFLICT)
+
+    # a batch with an invalid swap starts none of them
+    response = post_batch([crosstransaction(104), crosstransaction(105, sendETH_amount=0)])
+    assert_response_with_error(response, HTTPStatus.CONFLICT)
+    response = post_batch([crosstransaction(104)])
+    assert_proper_response(response, HTTPStatus.ACCEPTED)
+
+    # the identifiers must fit in a SQLite INTEGER
+    response = post_batch([crosstransaction(-1)])
+    assert_response_with_error(response, HTTPStatus.BAD_REQUEST)
+    response = post_batch([crosstransaction(2 ** 63)])
+    assert_response_with_error(response, HTTPStatus.BAD_REQUEST)
+
+
+@pytest.mark.parametrize('number_of_nodes', [2])
+def test_api_raiden_events_feed(api_backend, raiden_network, token_addresses):
+    _, app1 = raiden_network
+    token_address = token_addresses[0]
+    api_server, _ = api_backend
+    raiden_api = api_server.rest_api.raiden_api
+
+    request = grequests.get(
+        api_url_for(api_backend, 'raideneventsfeedresource'),
+        params={
+            'event_types': 'EventTransferSentSuccess',
+            'token_address': to_checksum_address(token_address),
+            'partner_address': to_checksum_address(app1.raiden.address),
+        },
+        stream=True,
+    )
+    response = request.send().response
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['Content-Type'].startswith('text/event-stream')
+
+    gevent.spawn(
+        raiden_api.transfer,
+        raiden_api.raiden.default_registry.address,
+        token_address,
+        10,
+        app1.raiden.address,
+        identifier=7,
+    )
+
+    with gevent.Timeout(10):
+        lines = response.iter_lines(decode_unicode=True)
+        data = next(line for line in lines if line.startswith('data: '))
+
+    event = json.loads(data[len('data: '):])
+    assert event['event'] == 'EventTransferSentSuccess'
+    assert event['identifier'] == 7
+    assert event['target'] == to_checksum_address(app1.raiden.address)
+    response.close()
+
+
+@pytest.mark.parametrize('number_of_nodes', [1])
+@pytest.mark.parametrize('channels_per_node', [0])
+def test_api_profiler(api_backend):
+    request = grequests.post(
+        api_url_for(api_backend, 'profilerresource'),
+        json={'duration': 0.5, 'format': 'json'},
+    )
+    response = request.send().response
+    assert_proper_response(response)
+
+    profile = response.json()
+    assert profile['interval'] == 0.005
+    assert profile['samples'] == sum(profile['greenlets'].values())
+    assert profile['samples'] == sum(profile['stacks'].values())
+
+    request = grequests.post(
+        api_url_for(api_backend, 'profilerresource'),
+        json={'duration': 0},
+    )
+    response = request.send().response
+    assert_proper_response(response)
+    assert response.headers['Content-Type'].startswith('text/plain')
+
+    request = grequests.post(
+        api_url_for(api_backend, 'profilerresource'),
+        json={'duration': -1},
+    )
+    response = request.send().response
+    assert_response_with_error(response, HTTPStatus.BAD_REQUEST)
 #demo
 @pytest.mark.parametrize('number_of_nodes', [2])
 def test_api_crosstransactiontry(api_backend, raiden_network, token_addresses):
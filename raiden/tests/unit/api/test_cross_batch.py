@@ -0,0 +1,147 @@
+import random
+from collections import defaultdict
+from types import SimpleNamespace
+
+import pytest
+from marshmallow import ValidationError
+
+from raiden.api.python import RaidenAPI
+from raiden.api.v1.encoding import CrossTransactionBatchSchema
+from raiden.constants import CROSS_STATUS_CREATED, CROSS_STATUS_DONE, INT64_MAX
+from raiden.exceptions import DuplicatedCrossIdentifier, InvalidAmount, UnknownTokenAddress
+from raiden.storage.serialize import PickleSerializer
+from raiden.storage.sqlite import SQLiteStorage
+from raiden.tests.utils import factories
+from raiden.transfer import node
+from raiden.transfer.state import ChainState, CrossSwapState
+from raiden.transfer.state_change import ActionInitCrossSwap
+
+TOKEN_ADDRESS = factories.make_address()
+TOKEN_NETWORK_IDENTIFIER = factories.make_address()
+
+
+class FakeRaiden:
+    """ Records the swaps started instead of sending them. """
+
+    def __init__(self):
+        self.address = factories.HOP1
+        self.chain_state = ChainState(random.Random(), 1, 1)
+        self.wal = SimpleNamespace(
+            state_manager=SimpleNamespace(current_state=self.chain_state),
+            storage=SQLiteStorage(':memory:', PickleSerializer),
+        )
+        self.identifier_to_results = defaultdict(list)
+        self.started = list()
+
+    def start_crosstransaction(self, token_network_identifier, target_address, *args):
+        self.started.append((token_network_identifier, target_address) + args)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    views = RaidenAPI.__init__.__globals__['views']
+    monkeypatch.setattr(
+        views,
+        'get_token_network_addresses_for',
+        lambda chain_state, registry_address: [TOKEN_ADDRESS],
+    )
+    monkeypatch.setattr(
+        views,
+        'get_token_network_identifier_by_token_address',
+        lambda chain_state, registry_address, token_address: TOKEN_NETWORK_IDENTIFIER,
+    )
+    return RaidenAPI(FakeRaiden())
+
+
+def make_crosstransaction(identifier=None, sendETH_amount=10):
+    return {
+        'initiator_address': None,
+        'target_address': factories.HOP2,
+        'token_address': TOKEN_ADDRESS,
+        'sendETH_amount': sendETH_amount,
+        'sendBTC_amount': 5,
+        'receiveBTC_address': 'btc',
+        'identifier': identifier,
+        'cross_type': None,
+    }
+
+
+def test_cross_batch_starts_all_swaps(api):
+    crosstransactions = [
+        make_crosstransaction(1),
+        make_crosstransaction(0),
+        make_crosstransaction(),
+    ]
+
+    cross_ids = api.crosstransaction_batch_async(factories.ADDR, crosstransactions)
+
+    assert cross_ids[:2] == [1, 0]
+    assert len(set(cross_ids)) == 3
+    assert [started[-1] for started in api.raiden.started] == cross_ids
+    assert all(started[0] == TOKEN_NETWORK_IDENTIFIER for started in api.raiden.started)
+    assert all(started[2] == api.raiden.address for started in api.raiden.started)
+
+
+def test_cross_batch_rejects_duplicated_identifiers(api):
+    with pytest.raises(DuplicatedCrossIdentifier):
+        api.crosstransaction_batch_async(
+            factories.ADDR,
+            [make_crosstransaction(1), make_crosstransaction(2), make_crosstransaction(1)],
+        )
+    assert not api.raiden.started
+
+    # the identifier of a swap in flight
+    cross_swap = CrossSwapState(
+        3,
+        factories.HOP1,
+        factories.HOP2,
+        TOKEN_NETWORK_IDENTIFIER,
+        10,
+        5,
+        'btc',
+        CROSS_STATUS_CREATED,
+    )
+    node.state_transition(api.raiden.chain_state, ActionInitCrossSwap(cross_swap))
+    with pytest.raises(DuplicatedCrossIdentifier):
+        api.crosstransaction_batch_async(factories.ADDR, [make_crosstransaction(3)])
+
+    # the identifier of a finished swap
+    api.raiden.wal.storage.create_crosstransaction(
+        factories.HOP1, factories.HOP2, TOKEN_NETWORK_IDENTIFIER, 10, 5, 'btc',
+        CROSS_STATUS_DONE, 4,
+    )
+    with pytest.raises(DuplicatedCrossIdentifier):
+        api.crosstransaction_batch_async(factories.ADDR, [make_crosstransaction(4)])
+
+    assert not api.raiden.started
+
+
+def test_cross_batch_with_an_invalid_swap_starts_none(api):
+    invalid_amount = [make_crosstransaction(1), make_crosstransaction(2, sendETH_amount=0)]
+    with pytest.raises(InvalidAmount):
+        api.crosstransaction_batch_async(factories.ADDR, invalid_amount)
+
+    unknown_token = make_crosstransaction(3)
+    unknown_token['token_address'] = factories.make_address()
+    with pytest.raises(UnknownTokenAddress):
+        api.crosstransaction_batch_async(factories.ADDR, [make_crosstransaction(4), unknown_token])
+
+    assert not api.raiden.started
+
+
+@pytest.mark.parametrize('identifier', [-1, INT64_MAX + 1])
+def test_cross_batch_schema_rejects_identifiers_out_of_range(identifier):
+    crosstransaction = {
+        'sendETH_amount': 10,
+        'sendBTC_amount': 5,
+        'receiveBTC_address': 'btc',
+        'identifier': identifier,
+    }
+    schema = CrossTransactionBatchSchema()
+
+    with pytest.raises(ValidationError):
+        schema.load({'crosstransactions': [crosstransaction]})
+
+    crosstransaction['identifier'] = INT64_MAX
+    loaded = schema.load({'crosstransactions': [crosstransaction]}).data
+    assert loaded['crosstransactions'][0]['identifier'] == INT64_MAX
@@ -0,0 +1,107 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from raiden.api.python import RaidenAPI
+from raiden.api.rest import normalize_events_list
+from raiden.storage.serialize import PickleSerializer
+from raiden.storage.sqlite import SQLiteStorage
+from raiden.tests.utils import factories
+from raiden.transfer.events import (
+    EventTransferReceivedSuccess,
+    EventTransferSentFailed,
+    EventTransferSentSuccess,
+)
+
+TOKEN_ADDRESS = factories.make_address()
+TOKEN_NETWORK_IDENTIFIER = factories.make_address()
+CHANNEL_IDENTIFIER = factories.make_channel_identifier()
+OTHER_CHANNEL_IDENTIFIER = factories.make_channel_identifier()
+
+
+class FakeRaiden:
+    """ Has the payment events of two channels of a token network and of a
+    channel of another token network.
+    """
+
+    def __init__(self):
+        self.chain = None
+        self.default_registry = SimpleNamespace(
+            address=factories.ADDR,
+            get_token_network=lambda token_address: TOKEN_NETWORK_IDENTIFIER,
+        )
+        self.wal = SimpleNamespace(storage=SQLiteStorage(':memory:', PickleSerializer))
+
+        storage = self.wal.storage
+        state_change_id = storage.write_state_change('statechangedata')
+        storage.write_events(state_change_id, 1, [
+            EventTransferSentSuccess(
+                1,
+                10,
+                factories.HOP2,
+                TOKEN_NETWORK_IDENTIFIER,
+                CHANNEL_IDENTIFIER,
+            ),
+            EventTransferReceivedSuccess(
+                2,
+                10,
+                factories.HOP2,
+                TOKEN_NETWORK_IDENTIFIER,
+                OTHER_CHANNEL_IDENTIFIER,
+            ),
+            EventTransferSentFailed(
+                3,
+                'whatever',
+                factories.make_address(),
+                factories.make_channel_identifier(),
+            ),
+        ])
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api_globals = RaidenAPI.__init__.__globals__
+    monkeypatch.setitem(
+        api_globals,
+        'get_all_netting_channel_events',
+        lambda *args, **kwargs: list(),
+    )
+    monkeypatch.setitem(api_globals, 'get_token_network_events', lambda *args, **kwargs: list())
+
+    api = RaidenAPI(FakeRaiden())
+    channels = {
+        factories.HOP2: SimpleNamespace(identifier=CHANNEL_IDENTIFIER),
+        factories.HOP3: SimpleNamespace(identifier=OTHER_CHANNEL_IDENTIFIER),
+    }
+    monkeypatch.setattr(
+        api,
+        'get_channel_list',
+        lambda registry_address, token_address, partner_address: (
+            list(channels.values())
+            if partner_address is None
+            else [channels[partner_address]]
+        ),
+    )
+    return api
+
+
+def test_channel_events_are_the_events_of_the_channel(api):
+    channel_events = api.get_channel_events(TOKEN_ADDRESS, factories.HOP2)
+    assert [event['identifier'] for event in channel_events] == [1]
+    assert channel_events[0]['channel_identifier'] == CHANNEL_IDENTIFIER
+
+    token_events = api.get_channel_events(TOKEN_ADDRESS)
+    assert sorted(event['identifier'] for event in token_events) == [1, 2]
+
+    encoded_events = json.loads(json.dumps(normalize_events_list(channel_events)))
+    assert encoded_events[0]['channel_identifier'] == '0x' + CHANNEL_IDENTIFIER.hex()
+
+
+def test_token_network_events_are_the_events_of_the_token_network(api):
+    token_events = api.get_token_network_events(TOKEN_ADDRESS, 0)
+    assert sorted(event['identifier'] for event in token_events) == [1, 2]
+    assert all(
+        event['token_network_identifier'] == TOKEN_NETWORK_IDENTIFIER
+        for event in token_events
+    )
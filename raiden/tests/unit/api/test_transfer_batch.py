@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+
+import gevent
+import pytest
+from gevent.event import AsyncResult
+
+from raiden.api.python import RaidenAPI
+from raiden.tests.utils import factories
+
+TOKEN_ADDRESS = factories.make_address()
+TOKEN_NETWORK_IDENTIFIER = factories.make_address()
+
+
+class FakeRaiden:
+    """ Records the transfers started, they are completed by the test. """
+
+    def __init__(self):
+        self.address = factories.HOP1
+        self.default_registry = SimpleNamespace(address=factories.ADDR)
+        self.wal = SimpleNamespace(state_manager=SimpleNamespace(current_state=None))
+        self.identifier_to_results = dict()
+        self.started = list()
+        self.failing_identifiers = set()
+
+    def mediated_transfer_async(self, token_network_identifier, amount, target, identifier):
+        if identifier in self.failing_identifiers:
+            raise RuntimeError('the payment could not be logged')
+
+        async_result = AsyncResult()
+        self.started.append((amount, target, identifier, async_result))
+        return async_result
+
+
+@pytest.fixture
+def api(monkeypatch):
+    views = RaidenAPI.__init__.__globals__['views']
+    monkeypatch.setattr(
+        views,
+        'get_token_network_addresses_for',
+        lambda chain_state, registry_address: [TOKEN_ADDRESS],
+    )
+    monkeypatch.setattr(
+        views,
+        'get_token_network_identifier_by_token_address',
+        lambda chain_state, registry_address, token_address: TOKEN_NETWORK_IDENTIFIER,
+    )
+    api = RaidenAPI(FakeRaiden())
+    monkeypatch.setattr(
+        api,
+        '_get_distributable_per_channel',
+        lambda registry_address, token_address: 100,
+    )
+    return api
+
+
+def make_payment(amount, identifier=None):
+    return {
+        'target_address': factories.HOP2,
+        'amount': amount,
+        'identifier': identifier,
+    }
+
+
+def test_transfer_batch_starts_without_reading_the_results(api):
+    payments = [make_payment(10, 0), make_payment(20, 7), make_payment(30)]
+
+    results = api.transfer_batch_async(factories.ADDR, TOKEN_ADDRESS, payments)
+    gevent.sleep(0)
+
+    started = api.raiden.started
+    assert [transfer[0] for transfer in started] == [10, 20, 30]
+    assert [transfer[2] for transfer in started[:2]] == [0, 7]
+    assert started[2][2] is not None
+
+    started[1][3].set(True)
+    started[0][3].set(False)
+    started[2][3].set(True)
+
+    completed = [(payment['amount'], result) for payment, result in results]
+    assert sorted(completed) == [(10, False), (20, True), (30, True)]
+
+
+def test_transfer_batch_fails_a_payment_no_channel_can_carry(api):
+    payments = [make_payment(10, 1), make_payment(200, 2)]
+
+    results = api.transfer_batch_async(factories.ADDR, TOKEN_ADDRESS, payments)
+    gevent.sleep(0)
+
+    assert len(api.raiden.started) == 1
+    api.raiden.started[0][3].set(True)
+
+    completed = [(payment['identifier'], result) for payment, result in results]
+    assert completed == [(1, True), (2, False)]
+
+
+def test_transfer_batch_reports_the_payments_which_fail_to_start(api):
+    api.raiden.failing_identifiers.add(2)
+    payments = [make_payment(10, 1), make_payment(10, 2), make_payment(10, 3), make_payment(10, 4)]
+
+    results = api.transfer_batch_async(factories.ADDR, TOKEN_ADDRESS, payments)
+
+    # a concurrent request used the identifier after the batch was validated
+    api.raiden.identifier_to_results[3] = AsyncResult()
+    gevent.sleep(0)
+
+    started = api.raiden.started
+    assert [transfer[2] for transfer in started] == [1, 4]
+    started[0][3].set(True)
+    started[1][3].set_exception(RuntimeError('the payment failed'))
+
+    completed = sorted((payment['identifier'], result) for payment, result in results)
+    assert completed == [(1, True), (2, False), (3, False), (4, False)]
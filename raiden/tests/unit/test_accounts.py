@@ -1,15 +1,22 @@
+import json
 import logging
 import os
+import shutil
+import stat
+import time
 from unittest.mock import patch
 
 import pytest
 
-from raiden.accounts import AccountManager
+from raiden.accounts import AccountManager, UnlockCache
 from raiden.utils import get_project_root
-from eth_utils import encode_hex
+from eth_utils import decode_hex, encode_hex
 
 KEYFILE_INACCESSIBLE = 'UTC--2017-06-20T16-33-00.000000000Z--inaccessible'
 KEYFILE_INVALID = 'UTC--2017-06-20T16-06-00.000000000Z--invalid'
+KEYFILE_VALID = 'UTC--2016-10-26T16-55-53.551024336Z--0d5a0e4fece4b84365b9b8dba6e6d41348c73645'
+ADDRESS_VALID = '0d5a0e4fece4b84365b9b8dba6e6d41348c73645'
+PRIVKEY_VALID = '0xf696ecb5c767263c797a035db6f6008d38d852960ed33a491a58390b003fb605'
 
 import structlog
 log = structlog.get_logger()
@@ -110,3 +117,143 @@ def test_account_manager_invalid_directory(caplog):
                 break
         else:
             assert False, "'{}' not in log messages".format(msg)
+
+
+@pytest.fixture
+def copied_keystore(tmpdir):
+    keystore = tmpdir.mkdir('keystore')
+    shutil.copy(
+        os.path.join(get_project_root(), 'tests', 'test_files', KEYFILE_VALID),
+        str(keystore),
+    )
+    return str(keystore)
+
+
+def test_keystore_index(copied_keystore, tmpdir):
+    index_path = str(tmpdir.join('datadir', 'keystore_index.json'))
+    keyfile = os.path.join(copied_keystore, KEYFILE_VALID)
+
+    account_manager = AccountManager(copied_keystore, index_path=index_path)
+    assert account_manager.accounts == {ADDRESS_VALID: keyfile}
+    assert stat.S_IMODE(os.stat(index_path).st_mode) == 0o600
+
+    with open(index_path) as handler:
+        index = json.load(handler)
+    assert index['files'][KEYFILE_VALID]['address'] == ADDRESS_VALID
+
+    # The unchanged keystore files are not parsed again
+    index['files'][KEYFILE_VALID]['address'] = 'indexed'
+    with open(index_path, 'w') as handler:
+        json.dump(index, handler)
+    assert AccountManager(copied_keystore, index_path=index_path).accounts == {'indexed': keyfile}
+
+    # The index of another keystore directory is ignored
+    other_keystore = str(tmpdir.mkdir('other'))
+    shutil.copy(keyfile, other_keystore)
+    other_manager = AccountManager(other_keystore, index_path=index_path)
+    assert list(other_manager.accounts) == [ADDRESS_VALID]
+
+    stat_ = os.stat(keyfile)
+    os.utime(keyfile, ns=(stat_.st_atime_ns, stat_.st_mtime_ns + 10 ** 9))
+    assert AccountManager(copied_keystore, index_path=index_path).accounts == {
+        ADDRESS_VALID: keyfile,
+    }
+
+
+@pytest.mark.parametrize('index', [[], 'index', {'files': []}, {'files': None}])
+def test_keystore_index_with_invalid_content(copied_keystore, tmpdir, index):
+    index_path = str(tmpdir.join('keystore_index.json'))
+    keyfile = os.path.join(copied_keystore, KEYFILE_VALID)
+
+    if isinstance(index, dict):
+        index['keystore_path'] = os.path.abspath(copied_keystore)
+    with open(index_path, 'w') as handler:
+        json.dump(index, handler)
+
+    account_manager = AccountManager(copied_keystore, index_path=index_path)
+    assert account_manager.accounts == {ADDRESS_VALID: keyfile}
+
+
+def test_unlock_cache(copied_keystore, tmpdir):
+    cache_path = str(tmpdir.join('datadir', 'unlock_cache.json'))
+    keyfile = os.path.join(copied_keystore, KEYFILE_VALID)
+
+    account_manager = AccountManager(
+        copied_keystore,
+        unlock_cache=UnlockCache(cache_path, lifetime=60),
+    )
+    assert encode_hex(account_manager.get_privkey(ADDRESS_VALID, '123')) == PRIVKEY_VALID
+    assert stat.S_IMODE(os.stat(cache_path).st_mode) == 0o600
+
+    with open(cache_path) as handler:
+        assert PRIVKEY_VALID[2:] not in handler.read()
+
+    # A restarted node is not asked for the password
+    account_manager = AccountManager(
+        copied_keystore,
+        unlock_cache=UnlockCache(cache_path, lifetime=60),
+    )
+    with patch('getpass.getpass', side_effect=AssertionError('password prompted')):
+        assert encode_hex(account_manager.get_privkey(ADDRESS_VALID)) == PRIVKEY_VALID
+
+    unlock_cache = UnlockCache(cache_path, lifetime=60)
+    with patch('raiden.accounts.local_secret', return_value=b'another machine'):
+        assert unlock_cache.get(ADDRESS_VALID, keyfile) is None
+
+    with patch('time.time', return_value=10 ** 10):
+        assert unlock_cache.get(ADDRESS_VALID, keyfile) is None
+
+    with open(keyfile, 'a') as handler:
+        handler.write('\n')
+    assert unlock_cache.get(ADDRESS_VALID, keyfile) is None
+
+    unlock_cache.clear()
+    assert not os.path.exists(cache_path)
+
+
+def test_unlock_cache_does_not_override_the_password(copied_keystore, tmpdir):
+    cache_path = str(tmpdir.join('datadir', 'unlock_cache.json'))
+    account_manager = AccountManager(
+        copied_keystore,
+        unlock_cache=UnlockCache(cache_path, lifetime=60),
+    )
+    assert encode_hex(account_manager.get_privkey(ADDRESS_VALID, '123')) == PRIVKEY_VALID
+
+    with pytest.raises(ValueError):
+        account_manager.get_privkey(ADDRESS_VALID, 'wrong password')
+
+
+def test_unlock_cache_purges_the_expired_keys(copied_keystore, tmpdir):
+    cache_path = str(tmpdir.join('datadir', 'unlock_cache.json'))
+    keyfile = os.path.join(copied_keystore, KEYFILE_VALID)
+    privkey = decode_hex(PRIVKEY_VALID)
+
+    unlock_cache = UnlockCache(cache_path, lifetime=60)
+    unlock_cache.put(ADDRESS_VALID, keyfile, privkey)
+    with patch('time.time', return_value=time.time() + 30):
+        unlock_cache.put('other', keyfile, privkey)
+
+    with patch('time.time', return_value=time.time() + 70):
+        assert unlock_cache.get(ADDRESS_VALID, keyfile) is None
+
+    with open(cache_path) as handler:
+        assert list(json.load(handler)) == ['other']
+
+    with patch('time.time', return_value=time.time() + 100):
+        assert unlock_cache.get('other', keyfile) is None
+    assert not os.path.exists(cache_path)
+
+
+def test_unlock_cache_without_the_system_ids(copied_keystore, tmpdir):
+    cache_path = str(tmpdir.join('datadir', 'unlock_cache.json'))
+    keyfile = os.path.join(copied_keystore, KEYFILE_VALID)
+    privkey = decode_hex(PRIVKEY_VALID)
+
+    unlock_cache = UnlockCache(cache_path, lifetime=60)
+    with patch('raiden.accounts.read_system_id', return_value=None):
+        unlock_cache.put(ADDRESS_VALID, keyfile, privkey)
+        assert not os.path.exists(cache_path)
+
+    unlock_cache.put(ADDRESS_VALID, keyfile, privkey)
+    with patch('raiden.accounts.read_system_id', return_value=None):
+        assert unlock_cache.get(ADDRESS_VALID, keyfile) is None
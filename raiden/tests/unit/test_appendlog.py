@@ -0,0 +1,198 @@
+import os
+
+import pytest
+
+from raiden.exceptions import InvalidDBData
+from raiden.storage.appendlog import AppendLogStorage
+from raiden.storage.base import open_storage
+from raiden.storage.serialize import PickleSerializer
+from raiden.storage.sqlite import SQLiteStorage
+from raiden.storage.wal import restore_from_latest_snapshot
+from raiden.tests.unit.test_wal import new_crosstransaction, state_transtion_acc
+from raiden.tests.utils import factories
+from raiden.transfer.events import ContractSendChannelBatchUnlock, EventTransferSentFailed
+from raiden.transfer.state_change import Block
+
+
+@pytest.fixture(params=['sqlite', 'appendlog'])
+def storage(request, tmpdir):
+    return open_storage(str(tmpdir.join('log.db')), PickleSerializer, request.param)
+
+
+def write_events(storage, token_network_identifier):
+    for block_number in range(1, 6):
+        state_change_id = storage.write_state_change(Block(block_number))
+        storage.write_events(
+            state_change_id,
+            block_number,
+            [
+                EventTransferSentFailed(block_number, 'whatever'),
+                ContractSendChannelBatchUnlock(
+                    token_network_identifier,
+                    factories.make_channel_identifier(),
+                    [],
+                ),
+            ],
+        )
+
+
+def test_open_storage(tmpdir):
+    database_path = str(tmpdir.join('sqlite', 'log.db'))
+    tmpdir.mkdir('sqlite')
+    assert isinstance(open_storage(database_path, PickleSerializer), SQLiteStorage)
+    assert isinstance(open_storage(':memory:', PickleSerializer, 'appendlog'), SQLiteStorage)
+
+    database_path = str(tmpdir.join('log.db'))
+    storage = open_storage(database_path, PickleSerializer, 'appendlog')
+    assert isinstance(storage, AppendLogStorage)
+    assert storage.directory == str(tmpdir.join('log.appendlog'))
+
+    with pytest.raises(ValueError):
+        open_storage(database_path, PickleSerializer, 'unknown')
+
+
+def test_open_storage_with_the_data_of_the_other_backend(tmpdir):
+    sqlite_path = str(tmpdir.join('sqlite', 'log.db'))
+    tmpdir.mkdir('sqlite')
+    open_storage(sqlite_path, PickleSerializer, 'sqlite').write_state_change(Block(1))
+    with pytest.raises(InvalidDBData):
+        open_storage(sqlite_path, PickleSerializer, 'appendlog')
+    assert not os.path.exists(str(tmpdir.join('sqlite', 'log.appendlog')))
+
+    appendlog_path = str(tmpdir.join('appendlog', 'log.db'))
+    open_storage(appendlog_path, PickleSerializer, 'appendlog')
+
+    # an appendlog without state changes is not in the way of sqlite
+    assert isinstance(open_storage(appendlog_path, PickleSerializer, 'sqlite'), SQLiteStorage)
+    os.unlink(appendlog_path)
+
+    open_storage(appendlog_path, PickleSerializer, 'appendlog').write_state_change(Block(1))
+    with pytest.raises(InvalidDBData):
+        open_storage(appendlog_path, PickleSerializer, 'sqlite')
+    assert not os.path.exists(appendlog_path)
+
+
+def test_storage_backends_log(storage):
+    token_network_identifier = factories.make_address()
+    write_events(storage, token_network_identifier)
+
+    state_changes = storage.get_statechanges_by_identifier(2, 'latest')
+    assert state_changes == [Block(number) for number in range(2, 6)]
+    assert storage.get_statechanges_by_identifier(2, 3) == [Block(2), Block(3)]
+    assert storage.get_cross_state_change_by_identifier(4) == Block(4)
+
+    events = storage.get_events_by_identifier(0, 'latest')
+    assert len(events) == 10
+    assert events[0][0] == 1
+    assert isinstance(events[0][1], EventTransferSentFailed)
+
+    assert [block for block, _ in storage.get_events_by_block(2, 3)] == [2, 2, 3, 3]
+
+    failed_name = EventTransferSentFailed.__name__
+    first_page = storage.get_events_page(limit=2, event_types=[failed_name])
+    assert [event.identifier for _, _, event in first_page] == [5, 4]
+
+    second_page = storage.get_events_page(
+        limit=2,
+        before_identifier=first_page[-1][0],
+        event_types=[failed_name],
+    )
+    assert [event.identifier for _, _, event in second_page] == [3, 2]
+
+    newer = storage.get_events_page(after_identifier=second_page[0][0], event_types=[failed_name])
+    assert [event.identifier for _, _, event in newer] == [4, 5]
+
+    in_range = storage.get_events_page(event_types=[failed_name], from_block=2, to_block=3)
+    assert [block_number for _, block_number, _ in in_range] == [3, 2]
+
+    unlocks = storage.get_events_page(token_network_identifier=token_network_identifier)
+    assert [identifier for identifier, _, _ in unlocks] == [10, 8, 6, 4, 2]
+
+    channel_identifier = unlocks[0][2].channel_identifier
+    by_channel = storage.get_events_page(channel_identifier=channel_identifier)
+    assert [identifier for identifier, _, _ in by_channel] == [10]
+
+
+def test_storage_backends_snapshot_and_restore(storage):
+    for block_number in (5, 7, 8):
+        storage.write_state_change(Block(block_number))
+
+    assert storage.get_state_snapshot() is None
+    wal, _ = restore_from_latest_snapshot(state_transtion_acc, storage)
+    assert wal.state_manager.current_state.state_changes == [Block(5), Block(7), Block(8)]
+
+    storage.write_state_snapshot(2, 'AAAA')
+    storage.write_state_snapshot(3, 'BBBB')
+    assert storage.get_state_snapshot() == (3, 'BBBB')
+
+
+def test_storage_backends_auxiliary_tables(storage):
+    new_crosstransaction(storage, 1)
+    storage.change_crosstransaction_r(1, '0xhash', 'lnd_r')
+
+    assert storage.get_crosstransaction_by_r('lnd_r')[0] == 1
+    assert len(storage.get_crosstransactions_page(10)) == 1
+    assert storage.get_version() > 0
+
+
+def test_appendlog_reopen(tmpdir):
+    directory = str(tmpdir.join('log.appendlog'))
+    storage = AppendLogStorage(directory, PickleSerializer)
+    token_network_identifier = factories.make_address()
+    write_events(storage, token_network_identifier)
+    storage.write_state_snapshot(3, 'snapshot')
+    storage.close()
+
+    reopened = AppendLogStorage(directory, PickleSerializer)
+    assert reopened.get_statechanges_by_identifier(0, 'latest') == [
+        Block(number)
+        for number in range(1, 6)
+    ]
+    assert reopened.get_state_snapshot() == (3, 'snapshot')
+    assert len(reopened.get_events_page(token_network_identifier=token_network_identifier)) == 5
+
+    # The identifiers continue after the existing records
+    assert reopened.write_state_change(Block(6)) == 6
+
+    with pytest.raises(ValueError):
+        reopened.write_events(7, 6, [EventTransferSentFailed(6, 'whatever')])
+
+
+def test_appendlog_removes_incomplete_record(tmpdir):
+    directory = str(tmpdir.join('log.appendlog'))
+    storage = AppendLogStorage(directory, PickleSerializer)
+    storage.write_state_change(Block(1))
+    storage.write_state_change(Block(2))
+    storage.close()
+
+    # A crash during the write of the last record
+    log_path = os.path.join(directory, 'log')
+    size = os.path.getsize(log_path)
+    with open(log_path, 'r+b') as handler:
+        handler.truncate(size - 3)
+
+    reopened = AppendLogStorage(directory, PickleSerializer)
+    assert reopened.get_statechanges_by_identifier(0, 'latest') == [Block(1)]
+    assert reopened.write_state_change(Block(3)) == 2
+    reopened.close()
+
+    assert AppendLogStorage(directory, PickleSerializer).get_statechanges_by_identifier(
+        0,
+        'latest',
+    ) == [Block(1), Block(3)]
+
+
+def test_appendlog_detects_corruption(tmpdir):
+    directory = str(tmpdir.join('log.appendlog'))
+    storage = AppendLogStorage(directory, PickleSerializer)
+    storage.write_state_change(Block(1))
+    storage.write_state_change(Block(2))
+    storage.close()
+
+    log_path = os.path.join(directory, 'log')
+    with open(log_path, 'r+b') as handler:
+        handler.seek(40)
+        handler.write(b'\xff')
+
+    with pytest.raises(InvalidDBData):
+        AppendLogStorage(directory, PickleSerializer)
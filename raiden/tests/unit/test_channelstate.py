@@ -1298,7 +1298,10 @@ def test_receive_directdtransfer_before_deposit():
         channel_state,
         receive_directtransfer,
     )
-    assert must_contain_entry(iteration.events, EventTransferReceivedSuccess, {})
+    assert must_contain_entry(iteration.events, EventTransferReceivedSuccess, {
+        'token_network_identifier': channel_state.token_network_identifier,
+        'channel_identifier': channel_state.identifier,
+    })
 
 
 def test_channelstate_unlock_without_locks():
@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+
+import gevent
+import pytest
+
+from raiden import connection_manager as connection_manager_module
+from raiden.connection_manager import ConnectionManager
+from raiden.constants import (
+    CHANNEL_DEPOSIT_TX_GAS_LIMIT,
+    CHANNEL_OPEN_TX_GAS_LIMIT,
+    TOKEN_APPROVE_TX_GAS_LIMIT,
+)
+from raiden.exceptions import InsufficientFunds
+from raiden.tests.utils import factories
+
+GAS_PRICE = 10
+CHANNEL_COST = GAS_PRICE * (
+    CHANNEL_OPEN_TX_GAS_LIMIT +
+    TOKEN_APPROVE_TX_GAS_LIMIT +
+    CHANNEL_DEPOSIT_TX_GAS_LIMIT
+)
+
+
+class FakeClient:
+    def __init__(self, eth_balance):
+        self.eth_balance = eth_balance
+
+    def balance(self, address):  # pylint: disable=unused-argument
+        return self.eth_balance
+
+    def gasprice(self):
+        return GAS_PRICE
+
+
+class RecordingConnectionManager(ConnectionManager):
+    """ Connection manager which records the channels in flight instead of
+    sending transactions, the channel with `failing_partner` can't be funded.
+    """
+
+    def __init__(self, eth_balance, token_balance, partners, failing_partner=None):
+        # pylint: disable=super-init-not-called
+        client = FakeClient(eth_balance)
+        token = SimpleNamespace(balance_of=lambda address: token_balance)
+        self.raiden = SimpleNamespace(
+            address=factories.make_address(),
+            chain=SimpleNamespace(client=client, token=lambda address: token),
+        )
+        self.registry_address = factories.make_address()
+        self.token_address = factories.make_address()
+        self.funds = token_balance
+        self.initial_channel_target = len(partners)
+        self.joinable_funds_target = 0
+
+        self.partners = partners
+        self.failing_partner = failing_partner
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.opened = list()
+        self.funded = list()
+
+    def find_new_partners(self, number):
+        return self.partners[:number]
+
+    def _open_channel(self, partner):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        gevent.sleep(0.01)
+        self.opened.append(partner)
+
+    def _fund_channel(self, partner, funding):
+        gevent.sleep(0.01)
+        self.in_flight -= 1
+        if partner == self.failing_partner:
+            raise InsufficientFunds('not enough tokens')
+        self.funded.append(partner)
+
+
+@pytest.fixture
+def no_channels(monkeypatch):
+    views = connection_manager_module.views
+    monkeypatch.setattr(views, 'state_from_raiden', lambda raiden: None)
+    monkeypatch.setattr(views, 'get_channelstate_open', lambda **kwargs: [])
+    monkeypatch.setattr(views, 'get_our_capacity_for_token_network', lambda *args: 0)
+
+
+def test_max_concurrent_channels_uses_the_transaction_gas():
+    manager = RecordingConnectionManager(3 * CHANNEL_COST, 100, [])
+
+    assert manager._max_concurrent_channels(5, funded=True) == 3
+    assert manager._max_concurrent_channels(2, funded=True) == 2
+
+    open_cost = GAS_PRICE * CHANNEL_OPEN_TX_GAS_LIMIT
+    assert manager._max_concurrent_channels(10, funded=False) == 3 * CHANNEL_COST // open_cost
+
+    manager.raiden.chain.client.eth_balance = 0
+    assert manager._max_concurrent_channels(5, funded=True) == 1
+
+
+@pytest.mark.usefixtures('no_channels')
+def test_open_channels_bounds_the_channels_in_flight():
+    partners = [factories.make_address() for _ in range(6)]
+    manager = RecordingConnectionManager(2 * CHANNEL_COST, 600, partners)
+
+    manager._open_channels()
+
+    assert manager.max_in_flight == 2
+    assert sorted(manager.opened) == sorted(partners)
+    assert sorted(manager.funded) == sorted(partners)
+
+
+@pytest.mark.usefixtures('no_channels')
+def test_open_channels_raises_the_funding_failure_and_stops_the_others():
+    partners = [factories.make_address() for _ in range(4)]
+    manager = RecordingConnectionManager(2 * CHANNEL_COST, 400, partners, partners[0])
+
+    with pytest.raises(InsufficientFunds):
+        manager._open_channels()
+
+    # the channels in flight with the failing one were killed, and the
+    # remaining ones were not started
+    opened = list(manager.opened)
+    gevent.sleep(0.05)
+    assert manager.opened == opened
+    assert partners[0] not in manager.funded
+    assert len(manager.opened) < len(partners)
@@ -0,0 +1,265 @@
+import random
+from types import SimpleNamespace
+
+from eth_utils import encode_hex
+
+from raiden.constants import (
+    CROSS_ACCEPT,
+    CROSS_ACCEPT_SYNC,
+    CROSS_STATUS_ACCEPTED,
+    CROSS_STATUS_CREATED,
+    CROSS_STATUS_DONE,
+    CROSS_STATUS_INVOICE_PAID,
+    CROSS_STATUS_LOCKED,
+    CROSS_STATUS_PAYMENT_FAILED,
+    CROSS_STATUS_PAYMENT_SENT,
+    CROSS_STATUS_RECEIVED,
+    CROSS_STATUS_SECRET_REQUESTED,
+)
+from raiden.raiden_event_handler import handle_crossswapupdated
+from raiden.storage.serialize import PickleSerializer
+from raiden.storage.sqlite import SQLiteStorage
+from raiden.storage.wal import legacy_cross_swaps
+from raiden.tests.utils import factories
+from raiden.transfer import node, views
+from raiden.transfer.events import EventCrossSwapUpdated, SendCrossSwapAccept
+from raiden.transfer.mediated_transfer.state_change import ReceiveSecretRequest
+from raiden.transfer.state import ChainState, CrossSwapState
+from raiden.transfer.state_change import (
+    ActionCrossSwapLocked,
+    ActionCrossSwapPaymentFailed,
+    ActionCrossSwapPaymentSent,
+    ActionInitCrossSwap,
+    ActionRestoreCrossSwap,
+    ReceiveCrossInvoicePaid,
+    ReceiveCrossSecretRequest,
+    ReceiveCrossSwap,
+    ReceiveCrossSwapAccept,
+    ReceiveCrossSwapDone,
+)
+
+CROSS_ID = 7
+LND_R_HASH = 'bG5kX3JfaGFzaA=='
+
+
+def make_chain_state():
+    return ChainState(random.Random(), 1, 1)
+
+
+def make_cross_swap(status):
+    return CrossSwapState(
+        CROSS_ID,
+        factories.HOP1,
+        factories.HOP2,
+        factories.UNIT_TOKEN_NETWORK_ADDRESS,
+        10,
+        1000,
+        'btc_address',
+        status,
+    )
+
+
+def statuses(events):
+    return [event.status for event in events if isinstance(event, EventCrossSwapUpdated)]
+
+
+def make_secret_request():
+    return ReceiveSecretRequest(
+        CROSS_ID,
+        10,
+        factories.UNIT_SECRETHASH,
+        factories.HOP2,
+    )
+
+
+def init_initiator(chain_state):
+    cross_swap = make_cross_swap(CROSS_STATUS_CREATED)
+    node.state_transition(chain_state, ActionInitCrossSwap(cross_swap))
+    node.state_transition(chain_state, ReceiveCrossSwapAccept(CROSS_ID))
+    node.state_transition(chain_state, ActionCrossSwapLocked(
+        CROSS_ID,
+        factories.UNIT_SECRETHASH,
+        LND_R_HASH,
+    ))
+
+
+def test_cross_swap_initiator_invoice_paid_first():
+    chain_state = make_chain_state()
+    init_initiator(chain_state)
+
+    cross_swap = views.get_cross_swap(chain_state, CROSS_ID)
+    assert cross_swap.status == CROSS_STATUS_ACCEPTED
+    assert views.get_cross_swap_by_lnd_r_hash(chain_state, LND_R_HASH) == cross_swap
+
+    iteration = node.state_transition(chain_state, ReceiveCrossInvoicePaid(LND_R_HASH))
+    assert statuses(iteration.events) == [CROSS_STATUS_INVOICE_PAID]
+
+    secret_request = ReceiveCrossSecretRequest(CROSS_ID, make_secret_request())
+    iteration = node.state_transition(chain_state, secret_request)
+    assert statuses(iteration.events) == [CROSS_STATUS_DONE]
+
+    sync = next(event for event in iteration.events if isinstance(event, SendCrossSwapAccept))
+    assert sync.recipient == factories.HOP2
+    assert sync.accept == CROSS_ACCEPT_SYNC
+
+    # finished swaps are removed from the state
+    assert views.get_cross_swap(chain_state, CROSS_ID) is None
+    assert views.get_cross_swap_by_lnd_r_hash(chain_state, LND_R_HASH) is None
+
+
+def test_cross_swap_initiator_holds_secret_request_until_paid():
+    chain_state = make_chain_state()
+    init_initiator(chain_state)
+
+    secret_request = ReceiveCrossSecretRequest(CROSS_ID, make_secret_request())
+    iteration = node.state_transition(chain_state, secret_request)
+    assert statuses(iteration.events) == [CROSS_STATUS_SECRET_REQUESTED]
+    assert views.get_cross_swap(chain_state, CROSS_ID).secret_request is not None
+
+    iteration = node.state_transition(chain_state, ReceiveCrossInvoicePaid(LND_R_HASH))
+    assert statuses(iteration.events) == [CROSS_STATUS_DONE]
+    assert views.get_cross_swap(chain_state, CROSS_ID) is None
+
+
+def test_cross_swap_secret_request_with_wrong_secrethash_is_ignored():
+    chain_state = make_chain_state()
+    init_initiator(chain_state)
+
+    wrong_request = make_secret_request()
+    wrong_request.secrethash = factories.make_secret(1)
+    iteration = node.state_transition(
+        chain_state,
+        ReceiveCrossSecretRequest(CROSS_ID, wrong_request),
+    )
+
+    assert not iteration.events
+    assert views.get_cross_swap(chain_state, CROSS_ID).status == CROSS_STATUS_ACCEPTED
+
+
+def test_cross_swap_target():
+    chain_state = make_chain_state()
+
+    cross_swap = make_cross_swap(CROSS_STATUS_RECEIVED)
+    iteration = node.state_transition(chain_state, ReceiveCrossSwap(cross_swap))
+    assert statuses(iteration.events) == [CROSS_STATUS_RECEIVED]
+
+    accept = next(event for event in iteration.events if isinstance(event, SendCrossSwapAccept))
+    assert accept.recipient == factories.HOP1
+    assert accept.accept == CROSS_ACCEPT
+
+    # a repeated swap message is ignored
+    iteration = node.state_transition(chain_state, ReceiveCrossSwap(cross_swap))
+    assert not iteration.events
+
+    locked = ActionCrossSwapLocked(CROSS_ID, factories.UNIT_SECRETHASH, None)
+    iteration = node.state_transition(chain_state, locked)
+    assert statuses(iteration.events) == [CROSS_STATUS_LOCKED]
+
+    iteration = node.state_transition(chain_state, ActionCrossSwapPaymentSent(CROSS_ID))
+    assert statuses(iteration.events) == [CROSS_STATUS_PAYMENT_SENT]
+
+    iteration = node.state_transition(chain_state, ReceiveCrossSwapDone(CROSS_ID))
+    assert statuses(iteration.events) == [CROSS_STATUS_DONE]
+    assert not chain_state.payment_mapping.crossids_to_task
+
+
+def test_cross_swap_target_payment_failed():
+    chain_state = make_chain_state()
+
+    node.state_transition(chain_state, ReceiveCrossSwap(make_cross_swap(CROSS_STATUS_RECEIVED)))
+    locked = ActionCrossSwapLocked(CROSS_ID, factories.UNIT_SECRETHASH, None)
+    node.state_transition(chain_state, locked)
+
+    failed = ActionCrossSwapPaymentFailed(CROSS_ID, 'no route')
+    iteration = node.state_transition(chain_state, failed)
+    assert statuses(iteration.events) == [CROSS_STATUS_PAYMENT_FAILED]
+    assert not chain_state.payment_mapping.crossids_to_task
+
+    # the failed swap is finished, it is not restored from the table
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    raiden = SimpleNamespace(wal=SimpleNamespace(storage=storage, state_change_id=1))
+    for event in iteration.events:
+        handle_crossswapupdated(raiden, event)
+    assert not legacy_cross_swaps(storage, chain_state)
+
+
+def test_cross_swap_updates_go_through_the_status_transitions():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    raiden = SimpleNamespace(wal=SimpleNamespace(storage=storage, state_change_id=3))
+    chain_state = make_chain_state()
+
+    cross_swap = make_cross_swap(CROSS_STATUS_CREATED)
+    created = node.state_transition(chain_state, ActionInitCrossSwap(cross_swap)).events
+    for event in created:
+        handle_crossswapupdated(raiden, event)
+
+    row = storage.get_crosstransaction_by_identifier(CROSS_ID)
+    assert row[7] == CROSS_STATUS_CREATED
+    assert row[8] == 3
+
+    raiden.wal.state_change_id = 4
+    node.state_transition(chain_state, ReceiveCrossSwapAccept(CROSS_ID))
+    locked = ActionCrossSwapLocked(CROSS_ID, factories.UNIT_SECRETHASH, LND_R_HASH)
+    for event in node.state_transition(chain_state, locked).events:
+        handle_crossswapupdated(raiden, event)
+
+    row = storage.get_crosstransaction_by_identifier(CROSS_ID)
+    assert row[7] == CROSS_STATUS_ACCEPTED
+    assert row[8:] == (4, encode_hex(factories.UNIT_SECRETHASH), LND_R_HASH)
+
+    # an event replayed after a restart can't move the swap back
+    for event in created:
+        handle_crossswapupdated(raiden, event)
+
+    row = storage.get_crosstransaction_by_identifier(CROSS_ID)
+    assert row[7] == CROSS_STATUS_ACCEPTED
+    assert row[8] == 4
+
+
+def test_legacy_cross_swaps_are_restored_to_the_state():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    chain_state = make_chain_state()
+
+    # a swap written before the swaps were part of the node state, the
+    # secret request was stored in the state_changes table
+    cross_swap = make_cross_swap(CROSS_STATUS_SECRET_REQUESTED)
+    storage.create_crosstransaction(
+        cross_swap.initiator_address,
+        cross_swap.target_address,
+        cross_swap.token_network_identifier,
+        cross_swap.sendETH_amount,
+        cross_swap.sendBTC_amount,
+        cross_swap.receiveBTC_address,
+        CROSS_STATUS_SECRET_REQUESTED,
+        CROSS_ID,
+    )
+    state_change_id = storage.write_state_change(make_secret_request())
+    storage.change_crosstransaction_statechangeid(CROSS_ID, state_change_id)
+    storage.change_crosstransaction_r(
+        CROSS_ID,
+        encode_hex(factories.UNIT_SECRETHASH),
+        LND_R_HASH,
+    )
+
+    # finished swaps stay in the table only
+    storage.create_crosstransaction(
+        factories.HOP1, factories.HOP2, factories.make_address(), 1, 1, 'btc',
+        CROSS_STATUS_DONE, CROSS_ID + 1,
+    )
+
+    state_changes = legacy_cross_swaps(storage, chain_state)
+    assert len(state_changes) == 1
+    assert isinstance(state_changes[0], ActionRestoreCrossSwap)
+
+    iteration = node.state_transition(chain_state, state_changes[0])
+    assert not iteration.events
+
+    restored = views.get_cross_swap(chain_state, CROSS_ID)
+    assert restored.status == CROSS_STATUS_SECRET_REQUESTED
+    assert restored.secrethash == factories.UNIT_SECRETHASH
+    assert restored.secret_request == make_secret_request()
+    assert views.get_cross_swap_by_lnd_r_hash(chain_state, LND_R_HASH) == restored
+    assert legacy_cross_swaps(storage, chain_state) == []
+
+    iteration = node.state_transition(chain_state, ReceiveCrossInvoicePaid(LND_R_HASH))
+    assert statuses(iteration.events) == [CROSS_STATUS_DONE]
@@ -0,0 +1,93 @@
+import pytest
+
+from raiden.exceptions import InvalidAddress, UnknownAddress
+from raiden.network.discovery import ContractDiscovery, Discovery
+from raiden.tests.utils.factories import make_address
+from raiden.utils import host_port_to_endpoint
+
+
+class DiscoveryProxyMock:
+    """ In-memory endpoint registry which counts the on-chain lookups. """
+
+    def __init__(self):
+        self.endpoints = dict()
+        self.calls = 0
+
+    def endpoint_by_address(self, node_address):
+        self.calls += 1
+        try:
+            return self.endpoints[node_address]
+        except KeyError:
+            raise UnknownAddress('Unknown address')
+
+    def address_by_endpoint(self, endpoint):
+        self.calls += 1
+        for node_address, registered_endpoint in self.endpoints.items():
+            if registered_endpoint == endpoint:
+                return node_address
+        return None
+
+
+def test_discovery_reregistration_updates_reverse_mapping():
+    address = make_address()
+    discovery = Discovery()
+
+    discovery.register(address, '127.0.0.1', 44444)
+    discovery.register(address, '127.0.0.1', 44445)
+
+    assert discovery.nodeid_by_host_port(('127.0.0.1', 44444)) is None
+    assert discovery.nodeid_by_host_port(('127.0.0.1', 44445)) == address
+
+
+def test_discovery_endpoint_moved_to_another_node():
+    address = make_address()
+    other_address = make_address()
+    discovery = Discovery()
+
+    discovery.register(address, '127.0.0.1', 44444)
+    discovery.register(other_address, '127.0.0.1', 44444)
+
+    assert discovery.nodeid_by_host_port(('127.0.0.1', 44444)) == other_address
+    assert discovery.get(other_address) == ('127.0.0.1', 44444)
+    with pytest.raises(InvalidAddress):
+        discovery.get(address)
+
+
+def test_contract_discovery_caches_lookups():
+    address = make_address()
+    proxy = DiscoveryProxyMock()
+    proxy.endpoints[address] = host_port_to_endpoint('127.0.0.1', 44444)
+    discovery = ContractDiscovery(make_address(), proxy)
+
+    assert discovery.get(address) == ('127.0.0.1', 44444)
+    assert discovery.get(address) == ('127.0.0.1', 44444)
+    assert discovery.nodeid_by_host_port(('127.0.0.1', 44444)) == address
+    assert proxy.calls == 1
+
+    # misses are not cached, the node may register later
+    unknown_address = make_address()
+    with pytest.raises(UnknownAddress):
+        discovery.get(unknown_address)
+    assert discovery.nodeid_by_host_port(('127.0.0.1', 55555)) is None
+    assert proxy.calls == 3
+
+
+def test_contract_discovery_registration_event_updates_mappings():
+    address = make_address()
+    proxy = DiscoveryProxyMock()
+    proxy.endpoints[address] = host_port_to_endpoint('127.0.0.1', 44444)
+    discovery = ContractDiscovery(make_address(), proxy)
+
+    assert discovery.get(address) == ('127.0.0.1', 44444)
+
+    new_endpoint = host_port_to_endpoint('127.0.0.1', 44445)
+    proxy.endpoints[address] = new_endpoint
+    discovery.endpoint_registered(address, new_endpoint)
+
+    assert discovery.get(address) == ('127.0.0.1', 44445)
+    assert discovery.nodeid_by_host_port(('127.0.0.1', 44445)) == address
+    assert proxy.calls == 1
+
+    # the old endpoint is not served from the mappings anymore
+    assert discovery.nodeid_by_host_port(('127.0.0.1', 44444)) is None
+    assert proxy.calls == 2
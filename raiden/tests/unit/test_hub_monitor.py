@@ -0,0 +1,63 @@
+import gevent
+from gevent.monkey import get_original
+
+from raiden.utils import metrics
+from raiden.utils.hub_monitor import HubMonitor
+
+# time.sleep is monkey patched by the conftest and would not block the hub
+blocking_sleep = get_original('time', 'sleep')
+
+
+def blocking_call(duration):
+    blocking_sleep(duration)
+
+
+def test_hub_monitor_reports_blocking_greenlet():
+    metrics.HUB_BLOCKED_SECONDS.values.clear()
+
+    # The latency greenlet does not wake up during the test, so the report
+    # is not moved to the log
+    monitor = HubMonitor(blocking_threshold=0.05, interval=10)
+    monitor.start()
+    try:
+        short = gevent.spawn(blocking_call, 0.01)
+        short.join()
+
+        blocking = gevent.spawn(blocking_call, 0.2)
+        blocking.name = 'Queue for 0x1234 - global'
+        blocking.join()
+    finally:
+        monitor.stop()
+
+    assert len(monitor.reports) == 1
+    name, blocked_for, stack = monitor.reports[0]
+    assert name == 'Queue for 0x1234 - global'
+    assert blocked_for >= 0.05
+    assert 'blocking_call' in stack
+
+    blocked = metrics.HUB_BLOCKED_SECONDS.values
+    assert list(blocked) == ['Queue for 0x1234 - global']
+    assert blocked['Queue for 0x1234 - global'][-1] >= 0.2
+
+    rendered = metrics.REGISTRY.render()
+    assert 'raiden_hub_blocked_seconds_count{greenlet="Queue for 0x1234 - global"} 1' in rendered
+
+
+def test_hub_monitor_measures_latency():
+    metrics.HUB_LATENCY_SECONDS.values.clear()
+
+    monitor = HubMonitor(blocking_threshold=0.05, interval=0.01)
+    monitor.start()
+    try:
+        gevent.sleep(0.05)
+        gevent.spawn(blocking_call, 0.1).join()
+        gevent.sleep(0.05)
+    finally:
+        monitor.stop()
+
+    latency = metrics.HUB_LATENCY_SECONDS.values[None]
+    assert sum(latency[:-1]) > 2
+    # The wake up after the blocking call was delayed
+    assert latency[-1] >= 0.05
+    # The report was logged
+    assert not monitor.reports
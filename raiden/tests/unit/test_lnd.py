@@ -0,0 +1,155 @@
+import base64
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+
+from raiden.exceptions import LndError
+from raiden.network.lnd import InvoicePool, LndClient
+from raiden.raiden_service import RaidenService
+from raiden.settings import DEFAULT_LND_INVOICE_EXPIRY
+from raiden.tests.utils.factories import HOP1
+from raiden.tests.utils.lnd import LndStub
+from raiden.transfer.state_change import (
+    ActionCrossSwapPaymentFailed,
+    ActionCrossSwapPaymentSent,
+)
+
+
+@pytest.fixture
+def lnd_stub():
+    stub = LndStub(macaroon='0201036c6e64')
+    stub.start()
+    yield stub
+    stub.stop()
+
+
+def make_client(lnd_stub, macaroons):
+    def load_macaroon():
+        macaroons.append(lnd_stub.macaroon)
+        return lnd_stub.macaroon
+
+    return LndClient(lnd_stub.address, load_macaroon, scheme='http', retries=0)
+
+
+def test_lnd_client_invoice_and_payment(lnd_stub):
+    loaded = list()
+    client = make_client(lnd_stub, loaded)
+    preimage = b'\x01' * 32
+
+    r_hash, payment_request = client.add_invoice(1000, preimage)
+    assert base64.b64decode(r_hash) == hashlib.sha256(preimage).digest()
+    assert lnd_stub.invoices[payment_request]['value'] == 1000
+    assert lnd_stub.invoices[payment_request]['expiry'] == DEFAULT_LND_INVOICE_EXPIRY
+
+    client.send_payment(payment_request)
+    assert lnd_stub.payments == [payment_request]
+
+    # the macaroon is read from the database only once
+    assert len(loaded) == 1
+    client.invalidate_credentials()
+    client.add_invoice(1000, preimage)
+    assert len(loaded) == 2
+
+
+def test_lnd_client_errors(lnd_stub):
+    client = make_client(lnd_stub, list())
+    _, payment_request = client.add_invoice(1000, b'\x02' * 32)
+
+    lnd_stub.failing_payments.add(payment_request)
+    with pytest.raises(LndError):
+        client.send_payment(payment_request)
+
+    lnd_stub.macaroon = 'revoked'
+    with pytest.raises(LndError):
+        client.add_invoice(1000, b'\x03' * 32)
+
+    lnd_stub.stop()
+    with pytest.raises(LndError):
+        client.add_invoice(1000, b'\x04' * 32)
+
+
+def test_cross_invoice_payment_result_is_dispatched(lnd_stub):
+    client = make_client(lnd_stub, list())
+    _, paid = client.add_invoice(1000, b'\x05' * 32)
+    _, failing = client.add_invoice(1000, b'\x06' * 32)
+    lnd_stub.failing_payments.add(failing)
+
+    state_changes = list()
+    raiden = SimpleNamespace(address=HOP1, lnd=client, handle_state_change=state_changes.append)
+
+    RaidenService.pay_cross_invoice(raiden, 1, paid)
+    RaidenService.pay_cross_invoice(raiden, 2, failing)
+
+    assert state_changes[0] == ActionCrossSwapPaymentSent(1)
+    assert isinstance(state_changes[1], ActionCrossSwapPaymentFailed)
+    assert state_changes[1].cross_id == 2
+
+
+def test_invoice_pool_serves_pooled_invoices(lnd_stub):
+    client = make_client(lnd_stub, list())
+    pool = InvoicePool(client, amounts=[1000], size=2)
+
+    pool.provision()
+    pool.provisioners[1000].join()
+    assert len(lnd_stub.invoices) == 2
+
+    invoice = pool.allocate(1000)
+    assert len(lnd_stub.invoices) == 2
+    assert base64.b64decode(invoice.r_hash) == hashlib.sha256(invoice.secret).digest()
+    assert lnd_stub.invoices[invoice.payment_request]['value'] == 1000
+
+    # the used invoice is replaced in the background
+    pool.provisioners[1000].join()
+    assert len(lnd_stub.invoices) == 3
+    assert len(pool.invoices[1000]) == 2
+    assert invoice not in pool.invoices[1000]
+
+
+def test_invoice_pool_miss_creates_invoice(lnd_stub):
+    client = make_client(lnd_stub, list())
+    pool = InvoicePool(client, amounts=[500], size=1)
+
+    invoice = pool.allocate(500)
+    assert lnd_stub.invoices[invoice.payment_request]['value'] == 500
+
+    pool.provisioners[500].join()
+    assert len(pool.invoices[500]) == 1
+    pool.stop()
+
+
+def test_invoice_pool_only_pools_the_configured_amounts(lnd_stub):
+    client = make_client(lnd_stub, list())
+    pool = InvoicePool(client, amounts=[1000], size=3)
+
+    for value in range(1, 20):
+        invoice = pool.allocate(value)
+        assert lnd_stub.invoices[invoice.payment_request]['value'] == value
+
+    # no invoices are provisioned for the other amounts
+    assert len(lnd_stub.invoices) == 19
+    assert list(pool.invoices) == [1000]
+    assert not pool.provisioners
+
+
+def test_invoice_pool_drops_stale_invoices(lnd_stub):
+    client = make_client(lnd_stub, list())
+    pool = InvoicePool(client, amounts=[1000], size=2, expiry=60)
+
+    pool.provision()
+    pool.provisioners[1000].join()
+    stale = list(pool.invoices[1000])
+    pool.invoices[1000].clear()
+    pool.invoices[1000].extend(
+        pooled._replace(created_at=pooled.created_at - 30)
+        for pooled in stale
+    )
+
+    invoice = pool.allocate(1000)
+    assert invoice.payment_request not in {pooled.payment_request for pooled in stale}
+    assert lnd_stub.invoices[invoice.payment_request]['expiry'] == 60
+
+    pool.provisioners[1000].join()
+    assert len(pool.invoices[1000]) == 2
+    assert all(pool.is_fresh(invoice) for invoice in pool.invoices[1000])
+    pool.stop()
@@ -1,6 +1,7 @@
 import logging
 import traceback
 
+import gevent
 import structlog
 import pytest
 
@@ -146,3 +147,62 @@ def test_redacted_traceback(capsys):
 
     assert token not in captured.err
     assert 'accessToken=<redacted>' in captured.err
+
+
+class CountingRepr:
+    def __init__(self):
+        self.calls = 0
+
+    def __repr__(self):
+        self.calls += 1
+        return '<CountingRepr>'
+
+
+def test_records_are_not_built_without_handler(capsys, tmpdir):
+    debug_log_file = str(tmpdir.join('debug.log'))
+    value = CountingRepr()
+
+    configure_logging({'': 'INFO'}, disable_debug_logfile=True)
+    log = structlog.get_logger('raiden.test')
+    log.debug('test event', value=value)
+
+    assert value.calls == 0
+    assert capsys.readouterr().err == ''
+
+    # the debug logfile accepts the debug records of raiden
+    configure_logging({'': 'INFO'}, debug_log_file_name=debug_log_file)
+    log = structlog.get_logger('raiden.test')
+    log.debug('test event', value=value)
+
+    # pytest's log capture formats the records as well
+    calls = value.calls
+    assert calls >= 1
+    assert capsys.readouterr().err == ''
+    assert '<CountingRepr>' in tmpdir.join('debug.log').read()
+
+    configure_logging({'': 'INFO'}, disable_debug_logfile=True)
+    log = structlog.get_logger('raiden.test')
+    log.debug('test event', value=value)
+
+    assert value.calls == calls
+
+
+def test_async_log_file(tmpdir):
+    log_file = str(tmpdir.join('raiden.log'))
+    configure_logging(
+        {'': 'DEBUG'},
+        log_file=log_file,
+        disable_debug_logfile=True,
+        log_async=True,
+    )
+    log = structlog.get_logger('raiden.test')
+    log.info('test event', key='value')
+
+    # the record is written once the hub runs the writer
+    assert 'test event' not in tmpdir.join('raiden.log').read()
+    gevent.sleep(0)
+    assert 'key=value' in tmpdir.join('raiden.log').read()
+
+    log.info('second event')
+    logging.shutdown()
+    assert 'second event' in tmpdir.join('raiden.log').read()
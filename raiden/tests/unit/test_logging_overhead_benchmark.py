@@ -0,0 +1,21 @@
+from raiden.tests.benchmark.logging_overhead import run_logging_benchmark
+
+
+def test_logging_benchmark_measures_every_mode():
+    result = run_logging_benchmark(
+        modes=('info-debug-logfile', 'debug-async'),
+        seed=1,
+        nodes=3,
+        topology='line',
+        transfers=4,
+        concurrency=2,
+    )
+
+    modes = result['modes']
+    assert sorted(modes) == ['debug-async', 'disabled', 'info-debug-logfile']
+    assert modes['disabled']['log_bytes_per_transfer'] == 0
+    assert modes['debug-async']['log_bytes_per_transfer'] > 0
+
+    for mode in modes.values():
+        assert mode['completed_transfers'] == 4
+        assert mode['overhead_per_transfer_us'] is not None
@@ -0,0 +1,12 @@
+from raiden.tests.benchmark.memory import run_benchmark
+
+
+def test_memory_benchmark_measures_every_item():
+    result = run_benchmark(seed=1, channels=4, pending_locks=2, queued_messages=5, payments=10)
+
+    assert result['state_bytes'] > 0
+    assert result['snapshot_bytes'] > 0
+    assert result['bytes_per_channel'] > 0
+    assert result['bytes_per_pending_lock'] > 0
+    assert result['bytes_per_queued_message'] > 0
+    assert result['snapshot_bytes_per_pending_lock'] > 0
@@ -0,0 +1,45 @@
+from raiden.utils.metrics import MetricsRegistry
+
+
+def test_histogram_render():
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        'dispatch_seconds',
+        'Dispatch time.',
+        label_name='state_change',
+        buckets=(0.1, 1.0),
+    )
+
+    histogram.observe(0.05, 'Block')
+    histogram.observe(0.1, 'Block')
+    histogram.observe(0.5, 'Block')
+    histogram.observe(2, 'ReceiveDelivered')
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == [
+        '# HELP dispatch_seconds Dispatch time.',
+        '# TYPE dispatch_seconds histogram',
+    ]
+    assert 'dispatch_seconds_bucket{state_change="Block",le="0.1"} 2' in lines
+    assert 'dispatch_seconds_bucket{state_change="Block",le="1.0"} 3' in lines
+    assert 'dispatch_seconds_bucket{state_change="Block",le="+Inf"} 3' in lines
+    assert 'dispatch_seconds_count{state_change="Block"} 3' in lines
+    assert 'dispatch_seconds_sum{state_change="Block"} 0.65' in lines
+    assert 'dispatch_seconds_bucket{state_change="ReceiveDelivered",le="1.0"} 0' in lines
+    assert 'dispatch_seconds_bucket{state_change="ReceiveDelivered",le="+Inf"} 1' in lines
+
+
+def test_gauge_render():
+    registry = MetricsRegistry()
+    unlabeled = registry.gauge('queue_size', 'Queue size.')
+    labeled = registry.gauge('open_channels', 'Open channels.', label_name='token_network')
+
+    unlabeled.set(3)
+    labeled.set(2, 'a"b')
+
+    lines = registry.render().splitlines()
+    assert 'queue_size 3.0' in lines
+    assert 'open_channels{token_network="a\\"b"} 2.0' in lines
+
+    labeled.clear()
+    assert 'open_channels{' not in registry.render()
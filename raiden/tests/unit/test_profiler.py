@@ -0,0 +1,42 @@
+import time
+
+import gevent
+import pytest
+
+from raiden.exceptions import ProfilerAlreadyRunning
+from raiden.utils.profiler import SamplingProfiler
+
+
+def busy_loop(duration):
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        sum(range(1000))
+
+
+def test_profiler_samples_named_greenlets():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    try:
+        with pytest.raises(ProfilerAlreadyRunning):
+            SamplingProfiler().start()
+
+        busy = gevent.spawn(busy_loop, 0.3)
+        busy.name = 'Queue for 0x1234 - global'
+        busy.join()
+    finally:
+        profiler.stop()
+
+    greenlets = profiler.greenlets()
+    assert greenlets['Queue for 0x1234 - global'] > 0
+
+    for line in profiler.collapsed().splitlines():
+        stack, count = line.rsplit(' ', 1)
+        assert int(count) > 0
+        if stack.startswith('Queue for 0x1234 - global;'):
+            assert 'busy_loop' in stack
+
+    # the timer is released
+    SamplingProfiler().stop()
+    second = SamplingProfiler()
+    second.start()
+    second.stop()
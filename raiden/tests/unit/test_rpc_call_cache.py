@@ -0,0 +1,96 @@
+from raiden.network.rpc.cache import BlockCallCache
+from raiden.tests.utils import factories
+
+
+class CallCounter:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+def test_block_scoped_entries_are_dropped_on_new_block():
+    cache = BlockCallCache()
+    cache.on_new_block(1, 1)
+
+    contract = factories.make_address()
+    fetch = CallCounter(10)
+
+    assert cache.get_or_fetch(contract, 'balanceOf', (b'a',), fetch) == 10
+    assert cache.get_or_fetch(contract, 'balanceOf', (b'a',), fetch) == 10
+    assert fetch.calls == 1
+
+    cache.on_new_block(1, 1)
+    assert cache.get_or_fetch(contract, 'balanceOf', (b'a',), fetch) == 10
+    assert fetch.calls == 1, 'the same block must not invalidate the cache'
+
+    cache.on_new_block(2, 1)
+    assert cache.get_or_fetch(contract, 'balanceOf', (b'a',), fetch) == 10
+    assert fetch.calls == 2
+
+    assert cache.hits == 2
+    assert cache.misses == 2
+    assert cache.hit_rate == 0.5
+
+
+def test_keys_include_contract_function_and_arguments():
+    cache = BlockCallCache()
+    cache.on_new_block(1, 1)
+    contract1 = factories.make_address()
+    contract2 = factories.make_address()
+
+    cache.get_or_fetch(contract1, 'balanceOf', (b'a',), lambda: 1)
+    cache.get_or_fetch(contract1, 'balanceOf', (b'b',), lambda: 2)
+    cache.get_or_fetch(contract1, 'allowance', (b'a',), lambda: 3)
+    cache.get_or_fetch(contract2, 'balanceOf', (b'a',), lambda: 4)
+
+    assert cache.get_or_fetch(contract1, 'balanceOf', (b'a',), None) == 1
+    assert cache.get_or_fetch(contract1, 'balanceOf', (b'b',), None) == 2
+    assert cache.get_or_fetch(contract1, 'allowance', (b'a',), None) == 3
+    assert cache.get_or_fetch(contract2, 'balanceOf', (b'a',), None) == 4
+
+
+def test_block_scoped_entries_are_not_cached_without_a_block():
+    cache = BlockCallCache()
+    contract = factories.make_address()
+    fetch = CallCounter(10)
+
+    cache.get_or_fetch(contract, 'balanceOf', (b'a',), fetch)
+    cache.get_or_fetch(contract, 'balanceOf', (b'a',), fetch)
+    assert fetch.calls == 2
+    assert not cache.block_entries
+
+    cache.get_or_fetch(contract, 'settlement_timeout_max', (), fetch, immutable=True)
+    cache.get_or_fetch(contract, 'settlement_timeout_max', (), fetch, immutable=True)
+    assert fetch.calls == 3
+
+
+def test_immutable_entries_survive_invalidation():
+    cache = BlockCallCache()
+    contract = factories.make_address()
+    fetch = CallCounter(500)
+
+    cache.get_or_fetch(contract, 'settlement_timeout_max', (), fetch, immutable=True)
+    cache.on_new_block(10, 1)
+    cache.invalidate()
+
+    value = cache.get_or_fetch(contract, 'settlement_timeout_max', (), fetch, immutable=True)
+    assert value == 500
+    assert fetch.calls == 1
+
+
+def test_result_of_racing_fetch_is_not_cached():
+    cache = BlockCallCache()
+    cache.on_new_block(1, 1)
+    contract = factories.make_address()
+
+    def fetch_and_invalidate():
+        # simulates a transaction being mined while the call is in flight
+        cache.invalidate()
+        return 'stale'
+
+    assert cache.get_or_fetch(contract, 'detail', (), fetch_and_invalidate) == 'stale'
+    assert cache.get_or_fetch(contract, 'detail', (), lambda: 'fresh') == 'fresh'
@@ -0,0 +1,160 @@
+from itertools import count
+from types import SimpleNamespace
+
+import pytest
+from eth_utils import encode_hex
+from requests.exceptions import ConnectionError
+
+from raiden.network.rpc.cache import BlockCallCache
+from raiden.network.rpc.transaction_manager import TransactionManager
+
+
+class FakeClient:
+    """ Minimal client, transactions are mined by calling `mine`. """
+
+    def __init__(self):
+        self.receipts = dict()
+        # the transactions known to the node
+        self.pool = set()
+        self.sent = list()
+        self.hash_counter = count(1000)
+        self.call_cache = BlockCallCache()
+        self.nonce_resyncs = 0
+        self.web3 = SimpleNamespace(
+            eth=SimpleNamespace(
+                getTransactionReceipt=self.receipts.get,
+                getTransaction=lambda transaction_hash: (
+                    {'hash': transaction_hash} if transaction_hash in self.pool else None
+                ),
+            ),
+        )
+
+    def resync_nonce(self):
+        self.nonce_resyncs += 1
+
+    def gasprice(self):
+        return 1
+
+    def send_signed_transaction(self, transaction):
+        transaction_hash = next(self.hash_counter).to_bytes(32, 'big')
+        self.sent.append((transaction_hash, transaction))
+        self.pool.add(encode_hex(transaction_hash))
+        return transaction_hash
+
+    def mine(self, transaction_hash, block_number):
+        self.receipts[encode_hex(transaction_hash)] = {
+            'blockNumber': block_number,
+            'transactionHash': transaction_hash,
+        }
+
+
+def make_transaction(nonce, gas_price=100):
+    return dict(nonce=nonce, gasPrice=gas_price, gas=21000, value=0, data=b'')
+
+
+def test_watcher_resolves_all_pending_transactions():
+    client = FakeClient()
+    manager = TransactionManager(client)
+    manager.on_new_block(1, 1)
+
+    hashes = [bytes([i]) * 32 for i in range(1, 4)]
+    for nonce, transaction_hash in enumerate(hashes):
+        manager.add(transaction_hash, make_transaction(nonce))
+    pending = [manager.pending[transaction_hash] for transaction_hash in hashes]
+
+    for transaction_hash in hashes:
+        client.mine(transaction_hash, 2)
+    manager.on_new_block(2, 1)
+
+    assert not manager.pending
+    for transaction_hash, pending_transaction in zip(hashes, pending):
+        assert not manager.is_pending(transaction_hash)
+        assert pending_transaction.receipt.get()['blockNumber'] == 2
+        assert manager.mined_hash(transaction_hash) == transaction_hash
+
+
+def test_stuck_transaction_is_replaced_with_higher_gas_price():
+    client = FakeClient()
+    manager = TransactionManager(client, resend_after_blocks=2, gas_price_bump_percent=20)
+    manager.on_new_block(1, 1)
+
+    original_hash = b'\x01' * 32
+    manager.add(original_hash, make_transaction(nonce=7, gas_price=100))
+
+    manager.on_new_block(2, 1)
+    assert not client.sent
+
+    manager.on_new_block(3, 1)
+    assert len(client.sent) == 1
+    replacement_hash, replacement = client.sent[0]
+    assert replacement['nonce'] == 7
+    assert replacement['gasPrice'] == 120
+
+    assert manager.is_pending(replacement_hash)
+
+    client.mine(replacement_hash, 4)
+    manager.on_new_block(4, 1)
+
+    assert not manager.is_pending(original_hash)
+    assert manager.mined_hash(original_hash) == replacement_hash
+    assert manager.mined_hash(replacement_hash) == replacement_hash
+
+
+def test_mined_original_resolves_after_replacement():
+    client = FakeClient()
+    manager = TransactionManager(client, resend_after_blocks=1)
+    manager.on_new_block(1, 1)
+
+    original_hash = b'\x01' * 32
+    manager.add(original_hash, make_transaction(nonce=0))
+    manager.on_new_block(2, 1)
+    assert len(client.sent) == 1
+
+    # the first version won the race
+    client.mine(original_hash, 3)
+    receipt = manager.wait(original_hash)
+
+    assert receipt['blockNumber'] == 3
+    assert manager.mined_hash(original_hash) == original_hash
+
+
+def test_dropped_transaction_fails_the_waiter():
+    client = FakeClient()
+    manager = TransactionManager(client)
+    manager.on_new_block(1, 1)
+
+    transaction_hash = b'\x01' * 32
+    manager.add(transaction_hash, make_transaction(nonce=0))
+
+    # not in the pool yet, e.g. right after it was sent
+    manager.on_new_block(2, 1)
+    assert manager.is_pending(transaction_hash)
+
+    client.pool.add(encode_hex(transaction_hash))
+    manager.on_new_block(3, 1)
+    assert manager.is_pending(transaction_hash)
+
+    client.pool.clear()
+    with pytest.raises(Exception, match='invalid transaction'):
+        manager.wait(transaction_hash, poll_interval=0)
+
+    assert not manager.is_pending(transaction_hash)
+    assert client.nonce_resyncs == 1
+
+
+def test_replacement_errors_do_not_escape_the_watcher():
+    client = FakeClient()
+    manager = TransactionManager(client, resend_after_blocks=1)
+    manager.on_new_block(1, 1)
+
+    transaction_hash = b'\x01' * 32
+    manager.add(transaction_hash, make_transaction(nonce=0))
+    client.pool.add(encode_hex(transaction_hash))
+
+    def send_signed_transaction(transaction):
+        raise ConnectionError('node unavailable')
+
+    client.send_signed_transaction = send_signed_transaction
+    manager.on_new_block(2, 1)
+
+    assert manager.is_pending(transaction_hash)
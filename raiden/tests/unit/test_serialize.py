@@ -0,0 +1,71 @@
+from raiden.storage.serialize import PickleSerializer
+from raiden.transfer import state, state_change
+from raiden.transfer.state import HashTimeLockState
+from raiden.transfer.state_change import Block
+from raiden.utils import sha3
+
+
+class LegacyBlock:
+    """ Block before it had __slots__. """
+
+    __module__ = state_change.__name__
+    __qualname__ = 'Block'
+
+    def __init__(self, block_number):
+        self.block_number = block_number
+
+
+class LegacyHashTimeLockState:
+    """ HashTimeLockState when it stored the encoded lock. """
+
+    __module__ = state.__name__
+    __qualname__ = 'HashTimeLockState'
+
+    __slots__ = (
+        'amount',
+        'expiration',
+        'secrethash',
+        'encoded',
+        'lockhash',
+    )
+
+
+def serialize_as(monkeypatch, module, legacy_class, obj):
+    """ Pickle `obj` while `legacy_class` replaces the class of the same name. """
+    with monkeypatch.context() as patch:
+        patch.setattr(module, legacy_class.__qualname__, legacy_class)
+        return PickleSerializer.serialize(obj)
+
+
+def test_slotted_objects_roundtrip():
+    lock = HashTimeLockState(10, 100, sha3(b'secret'))
+    restored = PickleSerializer.deserialize(PickleSerializer.serialize(lock))
+
+    assert restored == lock
+    assert restored.lockhash == lock.lockhash
+    assert restored.encoded == lock.encoded
+
+
+def test_deserialize_legacy_objects(monkeypatch):
+    data = serialize_as(monkeypatch, state_change, LegacyBlock, LegacyBlock(7))
+    assert PickleSerializer.deserialize(data) == Block(7)
+
+    lock = HashTimeLockState(10, 100, sha3(b'secret'))
+    legacy_lock = LegacyHashTimeLockState()
+    legacy_lock.amount = lock.amount
+    legacy_lock.expiration = lock.expiration
+    legacy_lock.secrethash = lock.secrethash
+    legacy_lock.encoded = lock.encoded
+    legacy_lock.lockhash = lock.lockhash
+
+    data = serialize_as(
+        monkeypatch,
+        state,
+        LegacyHashTimeLockState,
+        [legacy_lock, Block(8)],
+    )
+    restored_lock, restored_block = PickleSerializer.deserialize(data)
+
+    assert restored_lock == lock
+    assert restored_lock.lockhash == lock.lockhash
+    assert restored_block == Block(8)
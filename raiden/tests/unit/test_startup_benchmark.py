@@ -0,0 +1,19 @@
+from raiden.tests.benchmark.startup import DEFERRED_MODULES, deferred_modules_loaded, run_benchmark
+
+
+def test_cli_does_not_import_deferred_modules():
+    assert deferred_modules_loaded() == []
+
+
+def test_deferred_modules_are_detected():
+    assert deferred_modules_loaded(DEFERRED_MODULES + ('raiden.ui.cli',)) == ['raiden.ui.cli']
+
+
+def test_startup_benchmark_measures_commands():
+    result = run_benchmark(commands=('import', 'help'), repeat=1)
+
+    assert sorted(result['commands']) == ['help', 'import']
+    for command in result['commands'].values():
+        assert 0 < command['min_seconds'] <= command['median_seconds']
+    assert result['deferred_modules_loaded'] == []
+    assert result['within_budget'] is not None
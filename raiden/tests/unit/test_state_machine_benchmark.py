@@ -0,0 +1,51 @@
+import pytest
+
+from raiden.tests.benchmark.state_machine import (
+    build_chain_state,
+    compare_results,
+    replay,
+    run_benchmark,
+)
+
+
+@pytest.mark.parametrize('use_state_manager', [True, False])
+def test_replay_completes_every_payment(use_state_manager):
+    chain_state, network = build_chain_state(
+        seed=3,
+        tokens=2,
+        channels=3,
+        pending_locks=2,
+        queued_messages=5,
+    )
+    mix = {'initiator': 1, 'mediator': 1, 'target': 1}
+
+    final_state, samples, completed = replay(
+        chain_state,
+        network,
+        seed=3,
+        payments=30,
+        mix=mix,
+        concurrency=5,
+        block_interval=7,
+        use_state_manager=use_state_manager,
+    )
+
+    assert sum(completed.values()) == 30
+    assert set(completed) == {'initiator', 'mediator', 'target'}
+    assert not final_state.payment_mapping.secrethashes_to_task
+    assert samples['Block']
+    assert samples['ReceiveUnlock']
+
+
+def test_run_benchmark_results():
+    result = run_benchmark(seed=1, channels=2, payments=6, concurrency=2, measure_memory=False)
+
+    assert sum(result['completed_payments'].values()) == 6
+    assert result['total']['count'] == sum(
+        summary['count']
+        for summary in result['state_changes'].values()
+    )
+    assert result['total']['p50_us'] <= result['total']['p99_us']
+
+    lines = compare_results(result, result)
+    assert lines[1].split() == ['total', '+0.0%', '+0.0%', '+0.0%']
@@ -0,0 +1,42 @@
+from raiden.api.cache import StateViewCache
+
+
+class Counter:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+def test_state_view_cache_is_discarded_on_state_change():
+    versions = iter([1, 1, 2, 3])
+    cache = StateViewCache(lambda: next(versions))
+    compute = Counter(['channel'])
+
+    first = cache.get('channels', compute)
+    assert cache.get('channels', compute) is first
+    assert compute.calls == 1
+
+    # a new state with the same content keeps the etag
+    second = cache.get('channels', compute)
+    assert compute.calls == 2
+    assert second.etag == first.etag
+    assert second.data == '["channel"]'
+
+    compute.result = ['channel', 'other channel']
+    third = cache.get('channels', compute)
+    assert third.etag != first.etag
+
+
+def test_state_view_cache_keys():
+    cache = StateViewCache(lambda: 1)
+
+    tokens = cache.get('tokens', lambda: ['token'])
+    channels = cache.get('channels', lambda: ['channel'])
+
+    assert tokens.data == '["token"]'
+    assert channels.data == '["channel"]'
+    assert tokens.etag != channels.etag
@@ -0,0 +1,66 @@
+import os
+import random
+
+from raiden.storage.serialize import PickleSerializer
+from raiden.storage.sqlite import SQLiteStorage
+from raiden.storage.wal import WriteAheadLog
+from raiden.tests.benchmark.storage import replay_database, run_synthetic
+from raiden.tests.utils import factories
+from raiden.transfer import node
+from raiden.transfer.architecture import StateManager
+from raiden.transfer.state import PaymentNetworkState
+from raiden.transfer.state_change import (
+    ActionInitChain,
+    Block,
+    ContractReceiveNewPaymentNetwork,
+)
+
+
+def test_replay_database(tmpdir):
+    database_path = os.path.join(str(tmpdir), 'log.db')
+    storage = SQLiteStorage(database_path, PickleSerializer)
+    wal = WriteAheadLog(StateManager(node.state_transition, None), storage)
+
+    wal.log_and_dispatch(ActionInitChain(random.Random(), 1, 337), 1)
+    wal.log_and_dispatch(
+        ContractReceiveNewPaymentNetwork(PaymentNetworkState(factories.make_address(), [])),
+        1,
+    )
+    for block_number in range(2, 10):
+        wal.log_and_dispatch(Block(block_number), block_number)
+    wal.snapshot()
+    storage.conn.close()
+
+    with open(database_path, 'rb') as handler:
+        original = handler.read()
+
+    result = replay_database(database_path, checkpoints=3)
+
+    assert result['state_changes']['count'] == 10
+    assert result['dispatch']['state_changes']['Block']['count'] == 8
+    assert [snapshot['state_change_id'] for snapshot in result['snapshots']] == [3, 7, 10]
+    assert result['stored_snapshot']['state_change_id'] == 10
+
+    with open(database_path, 'rb') as handler:
+        assert handler.read() == original
+
+
+def test_run_synthetic(tmpdir):
+    result = run_synthetic(
+        channels=2,
+        payments=4,
+        pragmas=([], ['journal_mode=WAL']),
+        batch_sizes=(1, 7),
+        serializers=('pickle', 'pickle-zlib'),
+        snapshot_interval=10,
+        directory=str(tmpdir),
+        backends=('sqlite', 'appendlog'),
+    )
+
+    # The pragmas only apply to sqlite
+    assert len(result['runs']) == 12
+    assert [run['backend'] for run in result['runs']].count('appendlog') == 4
+    for run in result['runs']:
+        assert run['state_changes']['count'] == result['records']
+        assert run['batches']['count'] == -(-result['records'] // run['batch_size'])
+        assert run['range_scan_seconds'] > 0
@@ -0,0 +1,23 @@
+import random
+
+import networkx
+import pytest
+
+from raiden.tests.benchmark.transfers import TOPOLOGIES, run_benchmark, topology_edges
+
+
+@pytest.mark.parametrize('topology', TOPOLOGIES)
+def test_topology_edges_are_connected(topology):
+    edges = topology_edges(topology, 7, random.Random(0))
+
+    assert len(set(edges)) == len(edges)
+    assert networkx.is_connected(networkx.Graph(edges))
+
+
+def test_run_benchmark_completes_every_transfer():
+    result = run_benchmark(seed=1, nodes=3, topology='line', transfers=4, concurrency=2)
+
+    assert result['completed_transfers'] == 4
+    assert result['failed_transfers'] == 0
+    assert result['transfers']['count'] == 4
+    assert result['messages']['LockedTransfer']['count'] >= 4
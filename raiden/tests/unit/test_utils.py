@@ -1,4 +1,4 @@
-from raiden.utils import privtopub, sha3
+from raiden.utils import intern_identifier, privtopub, sha3
 
 
 def test_privtopub():
@@ -7,3 +7,13 @@ def test_privtopub():
               '705f70c7554b26e82b90d2d1bbbaf711b10c6c8b807077f4070200a8fb4c6b771')
 
     assert pubkey == privtopub(privkey).hex()
+
+
+def test_intern_identifier():
+    address = bytes(bytearray(b'\x01' * 20))
+    copy = bytes(bytearray(b'\x01' * 20))
+    assert address is not copy
+
+    assert intern_identifier(address) is address
+    assert intern_identifier(copy) is address
+    assert intern_identifier(None) is None
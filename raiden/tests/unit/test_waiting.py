@@ -0,0 +1,52 @@
+import gevent
+
+from raiden.transfer.state_change import (
+    ActionChannelClose,
+    Block,
+    ContractReceiveChannelClosed,
+)
+from raiden.tests.utils import factories
+from raiden.waiting import StateChangeSubscriptions
+
+
+def test_subscription_matches_types_and_channels():
+    subscriptions = StateChangeSubscriptions()
+    token_network_identifier = factories.make_address()
+
+    with subscriptions.subscribe([ContractReceiveChannelClosed], channel_ids=[1]) as subscription:
+        subscriptions.notify(Block(1), [])
+        subscriptions.notify(ActionChannelClose(token_network_identifier, 1), [])
+        assert not subscription.notified.is_set()
+
+        other_closed = ContractReceiveChannelClosed(
+            token_network_identifier,
+            2,
+            factories.make_address(),
+            10,
+        )
+        subscriptions.notify(other_closed, [])
+        assert not subscription.notified.is_set()
+
+        closed = ContractReceiveChannelClosed(
+            token_network_identifier,
+            1,
+            factories.make_address(),
+            10,
+        )
+        subscriptions.notify(closed, ['event'])
+        assert subscription.notified.is_set()
+        assert subscription.wait(0) == ['event']
+        assert not subscription.notified.is_set()
+
+    assert not subscriptions.subscriptions
+
+
+def test_waiter_is_woken_by_notification():
+    subscriptions = StateChangeSubscriptions()
+
+    with subscriptions.subscribe([Block]) as subscription:
+        gevent.spawn_later(0.01, subscriptions.notify, Block(2), [])
+
+        # the timeout is much larger than the notification delay
+        with gevent.Timeout(1):
+            subscription.wait(10)
@@ -2,7 +2,17 @@ import sqlite3
 import os
 import pytest
 
-from raiden.exceptions import InvalidDBData
+from raiden.constants import (
+    CROSS_STATUS_ACCEPTED,
+    CROSS_STATUS_CREATED,
+    CROSS_STATUS_DONE,
+    CROSS_STATUS_INVOICE_PAID,
+)
+from raiden.exceptions import (
+    InvalidCrossTransactionStatus,
+    InvalidDBData,
+    UnknownCrossTransaction,
+)
 from raiden.transfer.architecture import State, StateManager
 from raiden.storage.serialize import PickleSerializer
 from raiden.storage.sqlite import SQLiteStorage, RAIDEN_DB_VERSION
@@ -12,8 +22,13 @@ from raiden.storage.wal import (
 )
 from raiden.tests.utils import factories
 from raiden.transfer.architecture import TransitionResult
-from raiden.transfer.events import EventTransferSentFailed
+from raiden.transfer.events import (
+    ContractSendChannelBatchUnlock,
+    EventTransferSentFailed,
+    EventTransferSentSuccess,
+)
 from raiden.transfer.state_change import (
+    ActionTransferDirect,
     Block,
     ContractReceiveChannelBatchUnlock,
 )
@@ -174,6 +189,143 @@ def test_write_read_events():
     assert isinstance(latest_event[1], EventTransferSentFailed)
 
 
+def test_events_page():
+    wal = new_wal()
+    token_network_identifier = factories.make_address()
+
+    state_change_id = wal.storage.write_state_change('statechangedata')
+    for block_number in range(1, 6):
+        wal.storage.write_events(
+            state_change_id,
+            block_number,
+            [
+                EventTransferSentFailed(block_number, 'whatever'),
+                ContractSendChannelBatchUnlock(
+                    token_network_identifier,
+                    factories.make_channel_identifier(),
+                    [],
+                ),
+            ],
+        )
+
+    failed_name = EventTransferSentFailed.__name__
+    first_page = wal.storage.get_events_page(limit=2, event_types=[failed_name])
+    assert [event.identifier for _, _, event in first_page] == [5, 4]
+
+    second_page = wal.storage.get_events_page(
+        limit=2,
+        before_identifier=first_page[-1][0],
+        event_types=[failed_name],
+    )
+    assert [event.identifier for _, _, event in second_page] == [3, 2]
+
+    newer = wal.storage.get_events_page(
+        after_identifier=second_page[0][0],
+        event_types=[failed_name],
+    )
+    assert [event.identifier for _, _, event in newer] == [4, 5]
+
+    in_range = wal.storage.get_events_page(event_types=[failed_name], from_block=2, to_block=3)
+    assert [block_number for _, block_number, _ in in_range] == [3, 2]
+
+    unlocks = wal.storage.get_events_page(token_network_identifier=token_network_identifier)
+    assert len(unlocks) == 5
+    assert all(isinstance(event, ContractSendChannelBatchUnlock) for _, _, event in unlocks)
+
+
+def test_payment_events_are_bound_to_their_channel():
+    wal = new_wal()
+    token_network_identifier = factories.make_address()
+    channel_identifier = factories.make_channel_identifier()
+
+    state_change_id = wal.storage.write_state_change('statechangedata')
+    wal.storage.write_events(
+        state_change_id,
+        1,
+        [
+            EventTransferSentSuccess(
+                1,
+                10,
+                factories.HOP2,
+                token_network_identifier,
+                channel_identifier,
+            ),
+            EventTransferSentFailed(2, 'whatever', token_network_identifier),
+            EventTransferSentFailed(3, 'whatever'),
+        ],
+    )
+
+    channel_events = wal.storage.get_events_page(
+        token_network_identifier=token_network_identifier,
+        channel_identifier=channel_identifier,
+    )
+    assert [event.identifier for _, _, event in channel_events] == [1]
+
+    token_network_events = wal.storage.get_events_page(
+        token_network_identifier=token_network_identifier,
+    )
+    assert [event.identifier for _, _, event in token_network_events] == [2, 1]
+
+
+def test_upgrade_state_events(tmpdir):
+    dbpath = os.path.join(tmpdir, 'log.db')
+    conn = sqlite3.connect(dbpath)
+    conn.executescript(
+        'CREATE TABLE state_changes (identifier INTEGER PRIMARY KEY AUTOINCREMENT, data BINARY);'
+        'CREATE TABLE state_events ('
+        '   identifier INTEGER PRIMARY KEY,'
+        '   source_statechange_id INTEGER NOT NULL,'
+        '   block_number INTEGER NOT NULL,'
+        '   data BINARY'
+        ');',
+    )
+    token_network_identifier = factories.make_address()
+    channel_identifier = factories.make_channel_identifier()
+    transfer_direct = ActionTransferDirect(token_network_identifier, factories.HOP2, 1, 10)
+    state_changes = [
+        (1, PickleSerializer.serialize(transfer_direct)),
+        (2, PickleSerializer.serialize(Block(11))),
+    ]
+    batch_unlock = ContractSendChannelBatchUnlock(
+        token_network_identifier,
+        channel_identifier,
+        [],
+    )
+    events = [
+        (1, 1, 10, PickleSerializer.serialize(EventTransferSentFailed(1, 'whatever'))),
+        (2, 2, 11, PickleSerializer.serialize(EventTransferSentSuccess(2, 10, factories.HOP2))),
+        (3, 2, 11, PickleSerializer.serialize(batch_unlock)),
+    ]
+    conn.executemany('INSERT INTO state_changes(identifier, data) VALUES(?, ?)', state_changes)
+    conn.executemany(
+        'INSERT INTO state_events(identifier, source_statechange_id, block_number, data) '
+        'VALUES(?, ?, ?, ?)',
+        events,
+    )
+    conn.commit()
+    conn.close()
+
+    storage = SQLiteStorage(dbpath, PickleSerializer)
+    events = storage.get_events_page(event_types=[EventTransferSentFailed.__name__])
+    assert len(events) == 1
+    assert events[0][1] == 10
+    assert storage.get_version() == RAIDEN_DB_VERSION
+
+    # the payment events are bound to the channel of the other events of their
+    # state change, or else to the token network of the state change
+    token_network_events = storage.get_events_page(
+        token_network_identifier=token_network_identifier,
+    )
+    assert [identifier for identifier, _, _ in token_network_events] == [3, 2, 1]
+
+    channel_events = storage.get_events_page(
+        event_types=[EventTransferSentSuccess.__name__],
+        token_network_identifier=token_network_identifier,
+        channel_identifier=channel_identifier,
+    )
+    assert [identifier for identifier, _, _ in channel_events] == [2]
+
+
 def test_restore_without_snapshot():
     wal = new_wal()
 
@@ -190,6 +342,122 @@ def test_restore_without_snapshot():
 
     aggregate = newwal.state_manager.current_state
     assert aggregate.state_changes == [Block(5), Block(7), Block(8)]
+    assert newwal.state_change_id == wal.state_change_id == 3
+
+
+def test_restore_sets_the_state_change_id():
+    wal = new_wal()
+    wal.state_manager = StateManager(state_transtion_acc, None)
+
+    for block_number in range(1, 6):
+        wal.log_and_dispatch(Block(block_number), block_number)
+        if block_number == 3:
+            wal.snapshot()
+
+    newwal, _ = restore_from_latest_snapshot(state_transtion_acc, wal.storage)
+    assert newwal.state_change_id == 5
+
+    wal.snapshot()
+    newwal, _ = restore_from_latest_snapshot(state_transtion_acc, wal.storage)
+    assert newwal.state_change_id == 5
+
+    empty, _ = restore_from_latest_snapshot(state_transtion_acc, new_wal().storage)
+    assert empty.state_change_id is None
+
+
+def new_crosstransaction(storage, identifier):
+    address = '0xb626843871F547f097d2185342fCbB6f7a28e160'
+    storage.create_crosstransaction(
+        address,
+        address,
+        address,
+        100,
+        100,
+        address,
+        CROSS_STATUS_CREATED,
+        identifier,
+    )
+
+
+def test_crosstransaction_status_transitions():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    new_crosstransaction(storage, 1)
+
+    storage.change_crosstransaction_status(1, CROSS_STATUS_ACCEPTED)
+    # setting the same status again is allowed
+    storage.change_crosstransaction_status(1, CROSS_STATUS_ACCEPTED)
+
+    with pytest.raises(InvalidCrossTransactionStatus):
+        storage.change_crosstransaction_status(1, CROSS_STATUS_CREATED)
+
+    storage.change_crosstransaction_status(1, CROSS_STATUS_INVOICE_PAID)
+    storage.change_crosstransaction_status(1, CROSS_STATUS_DONE)
+    assert storage.get_crosstransaction_by_identifier(1)[7] == CROSS_STATUS_DONE
+
+    with pytest.raises(UnknownCrossTransaction):
+        storage.change_crosstransaction_status(2, CROSS_STATUS_ACCEPTED)
+
+
+def test_crosstransaction_column_updates():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    new_crosstransaction(storage, 1)
+    new_crosstransaction(storage, 2)
+
+    storage.change_crosstransaction_r(1, '0xhash', 'lnd_r')
+    storage.change_crosstransaction_statechangeid(1, 10)
+
+    row = storage.get_crosstransaction_by_r('lnd_r')
+    assert row[0] == 1
+    assert row[8] == 10
+    assert storage.get_crosstransaction_by_hash_r('0xhash')[0] == 1
+
+    # the other columns and rows are untouched
+    assert row[4] == 100
+    assert storage.get_crosstransaction_by_identifier(2)[8] == 0
+
+    with pytest.raises(UnknownCrossTransaction):
+        storage.get_crosstransaction_by_r('missing')
+
+    with pytest.raises(UnknownCrossTransaction):
+        storage.change_crosstransaction_r(3, '0xhash', 'lnd_r')
+
+
+def test_crosstransaction_lookups_use_indexes():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+
+    for column in ('r', 'hash_r', 'status'):
+        plan = storage.conn.execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM crosstransaction_events WHERE {} = ?'.format(
+                column,
+            ),
+            ('value', ),
+        ).fetchall()
+        assert 'USING INDEX' in ' '.join(str(step) for step in plan)
+
+
+def test_crosstransactions_page():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    initiator = b'\x01' * 20
+    target = b'\x02' * 20
+    other = b'\x03' * 20
+
+    for identifier in range(1, 8):
+        status = CROSS_STATUS_DONE if identifier % 2 else CROSS_STATUS_CREATED
+        counterparty = target if identifier < 5 else other
+        storage.create_crosstransaction(
+            initiator, counterparty, b'\x04' * 20, 10, 5, 'btc', status, identifier,
+        )
+
+    first_page = storage.get_crosstransactions_page(3)
+    assert [row[0] for row in first_page] == [1, 2, 3]
+    second_page = storage.get_crosstransactions_page(3, after_identifier=first_page[-1][0])
+    assert [row[0] for row in second_page] == [4, 5, 6]
+
+    done = storage.get_crosstransactions_page(10, status=CROSS_STATUS_DONE)
+    assert [row[0] for row in done] == [1, 3, 5, 7]
+
+    with_other = storage.get_crosstransactions_page(10, after_identifier=5, counterparty=other)
+    assert [row[0] for row in with_other] == [6, 7]
 
 
 ######demo
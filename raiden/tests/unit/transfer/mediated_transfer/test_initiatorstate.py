@@ -286,6 +286,8 @@ def test_state_wait_unlock_valid():
 
     assert balance_proof.recipient == channel1.partner_state.address
     assert complete.identifier == UNIT_TRANSFER_IDENTIFIER
+    assert complete.token_network_identifier == channel1.token_network_identifier
+    assert complete.channel_identifier == channel1.identifier
     assert iteration.new_state is None, 'state must be cleaned'
 
 
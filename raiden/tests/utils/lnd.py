@@ -0,0 +1,65 @@
+import base64
+import hashlib
+import json
+
+from gevent.pywsgi import WSGIServer
+
+
+class LndStub:
+    """ Minimal LND REST API, serves invoices and records the payments.
+
+    Requests with a macaroon different from `macaroon` are rejected, as are
+    payments of the requests in `failing_payments`.
+    """
+
+    def __init__(self, macaroon: str):
+        self.macaroon = macaroon
+        self.invoices = dict()
+        self.payments = list()
+        self.failing_payments = set()
+        self.server = WSGIServer(('127.0.0.1', 0), self.application, log=None)
+
+    @property
+    def address(self) -> str:
+        host, port = self.server.address
+        return '{}:{}'.format(host, port)
+
+    def start(self):
+        self.server.start()
+
+    def stop(self):
+        self.server.stop()
+
+    def add_invoice(self, data):
+        preimage = base64.b64decode(data['r_preimage'])
+        r_hash = base64.b64encode(hashlib.sha256(preimage).digest()).decode('utf-8')
+        payment_request = 'lnstub{}'.format(len(self.invoices))
+        self.invoices[payment_request] = data
+        return {'r_hash': r_hash, 'payment_request': payment_request}
+
+    def send_payment(self, data):
+        payment_request = data['payment_request']
+        if payment_request in self.failing_payments:
+            return {'payment_error': 'unable to route payment'}
+
+        self.payments.append(payment_request)
+        return {'payment_preimage': self.invoices[payment_request]['r_preimage']}
+
+    def application(self, environ, start_response):
+        routes = {
+            '/v1/invoices': self.add_invoice,
+            '/v1/channels/transactions': self.send_payment,
+        }
+        handler = routes.get(environ['PATH_INFO'])
+
+        if environ.get('HTTP_GRPC_METADATA_MACAROON') != self.macaroon:
+            status, result = '403 Forbidden', {'error': 'invalid macaroon'}
+        elif environ['REQUEST_METHOD'] != 'POST' or handler is None:
+            status, result = '404 Not Found', {'error': 'not found'}
+        else:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+            data = json.loads(environ['wsgi.input'].read(length))
+            status, result = '200 OK', handler(data)
+
+        start_response(status, [('Content-Type', 'application/json')])
+        return [json.dumps(result).encode('utf-8')]
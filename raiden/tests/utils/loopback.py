@@ -0,0 +1,171 @@
+""" In-process stand-ins for the blockchain and the UDP network.
+
+These are used to run many RaidenService instances in a single process
+without an ethereum node nor sockets. The chain never produces events, the
+channels are opened by dispatching the state changes directly to the nodes,
+see `raiden.tests.benchmark.transfers`.
+"""
+import time
+from collections import defaultdict
+
+import gevent
+
+from raiden.messages import CMDID_TO_CLASS
+from raiden.network.transport.udp.udp_transport import UDPTransport
+from raiden.utils import typing
+
+
+class LoopbackFilter:
+    """ A blockchain filter which never has entries. """
+
+    # There is nothing to uninstall from an ethereum node
+    filter_id = None
+
+    def get_all_entries(self, block_number=None):  # pylint: disable=unused-argument,no-self-use
+        return list()
+
+    def get_new_entries(self, block_number=None):  # pylint: disable=unused-argument,no-self-use
+        return list()
+
+
+class LoopbackCallbacks:
+    """ Stands for the call cache and the transaction manager of the client,
+    which are notified of every new block.
+    """
+
+    def on_new_block(self, block_number, chain_id):  # pylint: disable=unused-argument
+        pass
+
+
+class LoopbackClient:
+    def __init__(self):
+        self.call_cache = LoopbackCallbacks()
+        self.transactions = LoopbackCallbacks()
+        self.stop_event = None
+
+    def inject_stop_event(self, event):
+        self.stop_event = event
+
+
+class LoopbackTokenNetworkRegistry:
+    def __init__(self, address: typing.Address):
+        self.address = address
+
+    def tokenadded_filter(self, from_block=None):  # pylint: disable=unused-argument,no-self-use
+        return LoopbackFilter()
+
+
+class LoopbackSecretRegistry:
+    def __init__(self, address: typing.Address):
+        self.address = address
+
+    def secret_registered_filter(self, from_block=None):  # pylint: disable=unused-argument
+        return LoopbackFilter()
+
+
+class LoopbackChain:
+    """ Replaces the BlockChainService of a node.
+
+    Only the block number and the chain id are served, the nodes must not
+    send transactions.
+    """
+
+    def __init__(self, network_id: int, block_number: typing.BlockNumber = 1):
+        self.client = LoopbackClient()
+        self.network_id = network_id
+        self.current_block_number = block_number
+
+    def block_number(self) -> typing.BlockNumber:
+        return self.current_block_number
+
+    def next_block(self):
+        """ Mine a block, the nodes see it on the next poll of their alarm
+        task.
+        """
+        self.current_block_number += 1
+
+
+class LoopbackServer:
+    """ Replaces the DatagramServer of the UDPTransport, the datagrams are
+    delivered by the `LoopbackNetwork`.
+    """
+
+    def __init__(self, network: 'LoopbackNetwork', host_port: typing.Tuple[str, int]):
+        self.network = network
+        self.host_port = host_port
+        self.handle = None
+        self.accepting = False
+
+    def set_handle(self, handle):
+        self.handle = handle
+
+    def start(self):
+        # UDPTransport.maybe_sendraw checks for this attribute
+        self.socket = self
+        self._socket = self
+        self.accepting = True
+
+    def stop_accepting(self):
+        self.accepting = False
+
+    def stop(self):
+        self.accepting = False
+        self.handle = None
+        if hasattr(self, 'socket'):
+            del self.socket
+
+    def close(self):
+        pass
+
+    def sendto(self, data: bytes, host_port: typing.Tuple[str, int]):
+        self.network.sendto(self.host_port, host_port, data)
+
+
+class LoopbackNetwork:
+    """ Delivers the datagrams of every `LoopbackServer` registered with it.
+
+    Like UDP a datagram sent to an unknown or stopped endpoint is dropped.
+    Every datagram is delivered in a new greenlet, after an optional fixed
+    `delay`, and the time from the send until the receiver finished handling
+    the datagram is recorded by message type.
+    """
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.hostports_to_servers = dict()
+        self.latencies = defaultdict(list)
+
+    def server(self, host_port: typing.Tuple[str, int]) -> LoopbackServer:
+        server = LoopbackServer(self, host_port)
+        self.hostports_to_servers[host_port] = server
+        return server
+
+    def sendto(self, sender_host_port, host_port, data):
+        gevent.spawn(self.deliver, sender_host_port, host_port, data, time.perf_counter())
+
+    def deliver(self, sender_host_port, host_port, data, sent_at):
+        if self.delay:
+            gevent.sleep(self.delay)
+
+        server = self.hostports_to_servers.get(host_port)
+        if server is None or not server.accepting or server.handle is None:
+            return
+
+        server.handle(data, sender_host_port)
+
+        message_type = CMDID_TO_CLASS[data[0]].__name__
+        self.latencies[message_type].append(time.perf_counter() - sent_at)
+
+
+class LoopbackTransport(UDPTransport):
+    """ The UDPTransport with its socket replaced by a `LoopbackServer`.
+
+    The queues, retries, acknowledgements and healthchecks are the ones of the
+    UDPTransport.
+    """
+
+    def __init__(self, network, discovery, host_port, throttle_policy, config):
+        # The DatagramServer only binds the address when started, it is
+        # replaced before that
+        super().__init__(discovery, host_port, throttle_policy, config)
+        self.server = network.server(host_port)
@@ -2,6 +2,8 @@
 from copy import deepcopy
 from typing import List
 
+from raiden.utils import intern_identifier
+
 
 # Quick overview
 # --------------
@@ -80,8 +82,14 @@ class Event:
 
 
 class SendMessageEvent(Event):
+    __slots__ = (
+        'recipient',
+        'queue_name',
+        'message_identifier',
+    )
+
     def __init__(self, recipient, queue_name, message_identifier):
-        self.recipient = recipient
+        self.recipient = intern_identifier(recipient)
         self.queue_name = queue_name
         self.message_identifier = message_identifier
 
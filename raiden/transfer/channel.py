@@ -1456,12 +1456,22 @@ def handle_send_directtransfer(
         events.append(direct_transfer)
     else:
         if not is_open:
-            failure = EventTransferSentFailed(payment_identifier, 'Channel is not opened')
+            failure = EventTransferSentFailed(
+                payment_identifier,
+                'Channel is not opened',
+                channel_state.token_network_identifier,
+                channel_state.identifier,
+            )
             events.append(failure)
 
         elif not is_valid:
             msg = 'Transfer amount is invalid. Transfer: {}'.format(amount)
-            failure = EventTransferSentFailed(payment_identifier, msg)
+            failure = EventTransferSentFailed(
+                payment_identifier,
+                msg,
+                channel_state.token_network_identifier,
+                channel_state.identifier,
+            )
             events.append(failure)
 
         elif not can_pay:
@@ -1473,7 +1483,12 @@ def handle_send_directtransfer(
                 amount,
             )
 
-            failure = EventTransferSentFailed(payment_identifier, msg)
+            failure = EventTransferSentFailed(
+                payment_identifier,
+                msg,
+                channel_state.token_network_identifier,
+                channel_state.identifier,
+            )
             events.append(failure)
 
     return TransitionResult(channel_state, events)
@@ -1518,6 +1533,8 @@ def handle_receive_directtransfer(
             direct_transfer.payment_identifier,
             transfer_amount,
             channel_state.partner_state.address,
+            channel_state.token_network_identifier,
+            channel_state.identifier,
         )
         send_processed = SendProcessed(
             direct_transfer.balance_proof.sender,
@@ -0,0 +1,231 @@
+""" State machine of a cross chain swap.
+
+The initiator sends tokens and receives BTC, the target sends BTC and
+receives tokens:
+
+- initiator: CREATED -> ACCEPTED -> SECRET_REQUESTED or INVOICE_PAID -> DONE
+- target: RECEIVED -> LOCKED -> PAYMENT_SENT -> DONE, or PAYMENT_FAILED when
+  the invoice can not be paid
+
+The initiator reveals the secret of the locked transfer only after the
+target requested it and the LND invoice was paid, in whichever order these
+happen.
+"""
+from raiden.constants import (
+    CROSS_ACCEPT,
+    CROSS_ACCEPT_SYNC,
+    CROSS_STATUS_ACCEPTED,
+    CROSS_STATUS_CREATED,
+    CROSS_STATUS_DONE,
+    CROSS_STATUS_INVOICE_PAID,
+    CROSS_STATUS_LOCKED,
+    CROSS_STATUS_PAYMENT_FAILED,
+    CROSS_STATUS_PAYMENT_SENT,
+    CROSS_STATUS_RECEIVED,
+    CROSS_STATUS_SECRET_REQUESTED,
+)
+from raiden.transfer.architecture import TransitionResult
+from raiden.transfer.events import EventCrossSwapUpdated, SendCrossSwapAccept
+from raiden.transfer.state import CrossSwapState
+from raiden.transfer.state_change import (
+    ActionCrossSwapLocked,
+    ActionCrossSwapPaymentFailed,
+    ActionCrossSwapPaymentSent,
+    ActionInitCrossSwap,
+    ActionRestoreCrossSwap,
+    ReceiveCrossInvoicePaid,
+    ReceiveCrossSecretRequest,
+    ReceiveCrossSwap,
+    ReceiveCrossSwapAccept,
+    ReceiveCrossSwapDone,
+)
+from raiden.utils import typing
+
+
+def event_for_update(swap_state: CrossSwapState) -> EventCrossSwapUpdated:
+    return EventCrossSwapUpdated(
+        swap_state.identifier,
+        swap_state.initiator_address,
+        swap_state.target_address,
+        swap_state.token_network_identifier,
+        swap_state.sendETH_amount,
+        swap_state.sendBTC_amount,
+        swap_state.receiveBTC_address,
+        swap_state.status,
+        swap_state.secrethash,
+        swap_state.lnd_r_hash,
+    )
+
+
+def events_for_done(swap_state: CrossSwapState):
+    swap_state.status = CROSS_STATUS_DONE
+
+    sync = SendCrossSwapAccept(
+        swap_state.target_address,
+        swap_state.initiator_address,
+        swap_state.target_address,
+        swap_state.identifier,
+        CROSS_ACCEPT_SYNC,
+    )
+    return [event_for_update(swap_state), sync]
+
+
+def handle_init_initiator(state_change: ActionInitCrossSwap):
+    swap_state = state_change.cross_swap
+    swap_state.status = CROSS_STATUS_CREATED
+
+    events = [event_for_update(swap_state)]
+    return TransitionResult(swap_state, events)
+
+
+def handle_init_target(state_change: ReceiveCrossSwap):
+    swap_state = state_change.cross_swap
+    swap_state.status = CROSS_STATUS_RECEIVED
+
+    accept = SendCrossSwapAccept(
+        swap_state.initiator_address,
+        swap_state.initiator_address,
+        swap_state.target_address,
+        swap_state.identifier,
+        CROSS_ACCEPT,
+    )
+    events = [event_for_update(swap_state), accept]
+    return TransitionResult(swap_state, events)
+
+
+def handle_restore(state_change: ActionRestoreCrossSwap):
+    # The row of the swap is already in the table
+    return TransitionResult(state_change.cross_swap, list())
+
+
+def handle_accept(swap_state: CrossSwapState, state_change: ReceiveCrossSwapAccept):
+    events = list()
+
+    if swap_state.status == CROSS_STATUS_CREATED:
+        swap_state.status = CROSS_STATUS_ACCEPTED
+        events.append(event_for_update(swap_state))
+
+    return TransitionResult(swap_state, events)
+
+
+def handle_locked(swap_state: CrossSwapState, state_change: ActionCrossSwapLocked):
+    events = list()
+
+    if swap_state.status == CROSS_STATUS_ACCEPTED:
+        swap_state.secrethash = state_change.secrethash
+        swap_state.lnd_r_hash = state_change.lnd_r_hash
+        events.append(event_for_update(swap_state))
+
+    elif swap_state.status == CROSS_STATUS_RECEIVED:
+        swap_state.status = CROSS_STATUS_LOCKED
+        swap_state.secrethash = state_change.secrethash
+        events.append(event_for_update(swap_state))
+
+    return TransitionResult(swap_state, events)
+
+
+def handle_secret_request(swap_state: CrossSwapState, state_change: ReceiveCrossSecretRequest):
+    events = list()
+
+    is_valid_request = (
+        state_change.secret_request.secrethash == swap_state.secrethash
+    )
+
+    if is_valid_request and swap_state.status == CROSS_STATUS_INVOICE_PAID:
+        swap_state.secret_request = state_change.secret_request
+        events.extend(events_for_done(swap_state))
+
+    elif is_valid_request and swap_state.status == CROSS_STATUS_ACCEPTED:
+        swap_state.status = CROSS_STATUS_SECRET_REQUESTED
+        swap_state.secret_request = state_change.secret_request
+        events.append(event_for_update(swap_state))
+
+    return TransitionResult(swap_state, events)
+
+
+def handle_invoice_paid(swap_state: CrossSwapState, state_change: ReceiveCrossInvoicePaid):
+    events = list()
+
+    if swap_state.status == CROSS_STATUS_SECRET_REQUESTED:
+        events.extend(events_for_done(swap_state))
+
+    elif swap_state.status == CROSS_STATUS_ACCEPTED:
+        swap_state.status = CROSS_STATUS_INVOICE_PAID
+        events.append(event_for_update(swap_state))
+
+    return TransitionResult(swap_state, events)
+
+
+def handle_payment_sent(swap_state: CrossSwapState, state_change: ActionCrossSwapPaymentSent):
+    events = list()
+
+    if swap_state.status == CROSS_STATUS_LOCKED:
+        swap_state.status = CROSS_STATUS_PAYMENT_SENT
+        events.append(event_for_update(swap_state))
+
+    return TransitionResult(swap_state, events)
+
+
+def handle_payment_failed(
+        swap_state: CrossSwapState,
+        state_change: ActionCrossSwapPaymentFailed,
+):
+    events = list()
+
+    # The initiator never reveals the secret, the locked transfer expires
+    if swap_state.status == CROSS_STATUS_LOCKED:
+        swap_state.status = CROSS_STATUS_PAYMENT_FAILED
+        events.append(event_for_update(swap_state))
+
+    return TransitionResult(swap_state, events)
+
+
+def handle_done(swap_state: CrossSwapState, state_change: ReceiveCrossSwapDone):
+    events = list()
+
+    # The initiator may finish the swap before the payment result is known
+    if swap_state.status in (CROSS_STATUS_LOCKED, CROSS_STATUS_PAYMENT_SENT):
+        swap_state.status = CROSS_STATUS_DONE
+        events.append(event_for_update(swap_state))
+
+    return TransitionResult(swap_state, events)
+
+
+def state_transition(
+        swap_state: typing.Optional[CrossSwapState],
+        state_change,
+) -> TransitionResult:
+    """ Apply `state_change` to the swap, `swap_state` is None for the init
+    state changes.
+
+    When the swap is done with a pending `secret_request` the caller must
+    dispatch it to the initiator task.
+    """
+    # pylint: disable=unidiomatic-typecheck
+    if swap_state is None:
+        if type(state_change) == ActionInitCrossSwap:
+            iteration = handle_init_initiator(state_change)
+        elif type(state_change) == ReceiveCrossSwap:
+            iteration = handle_init_target(state_change)
+        elif type(state_change) == ActionRestoreCrossSwap:
+            iteration = handle_restore(state_change)
+        else:
+            iteration = TransitionResult(swap_state, list())
+    elif type(state_change) == ReceiveCrossSwapAccept:
+        iteration = handle_accept(swap_state, state_change)
+    elif type(state_change) == ActionCrossSwapLocked:
+        iteration = handle_locked(swap_state, state_change)
+    elif type(state_change) == ReceiveCrossSecretRequest:
+        iteration = handle_secret_request(swap_state, state_change)
+    elif type(state_change) == ReceiveCrossInvoicePaid:
+        iteration = handle_invoice_paid(swap_state, state_change)
+    elif type(state_change) == ActionCrossSwapPaymentSent:
+        iteration = handle_payment_sent(swap_state, state_change)
+    elif type(state_change) == ActionCrossSwapPaymentFailed:
+        iteration = handle_payment_failed(swap_state, state_change)
+    elif type(state_change) == ReceiveCrossSwapDone:
+        iteration = handle_done(swap_state, state_change)
+    else:
+        iteration = TransitionResult(swap_state, list())
+
+    return iteration
@@ -14,6 +14,13 @@ class ContractSendChannelClose(Event):
     on-chain.
     """
 
+    __slots__ = (
+        'channel_identifier',
+        'token_address',
+        'token_network_identifier',
+        'balance_proof',
+    )
+
     def __init__(self, channel_identifier, token_address, token_network_identifier, balance_proof):
         self.channel_identifier = channel_identifier
         self.token_address = token_address
@@ -46,6 +53,13 @@ class ContractSendChannelClose(Event):
 class ContractSendChannelSettle(Event):
     """ Event emitted if the netting channel must be settled. """
 
+    __slots__ = (
+        'channel_identifier',
+        'token_network_identifier',
+        'our_balance_proof',
+        'partner_balance_proof',
+    )
+
     def __init__(
             self,
             channel_identifier: typing.ChannelID,
@@ -106,6 +120,12 @@ class ContractSendChannelSettle(Event):
 class ContractSendChannelUpdateTransfer(Event):
     """ Event emitted if the netting channel balance proof must be updated. """
 
+    __slots__ = (
+        'channel_identifier',
+        'token_network_identifier',
+        'balance_proof',
+    )
+
     def __init__(self, channel_identifier, token_network_identifier, balance_proof):
         self.channel_identifier = channel_identifier
         self.token_network_identifier = token_network_identifier
@@ -135,6 +155,12 @@ class ContractSendChannelUpdateTransfer(Event):
 class ContractSendChannelBatchUnlock(Event):
     """ Event emitted when the lock must be claimed on-chain. """
 
+    __slots__ = (
+        'token_network_identifier',
+        'channel_identifier',
+        'merkle_treee_leaves',
+    )
+
     def __init__(self, token_network_identifier, channel_identifier, merkle_treee_leaves):
         self.token_network_identifier = token_network_identifier
         self.channel_identifier = channel_identifier
@@ -162,6 +188,10 @@ class ContractSendChannelBatchUnlock(Event):
 class ContractSendSecretReveal(Event):
     """ Event emitted when the lock must be claimed on-chain. """
 
+    __slots__ = (
+        'secret',
+    )
+
     def __init__(self, secret: typing.Secret):
         if not isinstance(secret, typing.T_Secret):
             raise ValueError('secret must be a Secret instance')
@@ -205,10 +235,27 @@ class EventTransferSentSuccess(Event):
         sucessful but there is no knowledge about the global transfer.
     """
 
-    def __init__(self, identifier, amount, target):
+    __slots__ = (
+        'identifier',
+        'amount',
+        'target',
+        'token_network_identifier',
+        'channel_identifier',
+    )
+
+    def __init__(
+            self,
+            identifier,
+            amount,
+            target,
+            token_network_identifier=None,
+            channel_identifier=None,
+    ):
         self.identifier = identifier
         self.amount = amount
         self.target = target
+        self.token_network_identifier = token_network_identifier
+        self.channel_identifier = channel_identifier
 
     def __repr__(self):
         return '<EventTransferSentSuccess identifier:{} amount:{} target:{}>'.format(
@@ -222,7 +269,9 @@ class EventTransferSentSuccess(Event):
             isinstance(other, EventTransferSentSuccess) and
             self.identifier == other.identifier and
             self.amount == other.amount and
-            self.target == other.target
+            self.target == other.target and
+            self.token_network_identifier == other.token_network_identifier and
+            self.channel_identifier == other.channel_identifier
         )
 
     def __ne__(self, other):
@@ -237,9 +286,24 @@ class EventTransferSentFailed(Event):
         has failed, they may infer about lock successes and failures.
     """
 
-    def __init__(self, identifier, reason):
+    __slots__ = (
+        'identifier',
+        'reason',
+        'token_network_identifier',
+        'channel_identifier',
+    )
+
+    def __init__(
+            self,
+            identifier,
+            reason,
+            token_network_identifier=None,
+            channel_identifier=None,
+    ):
         self.identifier = identifier
         self.reason = reason
+        self.token_network_identifier = token_network_identifier
+        self.channel_identifier = channel_identifier
 
     def __repr__(self):
         return '<EventTransferSentFailed id:{} reason:{}>'.format(
@@ -251,7 +315,9 @@ class EventTransferSentFailed(Event):
         return (
             isinstance(other, EventTransferSentFailed) and
             self.identifier == other.identifier and
-            self.reason == other.reason
+            self.reason == other.reason and
+            self.token_network_identifier == other.token_network_identifier and
+            self.channel_identifier == other.channel_identifier
         )
 
     def __ne__(self, other):
@@ -268,7 +334,22 @@ class EventTransferReceivedSuccess(Event):
         there is no correspoding `EventTransferReceivedFailed`.
     """
 
-    def __init__(self, identifier, amount, initiator):
+    __slots__ = (
+        'identifier',
+        'amount',
+        'initiator',
+        'token_network_identifier',
+        'channel_identifier',
+    )
+
+    def __init__(
+            self,
+            identifier,
+            amount,
+            initiator,
+            token_network_identifier=None,
+            channel_identifier=None,
+    ):
         if amount < 0:
             raise ValueError('transferred_amount cannot be negative')
 
@@ -278,6 +359,8 @@ class EventTransferReceivedSuccess(Event):
         self.identifier = identifier
         self.amount = amount
         self.initiator = initiator
+        self.token_network_identifier = token_network_identifier
+        self.channel_identifier = channel_identifier
 
     def __repr__(self):
         return '<EventTransferReceivedSuccess identifier:{} amount:{} initiator:{}>'.format(
@@ -291,7 +374,9 @@ class EventTransferReceivedSuccess(Event):
             isinstance(other, EventTransferReceivedSuccess) and
             self.identifier == other.identifier and
             self.amount == other.amount and
-            self.initiator == other.initiator
+            self.initiator == other.initiator and
+            self.token_network_identifier == other.token_network_identifier and
+            self.channel_identifier == other.channel_identifier
         )
 
     def __ne__(self, other):
@@ -301,6 +386,11 @@ class EventTransferReceivedSuccess(Event):
 class EventTransferReceivedInvalidDirectTransfer(Event):
     """ Event emitted when an invalid direct transfer is received. """
 
+    __slots__ = (
+        'identifier',
+        'reason',
+    )
+
     def __init__(self, identifier, reason):
         self.identifier = identifier
         self.reason = reason
@@ -325,6 +415,12 @@ class EventTransferReceivedInvalidDirectTransfer(Event):
 class SendDirectTransfer(SendMessageEvent):
     """ Event emitted when a direct transfer message must be sent. """
 
+    __slots__ = (
+        'payment_identifier',
+        'balance_proof',
+        'token',
+    )
+
     def __init__(
             self,
             recipient,
@@ -370,6 +466,8 @@ class SendDirectTransfer(SendMessageEvent):
 
 
 class SendProcessed(SendMessageEvent):
+    __slots__ = ()
+
     def __repr__(self):
         return (
             '<SendProcessed confirmed_msgid:{} recipient:{}>'
@@ -390,6 +488,12 @@ class SendProcessed(SendMessageEvent):
 
 
 class SendCrosstransaction(SendMessageEvent):
+    __slots__ = (
+        'initiator_address',
+        'sendETH_amount',
+        'sendBTC_amount',
+        'receiveBTC_address',
+    )
 
     def __init__(
         self,
@@ -426,3 +530,120 @@ class SendCrosstransaction(SendMessageEvent):
 
     def __ne__(self, other):
         return not self.__eq__(other)
+
+
+class SendCrossSwapAccept(Event):
+    """ Event emitted to send an `AcceptCross` message to `recipient`.
+
+    The message is not queued, a lost message is recovered by the user
+    retrying the swap.
+    """
+
+    __slots__ = (
+        'recipient',
+        'initiator_address',
+        'target_address',
+        'cross_id',
+        'accept',
+    )
+
+    def __init__(
+            self,
+            recipient: typing.Address,
+            initiator_address: typing.Address,
+            target_address: typing.Address,
+            cross_id: int,
+            accept: int,
+    ):
+        self.recipient = recipient
+        self.initiator_address = initiator_address
+        self.target_address = target_address
+        self.cross_id = cross_id
+        self.accept = accept
+
+    def __repr__(self):
+        return '<SendCrossSwapAccept recipient:{} cross_id:{} accept:{}>'.format(
+            pex(self.recipient),
+            self.cross_id,
+            self.accept,
+        )
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, SendCrossSwapAccept) and
+            self.recipient == other.recipient and
+            self.initiator_address == other.initiator_address and
+            self.target_address == other.target_address and
+            self.cross_id == other.cross_id and
+            self.accept == other.accept
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class EventCrossSwapUpdated(Event):
+    """ Event emitted when a cross chain swap is created or changes, it is
+    used to keep the `crosstransaction_events` table up-to-date.
+    """
+
+    __slots__ = (
+        'identifier',
+        'initiator_address',
+        'target_address',
+        'token_network_identifier',
+        'sendETH_amount',
+        'sendBTC_amount',
+        'receiveBTC_address',
+        'status',
+        'secrethash',
+        'lnd_r_hash',
+    )
+
+    def __init__(
+            self,
+            identifier: int,
+            initiator_address: typing.Address,
+            target_address: typing.Address,
+            token_network_identifier: typing.TokenNetworkID,
+            sendETH_amount: typing.TokenAmount,
+            sendBTC_amount: int,
+            receiveBTC_address: str,
+            status: int,
+            secrethash: typing.Optional[typing.SecretHash],
+            lnd_r_hash: typing.Optional[str],
+    ):
+        self.identifier = identifier
+        self.initiator_address = initiator_address
+        self.target_address = target_address
+        self.token_network_identifier = token_network_identifier
+        self.sendETH_amount = sendETH_amount
+        self.sendBTC_amount = sendBTC_amount
+        self.receiveBTC_address = receiveBTC_address
+        self.status = status
+        self.secrethash = secrethash
+        self.lnd_r_hash = lnd_r_hash
+
+    def __repr__(self):
+        return '<EventCrossSwapUpdated id:{} status:{}>'.format(
+            self.identifier,
+            self.status,
+        )
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, EventCrossSwapUpdated) and
+            self.identifier == other.identifier and
+            self.initiator_address == other.initiator_address and
+            self.target_address == other.target_address and
+            self.token_network_identifier == other.token_network_identifier and
+            self.sendETH_amount == other.sendETH_amount and
+            self.sendBTC_amount == other.sendBTC_amount and
+            self.receiveBTC_address == other.receiveBTC_address and
+            self.status == other.status and
+            self.secrethash == other.secrethash and
+            self.lnd_r_hash == other.lnd_r_hash
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
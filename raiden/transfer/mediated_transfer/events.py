@@ -25,6 +25,10 @@ def refund_from_sendmediated(send_lockedtransfer_event):
 class SendLockedTransfer(SendMessageEvent):
     """ A locked transfer that must be sent to `recipient`. """
 
+    __slots__ = (
+        'transfer',
+    )
+
     def __init__(self, recipient, queue_name, message_identifier, transfer):
         if not isinstance(transfer, LockedTransferUnsignedState):
             raise ValueError('transfer must be a LockedTransferUnsignedState instance')
@@ -81,6 +85,11 @@ class SendRevealSecret(SendMessageEvent):
         update the balance.
     """
 
+    __slots__ = (
+        'secret',
+        'secrethash',
+    )
+
     def __init__(
             self,
             recipient,
@@ -134,6 +143,13 @@ class SendBalanceProof(SendMessageEvent):
         updated by the recipient once a balance proof message is received.
     """
 
+    __slots__ = (
+        'payment_identifier',
+        'token',
+        'secret',
+        'balance_proof',
+    )
+
     def __init__(
             self,
             recipient,
@@ -184,6 +200,12 @@ class SendSecretRequest(SendMessageEvent):
     (`recipient`).
     """
 
+    __slots__ = (
+        'payment_identifier',
+        'amount',
+        'secrethash',
+    )
+
     def __init__(
             self,
             recipient,
@@ -234,6 +256,15 @@ class SendRefundTransfer(SendMessageEvent):
     of losing token.
     """
 
+    __slots__ = (
+        'payment_identifier',
+        'token',
+        'balance_proof',
+        'lock',
+        'initiator',
+        'target',
+    )
+
     def __init__(
             self,
             recipient,
@@ -295,6 +326,11 @@ class SendRefundTransfer(SendMessageEvent):
 class EventUnlockSuccess(Event):
     """ Event emitted when a lock unlock succeded. """
 
+    __slots__ = (
+        'identifier',
+        'secrethash',
+    )
+
     def __init__(self, identifier, secrethash):
         self.identifier = identifier
         self.secrethash = secrethash
@@ -319,6 +355,12 @@ class EventUnlockSuccess(Event):
 class EventUnlockFailed(Event):
     """ Event emitted when a lock unlock failed. """
 
+    __slots__ = (
+        'identifier',
+        'secrethash',
+        'reason',
+    )
+
     def __init__(self, identifier, secrethash, reason):
         self.identifier = identifier
         self.secrethash = secrethash
@@ -345,6 +387,11 @@ class EventUnlockFailed(Event):
 class EventUnlockClaimSuccess(Event):
     """ Event emitted when a lock claim succeded. """
 
+    __slots__ = (
+        'identifier',
+        'secrethash',
+    )
+
     def __init__(self, identifier, secrethash):
         self.identifier = identifier
         self.secrethash = secrethash
@@ -369,6 +416,12 @@ class EventUnlockClaimSuccess(Event):
 class EventUnlockClaimFailed(Event):
     """ Event emitted when a lock claim failed. """
 
+    __slots__ = (
+        'identifier',
+        'secrethash',
+        'reason',
+    )
+
     def __init__(self, identifier, secrethash, reason):
         self.identifier = identifier
         self.secrethash = secrethash
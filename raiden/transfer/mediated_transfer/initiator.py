@@ -104,6 +104,7 @@ def try_new_route(
         transfer_failed = EventTransferSentFailed(
             identifier=transfer_description.payment_identifier,
             reason=reason,
+            token_network_identifier=transfer_description.token_network_identifier,
         )
         events.append(transfer_failed)
 
@@ -217,6 +218,10 @@ def handle_secretrequest(
         cancel = EventTransferSentFailed(
             identifier=initiator_state.transfer_description.payment_identifier,
             reason='bad secret request message from target',
+            token_network_identifier=(
+                initiator_state.transfer_description.token_network_identifier
+            ),
+            channel_identifier=initiator_state.channel_identifier,
         )
         iteration = TransitionResult(None, [cancel])
 
@@ -262,6 +267,8 @@ def handle_secretreveal(
             transfer_description.payment_identifier,
             transfer_description.amount,
             transfer_description.target,
+            channel_state.token_network_identifier,
+            channel_state.identifier,
         )
 
         unlock_success = EventUnlockSuccess(
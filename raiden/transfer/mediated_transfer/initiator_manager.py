@@ -147,11 +147,14 @@ def handle_cancelpayment(payment_state: InitiatorPaymentState) -> TransitionResu
     assert can_cancel(payment_state), 'Cannot cancel a transfer after the secret is revealed'
 
     transfer_description = payment_state.initiator.transfer_description
+    channel_identifier = payment_state.initiator.channel_identifier
     cancel_events = cancel_current_route(payment_state)
 
     cancel = EventTransferSentFailed(
         identifier=transfer_description.payment_identifier,
         reason='user canceled transfer',
+        token_network_identifier=transfer_description.token_network_identifier,
+        channel_identifier=channel_identifier,
     )
     cancel_events.append(cancel)
 
@@ -1,6 +1,6 @@
 # pylint: disable=too-few-public-methods,too-many-arguments,too-many-instance-attributes
 from raiden.transfer.architecture import State
-from raiden.utils import pex, sha3, typing
+from raiden.utils import intern_identifier, pex, sha3, typing
 from raiden.transfer.state import (
     EMPTY_MERKLE_ROOT,
     balanceproof_from_envelope,
@@ -235,11 +235,11 @@ class LockedTransferUnsignedState(State):
             raise ValueError('balance_proof must not be empty')
 
         self.payment_identifier = payment_identifier
-        self.token = token
+        self.token = intern_identifier(token)
         self.balance_proof = balance_proof
         self.lock = lock
-        self.initiator = initiator
-        self.target = target
+        self.initiator = intern_identifier(initiator)
+        self.target = intern_identifier(target)
 
     def __repr__(self):
         return (
@@ -308,11 +308,11 @@ class LockedTransferSignedState(State):
 
         self.message_identifier = message_identifier
         self.payment_identifier = payment_identifier
-        self.token = token
+        self.token = intern_identifier(token)
         self.balance_proof = balance_proof
         self.lock = lock
-        self.initiator = initiator
-        self.target = target
+        self.initiator = intern_identifier(initiator)
+        self.target = intern_identifier(target)
 
     def __repr__(self):
         return (
@@ -200,6 +200,8 @@ def handle_unlock(target_state, state_change: ReceiveUnlock, channel_state):
                 transfer.payment_identifier,
                 transfer.lock.amount,
                 transfer.initiator,
+                channel_state.token_network_identifier,
+                channel_state.identifier,
             )
 
             unlock_success = EventUnlockClaimSuccess(
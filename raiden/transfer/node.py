@@ -1,5 +1,7 @@
+from raiden.constants import CROSS_STATUS_FINISHED
 from raiden.transfer import (
     channel,
+    cross_swap,
     token_network,
     views,
 )
@@ -46,6 +48,16 @@ from raiden.transfer.state_change import (
     ReceiveTransferDirect,
     ReceiveUnlock,
     ActionCrosstransaction,
+    ActionCrossSwapLocked,
+    ActionCrossSwapPaymentFailed,
+    ActionCrossSwapPaymentSent,
+    ActionInitCrossSwap,
+    ActionRestoreCrossSwap,
+    ReceiveCrossInvoicePaid,
+    ReceiveCrossSecretRequest,
+    ReceiveCrossSwap,
+    ReceiveCrossSwapAccept,
+    ReceiveCrossSwapDone,
 )
 from raiden.transfer.mediated_transfer.state_change import (
     ActionInitInitiator,
@@ -361,6 +373,52 @@ def subdispatch_targettask(
     return TransitionResult(chain_state, events)
 
 
+def subdispatch_crossswaptask(
+        chain_state: ChainState,
+        state_change: StateChange,
+        cross_id: int,
+) -> TransitionResult:
+    payment_mapping = chain_state.payment_mapping
+    sub_task = payment_mapping.crossids_to_task.get(cross_id)
+
+    init_state_changes = (ActionInitCrossSwap, ReceiveCrossSwap, ActionRestoreCrossSwap)
+    if not sub_task:
+        is_valid_subtask = type(state_change) in init_state_changes
+        swap_state = None
+    else:
+        is_valid_subtask = type(state_change) not in init_state_changes
+        swap_state = sub_task.swap_state
+
+    events = list()
+    if is_valid_subtask:
+        iteration = cross_swap.state_transition(swap_state, state_change)
+        swap_state = iteration.new_state
+        events.extend(iteration.events)
+
+        if swap_state.status in CROSS_STATUS_FINISHED:
+            # Finished swaps are only kept in the crosstransaction_events table
+            del payment_mapping.crossids_to_task[cross_id]
+            payment_mapping.lnd_rhashes_to_crossid.pop(swap_state.lnd_r_hash, None)
+
+            if swap_state.secret_request is not None:
+                sub_iteration = subdispatch_to_paymenttask(
+                    chain_state,
+                    swap_state.secret_request,
+                    swap_state.secrethash,
+                )
+                events.extend(sub_iteration.events)
+        else:
+            payment_mapping.crossids_to_task[cross_id] = PaymentMappingState.CrossSwapTask(
+                swap_state.token_network_identifier,
+                swap_state,
+            )
+
+            if swap_state.lnd_r_hash is not None:
+                payment_mapping.lnd_rhashes_to_crossid[swap_state.lnd_r_hash] = cross_id
+
+    return TransitionResult(chain_state, events)
+
+
 def maybe_add_tokennetwork(
         chain_state: ChainState,
         payment_network_identifier: typing.PaymentNetworkID,
@@ -718,6 +776,8 @@ def handle_processed(
                         message.payment_identifier,
                         message.balance_proof.transferred_amount,
                         message.recipient,
+                        message.balance_proof.token_network_identifier,
+                        message.balance_proof.channel_address,
                     ))
                 remove.append(pos)
 
@@ -759,6 +819,36 @@ def handle_send_cross(chain_state,state_change):
 
 
 
+def handle_init_cross_swap(
+        chain_state: ChainState,
+        state_change: StateChange,
+) -> TransitionResult:
+    return subdispatch_crossswaptask(
+        chain_state,
+        state_change,
+        state_change.cross_swap.identifier,
+    )
+
+
+def handle_cross_swap_action(
+        chain_state: ChainState,
+        state_change: StateChange,
+) -> TransitionResult:
+    return subdispatch_crossswaptask(
+        chain_state,
+        state_change,
+        state_change.cross_id,
+    )
+
+
+def handle_cross_invoice_paid(
+        chain_state: ChainState,
+        state_change: ReceiveCrossInvoicePaid,
+) -> TransitionResult:
+    cross_id = chain_state.payment_mapping.lnd_rhashes_to_crossid.get(state_change.lnd_r_hash)
+    return subdispatch_crossswaptask(chain_state, state_change, cross_id)
+
+
 def handle_state_change(chain_state: ChainState, state_change: StateChange) -> TransitionResult:
     if type(state_change) == Block:
         iteration = handle_block(
@@ -896,6 +986,56 @@ def handle_state_change(chain_state: ChainState, state_change: StateChange) -> T
         )
     elif type(state_change) == ActionCrosstransaction:
         iteration = handle_send_cross(chain_state,state_change)
+    elif type(state_change) == ActionInitCrossSwap:
+        iteration = handle_init_cross_swap(
+            chain_state,
+            state_change,
+        )
+    elif type(state_change) == ReceiveCrossSwap:
+        iteration = handle_init_cross_swap(
+            chain_state,
+            state_change,
+        )
+    elif type(state_change) == ActionRestoreCrossSwap:
+        iteration = handle_init_cross_swap(
+            chain_state,
+            state_change,
+        )
+    elif type(state_change) == ReceiveCrossSwapAccept:
+        iteration = handle_cross_swap_action(
+            chain_state,
+            state_change,
+        )
+    elif type(state_change) == ActionCrossSwapLocked:
+        iteration = handle_cross_swap_action(
+            chain_state,
+            state_change,
+        )
+    elif type(state_change) == ReceiveCrossSecretRequest:
+        iteration = handle_cross_swap_action(
+            chain_state,
+            state_change,
+        )
+    elif type(state_change) == ActionCrossSwapPaymentSent:
+        iteration = handle_cross_swap_action(
+            chain_state,
+            state_change,
+        )
+    elif type(state_change) == ActionCrossSwapPaymentFailed:
+        iteration = handle_cross_swap_action(
+            chain_state,
+            state_change,
+        )
+    elif type(state_change) == ReceiveCrossSwapDone:
+        iteration = handle_cross_swap_action(
+            chain_state,
+            state_change,
+        )
+    elif type(state_change) == ReceiveCrossInvoicePaid:
+        iteration = handle_cross_invoice_paid(
+            chain_state,
+            state_change,
+        )
 
     return iteration
 
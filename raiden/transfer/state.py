@@ -12,7 +12,7 @@ from raiden.encoding import messages
 from raiden.transfer.architecture import State
 from raiden.transfer.merkle_tree import merkleroot
 from raiden.transfer.utils import hash_balance_data
-from raiden.utils import lpex, pex, sha3, typing
+from raiden.utils import intern_identifier, lpex, pex, sha3, typing
 
 SecretHashToLock = typing.Dict[typing.SecretHash, 'HashTimeLockState']
 SecretHashToPartialUnlockProof = typing.Dict[typing.SecretHash, 'UnlockPartialProofState']
@@ -199,8 +199,8 @@ class TokenNetworkState(State):
         if not isinstance(token_address, typing.T_Address):
             raise ValueError('token_address must be an address instance')
 
-        self.address = address
-        self.token_address = token_address
+        self.address = intern_identifier(address)
+        self.token_address = intern_identifier(token_address)
         self.network_graph = TokenNetworkGraphState(networkx.Graph())
 
         self.channelidentifiers_to_channels = dict()
@@ -269,8 +269,13 @@ class PaymentMappingState(State):
     # Because token swaps span multiple token networks, the state of the
     # payment task is kept in this mapping, instead of inside an arbitrary
     # token network.
+    #
+    # Cross chain swaps exist before the transfer is initialized, so they are
+    # keyed by the swap identifier and not by the secrethash.
     __slots__ = (
         'secrethashes_to_task',
+        'crossids_to_task',
+        'lnd_rhashes_to_crossid',
     )
 
     InitiatorTask = namedtuple('InitiatorTask', (
@@ -289,18 +294,104 @@ class PaymentMappingState(State):
         'target_state',
     ))
 
+    CrossSwapTask = namedtuple('CrossSwapTask', (
+        'token_network_identifier',
+        'swap_state',
+    ))
+
     def __init__(self):
         self.secrethashes_to_task = dict()
+        self.crossids_to_task = dict()
+        self.lnd_rhashes_to_crossid = dict()
 
     def __repr__(self):
-        return '<PaymentMappingState qtd_transfers:{}>'.format(
+        return '<PaymentMappingState qtd_transfers:{} qtd_cross_swaps:{}>'.format(
             len(self.secrethashes_to_task),
+            len(self.crossids_to_task),
         )
 
     def __eq__(self, other):
         return (
             isinstance(other, PaymentMappingState) and
-            self.secrethashes_to_task == other.secrethashes_to_task
+            self.secrethashes_to_task == other.secrethashes_to_task and
+            self.crossids_to_task == other.crossids_to_task and
+            self.lnd_rhashes_to_crossid == other.lnd_rhashes_to_crossid
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class CrossSwapState(State):
+    """ State of a cross chain swap, the tokens of `token_network_identifier`
+    sent by the initiator are exchanged for the BTC sent by the target through
+    LND.
+
+    The swap is locked with the secret of the LND invoice created by the
+    initiator, the target pays the invoice and the initiator only reveals the
+    secret once both the invoice was paid and the target requested the secret.
+    """
+
+    __slots__ = (
+        'identifier',
+        'initiator_address',
+        'target_address',
+        'token_network_identifier',
+        'sendETH_amount',
+        'sendBTC_amount',
+        'receiveBTC_address',
+        'status',
+        'secrethash',
+        'lnd_r_hash',
+        'secret_request',
+    )
+
+    def __init__(
+            self,
+            identifier: int,
+            initiator_address: typing.Address,
+            target_address: typing.Address,
+            token_network_identifier: typing.TokenNetworkID,
+            sendETH_amount: typing.TokenAmount,
+            sendBTC_amount: int,
+            receiveBTC_address: str,
+            status: int,
+    ):
+        self.identifier = identifier
+        self.initiator_address = initiator_address
+        self.target_address = target_address
+        self.token_network_identifier = token_network_identifier
+        self.sendETH_amount = sendETH_amount
+        self.sendBTC_amount = sendBTC_amount
+        self.receiveBTC_address = receiveBTC_address
+        self.status = status
+        self.secrethash = None
+        self.lnd_r_hash = None
+        # The secret request of the target, held back until the invoice is paid
+        self.secret_request = None
+
+    def __repr__(self):
+        return '<CrossSwapState id:{} initiator:{} target:{} status:{}>'.format(
+            self.identifier,
+            pex(self.initiator_address),
+            pex(self.target_address),
+            self.status,
+        )
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, CrossSwapState) and
+            self.identifier == other.identifier and
+            self.initiator_address == other.initiator_address and
+            self.target_address == other.target_address and
+            self.token_network_identifier == other.token_network_identifier and
+            self.sendETH_amount == other.sendETH_amount and
+            self.sendBTC_amount == other.sendBTC_amount and
+            self.receiveBTC_address == other.receiveBTC_address and
+            self.status == other.status and
+            self.secrethash == other.secrethash and
+            self.lnd_r_hash == other.lnd_r_hash and
+            self.secret_request == other.secret_request
         )
 
     def __ne__(self, other):
@@ -324,8 +415,8 @@ class RouteState(State):
         if not isinstance(node_address, typing.T_Address):
             raise ValueError('node_address must be an address instance')
 
-        self.node_address = node_address
-        self.channel_identifier = channel_identifier
+        self.node_address = intern_identifier(node_address)
+        self.channel_identifier = intern_identifier(channel_identifier)
 
     def __repr__(self):
         return '<RouteState hop:{node} channel:{channel}>'.format(
@@ -407,8 +498,8 @@ class BalanceProofUnsignedState(State):
         self.transferred_amount = transferred_amount
         self.locked_amount = locked_amount
         self.locksroot = locksroot
-        self.token_network_identifier = token_network_identifier
-        self.channel_address = channel_address
+        self.token_network_identifier = intern_identifier(token_network_identifier)
+        self.channel_address = intern_identifier(channel_address)
         self.chain_id = chain_id
 
     def __repr__(self):
@@ -540,11 +631,11 @@ class BalanceProofSignedState(State):
         self.transferred_amount = transferred_amount
         self.locked_amount = locked_amount
         self.locksroot = locksroot
-        self.token_network_identifier = token_network_identifier
-        self.channel_address = channel_address
+        self.token_network_identifier = intern_identifier(token_network_identifier)
+        self.channel_address = intern_identifier(channel_address)
         self.message_hash = message_hash
         self.signature = signature
-        self.sender = sender
+        self.sender = intern_identifier(sender)
         self.chain_id = chain_id
 
     def __repr__(self):
@@ -595,13 +686,16 @@ class BalanceProofSignedState(State):
 
 
 class HashTimeLockState(State):
-    """ Represents a hash time lock. """
+    """ Represents a hash time lock.
+
+    Only the lockhash is kept, the `encoded` lock is packed when it is used
+    for an unlock.
+    """
 
     __slots__ = (
         'amount',
         'expiration',
         'secrethash',
-        'encoded',
         'lockhash',
     )
 
@@ -620,17 +714,10 @@ class HashTimeLockState(State):
         if not isinstance(secrethash, typing.T_Keccak256):
             raise ValueError('secrethash must be a keccak256 instance')
 
-        packed = messages.Lock(buffer_for(messages.Lock))
-        packed.amount = amount
-        packed.expiration = expiration
-        packed.secrethash = secrethash
-        encoded = bytes(packed.data)
-
         self.amount = amount
         self.expiration = expiration
         self.secrethash = secrethash
-        self.encoded = encoded
-        self.lockhash: typing.LockHash = typing.LockHash(sha3(encoded))
+        self.lockhash: typing.LockHash = typing.LockHash(sha3(self.encoded))
 
     def __repr__(self):
         return '<HashTimeLockState amount:{} expiration:{} secrethash:{}>'.format(
@@ -653,6 +740,14 @@ class HashTimeLockState(State):
     def __hash__(self):
         return self.lockhash
 
+    @property
+    def encoded(self) -> bytes:
+        packed = messages.Lock(buffer_for(messages.Lock))
+        packed.amount = self.amount
+        packed.expiration = self.expiration
+        packed.secrethash = self.secrethash
+        return bytes(packed.data)
+
 
 class UnlockPartialProofState(State):
     """ Stores the lock along with its unlocking secret. """
@@ -729,6 +824,13 @@ class UnlockProofState(State):
 
 class TransactionExecutionStatus(State):
     """ Represents the status of a transaction. """
+
+    __slots__ = (
+        'started_block_number',
+        'finished_block_number',
+        'result',
+    )
+
     SUCCESS = 'success'
     FAILURE = 'failure'
     VALID_RESULT_VALUES = (
@@ -788,6 +890,10 @@ class TransactionExecutionStatus(State):
 
 
 class MerkleTreeState(State):
+    __slots__ = (
+        'layers',
+    )
+
     def __init__(self, layers):
         self.layers = layers
 
@@ -826,7 +932,7 @@ class NettingChannelEndState(State):
         if not isinstance(balance, typing.T_TokenAmount):
             raise ValueError('balance must be a token_amount isinstance')
 
-        self.address = address
+        self.address = intern_identifier(address)
         self.contract_balance = balance
 
         self.secrethashes_to_lockedlocks: SecretHashToLock = dict()
@@ -926,9 +1032,9 @@ class NettingChannelState(State):
                 'settle_transaction must be a TransactionExecutionStatus instance or None',
             )
 
-        self.identifier = identifier
-        self.token_address = token_address
-        self.token_network_identifier = token_network_identifier
+        self.identifier = intern_identifier(identifier)
+        self.token_address = intern_identifier(token_address)
+        self.token_network_identifier = intern_identifier(token_network_identifier)
         self.reveal_timeout = reveal_timeout
         self.settle_timeout = settle_timeout
         self.our_state = our_state
@@ -971,6 +1077,12 @@ class NettingChannelState(State):
 
 @total_ordering
 class TransactionChannelNewBalance(State):
+    __slots__ = (
+        'participant_address',
+        'contract_balance',
+        'deposit_block_number',
+    )
+
     def __init__(
             self,
             participant_address: typing.Address,
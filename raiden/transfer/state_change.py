@@ -2,6 +2,7 @@
 from raiden.transfer.architecture import StateChange
 from raiden.transfer.state import (
     BalanceProofSignedState,
+    CrossSwapState,
     NettingChannelState,
     PaymentNetworkState,
     TransactionChannelNewBalance,
@@ -17,6 +18,10 @@ class Block(StateChange):
         block_number: The current block_number.
     """
 
+    __slots__ = (
+        'block_number',
+    )
+
     def __init__(self, block_number: typing.BlockNumber):
         if not isinstance(block_number, typing.T_BlockNumber):
             raise ValueError('block_number must be of type block_number')
@@ -42,6 +47,10 @@ class ActionCancelPayment(StateChange):
     state of the transfer.
     """
 
+    __slots__ = (
+        'payment_identifier',
+    )
+
     def __init__(self, payment_identifier: typing.PaymentID):
         self.payment_identifier = payment_identifier
 
@@ -63,6 +72,11 @@ class ActionCancelPayment(StateChange):
 class ActionChannelClose(StateChange):
     """ User is closing an existing channel. """
 
+    __slots__ = (
+        'token_network_identifier',
+        'channel_identifier',
+    )
+
     def __init__(
             self,
             token_network_identifier: typing.TokenNetworkID,
@@ -94,6 +108,10 @@ class ActionCancelTransfer(StateChange):
     state of the transfer.
     """
 
+    __slots__ = (
+        'transfer_identifier',
+    )
+
     def __init__(self, transfer_identifier: typing.TransferID) -> None:
         self.transfer_identifier = transfer_identifier
 
@@ -113,6 +131,13 @@ class ActionCancelTransfer(StateChange):
 
 
 class ActionTransferDirect(StateChange):
+    __slots__ = (
+        'token_network_identifier',
+        'amount',
+        'receiver_address',
+        'payment_identifier',
+    )
+
     def __init__(
             self,
             token_network_identifier: typing.TokenNetworkIdentifier,
@@ -154,6 +179,11 @@ class ActionTransferDirect(StateChange):
 class ContractReceiveChannelNew(StateChange):
     """ A new channel was created and this node IS a participant. """
 
+    __slots__ = (
+        'token_network_identifier',
+        'channel_state',
+    )
+
     def __init__(
             self,
             token_network_identifier: typing.TokenNetworkID,
@@ -182,6 +212,13 @@ class ContractReceiveChannelNew(StateChange):
 class ContractReceiveChannelClosed(StateChange):
     """ A channel to which this node IS a participant was closed. """
 
+    __slots__ = (
+        'token_network_identifier',
+        'channel_identifier',
+        'closing_address',
+        'closed_block_number',
+    )
+
     def __init__(
             self,
             token_network_identifier: typing.TokenNetworkID,
@@ -227,6 +264,12 @@ class ContractReceiveChannelClosed(StateChange):
 
 
 class ActionInitChain(StateChange):
+    __slots__ = (
+        'pseudo_random_generator',
+        'block_number',
+        'chain_id',
+    )
+
     def __init__(
             self,
             pseudo_random_generator,
@@ -266,6 +309,11 @@ class ActionNewTokenNetwork(StateChange):
     A token network corresponds to a channel manager smart contract.
     """
 
+    __slots__ = (
+        'payment_network_identifier',
+        'token_network',
+    )
+
     def __init__(
             self,
             payment_network_identifier: typing.PaymentNetworkID,
@@ -297,6 +345,12 @@ class ActionNewTokenNetwork(StateChange):
 class ContractReceiveChannelNewBalance(StateChange):
     """ A channel to which this node IS a participant had a deposit. """
 
+    __slots__ = (
+        'token_network_identifier',
+        'channel_identifier',
+        'deposit_transaction',
+    )
+
     def __init__(
             self,
             token_network_identifier: typing.TokenNetworkID,
@@ -331,6 +385,12 @@ class ContractReceiveChannelNewBalance(StateChange):
 class ContractReceiveChannelSettled(StateChange):
     """ A channel to which this node IS a participant was settled. """
 
+    __slots__ = (
+        'token_network_identifier',
+        'channel_identifier',
+        'settle_block_number',
+    )
+
     def __init__(
             self,
             token_network_identifier: typing.TokenNetworkID,
@@ -369,6 +429,8 @@ class ContractReceiveChannelSettled(StateChange):
 class ActionLeaveAllNetworks(StateChange):
     """ User is quitting all payment networks. """
 
+    __slots__ = ()
+
     def __repr__(self):
         return '<ActionLeaveAllNetworks>'
 
@@ -382,6 +444,11 @@ class ActionLeaveAllNetworks(StateChange):
 class ActionChangeNodeNetworkState(StateChange):
     """ The network state of `node_address` changed. """
 
+    __slots__ = (
+        'node_address',
+        'network_state',
+    )
+
     def __init__(
             self,
             node_address: typing.Address,
@@ -415,6 +482,10 @@ class ContractReceiveNewPaymentNetwork(StateChange):
     A payment network corresponds to a registry smart contract.
     """
 
+    __slots__ = (
+        'payment_network',
+    )
+
     def __init__(self, payment_network: PaymentNetworkState):
         if not isinstance(payment_network, PaymentNetworkState):
             raise ValueError('payment_network must be a PaymentNetworkState instance')
@@ -439,6 +510,11 @@ class ContractReceiveNewPaymentNetwork(StateChange):
 class ContractReceiveNewTokenNetwork(StateChange):
     """ A new token was registered with the payment network. """
 
+    __slots__ = (
+        'payment_network_identifier',
+        'token_network',
+    )
+
     def __init__(
             self,
             payment_network_identifier: typing.PaymentNetworkID,
@@ -470,6 +546,12 @@ class ContractReceiveNewTokenNetwork(StateChange):
 class ContractReceiveSecretReveal(StateChange):
     """ A new secret was registered with the SecretRegistry contract. """
 
+    __slots__ = (
+        'secret_registry_address',
+        'secrethash',
+        'secret',
+    )
+
     def __init__(
         self,
         secret_registry_address: typing.SecretRegistryAddress,
@@ -517,6 +599,15 @@ class ContractReceiveChannelBatchUnlock(StateChange):
         was transferred. `returned_tokens` was transferred to the channel partner.
     """
 
+    __slots__ = (
+        'token_network_identifier',
+        'participant',
+        'partner',
+        'locksroot',
+        'unlocked_amount',
+        'returned_tokens',
+    )
+
     def __init__(
             self,
             token_network_identifier: typing.TokenNetworkIdentifier,
@@ -575,6 +666,11 @@ class ContractReceiveChannelBatchUnlock(StateChange):
 class ContractReceiveNewRoute(StateChange):
     """ New channel was created and this node is NOT a participant. """
 
+    __slots__ = (
+        'participant1',
+        'participant2',
+    )
+
     def __init__(self, participant1: typing.Address, participant2: typing.Address):
         if not isinstance(participant1, typing.T_Address):
             raise ValueError('participant1 must be of type address')
@@ -605,6 +701,12 @@ class ContractReceiveNewRoute(StateChange):
 class ContractReceiveRouteNew(StateChange):
     """ New channel was created and this node is NOT a participant. """
 
+    __slots__ = (
+        'token_network_identifier',
+        'participant1',
+        'participant2',
+    )
+
     def __init__(
             self,
             token_network_identifier: typing.TokenNetworkID,
@@ -642,6 +744,13 @@ class ContractReceiveRouteNew(StateChange):
 
 
 class ReceiveTransferDirect(StateChange):
+    __slots__ = (
+        'token_network_identifier',
+        'message_identifier',
+        'payment_identifier',
+        'balance_proof',
+    )
+
     def __init__(
             self,
             token_network_identifier: typing.TokenNetworkID,
@@ -683,6 +792,13 @@ class ReceiveTransferDirect(StateChange):
 
 
 class ReceiveUnlock(StateChange):
+    __slots__ = (
+        'message_identifier',
+        'secret',
+        'secrethash',
+        'balance_proof',
+    )
+
     def __init__(
             self,
             message_identifier: typing.MessageID,
@@ -720,6 +836,10 @@ class ReceiveUnlock(StateChange):
 
 
 class ReceiveDelivered(StateChange):
+    __slots__ = (
+        'message_identifier',
+    )
+
     def __init__(self, message_identifier: typing.MessageID):
         self.message_identifier = message_identifier
 
@@ -739,6 +859,10 @@ class ReceiveDelivered(StateChange):
 
 
 class ReceiveProcessed(StateChange):
+    __slots__ = (
+        'message_identifier',
+    )
+
     def __init__(self, message_identifier: typing.MessageID):
         self.message_identifier = message_identifier
 
@@ -757,6 +881,10 @@ class ReceiveProcessed(StateChange):
         return not self.__eq__(other)
 
 class ActionCrosstransaction(StateChange):
+    __slots__ = (
+        'message_identifier',
+    )
+
     def __init__(self,message_identifier:typing.MessageID):
         self.message_identifier = message_identifier
 
@@ -776,6 +904,10 @@ class ActionCrosstransaction(StateChange):
 
 
 class ReceiveCrosstransaction(StateChange):
+    __slots__ = (
+        'message_identifier',
+    )
+
     def __init__(self,message_identifier:typing.MessageID):
         self.message_identifier = message_identifier
 
@@ -791,4 +923,300 @@ class ReceiveCrosstransaction(StateChange):
         )
 
     def __ne__(self, other):
-        return not self.__eq__(other)
\ No newline at end of file
+        return not self.__eq__(other)
+
+
+class ActionInitCrossSwap(StateChange):
+    """ A new cross chain swap started by this node. """
+
+    __slots__ = (
+        'cross_swap',
+    )
+
+    def __init__(self, cross_swap: CrossSwapState):
+        if not isinstance(cross_swap, CrossSwapState):
+            raise ValueError('cross_swap must be a CrossSwapState instance')
+
+        self.cross_swap = cross_swap
+
+    def __repr__(self):
+        return '<ActionInitCrossSwap {}>'.format(self.cross_swap)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ActionInitCrossSwap) and
+            self.cross_swap == other.cross_swap
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class ReceiveCrossSwap(StateChange):
+    """ A cross chain swap with this node as the target was received. """
+
+    __slots__ = (
+        'cross_swap',
+    )
+
+    def __init__(self, cross_swap: CrossSwapState):
+        if not isinstance(cross_swap, CrossSwapState):
+            raise ValueError('cross_swap must be a CrossSwapState instance')
+
+        self.cross_swap = cross_swap
+
+    def __repr__(self):
+        return '<ReceiveCrossSwap {}>'.format(self.cross_swap)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ReceiveCrossSwap) and
+            self.cross_swap == other.cross_swap
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class ActionRestoreCrossSwap(StateChange):
+    """ A cross chain swap which was in flight in the `crosstransaction_events`
+    table of a database written before the swaps were part of the node state.
+    The swap keeps its status.
+    """
+
+    __slots__ = (
+        'cross_swap',
+    )
+
+    def __init__(self, cross_swap: CrossSwapState):
+        if not isinstance(cross_swap, CrossSwapState):
+            raise ValueError('cross_swap must be a CrossSwapState instance')
+
+        self.cross_swap = cross_swap
+
+    def __repr__(self):
+        return '<ActionRestoreCrossSwap {}>'.format(self.cross_swap)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ActionRestoreCrossSwap) and
+            self.cross_swap == other.cross_swap
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class ReceiveCrossSwapAccept(StateChange):
+    """ The target accepted the cross chain swap. """
+
+    __slots__ = (
+        'cross_id',
+    )
+
+    def __init__(self, cross_id: int):
+        self.cross_id = cross_id
+
+    def __repr__(self):
+        return '<ReceiveCrossSwapAccept cross_id:{}>'.format(self.cross_id)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ReceiveCrossSwapAccept) and
+            self.cross_id == other.cross_id
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class ActionCrossSwapLocked(StateChange):
+    """ The locked transfer of the swap was sent by the initiator or received
+    by the target.
+
+    Args:
+        cross_id: The swap identifier.
+        secrethash: The secrethash of the locked transfer.
+        lnd_r_hash: The payment hash of the LND invoice, only known to the
+            initiator.
+    """
+
+    __slots__ = (
+        'cross_id',
+        'secrethash',
+        'lnd_r_hash',
+    )
+
+    def __init__(
+            self,
+            cross_id: int,
+            secrethash: typing.SecretHash,
+            lnd_r_hash: typing.Optional[str],
+    ):
+        self.cross_id = cross_id
+        self.secrethash = secrethash
+        self.lnd_r_hash = lnd_r_hash
+
+    def __repr__(self):
+        return '<ActionCrossSwapLocked cross_id:{} secrethash:{} lnd_r_hash:{}>'.format(
+            self.cross_id,
+            pex(self.secrethash),
+            self.lnd_r_hash,
+        )
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ActionCrossSwapLocked) and
+            self.cross_id == other.cross_id and
+            self.secrethash == other.secrethash and
+            self.lnd_r_hash == other.lnd_r_hash
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class ActionCrossSwapPaymentSent(StateChange):
+    """ The target paid the LND invoice of the swap.
+
+    Args:
+        cross_id: The swap identifier.
+    """
+
+    __slots__ = (
+        'cross_id',
+    )
+
+    def __init__(self, cross_id: int):
+        self.cross_id = cross_id
+
+    def __repr__(self):
+        return '<ActionCrossSwapPaymentSent cross_id:{}>'.format(
+            self.cross_id,
+        )
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ActionCrossSwapPaymentSent) and
+            self.cross_id == other.cross_id
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class ActionCrossSwapPaymentFailed(StateChange):
+    """ The target failed to pay the LND invoice of the swap.
+
+    Args:
+        cross_id: The swap identifier.
+        reason: The error returned by the LND node.
+    """
+
+    __slots__ = (
+        'cross_id',
+        'reason',
+    )
+
+    def __init__(self, cross_id: int, reason: str):
+        self.cross_id = cross_id
+        self.reason = reason
+
+    def __repr__(self):
+        return '<ActionCrossSwapPaymentFailed cross_id:{} reason:{}>'.format(
+            self.cross_id,
+            self.reason,
+        )
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ActionCrossSwapPaymentFailed) and
+            self.cross_id == other.cross_id and
+            self.reason == other.reason
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class ReceiveCrossSecretRequest(StateChange):
+    """ The target requested the secret of the swap.
+
+    Args:
+        cross_id: The swap identifier.
+        secret_request: The `ReceiveSecretRequest` for the initiator task, it
+            is only dispatched once the LND invoice is paid.
+    """
+
+    __slots__ = (
+        'cross_id',
+        'secret_request',
+    )
+
+    def __init__(self, cross_id: int, secret_request):
+        self.cross_id = cross_id
+        self.secret_request = secret_request
+
+    def __repr__(self):
+        return '<ReceiveCrossSecretRequest cross_id:{} secret_request:{}>'.format(
+            self.cross_id,
+            self.secret_request,
+        )
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ReceiveCrossSecretRequest) and
+            self.cross_id == other.cross_id and
+            self.secret_request == other.secret_request
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class ReceiveCrossInvoicePaid(StateChange):
+    """ The LND node reported the invoice with the payment hash `lnd_r_hash`
+    as paid.
+    """
+
+    __slots__ = (
+        'lnd_r_hash',
+    )
+
+    def __init__(self, lnd_r_hash: str):
+        self.lnd_r_hash = lnd_r_hash
+
+    def __repr__(self):
+        return '<ReceiveCrossInvoicePaid lnd_r_hash:{}>'.format(self.lnd_r_hash)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ReceiveCrossInvoicePaid) and
+            self.lnd_r_hash == other.lnd_r_hash
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class ReceiveCrossSwapDone(StateChange):
+    """ The initiator reported the swap as done. """
+
+    __slots__ = (
+        'cross_id',
+    )
+
+    def __init__(self, cross_id: int):
+        self.cross_id = cross_id
+
+    def __repr__(self):
+        return '<ReceiveCrossSwapDone cross_id:{}>'.format(self.cross_id)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ReceiveCrossSwapDone) and
+            self.cross_id == other.cross_id
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
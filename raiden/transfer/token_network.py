@@ -152,8 +152,9 @@ def handle_action_transfer_direct(
         events = iteration.events
     else:
         failure = EventTransferSentFailed(
-            state_change.identifier,
+            state_change.payment_identifier,
             'Unknown partner channel',
+            token_network_state.address,
         )
         events = [failure]
 
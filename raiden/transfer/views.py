@@ -4,6 +4,7 @@ from raiden.transfer.state import (
     NettingChannelState,
     NODE_NETWORK_UNKNOWN,
     ChainState,
+    CrossSwapState,
     PaymentMappingState,
     TokenNetworkState,
 )
@@ -379,6 +380,30 @@ def get_transfer_role(
     return result
 
 
+def get_cross_swap(chain_state: ChainState, cross_id: int) -> CrossSwapState:
+    """ Return the state of the unfinished cross chain swap `cross_id`. """
+    cross_task = chain_state.payment_mapping.crossids_to_task.get(cross_id)
+
+    result = None
+    if cross_task:
+        result = cross_task.swap_state
+
+    return result
+
+
+def get_cross_swap_by_lnd_r_hash(chain_state: ChainState, lnd_r_hash: str) -> CrossSwapState:
+    cross_id = chain_state.payment_mapping.lnd_rhashes_to_crossid.get(lnd_r_hash)
+    return get_cross_swap(chain_state, cross_id)
+
+
+def list_cross_swaps(chain_state: ChainState) -> typing.List[CrossSwapState]:
+    """ Return the states of all the unfinished cross chain swaps. """
+    return [
+        cross_task.swap_state
+        for cross_task in chain_state.payment_mapping.crossids_to_task.values()
+    ]
+
+
 def list_channelstate_for_tokennetwork(
         chain_state: ChainState,
         payment_network_id: typing.PaymentNetworkID,
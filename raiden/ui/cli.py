@@ -14,12 +14,11 @@ from datetime import datetime
 from itertools import count
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict
 from urllib.parse import urljoin
 
 import click
 import gevent
-import requests
 import structlog
 from eth_utils import (
     denoms,
@@ -28,12 +27,8 @@ from eth_utils import (
     to_int,
     to_normalized_address,
 )
-from mirakuru import HTTPExecutor, ProcessExitedWithError
-from requests.exceptions import RequestException
 
 from raiden import constants
-from raiden.accounts import AccountManager
-from raiden.api.rest import APIServer, RestAPI
 from raiden.exceptions import (
     APIServerPortInUseError,
     ContractVersionMismatch,
@@ -43,21 +38,17 @@ from raiden.exceptions import (
     ReplacementTransactionUnderpriced,
 )
 from raiden.log_config import configure_logging
-from raiden.network.blockchain_service import BlockChainService
-from raiden.network.discovery import ContractDiscovery
-from raiden.network.rpc.client import JSONRPCClient
-from raiden.network.sockfactory import SocketFactory
-from raiden.network.throttle import TokenBucket
-from raiden.network.transport import MatrixTransport, UDPTransport
-from raiden.network.utils import get_free_port
 from raiden.settings import (
+    DEFAULT_HUB_BLOCKING_THRESHOLD,
+    DEFAULT_LND_INVOICE_POOL_SIZE,
     DEFAULT_NAT_KEEPALIVE_RETRIES,
+    DEFAULT_STORAGE_BACKEND,
     DEFAULT_TRANSPORT_RETRY_INTERVAL,
     ETHERSCAN_API,
     INITIAL_PORT,
     ORACLE_BLOCKNUMBER_DRIFT_TOLERANCE,
+    STORAGE_BACKENDS,
 )
-from raiden.tasks import check_version
 from raiden.utils import (
     eth_endpoint_to_hostport,
     get_system_spec,
@@ -77,7 +68,6 @@ from raiden.utils.cli import (
     option,
     option_group,
 )
-from raiden.utils.echo_node import EchoNode
 from raiden.utils.gevent_utils import configure_gevent
 from raiden_contracts.constants import (
     CONTRACT_ENDPOINT_REGISTRY,
@@ -85,13 +75,20 @@ from raiden_contracts.constants import (
     CONTRACT_TOKEN_NETWORK_REGISTRY,
 )
 
+# web3, flask, the transports and the proxies are imported by the commands
+# which use them, so `raiden version` or `raiden --help` start quickly and a
+# node only loads the transport it runs with
+if TYPE_CHECKING:
+    from raiden.network.blockchain_service import BlockChainService  # NOQA
 
 log = structlog.get_logger(__name__)
 
 configure_gevent()
 
 
-def check_synced(blockchain_service: BlockChainService) -> None:
+def check_synced(blockchain_service: 'BlockChainService') -> None:
+    from requests.exceptions import RequestException
+
     net_id = blockchain_service.network_id
     try:
         network = constants.ID_TO_NETWORKNAME[net_id]
@@ -125,7 +122,7 @@ def check_synced(blockchain_service: BlockChainService) -> None:
 
 
 def check_discovery_registration_gas(
-        blockchain_service: BlockChainService,
+        blockchain_service: 'BlockChainService',
         account_address: typing.Address,
 ) -> None:
     discovery_tx_cost = blockchain_service.client.gasprice() * constants.DISCOVERY_TX_GAS_LIMIT
@@ -147,6 +144,9 @@ def etherscan_query_with_retries(
         sleep: float,
         retries: int = 3,
 ) -> int:
+    import requests
+    from requests.exceptions import RequestException
+
     for _ in range(retries - 1):
         try:
             etherscan_block = to_int(hexstr=requests.get(url).json()['result'])
@@ -160,7 +160,7 @@ def etherscan_query_with_retries(
 
 
 def wait_for_sync_etherscan(
-        blockchain_service: BlockChainService,
+        blockchain_service: 'BlockChainService',
         url: str,
         tolerance: int,
         sleep: float,
@@ -194,7 +194,7 @@ def wait_for_sync_etherscan(
 
 
 def wait_for_sync_rpc_api(
-        blockchain_service: BlockChainService,
+        blockchain_service: 'BlockChainService',
         sleep: float,
 ) -> None:
     if blockchain_service.is_synced():
@@ -219,11 +219,13 @@ def wait_for_sync_rpc_api(
 
 
 def wait_for_sync(
-        blockchain_service: BlockChainService,
+        blockchain_service: 'BlockChainService',
         url: str,
         tolerance: int,
         sleep: float,
 ) -> None:
+    from requests.exceptions import RequestException
+
     # print something since the actual test may take a few moments for the first
     # iteration
     print('Checking if the ethereum node is synchronized')
@@ -257,6 +259,17 @@ def options(func):
             ),
             show_default=True,
         ),
+        option(
+            '--storage-backend',
+            help=(
+                'How the state changes, events and snapshots are stored in the data directory. '
+                '"appendlog" appends them to a log file, which is faster to write and to replay. '
+                'The backend of an existing database can not be changed.'
+            ),
+            type=click.Choice(STORAGE_BACKENDS),
+            default=DEFAULT_STORAGE_BACKEND,
+            show_default=True,
+        ),
         option(
             '--config-file',
             help='Configuration file (TOML)',
@@ -297,6 +310,18 @@ def options(func):
             type=click.File(lazy=True),
             show_default=True,
         ),
+        option(
+            '--unlock-cache-lifetime',
+            help=(
+                'Keep the unlocked private key in the data directory for this many seconds, '
+                'so a restarted node does not ask for the password. The key is bound to this '
+                'machine, user and boot, the cache is only available where the machine and boot '
+                'ids are known, like on Linux. 0 disables the cache and removes the cached keys.'
+            ),
+            default=0,
+            type=click.IntRange(min=0),
+            show_default=True,
+        ),
         option(
             '--registry-contract-address',
             help='hex encoded address of the registry contract.',
@@ -316,6 +341,22 @@ def options(func):
             type=str,
             show_default=True,
         ),
+        option(
+            '--lnd-invoice-pool-size',
+            help='Number of unused LND invoices kept ready for every --lnd-invoice-amount.',
+            default=DEFAULT_LND_INVOICE_POOL_SIZE,
+            type=int,
+            show_default=True,
+        ),
+        option(
+            '--lnd-invoice-amount',
+            help=(
+                'BTC amount, in satoshis, for which LND invoices are kept ready. Can be '
+                'given multiple times, the invoices for other amounts are created on use.'
+            ),
+            multiple=True,
+            type=int,
+        ),
         option(
             '--discovery-contract-address',
             help='hex encoded address of the discovery contract.',
@@ -462,6 +503,19 @@ def options(func):
                 help='Output log lines in JSON format',
                 is_flag=True,
             ),
+            option(
+                '--disable-debug-logfile',
+                help=(
+                    'Disable the debug logfile feature. This is independent of '
+                    'the normal logging setup'
+                ),
+                is_flag=True,
+            ),
+            option(
+                '--log-async',
+                help='Write the log files from a greenlet, off the code paths which log.',
+                is_flag=True,
+            ),
         ),
         option_group(
             'RPC Options',
@@ -495,6 +549,25 @@ def options(func):
                 show_default=True,
             ),
         ),
+        option_group(
+            'Monitoring Options',
+            option(
+                '--hub-monitor/--no-hub-monitor',
+                help=(
+                    'Measure the latency of the gevent hub and log the stack of the '
+                    'greenlets which block it. The results are exported as metrics.'
+                ),
+                default=False,
+                show_default=True,
+            ),
+            option(
+                '--hub-blocking-threshold',
+                help='Time in seconds a greenlet can hold the gevent hub before it is logged.',
+                default=DEFAULT_HUB_BLOCKING_THRESHOLD,
+                type=float,
+                show_default=True,
+            ),
+        ),
     ]
 
     for option_ in reversed(options_):
@@ -518,32 +591,44 @@ def run_app(
         sync_check,
         console,
         password_file,
+        unlock_cache_lifetime,
         web_ui,
         datadir,
+        storage_backend,
         transport,
         matrix_server,
         network_id,
         lnd_address,
+        lnd_invoice_pool_size,
+        lnd_invoice_amount,
         extra_config=None,
         **kwargs,
 ):
     # pylint: disable=too-many-locals,too-many-branches,too-many-statements,unused-argument
 
     from raiden.app import App
+    from raiden.network.blockchain_service import BlockChainService  # NOQA
+    from raiden.network.rpc.client import JSONRPCClient
 
     if transport == 'udp' and not mapped_socket:
         raise RuntimeError('Missing socket')
 
+    if datadir is None:
+        datadir = os.path.join(os.path.expanduser('~'), '.raiden')
+
     address_hex = to_normalized_address(address) if address else None
-    address_hex, privatekey_bin = prompt_account(address_hex, keystore_path, password_file)
+    address_hex, privatekey_bin = prompt_account(
+        address_hex,
+        keystore_path,
+        password_file,
+        datadir,
+        unlock_cache_lifetime,
+    )
     address = to_canonical_address(address_hex)
 
     (listen_host, listen_port) = split_endpoint(listen_address)
     (api_host, api_port) = split_endpoint(api_address)
 
-    if datadir is None:
-        datadir = os.path.join(os.path.expanduser('~'), '.raiden')
-
     config = deepcopy(App.DEFAULT_CONFIG)
     if extra_config:
         merge_dict(config, extra_config)
@@ -600,6 +685,7 @@ def run_app(
 
     database_path = os.path.join(datadir, 'netid_%s' % net_id, address_hex[:8], 'log.db')
     config['database_path'] = database_path
+    config['storage_backend'] = storage_backend
     print(
         '\nYou are connected to the \'{}\' network and the DB path is: {}'.format(
             constants.ID_TO_NETWORKNAME.get(net_id) or net_id,
@@ -647,6 +733,10 @@ def run_app(
 
     discovery = None
     if transport == 'udp':
+        from raiden.network.discovery import ContractDiscovery
+        from raiden.network.throttle import TokenBucket
+        from raiden.network.transport.udp import UDPTransport
+
         check_discovery_registration_gas(blockchain_service, address)
         try:
             dicovery_proxy = blockchain_service.discovery(
@@ -672,6 +762,8 @@ def run_app(
             config['transport'],
         )
     elif transport == 'matrix':
+        from raiden.network.transport.matrix import MatrixTransport
+
         # matrix gets spammed with the default retry-interval of 1s, wait a little more
         if config['transport']['retry_interval'] == DEFAULT_TRANSPORT_RETRY_INTERVAL:
             config['transport']['retry_interval'] *= 5
@@ -688,6 +780,8 @@ def run_app(
         start_block = chain_config.get(constants.START_QUERY_BLOCK_KEY, 0)
         #vincent
         config['lnd_address'] = lnd_address
+        config['lnd_invoice_pool_size'] = lnd_invoice_pool_size
+        config['lnd_invoice_amounts'] = list(lnd_invoice_amount or ())
         raiden_app = App(
             config=config,
             chain=blockchain_service,
@@ -704,8 +798,29 @@ def run_app(
     return raiden_app
 
 
-def prompt_account(address_hex, keystore_path, password_file):
-    accmgr = AccountManager(keystore_path)
+def prompt_account(
+        address_hex,
+        keystore_path,
+        password_file,
+        datadir=None,
+        unlock_cache_lifetime=0,
+):
+    from raiden.accounts import AccountManager, UnlockCache
+
+    index_path = None
+    unlock_cache = None
+    if datadir is not None:
+        index_path = os.path.join(datadir, 'keystore_index.json')
+        unlock_cache = UnlockCache(
+            os.path.join(datadir, 'unlock_cache.json'),
+            unlock_cache_lifetime,
+        )
+        if not unlock_cache_lifetime:
+            # the keys cached by a previous run must not outlive the cache
+            unlock_cache.clear()
+            unlock_cache = None
+
+    accmgr = AccountManager(keystore_path, index_path=index_path, unlock_cache=unlock_cache)
     if not accmgr.accounts:
         print(
             'No Ethereum accounts found in the provided keystore directory {}. '
@@ -822,16 +937,27 @@ class NodeRunner:
             self._options['log_config'],
             log_json=self._options['log_json'],
             log_file=self._options['log_file'],
+            disable_debug_logfile=self._options['disable_debug_logfile'],
+            log_async=self._options['log_async'],
         )
 
         if self._options['config_file']:
             log.debug('Using config file', config_file=self._options['config_file'])
 
+        hub_monitor = None
+        if self._options['hub_monitor']:
+            from raiden.utils.hub_monitor import HubMonitor
+
+            hub_monitor = HubMonitor(self._options['hub_blocking_threshold'])
+            hub_monitor.start()
+
         # TODO:
         # - Ask for confirmation to quit if there are any locked transfers that did
         # not timeout.
         try:
             if self._options['transport'] == 'udp':
+                from raiden.network.sockfactory import SocketFactory
+
                 (listen_host, listen_port) = split_endpoint(self._options['listen_address'])
                 try:
                     with SocketFactory(
@@ -860,10 +986,15 @@ class NodeRunner:
                 'only user of the selected account'.format(str(e)),
             )
             sys.exit(1)
+        finally:
+            if hub_monitor is not None:
+                hub_monitor.stop()
 
     def _run_app(self):
-        from raiden.ui.console import Console
         from raiden.api.python import RaidenAPI
+        from raiden.api.rest import APIServer, RestAPI
+        from raiden.tasks import check_version
+        from raiden.ui.console import Console
 
         # this catches exceptions raised when waiting for the stalecheck to complete
         try:
@@ -973,6 +1104,8 @@ class EchoNodeRunner(NodeRunner):
         return '{} [ECHO NODE]'.format(super(EchoNodeRunner, self)._welcome_string)
 
     def _startup_hook(self):
+        from raiden.utils.echo_node import EchoNode
+
         self._echo_node = EchoNode(self._raiden_api, self._token_address)
 
     def _shutdown_hook(self):
@@ -1028,7 +1161,12 @@ def version(short, **kwargs):  # pylint: disable=unused-argument
 @click.pass_context
 def smoketest(ctx, debug, local_matrix, **kwargs):  # pylint: disable=unused-argument
     """ Test, that the raiden installation is sane. """
+    from mirakuru import HTTPExecutor, ProcessExitedWithError
+
     from raiden.api.python import RaidenAPI
+    from raiden.api.rest import APIServer, RestAPI
+    from raiden.network.sockfactory import SocketFactory
+    from raiden.network.utils import get_free_port
     from raiden.tests.utils.smoketest import (
         TEST_PARTNER_ADDRESS,
         TEST_DEPOSIT_AMOUNT,
@@ -108,6 +108,30 @@ def quantity_encoder(i: int) -> str:
     return hex(i).rstrip('L')
 
 
+# Bound of the table of `intern_identifier`, an identifier is a few dozen
+# bytes so the table is at most a few megabytes
+MAX_INTERNED_IDENTIFIERS = 100000
+_interned_identifiers = dict()
+
+
+def intern_identifier(identifier: bytes) -> bytes:
+    """ Return the shared copy of an address or identifier.
+
+    Every decoded message has its own copy of the addresses, interning them
+    keeps a single copy in the node state. Once the table is full new
+    identifiers are returned as they are.
+    """
+    interned = _interned_identifiers.get(identifier)
+    if interned is not None:
+        return interned
+
+    if identifier is None or len(_interned_identifiers) >= MAX_INTERNED_IDENTIFIERS:
+        return identifier
+
+    _interned_identifiers[identifier] = identifier
+    return identifier
+
+
 def pex(data: bytes) -> str:
     return hexlify(data).decode()[:8]
 
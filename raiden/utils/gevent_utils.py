@@ -8,6 +8,20 @@ def _make_greenlet_error_handler(original_handler):
     return handle_error
 
 
+def greenlet_name(greenlet) -> str:
+    name = getattr(greenlet, 'name', None)
+    if name:
+        return name
+
+    if isinstance(greenlet, gevent.hub.Hub):
+        return 'Hub'
+
+    if greenlet.parent is None:
+        return 'main'
+
+    return type(greenlet).__name__
+
+
 def configure_gevent():
     """
     Configure the gevent `Hub` as follows:
@@ -0,0 +1,136 @@
+""" Monitor of the gevent hub.
+
+A greenlet which blocks, e.g. on a synchronous HTTP request, a signature
+recovery or a database fsync, delays every other greenlet of the node: the
+transport retries, the health checks and the alarm task. The monitor measures
+this in two ways:
+
+- The latency of the hub, the delay to wake up a greenlet sleeping for a
+  fixed interval, as the `raiden_hub_latency_seconds` histogram.
+- The greenlets holding the hub for longer than the blocking threshold. The
+  switches among greenlets are traced, and a native thread, which runs while
+  the hub is blocked, captures the stack of the greenlet holding it. The stack
+  is logged once the hub is released, and the time the greenlet held the hub
+  is exported as the `raiden_hub_blocked_seconds` histogram.
+"""
+import sys
+import traceback
+from collections import deque
+from time import perf_counter
+
+import gevent
+import greenlet
+import structlog
+from gevent.monkey import get_original
+
+from raiden.settings import DEFAULT_HUB_BLOCKING_THRESHOLD, DEFAULT_HUB_MONITOR_INTERVAL
+from raiden.utils.gevent_utils import greenlet_name
+from raiden.utils.metrics import HUB_BLOCKED_SECONDS, HUB_LATENCY_SECONDS
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+# The watchdog must be a native thread and sleep without the hub, even if the
+# modules were monkey patched
+get_ident = get_original('_thread', 'get_ident')
+start_new_thread = get_original('_thread', 'start_new_thread')
+thread_sleep = get_original('time', 'sleep')
+
+
+class HubMonitor:
+    def __init__(
+            self,
+            blocking_threshold: float = DEFAULT_HUB_BLOCKING_THRESHOLD,
+            interval: float = DEFAULT_HUB_MONITOR_INTERVAL,
+    ):
+        self.blocking_threshold = blocking_threshold
+        self.interval = interval
+        self.hub = gevent.get_hub()
+        self.hub_thread_ident = None
+        self.previous_tracer = None
+        self.latency_greenlet = None
+        self.running = False
+
+        # (number of switches, running greenlet, time of the switch), replaced
+        # as a whole so the watchdog thread reads a consistent value
+        self.current = (0, None, perf_counter())
+
+        # Filled by the watchdog thread, logged by the latency greenlet
+        self.reports = deque()
+
+    def start(self):
+        if self.running:
+            return
+
+        self.running = True
+        self.hub_thread_ident = get_ident()
+        self.current = (0, greenlet.getcurrent(), perf_counter())
+        self.previous_tracer = greenlet.settrace(self.trace)
+
+        self.latency_greenlet = gevent.spawn(self.measure_latency)
+        self.latency_greenlet.name = 'Hub monitor'
+        start_new_thread(self.watchdog, ())
+
+    def stop(self):
+        if not self.running:
+            return
+
+        self.running = False
+        greenlet.settrace(self.previous_tracer)
+        self.previous_tracer = None
+        self.latency_greenlet.kill()
+
+    def trace(self, event, args):
+        """ Called by greenlet on every switch, in the thread of the hub. """
+        origin, target = args
+        now = perf_counter()
+
+        # The hub is idle while it holds the thread waiting for IO
+        if origin is not self.hub:
+            held = now - self.current[2]
+            if held >= self.blocking_threshold:
+                HUB_BLOCKED_SECONDS.observe(held, greenlet_name(origin))
+
+        self.current = (self.current[0] + 1, target, now)
+
+        if self.previous_tracer is not None:
+            self.previous_tracer(event, args)
+
+    def watchdog(self):
+        """ Runs in a native thread, captures the stack of the greenlet
+        holding the hub once per blocking.
+        """
+        reported_switch = None
+
+        while self.running:
+            thread_sleep(self.blocking_threshold / 2)
+
+            switch, running_greenlet, switched_at = self.current
+            if running_greenlet is self.hub or switch == reported_switch:
+                continue
+
+            blocked_for = perf_counter() - switched_at
+            if blocked_for < self.blocking_threshold:
+                continue
+
+            reported_switch = switch
+            frames = sys._current_frames()  # pylint: disable=protected-access
+            frame = frames.get(self.hub_thread_ident)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else ''
+            self.reports.append((greenlet_name(running_greenlet), blocked_for, stack))
+
+    def measure_latency(self):
+        while True:
+            start = perf_counter()
+            gevent.sleep(self.interval)
+            latency = perf_counter() - start - self.interval
+            HUB_LATENCY_SECONDS.observe(max(latency, 0))
+
+            while self.reports:
+                name, blocked_for, stack = self.reports.popleft()
+                log.warning(
+                    'Greenlet blocked the hub',
+                    greenlet=name,
+                    blocked_for=blocked_for,
+                    threshold=self.blocking_threshold,
+                    stack=stack,
+                )
@@ -0,0 +1,205 @@
+""" Metrics of the node, exposed in the Prometheus text format.
+
+The metrics are module level objects, like the loggers, and are updated from
+the code paths they measure. Observing a value is a couple of dictionary
+lookups and a bisection, so the metrics are always enabled.
+"""
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def format_label(label_name: Optional[str], label_value: Optional[str], extra: str = '') -> str:
+    labels = list()
+
+    if label_name is not None:
+        escaped = label_value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        labels.append('{}="{}"'.format(label_name, escaped))
+
+    if extra:
+        labels.append(extra)
+
+    if not labels:
+        return ''
+
+    return '{{{}}}'.format(','.join(labels))
+
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Histogram:
+    """ Distribution of a value, optionally partitioned by a single label. """
+
+    __slots__ = (
+        'name',
+        'documentation',
+        'label_name',
+        'buckets',
+        'values',
+    )
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            label_name: str = None,
+            buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_name = label_name
+        self.buckets = tuple(buckets)
+        # label value -> [bucket counts..., +Inf count, sum]
+        self.values: Dict[Optional[str], List[float]] = dict()
+
+    def observe(self, value: float, label_value: str = None):
+        counts = self.values.get(label_value)
+        if counts is None:
+            counts = [0] * (len(self.buckets) + 1) + [0.0]
+            self.values[label_value] = counts
+
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def collect(self) -> List[str]:
+        lines = [
+            '# HELP {} {}'.format(self.name, self.documentation),
+            '# TYPE {} histogram'.format(self.name),
+        ]
+
+        for label_value, counts in sorted(self.values.items(), key=lambda item: item[0] or ''):
+            cumulative = 0
+            for upper_bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="{}"'.format(format_value(upper_bound))
+                lines.append('{}_bucket{} {}'.format(
+                    self.name,
+                    format_label(self.label_name, label_value, le),
+                    cumulative,
+                ))
+
+            labels = format_label(self.label_name, label_value)
+            lines.append('{}_sum{} {}'.format(self.name, labels, format_value(counts[-1])))
+            lines.append('{}_count{} {}'.format(self.name, labels, cumulative))
+
+        return lines
+
+
+class Gauge:
+    """ A value which can go up and down, optionally partitioned by a single
+    label.
+    """
+
+    __slots__ = (
+        'name',
+        'documentation',
+        'label_name',
+        'values',
+    )
+
+    def __init__(self, name: str, documentation: str, label_name: str = None):
+        self.name = name
+        self.documentation = documentation
+        self.label_name = label_name
+        self.values: Dict[Optional[str], float] = dict()
+
+    def set(self, value: float, label_value: str = None):
+        self.values[label_value] = value
+
+    def clear(self):
+        self.values.clear()
+
+    def collect(self) -> List[str]:
+        lines = [
+            '# HELP {} {}'.format(self.name, self.documentation),
+            '# TYPE {} gauge'.format(self.name),
+        ]
+
+        for label_value, value in sorted(self.values.items(), key=lambda item: item[0] or ''):
+            lines.append('{}{} {}'.format(
+                self.name,
+                format_label(self.label_name, label_value),
+                format_value(value),
+            ))
+
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = list()
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        metric = Gauge(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = list()
+        for metric in self.metrics:
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+STATE_CHANGE_DISPATCH_SECONDS = REGISTRY.histogram(
+    'raiden_state_change_dispatch_seconds',
+    'Time to apply a state change to the node state.',
+    label_name='state_change',
+)
+STORAGE_WRITE_SECONDS = REGISTRY.histogram(
+    'raiden_storage_write_seconds',
+    'Time to write and commit to the database.',
+    label_name='operation',
+)
+EVENT_HANDLER_SECONDS = REGISTRY.histogram(
+    'raiden_event_handler_seconds',
+    'Time to handle an event of the state machine.',
+    label_name='event',
+)
+TRANSPORT_ROUNDTRIP_SECONDS = REGISTRY.histogram(
+    'raiden_transport_roundtrip_seconds',
+    'Time from the first send of a message until it is acknowledged.',
+)
+RPC_REQUEST_SECONDS = REGISTRY.histogram(
+    'raiden_rpc_request_seconds',
+    'Latency of the requests to the ethereum node.',
+    label_name='method',
+)
+HUB_LATENCY_SECONDS = REGISTRY.histogram(
+    'raiden_hub_latency_seconds',
+    'Delay of the gevent hub to wake up a sleeping greenlet.',
+)
+HUB_BLOCKED_SECONDS = REGISTRY.histogram(
+    'raiden_hub_blocked_seconds',
+    'Time a greenlet held the gevent hub above the blocking threshold.',
+    label_name='greenlet',
+)
+
+OPEN_CHANNELS = REGISTRY.gauge(
+    'raiden_open_channels',
+    'Number of open channels.',
+    label_name='token_network',
+)
+PENDING_LOCKS = REGISTRY.gauge(
+    'raiden_pending_locks',
+    'Number of pending locks sent by the node.',
+    label_name='token_network',
+)
+TRANSPORT_QUEUE_SIZE = REGISTRY.gauge(
+    'raiden_transport_queue_size',
+    'Number of messages waiting to be acknowledged.',
+)
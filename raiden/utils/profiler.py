@@ -0,0 +1,121 @@
+""" A sampling profiler of the greenlets of the node.
+
+The profiler uses the `ITIMER_PROF` timer, so it samples only while the
+process is using the CPU. The `SIGPROF` handler runs in the main thread, where
+all the greenlets of the node run, and records the stack of the greenlet which
+was interrupted. The greenlet name is the root frame of every stack, and it
+breaks down the samples by task, e.g. `Queue for <address> - global` for the
+UDPTransport queues.
+
+The samples are rendered as collapsed stacks, the input format of
+flamegraph.pl and speedscope.
+"""
+import os
+import signal
+import sys
+from collections import Counter
+from typing import Dict
+
+import gevent
+from greenlet import getcurrent
+
+from raiden.exceptions import ProfilerAlreadyRunning
+from raiden.settings import DEFAULT_PROFILER_SAMPLING_INTERVAL
+from raiden.utils.gevent_utils import greenlet_name
+
+# Only one profiler can own the timer
+_running_profiler = None
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = DEFAULT_PROFILER_SAMPLING_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.codes_to_labels = dict()
+        self.previous_handler = None
+
+        # Longest first, so the most specific path is stripped
+        self.path_prefixes = sorted(
+            (os.path.join(os.path.abspath(path), '') for path in sys.path if path),
+            key=len,
+            reverse=True,
+        )
+
+    def frame_label(self, code) -> str:
+        label = self.codes_to_labels.get(code)
+
+        if label is None:
+            filename = code.co_filename
+            for prefix in self.path_prefixes:
+                if filename.startswith(prefix):
+                    filename = filename[len(prefix):]
+                    break
+
+            label = '{}:{} ({})'.format(filename, code.co_name, code.co_firstlineno)
+            self.codes_to_labels[code] = label
+
+        return label
+
+    def sample(self, signum, frame):  # pylint: disable=unused-argument
+        labels = list()
+        while frame is not None:
+            labels.append(self.frame_label(frame.f_code))
+            frame = frame.f_back
+
+        labels.append(greenlet_name(getcurrent()).replace(';', ':'))
+        labels.reverse()
+
+        self.stacks[';'.join(labels)] += 1
+
+    def start(self):
+        global _running_profiler  # pylint: disable=global-statement
+
+        if _running_profiler is not None:
+            raise ProfilerAlreadyRunning('A profile is already running.')
+
+        # Must be done before the timer is set, this raises if called outside
+        # of the main thread
+        self.previous_handler = signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        _running_profiler = self
+
+    def stop(self):
+        global _running_profiler  # pylint: disable=global-statement
+
+        if _running_profiler is not self:
+            return
+
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self.previous_handler or signal.SIG_DFL)
+        _running_profiler = None
+
+    def greenlets(self) -> Dict[str, int]:
+        """ Number of samples per greenlet name. """
+        samples = Counter()
+        for stack, count in self.stacks.items():
+            samples[stack.split(';', 1)[0]] += count
+        return dict(samples)
+
+    def collapsed(self) -> str:
+        lines = [
+            '{} {}'.format(stack, count)
+            for stack, count in sorted(self.stacks.items())
+        ]
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+def profile(
+        duration: float,
+        interval: float = DEFAULT_PROFILER_SAMPLING_INTERVAL,
+) -> SamplingProfiler:
+    """ Sample the greenlets for `duration` seconds, the calling greenlet
+    sleeps meanwhile.
+    """
+    profiler = SamplingProfiler(interval)
+    profiler.start()
+    try:
+        gevent.sleep(duration)
+    finally:
+        profiler.stop()
+
+    return profiler
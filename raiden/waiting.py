@@ -1,11 +1,23 @@
-import gevent
+from contextlib import contextmanager
+
 import structlog
+from gevent.event import Event
 
+from raiden.transfer.architecture import StateChange
 from raiden.transfer.state import NODE_NETWORK_REACHABLE
 from raiden.transfer.state import (
     CHANNEL_STATE_SETTLED,
     CHANNEL_AFTER_CLOSE_STATES,
 )
+from raiden.transfer.state_change import (
+    ActionChangeNodeNetworkState,
+    Block,
+    ContractReceiveChannelClosed,
+    ContractReceiveChannelNew,
+    ContractReceiveChannelNewBalance,
+    ContractReceiveChannelSettled,
+    ContractReceiveNewTokenNetwork,
+)
 from raiden.transfer import channel, views
 from raiden.transfer.events import EventTransferReceivedSuccess
 from raiden.utils import typing
@@ -15,19 +27,129 @@ RaidenService = 'RaidenService'
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
 
+def state_change_channel_identifier(state_change: StateChange) -> typing.Optional[int]:
+    channel_identifier = getattr(state_change, 'channel_identifier', None)
+
+    if channel_identifier is None:
+        channel_state = getattr(state_change, 'channel_state', None)
+        channel_identifier = getattr(channel_state, 'identifier', None)
+
+    return channel_identifier
+
+
+class StateChangeSubscription:
+    """ A waiter interested in the state changes of the given types and/or
+    for the given channels, `None` matches everything.
+    """
+
+    def __init__(
+            self,
+            state_change_types: typing.Optional[typing.Tuple[type, ...]],
+            channel_ids: typing.Optional[typing.Set[typing.ChannelID]],
+    ):
+        self.state_change_types = state_change_types
+        self.channel_ids = channel_ids
+        self.notified = Event()
+        self.events = list()
+
+    def matches(self, state_change: StateChange) -> bool:
+        if self.state_change_types is not None:
+            if not isinstance(state_change, self.state_change_types):
+                return False
+
+        if self.channel_ids is not None:
+            if state_change_channel_identifier(state_change) not in self.channel_ids:
+                return False
+
+        return True
+
+    def notify(self, events: typing.List):
+        self.events.extend(events)
+        self.notified.set()
+
+    def wait(self, timeout: float) -> typing.List:
+        """ Wait until a matching state change is applied or `timeout`
+        expires, returns the events produced by the matching state changes
+        since the last call.
+        """
+        self.notified.wait(timeout)
+        self.notified.clear()
+
+        events = self.events
+        self.events = list()
+        return events
+
+
+class StateChangeSubscriptions:
+    """ Wakes up the waiters when a matching state change is applied.
+
+    `notify` must be called with every state change dispatched to the WAL,
+    this is done by `RaidenService.handle_state_change`.
+    """
+
+    def __init__(self):
+        self.subscriptions = list()
+
+    @contextmanager
+    def subscribe(
+            self,
+            state_change_types: typing.Iterable[type] = None,
+            channel_ids: typing.Iterable[typing.ChannelID] = None,
+    ):
+        if state_change_types is not None:
+            state_change_types = tuple(state_change_types)
+
+        if channel_ids is not None:
+            channel_ids = set(channel_ids)
+
+        subscription = StateChangeSubscription(state_change_types, channel_ids)
+        self.subscriptions.append(subscription)
+
+        try:
+            yield subscription
+        finally:
+            self.subscriptions.remove(subscription)
+
+    def notify(self, state_change: StateChange, events: typing.List):
+        for subscription in self.subscriptions:
+            if subscription.matches(state_change):
+                subscription.notify(events)
+
+
+def wait_for_state(
+        raiden: RaidenService,
+        condition: typing.Callable[['ChainState'], bool],
+        retry_timeout: float,
+        state_change_types: typing.Iterable[type] = None,
+        channel_ids: typing.Iterable[typing.ChannelID] = None,
+) -> None:
+    """Wait until `condition` holds for the node's chain state.
+
+    The condition is evaluated again as soon as a state change matching
+    `state_change_types` and `channel_ids` is applied. `retry_timeout` is
+    only a fallback for state changes that are not dispatched through
+    `RaidenService.handle_state_change`.
+
+    Note:
+        This does not time out, use gevent.Timeout.
+    """
+    subscriptions = raiden.state_change_subscriptions
+    with subscriptions.subscribe(state_change_types, channel_ids) as subscription:
+        while not condition(views.state_from_raiden(raiden)):
+            subscription.wait(retry_timeout)
+
+
 def wait_for_block(
         raiden: RaidenService,
         block_number: typing.BlockNumber,
         retry_timeout: float,
 ) -> None:
-    current_block_number = views.block_number(
-        views.state_from_raiden(raiden),
+    wait_for_state(
+        raiden,
+        lambda chain_state: views.block_number(chain_state) >= block_number,
+        retry_timeout,
+        state_change_types=[Block],
     )
-    while current_block_number < block_number:
-        gevent.sleep(retry_timeout)
-        current_block_number = views.block_number(
-            views.state_from_raiden(raiden),
-        )
 
 
 def wait_for_newchannel(
@@ -42,21 +164,21 @@ def wait_for_newchannel(
     Note:
         This does not time out, use gevent.Timeout.
     """
-    channel_state = views.get_channelstate_for(
-        views.state_from_raiden(raiden),
-        payment_network_id,
-        token_address,
-        partner_address,
-    )
-
-    while channel_state is None:
-        gevent.sleep(retry_timeout)
+    def channel_exists(chain_state):
         channel_state = views.get_channelstate_for(
-            views.state_from_raiden(raiden),
+            chain_state,
             payment_network_id,
             token_address,
             partner_address,
         )
+        return channel_state is not None
+
+    wait_for_state(
+        raiden,
+        channel_exists,
+        retry_timeout,
+        state_change_types=[ContractReceiveChannelNew],
+    )
 
 
 def wait_for_participant_newbalance(
@@ -80,21 +202,21 @@ def wait_for_participant_newbalance(
     else:
         raise ValueError('target_address must be one of the channel participants')
 
-    channel_state = views.get_channelstate_for(
-        views.state_from_raiden(raiden),
-        payment_network_id,
-        token_address,
-        partner_address,
-    )
-
-    while balance(channel_state) < target_balance:
-        gevent.sleep(retry_timeout)
+    def balance_reached(chain_state):
         channel_state = views.get_channelstate_for(
-            views.state_from_raiden(raiden),
+            chain_state,
             payment_network_id,
             token_address,
             partner_address,
         )
+        return balance(channel_state) >= target_balance
+
+    wait_for_state(
+        raiden,
+        balance_reached,
+        retry_timeout,
+        state_change_types=[ContractReceiveChannelNewBalance],
+    )
 
 
 def wait_for_close(
@@ -111,24 +233,31 @@ def wait_for_close(
     """
     channel_ids = list(channel_ids)
 
-    while channel_ids:
-        first_id = channel_ids[0]
-        channel_state = views.get_channelstate_by_id(
-            views.state_from_raiden(raiden),
-            payment_network_id,
-            token_address,
-            first_id,
-        )
+    def all_closed(chain_state):
+        for channel_id in channel_ids:
+            channel_state = views.get_channelstate_by_id(
+                chain_state,
+                payment_network_id,
+                token_address,
+                channel_id,
+            )
 
-        channel_is_settled = (
-            channel_state is None or
-            channel.get_status(channel_state) in CHANNEL_AFTER_CLOSE_STATES
-        )
+            channel_is_closed = (
+                channel_state is None or
+                channel.get_status(channel_state) in CHANNEL_AFTER_CLOSE_STATES
+            )
+            if not channel_is_closed:
+                return False
 
-        if channel_is_settled:
-            channel_ids.pop()
-        else:
-            gevent.sleep(retry_timeout)
+        return True
+
+    wait_for_state(
+        raiden,
+        all_closed,
+        retry_timeout,
+        state_change_types=[ContractReceiveChannelClosed, ContractReceiveChannelSettled],
+        channel_ids=channel_ids,
+    )
 
 
 def wait_for_payment_network(
@@ -137,18 +266,20 @@ def wait_for_payment_network(
         token_address: typing.TokenAddress,
         retry_timeout: float,
 ) -> None:
-    token_network = views.get_token_network_by_token_address(
-        views.state_from_raiden(raiden),
-        payment_network_id,
-        token_address,
-    )
-    while token_network is None:
-        gevent.sleep(retry_timeout)
+    def token_network_exists(chain_state):
         token_network = views.get_token_network_by_token_address(
-            views.state_from_raiden(raiden),
+            chain_state,
             payment_network_id,
             token_address,
         )
+        return token_network is not None
+
+    wait_for_state(
+        raiden,
+        token_network_exists,
+        retry_timeout,
+        state_change_types=[ContractReceiveNewTokenNetwork],
+    )
 
 
 def wait_for_settle(
@@ -168,24 +299,31 @@ def wait_for_settle(
 
     channel_ids = list(channel_ids)
 
-    while channel_ids:
-        first_id = channel_ids[0]
-        channel_state = views.get_channelstate_by_id(
-            views.state_from_raiden(raiden),
-            payment_network_id,
-            token_address,
-            first_id,
-        )
+    def all_settled(chain_state):
+        for channel_id in channel_ids:
+            channel_state = views.get_channelstate_by_id(
+                chain_state,
+                payment_network_id,
+                token_address,
+                channel_id,
+            )
 
-        channel_is_settled = (
-            channel_state is None or
-            channel.get_status(channel_state) == CHANNEL_STATE_SETTLED
-        )
+            channel_is_settled = (
+                channel_state is None or
+                channel.get_status(channel_state) == CHANNEL_STATE_SETTLED
+            )
+            if not channel_is_settled:
+                return False
 
-        if channel_is_settled:
-            channel_ids.pop()
-        else:
-            gevent.sleep(retry_timeout)
+        return True
+
+    wait_for_state(
+        raiden,
+        all_settled,
+        retry_timeout,
+        state_change_types=[ContractReceiveChannelSettled],
+        channel_ids=channel_ids,
+    )
 
 
 def wait_for_settle_all_channels(
@@ -204,12 +342,12 @@ def wait_for_settle_all_channels(
 
         id_tokennetworkstate = payment_network_state.tokenidentifiers_to_tokennetworks.items()
         for token_network_id, token_network_state in id_tokennetworkstate:
-            channel_ids = token_network_state.channelidentifiers_to_channels.keys()
+            channel_ids = list(token_network_state.channelidentifiers_to_channels.keys())
 
             wait_for_settle(
                 raiden,
                 payment_network_id,
-                token_network_id,
+                token_network_state.token_address,
                 channel_ids,
                 retry_timeout,
             )
@@ -225,16 +363,17 @@ def wait_for_healthy(
     Note:
         This does not time out, use gevent.Timeout.
     """
-    network_statuses = views.get_networkstatuses(
-        views.state_from_raiden(raiden),
+    def is_healthy(chain_state):
+        network_statuses = views.get_networkstatuses(chain_state)
+        return network_statuses.get(node_address) == NODE_NETWORK_REACHABLE
+
+    wait_for_state(
+        raiden,
+        is_healthy,
+        retry_timeout,
+        state_change_types=[ActionChangeNodeNetworkState],
     )
 
-    while network_statuses.get(node_address) != NODE_NETWORK_REACHABLE:
-        gevent.sleep(retry_timeout)
-        network_statuses = views.get_networkstatuses(
-            views.state_from_raiden(raiden),
-        )
-
 
 def wait_for_transfer_success(
         raiden: RaidenService,
@@ -248,18 +387,19 @@ def wait_for_transfer_success(
     Note:
         This does not time out, use gevent.Timeout.
     """
-    found = False
-    while not found:
+    def is_success(event):
+        return (
+            isinstance(event, EventTransferReceivedSuccess) and
+            event.identifier == payment_identifier and
+            event.amount == amount
+        )
+
+    # Subscribe before reading the storage, otherwise the event could be
+    # produced in between and missed.
+    with raiden.state_change_subscriptions.subscribe() as subscription:
         state_events = raiden.wal.storage.get_events_by_identifier(0, 'latest')
-        for event_tuple in state_events:
-            event = event_tuple[1]
-            # if isinstance(event, EventTransferReceivedSuccess):
-            found = (
-                isinstance(event, EventTransferReceivedSuccess) and
-                event.identifier == payment_identifier and
-                event.amount == amount
-            )
-            if found:
-                break
+        found = any(is_success(event_tuple[1]) for event_tuple in state_events)
 
-        gevent.sleep(retry_timeout)
+        while not found:
+            events = subscription.wait(retry_timeout)
+            found = any(is_success(event) for event in events)